@@ -1,6 +1,7 @@
 #define _POSIX_C_SOURCE 200809L
 
 #include "wang/solver.h"
+#include "wang/solver_parallel.h"
 
 #include "wang/formula.h"
 #include "wang/formula_parser.h"
@@ -17,6 +18,10 @@
 #include <sys/resource.h>
 #include <time.h>
 
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
 typedef enum {
     BENCH_GENERIC_FORCED_THIN,
     BENCH_GENERIC_RESULT_COPY,
@@ -36,9 +41,15 @@ typedef enum {
 
 typedef enum {
     BENCH_REFERENCE_SOLVER,
-    BENCH_OPTIMIZED_SOLVER
+    BENCH_OPTIMIZED_SOLVER,
+    BENCH_PARALLEL_SOLVER,
+    BENCH_PORTFOLIO_SOLVER,
+    BENCH_FRONTIER_SOLVER
 } BenchmarkSolver;
 
+/* Thread counts a parallel run sweeps; more than this is a usage error. */
+#define BENCH_MAX_THREAD_SWEEP 16u
+
 typedef struct {
     const char *name;
     BenchmarkKind kind;
@@ -488,6 +499,25 @@ static bool metrics_equal(
         left->support_byte_lookups == right->support_byte_lookups &&
         left->support_table_bytes == right->support_table_bytes &&
         left->mrv_cells_scanned == right->mrv_cells_scanned &&
+        left->mrv_index_updates == right->mrv_index_updates &&
+        left->mrv_index_bytes == right->mrv_index_bytes &&
+        left->component_splits == right->component_splits &&
+        left->components == right->components &&
+        left->nogoods_learned == right->nogoods_learned &&
+        left->nogoods_evicted == right->nogoods_evicted &&
+        left->nogood_hits == right->nogood_hits &&
+        left->backjumps == right->backjumps &&
+        left->backjump_levels == right->backjump_levels &&
+        left->restarts == right->restarts &&
+        left->bitslice_passes == right->bitslice_passes &&
+        left->bitslice_words == right->bitslice_words &&
+        left->frontier_states == right->frontier_states &&
+        left->frontier_peak_states == right->frontier_peak_states &&
+        left->value_scorings == right->value_scorings &&
+        left->value_score_lookups == right->value_score_lookups &&
+        left->probes == right->probes &&
+        left->probe_prunes == right->probe_prunes &&
+        left->weight_bumps == right->weight_bumps &&
         left->initial_trail_writes == right->initial_trail_writes &&
         left->search_trail_writes == right->search_trail_writes &&
         left->initial_trail_rewrites == right->initial_trail_rewrites &&
@@ -537,7 +567,7 @@ static bool result_matches_contract(
     return result->domains == NULL && result->domain_count == 0;
 }
 
-static bool parse_iterations(const char *text, size_t *out_iterations)
+static bool parse_positive_count(const char *text, size_t *out_count)
 {
     if (text == NULL || text[0] == '\0' || text[0] == '-') {
         return false;
@@ -549,7 +579,7 @@ static bool parse_iterations(const char *text, size_t *out_iterations)
         value == 0 || value > SIZE_MAX) {
         return false;
     }
-    *out_iterations = (size_t)value;
+    *out_count = (size_t)value;
     return true;
 }
 
@@ -613,13 +643,43 @@ static bool solve_once(
     const WangSolverOptions *options,
     bool capture_unsat,
     BenchmarkSolver solver,
+    size_t thread_count,
     WangSolverMetrics *out_metrics
 )
 {
     WangSolveResult result = {0};
-    const WangSolveStatus status = solver == BENCH_REFERENCE_SOLVER
-        ? wang_solve_serial(region, options, &result)
-        : wang_solve_optimized(region, options, &result);
+    WangSolveStatus status;
+    switch (solver) {
+    case BENCH_REFERENCE_SOLVER:
+        status = wang_solve_serial(region, options, &result);
+        break;
+    case BENCH_OPTIMIZED_SOLVER:
+        status = wang_solve_optimized(region, options, &result);
+        break;
+    case BENCH_FRONTIER_SOLVER:
+        status = wang_solve_frontier(region, options, &result);
+        break;
+    case BENCH_PARALLEL_SOLVER:
+        status = wang_solve_parallel(
+            region,
+            options,
+            WANG_SOLVER_OPTIMIZED,
+            thread_count,
+            &result
+        );
+        break;
+    case BENCH_PORTFOLIO_SOLVER:
+    default:
+        status = wang_solve_portfolio(
+            region,
+            options,
+            NULL,
+            thread_count,
+            NULL,
+            &result
+        );
+        break;
+    }
     const bool valid = status == spec->expected_status &&
         result_matches_contract(
             region,
@@ -634,6 +694,23 @@ static bool solve_once(
     return valid;
 }
 
+static const char *benchmark_solver_name(BenchmarkSolver solver)
+{
+    switch (solver) {
+    case BENCH_REFERENCE_SOLVER:
+        return "reference";
+    case BENCH_OPTIMIZED_SOLVER:
+        return "optimized";
+    case BENCH_PARALLEL_SOLVER:
+        return "parallel";
+    case BENCH_PORTFOLIO_SOLVER:
+        return "portfolio";
+    case BENCH_FRONTIER_SOLVER:
+        return "frontier";
+    }
+    return "unknown";
+}
+
 static const char *benchmark_scope_name(BenchmarkScope scope)
 {
     switch (scope) {
@@ -647,12 +724,59 @@ static const char *benchmark_scope_name(BenchmarkScope scope)
     return "unknown";
 }
 
+static const char *decompose_name(uint32_t decompose_flags)
+{
+    if ((decompose_flags & WANG_SOLVE_DECOMPOSE_EACH_DECISION) != 0) {
+        return "each";
+    }
+    return decompose_flags != 0 ? "root" : "none";
+}
+
+static const char *restart_name(WangRestartSchedule schedule)
+{
+    switch (schedule) {
+    case WANG_RESTART_LUBY:
+        return "luby";
+    case WANG_RESTART_GEOMETRIC:
+        return "geometric";
+    case WANG_RESTART_NONE:
+        break;
+    }
+    return "none";
+}
+
+static const char *value_order_name(WangValueOrder order)
+{
+    switch (order) {
+    case WANG_VALUE_ORDER_DESCENDING:
+        return "descending";
+    case WANG_VALUE_ORDER_RANDOM:
+        return "random";
+    case WANG_VALUE_ORDER_LEAST_CONSTRAINING:
+        return "least-constraining";
+    case WANG_VALUE_ORDER_ASCENDING:
+        break;
+    }
+    return "ascending";
+}
+
 static bool run_benchmark(
     const BenchmarkSpec *spec,
     size_t iterations,
     bool collect_metrics,
     bool capture_unsat,
-    BenchmarkSolver solver
+    uint32_t decompose_flags,
+    bool learn_nogoods,
+    WangRestartSchedule restart_schedule,
+    bool bitslice,
+    bool frontier,
+    WangValueOrder value_order,
+    bool probe,
+    size_t probe_depth,
+    uint64_t probe_budget_ns,
+    bool weighted_degree,
+    BenchmarkSolver solver,
+    size_t thread_count
 )
 {
     BenchmarkFixture fixture = {0};
@@ -663,12 +787,24 @@ static bool run_benchmark(
 
     WangSolverOptions options = {
         .flags = (collect_metrics ? WANG_SOLVE_COLLECT_METRICS : 0) |
-            (capture_unsat ? WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT : 0),
+            (capture_unsat ? WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT : 0) |
+            decompose_flags |
+            (learn_nogoods ? WANG_SOLVE_LEARN_NOGOODS : 0) |
+            (bitslice ? WANG_SOLVE_BITSLICE_PROPAGATION : 0) |
+            (frontier ? WANG_SOLVE_FRONTIER_WHEN_NARROW : 0) |
+            (probe ? WANG_SOLVE_PROBE_SINGLETONS : 0) |
+            (weighted_degree ? WANG_SOLVE_WEIGHTED_DEGREE : 0),
+        .value_order = value_order,
+        .restart_schedule = restart_schedule,
+        .probe_budget_ns = probe_budget_ns,
+        .probe_depth = probe_depth,
     };
     WangSolverMetrics reference_metrics = {0};
     size_t cell_count = 0;
     size_t active_count = 0;
 
+    const bool solver_is_concurrent = solver == BENCH_PARALLEL_SOLVER ||
+        solver == BENCH_PORTFOLIO_SOLVER;
     const Region *region = prepared_region(&fixture);
     if (region != NULL) {
         cell_count = region->cell_count;
@@ -737,6 +873,7 @@ static bool run_benchmark(
             &options,
             capture_unsat,
             solver,
+            thread_count,
             &metrics
         );
         if (owns_iteration_reduction) {
@@ -750,9 +887,11 @@ static bool run_benchmark(
             return false;
         }
 
+        /* Concurrent solvers return whichever search finishes first. */
         if (iteration == 0) {
             reference_metrics = metrics;
-        } else if (!metrics_equal(&reference_metrics, &metrics)) {
+        } else if (!solver_is_concurrent &&
+                   !metrics_equal(&reference_metrics, &metrics)) {
             fixture_destroy(&fixture);
             return false;
         }
@@ -777,8 +916,11 @@ static bool run_benchmark(
     );
 
     printf(
-        "benchmark_version=8 case=%s solver=%s scope=%s expected=%s "
-        "iterations=%zu metrics=%u capture_unsat=%u "
+        "benchmark_version=18 case=%s solver=%s threads=%zu scope=%s "
+        "expected=%s iterations=%zu metrics=%u capture_unsat=%u "
+        "decompose=%s learn=%u restart_schedule=%s bitslice=%u "
+        "frontier=%u value_order=%s probe=%u probe_depth=%zu "
+        "probe_budget_ns=%" PRIu64 " weighted_degree=%u "
         "elapsed_ns=%" PRIu64 " ns_per_iteration=%" PRIu64 " "
         "process_peak_rss_kib=%ld peak_rss_source=%s "
         "cells=%zu active=%zu "
@@ -789,6 +931,16 @@ static bool run_benchmark(
         "support_byte_lookups=%" PRIu64 " "
         "support_table_bytes=%zu "
         "mrv_cells_scanned=%" PRIu64 " "
+        "mrv_index_updates=%" PRIu64 " mrv_index_bytes=%zu "
+        "component_splits=%" PRIu64 " components=%" PRIu64 " "
+        "nogoods_learned=%" PRIu64 " nogoods_evicted=%" PRIu64 " "
+        "nogood_hits=%" PRIu64 " backjumps=%" PRIu64 " "
+        "backjump_levels=%" PRIu64 " restarts=%" PRIu64 " "
+        "bitslice_passes=%" PRIu64 " bitslice_words=%" PRIu64 " "
+        "frontier_states=%" PRIu64 " frontier_peak_states=%zu "
+        "value_scorings=%" PRIu64 " value_score_lookups=%" PRIu64 " "
+        "probes=%" PRIu64 " probe_prunes=%" PRIu64 " "
+        "weight_bumps=%" PRIu64 " "
         "initial_trail_writes=%" PRIu64 " "
         "search_trail_writes=%" PRIu64 " "
         "initial_trail_rewrites=%" PRIu64 " "
@@ -801,12 +953,23 @@ static bool run_benchmark(
         "dfs_stack_capacity_peak=%zu dfs_stack_bytes_peak=%zu "
         "max_depth=%zu sat_result_copy_bytes=%zu\n",
         spec->name,
-        solver == BENCH_REFERENCE_SOLVER ? "reference" : "optimized",
+        benchmark_solver_name(solver),
+        thread_count,
         benchmark_scope_name(spec->scope),
         spec->expected_status == WANG_SOLVE_SAT ? "SAT" : "UNSAT",
         iterations,
         collect_metrics ? 1u : 0u,
         capture_unsat ? 1u : 0u,
+        decompose_name(decompose_flags),
+        learn_nogoods ? 1u : 0u,
+        restart_name(restart_schedule),
+        bitslice ? 1u : 0u,
+        frontier ? 1u : 0u,
+        value_order_name(value_order),
+        probe ? 1u : 0u,
+        probe_depth,
+        probe_budget_ns,
+        weighted_degree ? 1u : 0u,
         elapsed,
         elapsed / iterations,
         peak_rss_kib,
@@ -823,6 +986,25 @@ static bool run_benchmark(
         reference_metrics.support_byte_lookups,
         reference_metrics.support_table_bytes,
         reference_metrics.mrv_cells_scanned,
+        reference_metrics.mrv_index_updates,
+        reference_metrics.mrv_index_bytes,
+        reference_metrics.component_splits,
+        reference_metrics.components,
+        reference_metrics.nogoods_learned,
+        reference_metrics.nogoods_evicted,
+        reference_metrics.nogood_hits,
+        reference_metrics.backjumps,
+        reference_metrics.backjump_levels,
+        reference_metrics.restarts,
+        reference_metrics.bitslice_passes,
+        reference_metrics.bitslice_words,
+        reference_metrics.frontier_states,
+        reference_metrics.frontier_peak_states,
+        reference_metrics.value_scorings,
+        reference_metrics.value_score_lookups,
+        reference_metrics.probes,
+        reference_metrics.probe_prunes,
+        reference_metrics.weight_bumps,
         reference_metrics.initial_trail_writes,
         reference_metrics.search_trail_writes,
         reference_metrics.initial_trail_rewrites,
@@ -862,8 +1044,14 @@ static void print_usage(const char *program)
 {
     fprintf(
         stderr,
-        "Usage: %s --case NAME [--solver reference|optimized] "
-        "[--iterations N] [--metrics] [--capture-unsat]\n"
+        "Usage: %s --case NAME "
+        "[--solver reference|optimized|parallel|portfolio|frontier] "
+        "[--threads N]... [--iterations N] [--metrics] [--capture-unsat] "
+        "[--decompose root|each] [--learn] [--restarts luby|geometric] "
+        "[--bitslice] [--frontier]\n"
+        "       [--value-order ascending|descending|random|"
+        "least-constraining] [--probe] [--probe-depth N]\n"
+        "       [--probe-budget-ns N] [--weighted-degree]\n"
         "       %s --list\n"
         "       %s --environment\n",
         program,
@@ -878,17 +1066,29 @@ int main(int argc, char **argv)
     size_t iterations = 0;
     bool collect_metrics = false;
     bool capture_unsat = false;
+    uint32_t decompose_flags = 0;
+    bool learn_nogoods = false;
+    WangRestartSchedule restart_schedule = WANG_RESTART_NONE;
+    bool bitslice = false;
+    bool frontier = false;
+    WangValueOrder value_order = WANG_VALUE_ORDER_ASCENDING;
+    bool probe = false;
+    size_t probe_depth = 0;
+    size_t probe_budget_ns = 0;
+    bool weighted_degree = false;
     bool list = false;
     bool environment = false;
     BenchmarkSolver solver = BENCH_REFERENCE_SOLVER;
     bool solver_selected = false;
+    size_t thread_counts[BENCH_MAX_THREAD_SWEEP];
+    size_t thread_sweep = 0;
 
     for (int argument = 1; argument < argc; ++argument) {
         if (strcmp(argv[argument], "--case") == 0 && argument + 1 < argc) {
             case_name = argv[++argument];
         } else if (strcmp(argv[argument], "--iterations") == 0 &&
                    argument + 1 < argc) {
-            if (!parse_iterations(argv[++argument], &iterations)) {
+            if (!parse_positive_count(argv[++argument], &iterations)) {
                 print_usage(argv[0]);
                 return EXIT_FAILURE;
             }
@@ -896,6 +1096,67 @@ int main(int argc, char **argv)
             collect_metrics = true;
         } else if (strcmp(argv[argument], "--capture-unsat") == 0) {
             capture_unsat = true;
+        } else if (strcmp(argv[argument], "--decompose") == 0 &&
+                   argument + 1 < argc) {
+            const char *mode = argv[++argument];
+            if (strcmp(mode, "root") == 0) {
+                decompose_flags = WANG_SOLVE_DECOMPOSE_COMPONENTS;
+            } else if (strcmp(mode, "each") == 0) {
+                decompose_flags = WANG_SOLVE_DECOMPOSE_EACH_DECISION;
+            } else {
+                print_usage(argv[0]);
+                return EXIT_FAILURE;
+            }
+        } else if (strcmp(argv[argument], "--learn") == 0) {
+            learn_nogoods = true;
+        } else if (strcmp(argv[argument], "--bitslice") == 0) {
+            bitslice = true;
+        } else if (strcmp(argv[argument], "--frontier") == 0) {
+            frontier = true;
+        } else if (strcmp(argv[argument], "--probe") == 0) {
+            probe = true;
+        } else if (strcmp(argv[argument], "--probe-depth") == 0 &&
+                   argument + 1 < argc) {
+            if (!parse_positive_count(argv[++argument], &probe_depth)) {
+                print_usage(argv[0]);
+                return EXIT_FAILURE;
+            }
+            probe = true;
+        } else if (strcmp(argv[argument], "--probe-budget-ns") == 0 &&
+                   argument + 1 < argc) {
+            if (!parse_positive_count(argv[++argument], &probe_budget_ns)) {
+                print_usage(argv[0]);
+                return EXIT_FAILURE;
+            }
+            probe = true;
+        } else if (strcmp(argv[argument], "--weighted-degree") == 0) {
+            weighted_degree = true;
+        } else if (strcmp(argv[argument], "--value-order") == 0 &&
+                   argument + 1 < argc) {
+            const char *order = argv[++argument];
+            if (strcmp(order, "ascending") == 0) {
+                value_order = WANG_VALUE_ORDER_ASCENDING;
+            } else if (strcmp(order, "descending") == 0) {
+                value_order = WANG_VALUE_ORDER_DESCENDING;
+            } else if (strcmp(order, "random") == 0) {
+                value_order = WANG_VALUE_ORDER_RANDOM;
+            } else if (strcmp(order, "least-constraining") == 0) {
+                value_order = WANG_VALUE_ORDER_LEAST_CONSTRAINING;
+            } else {
+                print_usage(argv[0]);
+                return EXIT_FAILURE;
+            }
+        } else if (strcmp(argv[argument], "--restarts") == 0 &&
+                   argument + 1 < argc) {
+            const char *schedule = argv[++argument];
+            if (strcmp(schedule, "luby") == 0) {
+                restart_schedule = WANG_RESTART_LUBY;
+            } else if (strcmp(schedule, "geometric") == 0) {
+                restart_schedule = WANG_RESTART_GEOMETRIC;
+            } else {
+                print_usage(argv[0]);
+                return EXIT_FAILURE;
+            }
         } else if (strcmp(argv[argument], "--solver") == 0 &&
                    argument + 1 < argc) {
             const char *name = argv[++argument];
@@ -908,10 +1169,26 @@ int main(int argc, char **argv)
                 solver = BENCH_REFERENCE_SOLVER;
             } else if (strcmp(name, "optimized") == 0) {
                 solver = BENCH_OPTIMIZED_SOLVER;
+            } else if (strcmp(name, "parallel") == 0) {
+                solver = BENCH_PARALLEL_SOLVER;
+            } else if (strcmp(name, "portfolio") == 0) {
+                solver = BENCH_PORTFOLIO_SOLVER;
+            } else if (strcmp(name, "frontier") == 0) {
+                solver = BENCH_FRONTIER_SOLVER;
             } else {
                 print_usage(argv[0]);
                 return EXIT_FAILURE;
             }
+        } else if (strcmp(argv[argument], "--threads") == 0 &&
+                   argument + 1 < argc) {
+            if (thread_sweep == BENCH_MAX_THREAD_SWEEP ||
+                !parse_positive_count(
+                    argv[++argument],
+                    &thread_counts[thread_sweep++]
+                )) {
+                print_usage(argv[0]);
+                return EXIT_FAILURE;
+            }
         } else if (strcmp(argv[argument], "--list") == 0) {
             list = true;
         } else if (strcmp(argv[argument], "--environment") == 0) {
@@ -924,7 +1201,11 @@ int main(int argc, char **argv)
 
     if (list) {
         if (case_name != NULL || iterations != 0 || collect_metrics ||
-            capture_unsat || environment || solver_selected) {
+            capture_unsat || environment || solver_selected ||
+            thread_sweep != 0 || decompose_flags != 0 || learn_nogoods ||
+            restart_schedule != WANG_RESTART_NONE || bitslice || frontier ||
+            value_order != WANG_VALUE_ORDER_ASCENDING || probe ||
+            weighted_degree) {
             print_usage(argv[0]);
             return EXIT_FAILURE;
         }
@@ -938,11 +1219,15 @@ int main(int argc, char **argv)
 
     if (environment) {
         if (case_name != NULL || iterations != 0 || collect_metrics ||
-            capture_unsat || solver_selected) {
+            capture_unsat || solver_selected || thread_sweep != 0 ||
+            decompose_flags != 0 || learn_nogoods ||
+            restart_schedule != WANG_RESTART_NONE || bitslice || frontier ||
+            value_order != WANG_VALUE_ORDER_ASCENDING || probe ||
+            weighted_degree) {
             print_usage(argv[0]);
             return EXIT_FAILURE;
         }
-        printf("benchmark_version=8 ");
+        printf("benchmark_version=18 ");
 #if defined(__clang__)
         printf(
             "compiler=clang-%d.%d.%d ",
@@ -965,22 +1250,74 @@ int main(int argc, char **argv)
     }
 
     const BenchmarkSpec *spec = find_benchmark(case_name);
-    if (spec == NULL) {
+    /*
+     * The reference engine rejects decomposition, learning, restarts,
+     * bit-sliced propagation, frontier selection, least-constraining
+     * values, probing and weighted-degree selection by contract, the
+     * frontier engine rejects the search mechanisms, decomposition
+     * combines with neither learning nor restarts, and learning combines
+     * with no probe depth.
+     */
+    const bool restarts = restart_schedule != WANG_RESTART_NONE;
+    const bool value_scoring =
+        value_order == WANG_VALUE_ORDER_LEAST_CONSTRAINING;
+    if (spec == NULL ||
+        ((decompose_flags != 0 || learn_nogoods || restarts || bitslice ||
+          frontier || value_scoring || probe || weighted_degree) &&
+         solver == BENCH_REFERENCE_SOLVER) ||
+        ((decompose_flags != 0 || learn_nogoods || restarts || probe ||
+          weighted_degree) &&
+         solver == BENCH_FRONTIER_SOLVER) ||
+        (decompose_flags != 0 && (learn_nogoods || restarts)) ||
+        (learn_nogoods && probe_depth != 0)) {
         print_usage(argv[0]);
         return EXIT_FAILURE;
     }
     if (iterations == 0) {
         iterations = spec->default_iterations;
     }
-    if (!run_benchmark(
-            spec,
-            iterations,
-            collect_metrics,
-            capture_unsat,
-            solver
-        )) {
-        fprintf(stderr, "benchmark failed: %s\n", spec->name);
-        return EXIT_FAILURE;
+    if (solver != BENCH_PARALLEL_SOLVER && solver != BENCH_PORTFOLIO_SOLVER) {
+        if (thread_sweep != 0) {
+            print_usage(argv[0]);
+            return EXIT_FAILURE;
+        }
+        thread_counts[thread_sweep++] = 1;
+    } else if (thread_sweep == 0) {
+        /* Sweep powers of two up to the OpenMP default, then the default. */
+        size_t max_threads = 1;
+#ifdef _OPENMP
+        max_threads = (size_t)omp_get_max_threads();
+#endif
+        for (size_t threads = 1;
+             threads < max_threads &&
+             thread_sweep + 1 < BENCH_MAX_THREAD_SWEEP;
+             threads *= 2) {
+            thread_counts[thread_sweep++] = threads;
+        }
+        thread_counts[thread_sweep++] = max_threads;
+    }
+    for (size_t i = 0; i < thread_sweep; ++i) {
+        if (!run_benchmark(
+                spec,
+                iterations,
+                collect_metrics,
+                capture_unsat,
+                decompose_flags,
+                learn_nogoods,
+                restart_schedule,
+                bitslice,
+                frontier,
+                value_order,
+                probe,
+                probe_depth,
+                (uint64_t)probe_budget_ns,
+                weighted_degree,
+                solver,
+                thread_counts[i]
+            )) {
+            fprintf(stderr, "benchmark failed: %s\n", spec->name);
+            return EXIT_FAILURE;
+        }
     }
     return EXIT_SUCCESS;
 }
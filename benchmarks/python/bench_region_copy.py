@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Measure the cost of copying a native Yang–Zhang region into Python."""
+
+import argparse
+import json
+from pathlib import Path
+import statistics
+import sys
+from time import perf_counter_ns
+from typing import Any, Callable, Final
+
+
+REPOSITORY_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPOSITORY_ROOT / "python"))
+
+from model.region import Region  # noqa: E402
+from native.formula_adapter import _loaded_formula  # noqa: E402
+from native.region_adapter import (  # noqa: E402
+    _Region,
+    _built_reduction,
+    _packed_region,
+)
+
+
+SCHEMA_VERSION: Final = 1
+INSTANCE_DIRECTORIES: Final = (
+    REPOSITORY_ROOT / "benchmarks" / "instances",
+    REPOSITORY_ROOT / "tests" / "instances",
+)
+STRATEGIES: Final = ("per-cell-region", "packed-region", "packed-to-region")
+
+
+def _per_cell_region(native_region: _Region) -> Region:
+    """The original field-by-field ctypes copy, kept as the baseline."""
+
+    cell_count = int(native_region.cell_count)
+    return Region(
+        width=int(native_region.width),
+        height=int(native_region.height),
+        active=tuple(
+            bool(native_region.cells[index].active)
+            for index in range(cell_count)
+        ),
+        boundary=tuple(
+            (
+                int(native_region.cells[index].boundary[0]),
+                int(native_region.cells[index].boundary[1]),
+                int(native_region.cells[index].boundary[2]),
+                int(native_region.cells[index].boundary[3]),
+            )
+            for index in range(cell_count)
+        ),
+    )
+
+
+def _strategy(name: str) -> Callable[[_Region], Any]:
+    if name == "per-cell-region":
+        return _per_cell_region
+    if name == "packed-region":
+        return _packed_region
+    return lambda native_region: _packed_region(native_region).to_region()
+
+
+def _instance_paths() -> list[Path]:
+    return sorted(
+        path
+        for directory in INSTANCE_DIRECTORIES
+        for path in directory.glob("*.cm13")
+    )
+
+
+def _measure(
+    path: Path,
+    strategy: str,
+    samples: int,
+    iterations: int,
+) -> dict[str, Any] | None:
+    copy = _strategy(strategy)
+    try:
+        with _loaded_formula(path) as native_formula:
+            with _built_reduction(native_formula) as reduction:
+                native_region = reduction.region
+                cell_count = int(native_region.cell_count)
+                elapsed = []
+                for _ in range(samples):
+                    started = perf_counter_ns()
+                    for _ in range(iterations):
+                        copy(native_region)
+                    elapsed.append(perf_counter_ns() - started)
+    except (OSError, RuntimeError, ValueError):
+        return None
+
+    per_cell = [value / (iterations * cell_count) for value in elapsed]
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "instance": str(path.relative_to(REPOSITORY_ROOT)),
+        "strategy": strategy,
+        "cell_count": cell_count,
+        "samples": samples,
+        "iterations": iterations,
+        "median_ns_per_cell": statistics.median(per_cell),
+        "min_ns_per_cell": min(per_cell),
+    }
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError("value must be positive")
+    return value
+
+
+def _parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--strategy", choices=STRATEGIES, action="append")
+    parser.add_argument("--samples", type=_positive_int, default=5)
+    parser.add_argument("--iterations", type=_positive_int, default=20)
+    return parser.parse_args()
+
+
+def main() -> int:
+    arguments = _parse_arguments()
+    strategies = arguments.strategy or list(STRATEGIES)
+    for path in _instance_paths():
+        for strategy in strategies:
+            record = _measure(
+                path,
+                strategy,
+                arguments.samples,
+                arguments.iterations,
+            )
+            if record is not None:
+                print(json.dumps(record, sort_keys=True), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
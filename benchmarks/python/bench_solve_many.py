@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Measure thread-pool scaling of native solves over the benchmark corpus."""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import sys
+from time import perf_counter_ns
+from typing import Final
+
+
+REPOSITORY_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPOSITORY_ROOT / "python"))
+
+from native.instance_adapter import NativeInstance, solve_many  # noqa: E402
+
+
+SCHEMA_VERSION: Final = 1
+INSTANCE_DIRECTORY: Final = REPOSITORY_ROOT / "benchmarks" / "instances"
+
+
+def _thread_counts(maximum: int) -> list[int]:
+    counts = []
+    count = 1
+    while count < maximum:
+        counts.append(count)
+        count *= 2
+    counts.append(maximum)
+    return counts
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError("value must be positive")
+    return value
+
+
+def _parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-threads", type=_positive_int)
+    parser.add_argument("--repeat", type=_positive_int, default=4)
+    parser.add_argument("--samples", type=_positive_int, default=3)
+    parser.add_argument("--reference", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> int:
+    arguments = _parse_arguments()
+    maximum = arguments.max_threads or os.cpu_count() or 1
+    paths = sorted(INSTANCE_DIRECTORY.glob("*.cm13"))
+    instances = [NativeInstance(path) for path in paths]
+    try:
+        batch = instances * arguments.repeat
+        baseline_ns: float | None = None
+        for workers in _thread_counts(maximum):
+            elapsed = []
+            for _ in range(arguments.samples):
+                started = perf_counter_ns()
+                for _ in solve_many(
+                    batch,
+                    optimized=not arguments.reference,
+                    workers=workers,
+                ):
+                    pass
+                elapsed.append(perf_counter_ns() - started)
+            median_ns = statistics.median(elapsed)
+            if baseline_ns is None:
+                baseline_ns = median_ns
+            print(
+                json.dumps(
+                    {
+                        "schema_version": SCHEMA_VERSION,
+                        "engine": (
+                            "c-reference" if arguments.reference else "c-optimized"
+                        ),
+                        "workers": workers,
+                        "cpu_count": os.cpu_count(),
+                        "solves": len(batch),
+                        "samples": arguments.samples,
+                        "median_ns": median_ns,
+                        "speedup": baseline_ns / median_ns,
+                    },
+                    sort_keys=True,
+                ),
+                flush=True,
+            )
+    finally:
+        for instance in instances:
+            instance.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
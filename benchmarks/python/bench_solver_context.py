@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Measure native solves with and without a reused solver context."""
+
+import argparse
+import json
+from pathlib import Path
+import statistics
+import sys
+from time import perf_counter_ns
+from typing import Any, Final
+
+
+REPOSITORY_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPOSITORY_ROOT / "python"))
+
+from native.instance_adapter import NativeInstance  # noqa: E402
+from native.witness_adapter import SolverContext  # noqa: E402
+
+
+SCHEMA_VERSION: Final = 1
+INSTANCE_DIRECTORIES: Final = (
+    REPOSITORY_ROOT / "benchmarks" / "instances",
+    REPOSITORY_ROOT / "tests" / "instances",
+)
+MODES: Final = ("fresh", "context")
+
+
+def _instance_paths() -> list[Path]:
+    return sorted(
+        path
+        for directory in INSTANCE_DIRECTORIES
+        for path in directory.glob("*.cm13")
+    )
+
+
+def _measure(
+    instance: NativeInstance,
+    path: Path,
+    mode: str,
+    optimized: bool,
+    samples: int,
+    iterations: int,
+) -> dict[str, Any]:
+    with SolverContext() as context:
+        solve_context = context if mode == "context" else None
+        instance.solve(optimized=optimized, context=solve_context)
+        elapsed = []
+        for _ in range(samples):
+            started = perf_counter_ns()
+            for _ in range(iterations):
+                instance.solve(optimized=optimized, context=solve_context)
+            elapsed.append((perf_counter_ns() - started) / iterations)
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "instance": str(path.relative_to(REPOSITORY_ROOT)),
+        "engine": "c-optimized" if optimized else "c-reference",
+        "mode": mode,
+        "cell_count": len(instance.region.active),
+        "samples": samples,
+        "iterations": iterations,
+        "median_ns_per_solve": statistics.median(elapsed),
+        "min_ns_per_solve": min(elapsed),
+    }
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError("value must be positive")
+    return value
+
+
+def _parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=_positive_int, default=5)
+    parser.add_argument("--iterations", type=_positive_int, default=20)
+    parser.add_argument("--reference", action="store_true")
+    return parser.parse_args()
+
+
+def main() -> int:
+    arguments = _parse_arguments()
+    for path in _instance_paths():
+        try:
+            instance = NativeInstance(path)
+        except (OSError, RuntimeError, ValueError):
+            continue
+        with instance:
+            for mode in MODES:
+                record = _measure(
+                    instance,
+                    path,
+                    mode,
+                    not arguments.reference,
+                    arguments.samples,
+                    arguments.iterations,
+                )
+                print(json.dumps(record, sort_keys=True), flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Measure cold-start time and peak RSS of Python modules and entry points.
+
+Every sample runs in a fresh interpreter, so nothing is already imported or
+cached in-process. Module cases import one public module; CLI cases run a
+benchmark script with ``--help``, which exits right after its imports and
+argument parsing. The ``python-startup`` case runs an empty program, and each
+row reports its ``import_ns`` as the median wall time minus that baseline.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+from time import perf_counter_ns
+from typing import Final
+
+
+REPOSITORY_ROOT = Path(__file__).resolve().parents[2]
+PYTHON_DIRECTORY: Final = REPOSITORY_ROOT / "python"
+SCHEMA_VERSION: Final = 1
+
+
+def _public_modules() -> list[str]:
+    modules = []
+    for path in sorted(PYTHON_DIRECTORY.glob("*/*.py")):
+        if path.name.startswith("_") or path.stat().st_size == 0:
+            continue
+        modules.append(f"{path.parent.name}.{path.stem}")
+    return modules
+
+
+def _cli_scripts() -> list[Path]:
+    return [
+        path
+        for path in sorted(Path(__file__).resolve().parent.glob("*.py"))
+        if path.name != Path(__file__).name
+    ]
+
+
+def _cases() -> list[tuple[str, str, list[str]]]:
+    cases = [("python-startup", "baseline", ["-c", "pass"])]
+    cases.extend(
+        (module, "module", ["-c", f"import {module}"])
+        for module in _public_modules()
+    )
+    cases.extend(
+        (
+            str(path.relative_to(REPOSITORY_ROOT)),
+            "cli",
+            [str(path), "--help"],
+        )
+        for path in _cli_scripts()
+    )
+    return cases
+
+
+def _measure(
+    arguments: list[str],
+    environment: dict[str, str],
+    samples: int,
+) -> tuple[float, int]:
+    """Return the median wall time and the largest RSS over ``samples`` runs."""
+    elapsed = []
+    peak_rss = 0
+    for _ in range(samples):
+        started = perf_counter_ns()
+        pid = os.posix_spawn(
+            sys.executable,
+            [sys.executable, *arguments],
+            environment,
+            file_actions=[
+                (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+            ],
+        )
+        _, wait_status, usage = os.wait4(pid, 0)
+        elapsed.append(perf_counter_ns() - started)
+        if os.waitstatus_to_exitcode(wait_status) != 0:
+            raise RuntimeError(f"{' '.join(arguments)} failed")
+        # Linux reports ru_maxrss in KiB; macOS reports bytes.
+        scale = 1 if sys.platform == "darwin" else 1024
+        peak_rss = max(peak_rss, usage.ru_maxrss * scale)
+    return statistics.median(elapsed), peak_rss
+
+
+def _loads_z3(arguments: list[str], environment: dict[str, str]) -> bool | None:
+    """Report whether a module case imports Z3; CLI cases report ``None``."""
+    if arguments[0] != "-c":
+        return None
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"{arguments[1]}\nimport sys\nprint('z3' in sys.modules)",
+        ],
+        cwd=REPOSITORY_ROOT,
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return completed.stdout.strip() == "True"
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError("value must be positive")
+    return value
+
+
+def _parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=_positive_int, default=9)
+    parser.add_argument(
+        "--case",
+        action="append",
+        help="measure only cases with this name (repeatable)",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    arguments = _parse_arguments()
+    environment = dict(os.environ)
+    environment["PYTHONPATH"] = str(PYTHON_DIRECTORY)
+    environment.pop("PYTHONPROFILEIMPORTTIME", None)
+
+    cases = _cases()
+    if arguments.case:
+        selected = set(arguments.case)
+        cases = [cases[0], *(case for case in cases[1:] if case[0] in selected)]
+
+    baseline_ns: float | None = None
+    for name, kind, command in cases:
+        median_ns, peak_rss = _measure(command, environment, arguments.samples)
+        if baseline_ns is None:
+            baseline_ns = median_ns
+        print(
+            json.dumps(
+                {
+                    "schema_version": SCHEMA_VERSION,
+                    "case": name,
+                    "kind": kind,
+                    "python": sys.version.split()[0],
+                    "samples": arguments.samples,
+                    "median_ns": median_ns,
+                    "import_ns": max(0.0, median_ns - baseline_ns),
+                    "peak_rss_bytes": peak_rss,
+                    "z3_loaded": _loads_z3(command, environment),
+                },
+                sort_keys=True,
+            ),
+            flush=True,
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,6 +2,7 @@
 #define WANG_FORMULA_PARSER_H
 
 #include <stddef.h>
+#include <stdint.h>
 #include <stdio.h>
 
 #include "wang/formula.h"
@@ -26,6 +27,32 @@ Cm13ParseStatus cm13_formula_parse(
     Cm13ParseLocation *out_error_location
 );
 
+/*
+ * Parse one formula from the borrowed bytes data[0 .. size - 1] with the same
+ * grammar, diagnostics, and output contract as cm13_formula_parse(). The
+ * buffer need not be NUL-terminated and is never modified or retained.
+ */
+Cm13ParseStatus cm13_formula_parse_buffer(
+    const char *data,
+    size_t size,
+    Cm13Formula *out_formula,
+    Cm13ParseLocation *out_error_location
+);
+
+/*
+ * Build a formula from 3 * variable_count canonical 0-based indices, clause
+ * by clause, without any text round trip. The indices are borrowed. The same
+ * cubic domain rules as the parser apply: one clause per variable, and every
+ * variable occurs in exactly three clause positions. Violations return
+ * CM13_PARSE_DOMAIN_ERROR. The output contract matches the parser.
+ */
+Cm13ParseStatus cm13_formula_from_packed(
+    uint32_t variable_count,
+    const uint32_t *variable_indices,
+    size_t index_count,
+    Cm13Formula *out_formula
+);
+
 /*
  * Open path, parse one formula, and close the stream before returning.
  *
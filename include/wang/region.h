@@ -70,6 +70,13 @@ const RegionCell *region_cell_const(
  */
 bool region_validate(const Region *region);
 
+/*
+ * Return a 64-bit FNV-1a hash of the region's content: its dimensions,
+ * active mask, and boundary colors, in that order. Byte-identical regions
+ * hash equally, in any process. The region must be valid.
+ */
+uint64_t region_content_hash(const Region *region);
+
 /*
  * Change whether a cell belongs to the region while building its geometry.
  *
@@ -1,6 +1,7 @@
 #ifndef WANG_SOLVER_H
 #define WANG_SOLVER_H
 
+#include <stdatomic.h>
 #include <stdbool.h>
 #include <stddef.h>
 #include <stdint.h>
@@ -14,15 +15,82 @@
 typedef enum {
     WANG_SOLVE_ERROR = -1,
     WANG_SOLVE_UNSAT = 0,
-    WANG_SOLVE_SAT = 1
+    WANG_SOLVE_SAT = 1,
+    /* A search bound in WangSolverOptions stopped the search first. */
+    WANG_SOLVE_UNKNOWN = 2
 } WangSolveStatus;
 
 enum {
     WANG_SOLVE_COLLECT_METRICS = UINT32_C(1) << 0,
     WANG_SOLVE_TRACE_FAILED_LEAVES = UINT32_C(1) << 1,
-    WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT = UINT32_C(1) << 2
+    WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT = UINT32_C(1) << 2,
+    /*
+     * Optimized engine only; the reference engine rejects both with ERROR.
+     * After root propagation, search each connected component of open
+     * active cells to completion on its own, with an MRV index over that
+     * component: a component that fails backtracks to the decision that
+     * separated it, not into unrelated components. The second flag also
+     * splits the current component again after any decision that may have
+     * cut it, and implies the first. The parallel driver runs the
+     * components as tasks.
+     */
+    WANG_SOLVE_DECOMPOSE_COMPONENTS = UINT32_C(1) << 3,
+    WANG_SOLVE_DECOMPOSE_EACH_DECISION = UINT32_C(1) << 4,
+    /*
+     * Optimized engine only; the reference engine rejects it with ERROR, and
+     * it cannot be combined with decomposition. Explain each failure by the
+     * decisions it depends on, backjump over decisions that played no part,
+     * and remember short explanations as nogoods that refuse the same
+     * (cell, tile) combination elsewhere in the search.
+     */
+    WANG_SOLVE_LEARN_NOGOODS = UINT32_C(1) << 5,
+    /*
+     * Optimized engine only; the reference engine rejects it with ERROR.
+     * Propagate a cold root by sweeping one bitplane per tile, 64 cells per
+     * word, instead of the cell queue. The fixpoint, and so every decision,
+     * is identical; only the propagation counters differ.
+     */
+    WANG_SOLVE_BITSLICE_PROPAGATION = UINT32_C(1) << 6,
+    /*
+     * Optimized engine only; the reference engine rejects it with ERROR.
+     * When the active cells' bounding box is at most WANG_FRONTIER_MAX_WIDTH
+     * cells across its narrower side, decide the propagated root with the
+     * frontier engine instead of DFS, falling back to DFS when its profiles
+     * outgrow their bound. Wider regions and scoped searches use DFS.
+     */
+    WANG_SOLVE_FRONTIER_WHEN_NARROW = UINT32_C(1) << 7,
+    /*
+     * Optimized engine only; the reference engine rejects it with ERROR.
+     * After root propagation, try each tile of each open cell, propagate,
+     * and undo; a tile whose assignment wipes out a domain is removed, until
+     * a pass removes nothing. See probe_budget_ns and probe_depth.
+     */
+    WANG_SOLVE_PROBE_SINGLETONS = UINT32_C(1) << 8,
+    /*
+     * Optimized engine only; the reference engine rejects it with ERROR.
+     * After the first failed leaf, branch on the open cell with the
+     * smallest domain size divided by its weighted degree, the summed
+     * weights of its arcs to other open cells; MRV selects until then.
+     * Every failed leaf adds weight to the arcs around its conflict cell,
+     * and older additions decay. Equal ratios fall back to the smaller
+     * domain, then to tie_break, so equal seeds replay the same search.
+     */
+    WANG_SOLVE_WEIGHTED_DEGREE = UINT32_C(1) << 9,
+    /*
+     * Optimized engine only; the reference and frontier engines reject it
+     * with ERROR, and it cannot be combined with decomposition or learning.
+     * Periodically save the DFS to checkpoint_path, so that
+     * wang_solve_resume() can continue a search that was killed.
+     */
+    WANG_SOLVE_CHECKPOINT = UINT32_C(1) << 10
 };
 
+/*
+ * Widest sweep line, in cells, that the frontier engine accepts: the
+ * narrower side of the bounding box of the active cells.
+ */
+#define WANG_FRONTIER_MAX_WIDTH 16u
+
 typedef struct {
     uint64_t dfs_nodes;
     uint64_t decisions;
@@ -34,6 +102,25 @@ typedef struct {
     uint64_t support_byte_lookups;
     size_t support_table_bytes;
     uint64_t mrv_cells_scanned;
+    uint64_t mrv_index_updates;
+    size_t mrv_index_bytes;
+    uint64_t component_splits;
+    uint64_t components;
+    uint64_t nogoods_learned;
+    uint64_t nogoods_evicted;
+    uint64_t nogood_hits;
+    uint64_t backjumps;
+    uint64_t backjump_levels;
+    uint64_t restarts;
+    uint64_t bitslice_passes;
+    uint64_t bitslice_words;
+    uint64_t frontier_states;
+    size_t frontier_peak_states;
+    uint64_t value_scorings;
+    uint64_t value_score_lookups;
+    uint64_t probes;
+    uint64_t probe_prunes;
+    uint64_t weight_bumps;
     uint64_t initial_trail_writes;
     uint64_t search_trail_writes;
     uint64_t initial_trail_rewrites;
@@ -52,6 +139,60 @@ typedef struct {
     size_t sat_result_copy_bytes;
 } WangSolverMetrics;
 
+/*
+ * Arc-consistent root domains of an unpinned region, computed once by
+ * wang_root_fixpoint_compute() and borrowed by later solves through
+ * WangSolverOptions.root_fixpoint. domains is dense and row-major like
+ * WangSolveResult.domains. When the unpinned root is already contradictory,
+ * contradiction is set and domains is NULL; solves then run cold.
+ * region_fingerprint identifies the region the domains belong to.
+ */
+typedef struct {
+    uint32_t *domains;
+    size_t domain_count;
+    uint64_t region_fingerprint;
+    bool contradiction;
+} WangRootFixpoint;
+
+/*
+ * Order in which a DFS node tries the tiles of its cell. Ascending is the
+ * canonical order. Random draws each next tile uniformly from the remaining
+ * candidates using WangSolverOptions.seed. Least constraining, for the
+ * optimized engine only, tries first the tile that leaves the most tiles in
+ * the domains of the cell's active neighbors, lowest tile ID on ties; the
+ * reference engine rejects it with ERROR.
+ */
+typedef enum {
+    WANG_VALUE_ORDER_ASCENDING = 0,
+    WANG_VALUE_ORDER_DESCENDING = 1,
+    WANG_VALUE_ORDER_RANDOM = 2,
+    WANG_VALUE_ORDER_LEAST_CONSTRAINING = 3
+} WangValueOrder;
+
+/*
+ * Which of the smallest open domains a DFS node branches on, in row-major
+ * order. First is the canonical rule. Random picks uniformly among all tied
+ * cells using WangSolverOptions.seed, so it scans every active cell.
+ */
+typedef enum {
+    WANG_TIE_BREAK_FIRST = 0,
+    WANG_TIE_BREAK_LAST = 1,
+    WANG_TIE_BREAK_RANDOM = 2
+} WangTieBreak;
+
+/*
+ * How the optimized search restarts. A run that fails restart_base times
+ * times its budget unit returns to the propagated root and starts over.
+ * Luby units run 1, 1, 2, 1, 1, 2, 4, ...; geometric units start at 1 and
+ * grow by half each run. Budgets grow without bound, so the search stays
+ * complete.
+ */
+typedef enum {
+    WANG_RESTART_NONE = 0,
+    WANG_RESTART_LUBY = 1,
+    WANG_RESTART_GEOMETRIC = 2
+} WangRestartSchedule;
+
 typedef struct {
     uint32_t flags;
 
@@ -75,6 +216,82 @@ typedef struct {
      */
     const uint32_t *initial_domains;
     size_t initial_domain_count;
+
+    /*
+     * Optional search bounds; zero/NULL disables each one. deadline_ns is an
+     * absolute CLOCK_MONOTONIC time in nanoseconds. node_limit bounds the DFS
+     * nodes counted by metrics.dfs_nodes, including the root. cancel_flag is
+     * borrowed for the duration of the call; any nonzero value requests a
+     * stop. The node limit is exact; the deadline and cancel flag are polled
+     * every few decisions. A bound that stops the search before SAT or UNSAT
+     * is proven yields WANG_SOLVE_UNKNOWN.
+     */
+    uint64_t deadline_ns;
+    uint64_t node_limit;
+    const atomic_int *cancel_flag;
+
+    /*
+     * Optional borrowed root fixpoint of this exact region; a fixpoint of
+     * any other region is rejected with ERROR. The solve copies it, narrows
+     * it by the boundary and initial_domains restrictions, and propagates
+     * only the cells that shrank. Because the arc-consistent fixpoint is
+     * unique, the search starts from the same domains as a cold solve and
+     * returns the same status, witness, search counters, and best-leaf
+     * diagnostics. When the pins contradict at the root, the warm queue may
+     * empty a different cell first, so the solve propagates the root again
+     * cold and reports exactly the cold result.
+     */
+    const WangRootFixpoint *root_fixpoint;
+
+    /*
+     * Optional branching diversification; zero keeps the canonical order.
+     * Every order explores the same finite search space, so SAT and UNSAT
+     * never change, but the SAT witness, best failed leaf, and search
+     * counters may. Equal orders and seeds replay the same search.
+     */
+    WangValueOrder value_order;
+    WangTieBreak tie_break;
+    uint64_t seed;
+
+    /*
+     * Optional restarts, for the optimized engine only; the reference engine
+     * rejects a schedule with ERROR, as do decomposition flags. The first
+     * run follows value_order and tie_break. Every later run k breaks ties
+     * and orders values at random from seed + k, so equal seeds replay the
+     * same runs. restart_base counts failed leaves; zero selects 100, and it
+     * must be zero without a schedule. Failed leaves of every run are traced
+     * and counted, and the best one over all runs is reported.
+     */
+    WangRestartSchedule restart_schedule;
+    uint64_t restart_base;
+
+    /*
+     * Singleton probing, with WANG_SOLVE_PROBE_SINGLETONS only; both must be
+     * zero without it. probe_budget_ns bounds the time spent probing over
+     * the whole solve, zero for no bound; a spent budget stops probing, not
+     * the solve, so the status never changes but the counters may. Probing
+     * also repeats after every decision up to probe_depth, zero for the
+     * root only; a depth cannot be combined with WANG_SOLVE_LEARN_NOGOODS.
+     * Searches scoped to a component never probe.
+     */
+    uint64_t probe_budget_ns;
+    size_t probe_depth;
+
+    /*
+     * Checkpointing, with WANG_SOLVE_CHECKPOINT only; the path is required
+     * with it, and both must be NULL and zero without it. Once the DFS has
+     * run checkpoint_interval_ns since the last checkpoint, the next bound
+     * poll writes the DFS stack, trail, domains, best failed leaf, and the
+     * random, restart, probe, and weight state to checkpoint_path, in
+     * explicit little-endian. Zero checkpoints at every poll. The file is
+     * written beside the path under a unique name and renamed over it, so a
+     * kill leaves the previous checkpoint whole. A search that a bound stops
+     * also writes one. Checkpoints are never removed; a search that
+     * propagation alone decides, or that the frontier engine decides,
+     * writes none.
+     */
+    const char *checkpoint_path;
+    uint64_t checkpoint_interval_ns;
 } WangSolverOptions;
 
 typedef struct {
@@ -88,7 +305,11 @@ typedef struct {
     uint32_t *domains;
     size_t domain_count;
 
-    /* SIZE_MAX for SAT; the zero-domain active cell for UNSAT. */
+    /*
+     * SIZE_MAX for SAT and UNKNOWN; the zero-domain active cell for UNSAT.
+     * UNKNOWN never returns domains. Its resolved_count, decision_depth,
+     * trace, and metrics describe the partial search.
+     */
     size_t conflict_cell;
     size_t resolved_count;
     size_t decision_depth;
@@ -105,7 +326,8 @@ typedef struct {
  *
  * options may be NULL. out_result must be zero-initialized or destroyed.
  * On SAT, and on UNSAT when snapshot capture was requested, the caller owns
- * out_result->domains. On UNSAT without capture, domains is NULL. With a
+ * out_result->domains. On UNSAT without capture, and on UNKNOWN, domains is
+ * NULL. With a
  * conforming zero-initialized or destroyed output, ERROR leaves it destroyed;
  * an already-owned output is invalid and is rejected unchanged.
  */
@@ -128,7 +350,275 @@ WangSolveStatus wang_solve_optimized(
     WangSolveResult *out_result
 );
 
+/*
+ * Solve through the frontier engine: propagate the root like
+ * wang_solve_optimized(), then sweep the active cells' bounding box along
+ * its narrower side, carrying every reachable profile of colors across the
+ * sweep line with a back-pointer, instead of searching. Time grows linearly
+ * with the length of the sweep and with the number of distinct profiles,
+ * which depends only on the width.
+ *
+ * The input, ownership, and result contracts match wang_solve_serial().
+ * Regions wider than WANG_FRONTIER_MAX_WIDTH, decomposition, learning, and
+ * restarts are rejected with ERROR. SAT witnesses are verified like every
+ * other witness but may differ from a DFS witness. UNSAT reports as its
+ * conflict cell the first active cell in sweep order that no reachable
+ * profile can tile, with that cell's domain emptied in the snapshot and a
+ * decision_depth of zero. A sweep whose profiles outgrow the engine's
+ * bound, or that a search bound stops, yields UNKNOWN. No DFS nodes are
+ * expanded, so node_limit never stops the sweep.
+ */
+WangSolveStatus wang_solve_frontier(
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolveResult *out_result
+);
+
+/*
+ * Continue the optimized search saved at options->checkpoint_path, and keep
+ * checkpointing to it. options must carry WANG_SOLVE_CHECKPOINT and steer
+ * the search as the solve that wrote the checkpoint did: the same flags,
+ * apart from metrics, traces, bitslice propagation, and the checkpoint
+ * itself, the same value_order, tie_break, seed, restart schedule, and
+ * probe_depth, and the same initial_domains. The resume propagates the
+ * root again and checks that the checkpoint's trail unwinds to it.
+ *
+ * The remaining search takes exactly the steps the checkpointed search
+ * would have taken, so the status, witness, and best failed leaf are those
+ * of an uninterrupted solve. node_limit counts the DFS nodes since the
+ * original solve began; the deadline and cancel flag are this call's own.
+ * metrics and the failed-leaf trace cover only the resumed steps, and the
+ * probe budget continues from the checkpoint. A missing, damaged, or
+ * mismatched checkpoint is ERROR. The result contract is otherwise that
+ * of wang_solve_optimized().
+ */
+WangSolveStatus wang_solve_resume(
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolveResult *out_result
+);
+
 /* Release the owned snapshot and reset every field. Accepts NULL. */
 void wang_solve_result_destroy(WangSolveResult *result);
 
+/*
+ * Compute the root fixpoint of region with no initial_domains. out must be
+ * zero-initialized or destroyed; on false it is left destroyed.
+ */
+bool wang_root_fixpoint_compute(
+    const Region *region,
+    WangRootFixpoint *out_fixpoint
+);
+
+/* Release the owned domains and reset every field. Accepts NULL. */
+void wang_root_fixpoint_destroy(WangRootFixpoint *fixpoint);
+
+typedef enum {
+    WANG_SOLVER_REFERENCE = 0,
+    WANG_SOLVER_OPTIMIZED = 1,
+    /* wang_solve_frontier(); its contract differs as documented there. */
+    WANG_SOLVER_FRONTIER = 2
+} WangSolverEngine;
+
+/*
+ * Opaque solver storage reused across solves. A context keeps the validated
+ * tileset tables and the byte support table, and grows its per-cell, trail,
+ * queue, and DFS buffers monotonically to the largest region solved, so
+ * repeated solves skip table construction and most allocation. Regions of
+ * any size may be mixed. A context serves one solve at a time; use one per
+ * thread.
+ */
+typedef struct WangSolverContext WangSolverContext;
+
+/* Return an empty context, or NULL when allocation fails. */
+WangSolverContext *wang_solver_context_create(void);
+
+/*
+ * Solve through the selected engine using the context's storage. Input,
+ * ownership, diagnostics, and result contracts match wang_solve_serial(),
+ * wang_solve_optimized(), and wang_solve_frontier(), and SAT/UNSAT
+ * decisions, witnesses, and search counters are identical. Capacity and
+ * byte peak metrics include storage retained from earlier solves. The
+ * context stays usable after ERROR.
+ */
+WangSolveStatus wang_solver_context_solve(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolverEngine engine,
+    WangSolveResult *out_result
+);
+
+/*
+ * Release every work buffer and root-cache entry while keeping the derived
+ * tables and the root-cache settings, returning the context to the
+ * footprint of a fresh one after a large region. Accepts NULL.
+ */
+void wang_solver_context_reset(WangSolverContext *context);
+
+/* Release the context and everything it retains. Accepts NULL. */
+void wang_solver_context_destroy(WangSolverContext *context);
+
+/*
+ * Counters of a context's root cache since it was last enabled. hits found
+ * the region's root fixpoint in memory, disk_hits read it from the
+ * directory, and misses propagated it. evictions counts the entries dropped
+ * to stay within the byte limit, disk_writes the fixpoints written to the
+ * directory, and disk_failures the writes that failed. entry_count and
+ * bytes describe the memory tier now.
+ */
+typedef struct {
+    uint64_t hits;
+    uint64_t disk_hits;
+    uint64_t misses;
+    uint64_t evictions;
+    uint64_t disk_writes;
+    uint64_t disk_failures;
+    size_t entry_count;
+    size_t bytes;
+} WangRootCacheStats;
+
+/*
+ * Cache the unpinned root fixpoint of every region this context solves,
+ * keyed by region_content_hash() and confirmed against the region's cells.
+ * A later wang_solver_context_solve() of the same region, with no
+ * options->root_fixpoint of its own, borrows the cached fixpoint as that
+ * option would, with the same results and warm-start diagnostics. The
+ * memory tier keeps at most limit_bytes of entries, evicting the least
+ * recently used. With a directory, each computed fixpoint is also written
+ * there as a checksummed little-endian file named after the hash, and a
+ * memory miss maps that file before propagating; processes may share the
+ * directory. A failed write is only counted. Zero and NULL disable the
+ * cache. Enabling drops every entry and counter; reset drops the entries
+ * alone. Returns false, with the cache disabled, for a NULL context, a
+ * directory that does not exist, or failed allocation.
+ */
+bool wang_solver_context_enable_root_cache(
+    WangSolverContext *context,
+    size_t limit_bytes,
+    const char *directory
+);
+
+/* Copy the root-cache counters; false for a NULL argument. */
+bool wang_solver_context_root_cache_stats(
+    const WangSolverContext *context,
+    WangRootCacheStats *out_stats
+);
+
+/*
+ * Cubes of one region for cube-and-conquer. domains holds cube_count dense
+ * row-major domain arrays of domain_count entries each, back to back; each
+ * is a valid WangSolverOptions.initial_domains for the split region, with
+ * inactive cells zero. refuted_count counts the branches propagation
+ * refuted while splitting, and lookahead_propagations every propagation
+ * the lookahead ran.
+ */
+typedef struct {
+    uint32_t *domains;
+    size_t cube_count;
+    size_t domain_count;
+    size_t refuted_count;
+    uint64_t lookahead_propagations;
+} WangCubeSet;
+
+/*
+ * Split the search space of region under options into cubes by lookahead.
+ * The split starts from the propagated root. It repeatedly takes the cube
+ * with the most open tiles, the sum of each active cell's domain size less
+ * one, and branches it on one of its smallest open cells: the candidate
+ * whose weakest branch removes the most open tiles after propagation, a
+ * refuted branch counting as removing all of them. Each branch pins one
+ * tile of that cell and keeps its propagated domains; refuted branches are
+ * dropped. Splitting stops once there are target_count or more cubes, or
+ * no cube has an open cell left.
+ *
+ * The cubes are disjoint, and a tiling of region within the options'
+ * domains lies in exactly one of them, so region is SAT exactly when some
+ * cube is. Only options->initial_domains, options->root_fixpoint and
+ * WANG_SOLVE_BITSLICE_PROPAGATION are used; all are validated like a solve.
+ * Returns UNKNOWN with at least one cube, UNSAT with none when the root or
+ * every branch is refuted, or ERROR on invalid input, a zero target_count,
+ * or allocation failure. out_cubes must be zero-initialized or destroyed;
+ * on ERROR it is left destroyed.
+ */
+WangSolveStatus wang_solver_context_split_cubes(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    size_t target_count,
+    WangCubeSet *out_cubes
+);
+
+/* Release the owned domains and reset every field. Accepts NULL. */
+void wang_cube_set_destroy(WangCubeSet *cubes);
+
+/*
+ * Exact tiling count of one region. limbs holds the count as limb_count
+ * little-endian base 2^32 digits without leading zeros, so zero has none.
+ * decisions counts the tiles the search pinned, components the component
+ * counts it needed, cache hits included, and cache_hits those the
+ * component cache answered. cache_entries and cache_bytes describe the
+ * cache at the end, and cache_refused counts the counts it could not store
+ * within its byte limit.
+ */
+typedef struct {
+    uint32_t *limbs;
+    size_t limb_count;
+    uint64_t decisions;
+    uint64_t components;
+    uint64_t cache_hits;
+    size_t cache_entries;
+    size_t cache_bytes;
+    uint64_t cache_refused;
+} WangTilingCount;
+
+/*
+ * Receives one tiling: tile_count dense row-major tiles, TILE_NONE on
+ * inactive cells, valid only during the call. Return false to stop.
+ */
+typedef bool (*WangTilingVisitor)(
+    void *context,
+    const TileId *tiles,
+    size_t tile_count
+);
+
+/*
+ * Count the tilings of region within the options' domains. The count
+ * propagates the root, splits its open cells into components joined
+ * through open neighbors, and multiplies their counts. A component is
+ * counted by pinning each tile of its smallest open cell in turn,
+ * propagating, and summing the products over the components the
+ * remaining open cells fall into. A component of one open cell counts its
+ * domain size, and so does an isolated active cell, which a solve instead
+ * pins to its first tile. The count of a component depends only on its
+ * shape and domains, so counts are cached under the cells' offsets from its
+ * first cell together with their domains, and a translated copy hits too.
+ * The cache holds at most cache_limit_bytes; zero disables it.
+ *
+ * With visit set, the count enumerates instead: a plain search over the
+ * whole region verifies every tiling and passes it to visit in search
+ * order, without components or the cache. visit returning false stops the
+ * enumeration with UNKNOWN, and out_count then counts the tilings visited.
+ *
+ * Only options->initial_domains, options->root_fixpoint, node_limit,
+ * deadline_ns, cancel_flag and WANG_SOLVE_BITSLICE_PROPAGATION are used;
+ * node_limit bounds decisions. Any other flag is an error. Returns SAT
+ * with a nonzero count, UNSAT with zero, UNKNOWN when a bound or visit
+ * stops the count, or ERROR on invalid input or allocation failure. After
+ * a bound, out_count holds zero, or the tilings visited when enumerating.
+ * out_count must be zero-initialized or destroyed; on ERROR it is left
+ * destroyed.
+ */
+WangSolveStatus wang_count_tilings(
+    const Region *region,
+    const WangSolverOptions *options,
+    size_t cache_limit_bytes,
+    WangTilingVisitor visit,
+    void *visit_context,
+    WangTilingCount *out_count
+);
+
+/* Release the owned limbs and reset every field. Accepts NULL. */
+void wang_tiling_count_destroy(WangTilingCount *count);
+
 #endif /* WANG_SOLVER_H */
@@ -0,0 +1,129 @@
+#ifndef WANG_SOLVER_PARALLEL_H
+#define WANG_SOLVER_PARALLEL_H
+
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+
+#include "wang/region.h"
+#include "wang/solver.h"
+
+/*
+ * Solve region on up to thread_count OpenMP threads; zero selects
+ * omp_get_max_threads(). Provided by libwang_openmp.a and libwang.so only.
+ *
+ * The root is propagated once and then split on MRV cells, breadth first,
+ * into about eight propagated subtree tasks per thread. Subtrees that
+ * conflict while splitting are dropped. Threads pull tasks dynamically, and
+ * each one searches with its own WangSolverContext, so domains, trail, queue
+ * and stack are never shared. The first verified SAT stops every other
+ * thread. UNSAT is reported only after every task is exhausted.
+ *
+ * Inputs, ownership and statuses follow wang_solve_serial(), with these
+ * differences:
+ * - A SAT witness is whichever subtree finished first, so it can differ
+ *   between runs and from the serial engines.
+ * - UNSAT reports the best failed leaf over all tasks. Its decision_depth
+ *   includes the split decisions above the task.
+ * - metrics add up the counters of every subtree search. Peaks are the
+ *   maximum over subtrees, and the split phase is not counted.
+ * - node_limit bounds the DFS nodes of all threads together. It is checked
+ *   every few decisions, so it is approximate. deadline_ns and cancel_flag
+ *   apply to every thread.
+ *
+ * One thread, a trace request, a root that propagation alone decides, and a
+ * split that leaves no open task all run the engine serially with unchanged
+ * diagnostics. So does WANG_SOLVE_CHECKPOINT, which requires the optimized
+ * engine, so that one search writes the checkpoint.
+ *
+ * With WANG_SOLVE_DECOMPOSE_COMPONENTS or WANG_SOLVE_DECOMPOSE_EACH_DECISION,
+ * engine must be WANG_SOLVER_OPTIMIZED; the reference engine returns ERROR.
+ * When the propagated root has two or more components of open cells, each
+ * component becomes one task instead of the subtree split. SAT merges the
+ * component witnesses into one dense witness, verified with
+ * wang_verify_tiling(), and its decision_depth is the sum of the component
+ * depths. The first UNSAT component stops the others and is returned with
+ * its own best leaf. Fewer than two components fall back to subtree tasks,
+ * which then decompose serially.
+ *
+ * WANG_SOLVE_LEARN_NOGOODS also requires the optimized engine, and cannot be
+ * combined with decomposition. Each subtree task learns its own nogoods;
+ * none are shared between threads, and backjumps stop at the task root.
+ * A restart schedule likewise restarts each task from its own root, and it
+ * cannot be combined with decomposition either.
+ * WANG_SOLVE_BITSLICE_PROPAGATION requires the optimized engine too. Subtree
+ * tasks start warm from the queue's root fixpoint, so it only changes the
+ * serial fallback.
+ * WANG_SOLVE_FRONTIER_WHEN_NARROW requires the optimized engine as well. A
+ * region narrow enough for the frontier engine is swept once, serially,
+ * instead of split into subtree tasks. WANG_SOLVER_FRONTIER is ERROR here.
+ * WANG_VALUE_ORDER_LEAST_CONSTRAINING requires the optimized engine, here and
+ * in every portfolio member. Each subtree task scores the values of its own
+ * decisions.
+ * WANG_SOLVE_PROBE_SINGLETONS requires the optimized engine. Each subtree task
+ * probes its own root within its own budget; component tasks are scoped and
+ * never probe.
+ * WANG_SOLVE_WEIGHTED_DEGREE requires the optimized engine as well. Every
+ * subtree and component task weights the arcs of its own failed leaves.
+ */
+WangSolveStatus wang_solve_parallel(
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolverEngine engine,
+    size_t thread_count,
+    WangSolveResult *out_result
+);
+
+/* One search configuration of a portfolio. */
+typedef struct {
+    WangSolverEngine engine;
+    WangValueOrder value_order;
+    WangTieBreak tie_break;
+    uint64_t seed;
+} WangPortfolioMember;
+
+/* How one portfolio member ended. */
+typedef struct {
+    /*
+     * SAT or UNSAT for a member that finished, UNKNOWN for one that was
+     * cancelled by the winner or stopped by a bound, and ERROR for a failure.
+     */
+    WangSolveStatus status;
+    /* True for the single member whose result was returned. */
+    bool winner;
+    /* Zeroed unless WANG_SOLVE_COLLECT_METRICS was requested. */
+    WangSolverMetrics metrics;
+} WangPortfolioReport;
+
+/*
+ * Run member_count differently ordered searches of region concurrently, one
+ * OpenMP thread and WangSolverContext each, and return the first verified SAT
+ * or complete UNSAT; the others are cancelled. Provided by libwang_openmp.a
+ * and libwang.so only.
+ *
+ * options is shared by every member, except that each member replaces its
+ * value_order, tie_break, and seed. members may be NULL to use member_count
+ * built-in configurations: the canonical optimized search, then descending
+ * values with the last tied cell, then random values and ties seeded from
+ * options->seed plus the member index.
+ *
+ * out_result is the winner's own result, so its witness, best leaf, and
+ * metrics are those of one member. node_limit bounds each member
+ * separately. When every member stops at a bound, the status is UNKNOWN and
+ * out_result is member 0's partial result. Any member ERROR makes the
+ * portfolio fail. Failed-leaf traces and checkpoints are rejected with ERROR,
+ * because the members would share one path.
+ *
+ * out_reports may be NULL; otherwise it receives member_count entries, also
+ * on ERROR.
+ */
+WangSolveStatus wang_solve_portfolio(
+    const Region *region,
+    const WangSolverOptions *options,
+    const WangPortfolioMember *members,
+    size_t member_count,
+    WangPortfolioReport *out_reports,
+    WangSolveResult *out_result
+);
+
+#endif /* WANG_SOLVER_PARALLEL_H */
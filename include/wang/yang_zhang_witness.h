@@ -3,6 +3,7 @@
 
 #include <stdbool.h>
 #include <stddef.h>
+#include <stdint.h>
 
 #include "wang/solver.h"
 #include "wang/tile.h"
@@ -43,6 +44,37 @@ WangSolveStatus yang_zhang_solve_assignment_extension(
     WangSolveResult *out_result
 );
 
+/*
+ * Extend row_count assignments of one formula through one reused
+ * WangSolverContext. assignments is a borrowed row-major matrix of
+ * row_count rows, each holding assignment_count ==
+ * formula->variable_count values. The base
+ * root domains, the unpinned root fixpoint, and every solver table and
+ * buffer are set up once; each row only rewrites its variable-gadget pins
+ * and propagates them from that fixpoint.
+ *
+ * out_statuses receives one WangSolveStatus value (SAT or UNSAT) per row.
+ * out_tilings is optional: NULL with tiling_count zero, or a row-major
+ * matrix of exactly row_count * reduction->region.cell_count tiles. A SAT
+ * row receives the same dense tiling the single-assignment call returns;
+ * an UNSAT row is filled with TILE_NONE. Each row matches
+ * yang_zhang_solve_assignment_extension() with the same solver exactly.
+ *
+ * Returns false for malformed arguments, allocation failure, or a solver
+ * ERROR; rows before the failure may already have been written.
+ */
+bool yang_zhang_solve_assignment_batch(
+    const Cm13Formula *formula,
+    const YangZhangReduction *reduction,
+    const bool *assignments,
+    size_t row_count,
+    size_t assignment_count,
+    YangZhangExtensionSolver solver,
+    int8_t *out_statuses,
+    TileId *out_tilings,
+    size_t tiling_count
+);
+
 /*
  * Verify a borrowed dense tiling and decode its exact variable-gadget
  * patterns. The formula/reduction provenance precondition is the same as
@@ -1,17 +1,14 @@
 """End-to-end Boolean/Wang witness cross-validation over one native lifetime."""
 
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
 
 from model.formula import Formula
 from model.region import Region
 from model.tileset import TILESET
-from native.formula_adapter import PathLike, _copy_formula, _loaded_formula
-from native.region_adapter import _built_reduction, _copy_region
-from native.witness_adapter import (
-    _extract_assignment,
-    _solve_assignment_extension,
-    _solve_native,
-)
+from model.tiling import TilingBuffer
+from native.formula_adapter import FormulaSource
+from native.instance_adapter import NativeInstance
 from oracles.boolean_solver import (
     BooleanSolveResult,
     BooleanSolveStatus,
@@ -30,7 +27,7 @@ class WitnessCrosscheckError(RuntimeError):
         message: str,
         *,
         assignment: tuple[bool, ...] | None,
-        tiling: tuple[int | None, ...] | None,
+        tiling: tuple[int | None, ...] | TilingBuffer | None,
         extracted: tuple[bool, ...] | None,
     ) -> None:
         self.assignment = assignment
@@ -53,8 +50,20 @@ def _raise_crosscheck_failure(
     )
 
 
+@contextmanager
+def _scoped_instance(
+    source: FormulaSource | NativeInstance,
+) -> Iterator[NativeInstance]:
+    """Borrow an open instance, or open one for a path or formula and close it."""
+    if isinstance(source, NativeInstance):
+        yield source
+        return
+    with NativeInstance(source) as instance:
+        yield instance
+
+
 def solve_boolean_native_extension(
-    path: PathLike,
+    source: FormulaSource | NativeInstance,
     optimized: bool = False,
 ) -> tuple[
     Formula,
@@ -62,87 +71,80 @@ def solve_boolean_native_extension(
     BooleanSolveResult,
     TilingSolveResult | None,
 ]:
-    """Extend the exact Boolean-Z3 witness with one selected native solver."""
-    with _loaded_formula(path) as native_formula:
-        formula = _copy_formula(native_formula)
-        with _built_reduction(native_formula) as native_reduction:
-            region = _copy_region(native_reduction.region)
-            boolean_result = solve_boolean(formula)
-            if boolean_result.status is not BooleanSolveStatus.SAT:
-                return formula, region, boolean_result, None
-
-            assignment = boolean_result.assignment
-            extracted: tuple[bool, ...] | None = None
-            if assignment is None:
-                _raise_crosscheck_failure(
-                    "Boolean SAT result did not carry an assignment",
-                    None,
-                    None,
-                    None,
-                )
-
-            wang_result = _solve_assignment_extension(
-                native_formula,
-                native_reduction,
-                region,
-                assignment,
-                optimized=optimized,
+    """Extend the exact Boolean-Z3 witness with one selected native solver.
+
+    ``source`` is a ``.cm13`` path, an in-memory :class:`Formula`, or an open
+    :class:`NativeInstance`. A path or formula is reduced for this call only.
+    An instance is reused and left open.
+    """
+    with _scoped_instance(source) as instance:
+        formula = instance.formula
+        region = instance.region
+        boolean_result = solve_boolean(formula)
+        if boolean_result.status is not BooleanSolveStatus.SAT:
+            return formula, region, boolean_result, None
+
+        assignment = boolean_result.assignment
+        extracted: tuple[bool, ...] | None = None
+        if assignment is None:
+            _raise_crosscheck_failure(
+                "Boolean SAT result did not carry an assignment",
+                None,
+                None,
+                None,
             )
-            if wang_result.status is TilingSolveStatus.SAT:
-                if wang_result.tiling is None:
-                    _raise_crosscheck_failure(
-                        "native SAT result did not carry a tiling",
-                        assignment,
-                        wang_result,
-                        None,
-                    )
-                extracted = _extract_assignment(
-                    native_formula,
-                    native_reduction,
-                    region,
-                    wang_result.tiling,
-                )
 
-            if not is_valid_assignment(formula, assignment):
+        wang_result = instance.extend(assignment, optimized=optimized)
+        if wang_result.status is TilingSolveStatus.SAT:
+            if wang_result.tiling is None:
                 _raise_crosscheck_failure(
-                    "Boolean Z3 returned an assignment rejected by the "
-                    "Python checker",
+                    "native SAT result did not carry a tiling",
                     assignment,
                     wang_result,
-                    extracted,
-                )
-            if wang_result.status is not TilingSolveStatus.SAT:
-                _raise_crosscheck_failure(
-                    "valid Boolean assignment did not have a native Wang "
-                    "extension",
-                    assignment,
-                    wang_result,
-                    extracted,
-                )
-            if wang_result.tiling is None or not is_valid_tiling(
-                region,
-                TILESET,
-                wang_result.tiling,
-            ):
-                _raise_crosscheck_failure(
-                    "native SAT tiling was rejected by the Python checker",
-                    assignment,
-                    wang_result,
-                    extracted,
-                )
-            if extracted != assignment:
-                _raise_crosscheck_failure(
-                    "native Wang tiling did not encode the requested "
-                    "assignment",
-                    assignment,
-                    wang_result,
-                    extracted,
+                    None,
                 )
-            return formula, region, boolean_result, wang_result
+            extracted = instance.extract(wang_result.tiling)
+
+        if not is_valid_assignment(formula, assignment):
+            _raise_crosscheck_failure(
+                "Boolean Z3 returned an assignment rejected by the "
+                "Python checker",
+                assignment,
+                wang_result,
+                extracted,
+            )
+        if wang_result.status is not TilingSolveStatus.SAT:
+            _raise_crosscheck_failure(
+                "valid Boolean assignment did not have a native Wang "
+                "extension",
+                assignment,
+                wang_result,
+                extracted,
+            )
+        if wang_result.tiling is None or not is_valid_tiling(
+            region,
+            TILESET,
+            wang_result.tiling,
+        ):
+            _raise_crosscheck_failure(
+                "native SAT tiling was rejected by the Python checker",
+                assignment,
+                wang_result,
+                extracted,
+            )
+        if extracted != assignment:
+            _raise_crosscheck_failure(
+                "native Wang tiling did not encode the requested "
+                "assignment",
+                assignment,
+                wang_result,
+                extracted,
+            )
+        return formula, region, boolean_result, wang_result
 
 
 def solve_native_and_extract(
-    path: PathLike,
+    source: FormulaSource | NativeInstance,
     optimized: bool = False,
 ) -> tuple[
     Formula,
@@ -151,80 +153,63 @@ def solve_native_and_extract(
     tuple[bool, ...] | None,
 ]:
     """Solve one reduction natively and decode its Boolean witness."""
-    with _loaded_formula(path) as native_formula:
-        formula = _copy_formula(native_formula)
-        with _built_reduction(native_formula) as native_reduction:
-            region = _copy_region(native_reduction.region)
-            extracted: tuple[bool, ...] | None = None
-            wang_result = _solve_native(
-                native_reduction,
-                region,
-                optimized=optimized,
-            )
-            if wang_result.status is TilingSolveStatus.SAT:
-                if wang_result.tiling is None:
-                    _raise_crosscheck_failure(
-                        "native SAT result did not carry a tiling",
-                        None,
-                        wang_result,
-                        None,
-                    )
-                extracted = _extract_assignment(
-                    native_formula,
-                    native_reduction,
-                    region,
-                    wang_result.tiling,
-                )
-
-            if wang_result.status is TilingSolveStatus.UNSAT:
-                return formula, region, wang_result, None
-            if wang_result.status is not TilingSolveStatus.SAT:
+    with _scoped_instance(source) as instance:
+        formula = instance.formula
+        region = instance.region
+        extracted: tuple[bool, ...] | None = None
+        wang_result = instance.solve(optimized=optimized)
+        if wang_result.status is TilingSolveStatus.SAT:
+            if wang_result.tiling is None:
                 _raise_crosscheck_failure(
-                    "native Wang solver returned an unsupported status",
-                    extracted,
-                    wang_result,
-                    extracted,
-                )
-            if wang_result.tiling is None or not is_valid_tiling(
-                region,
-                TILESET,
-                wang_result.tiling,
-            ):
-                _raise_crosscheck_failure(
-                    "native SAT tiling was rejected by the Python checker",
-                    extracted,
-                    wang_result,
-                    extracted,
-                )
-            if extracted is None:
-                _raise_crosscheck_failure(
-                    "native SAT tiling did not encode a Boolean assignment",
+                    "native SAT result did not carry a tiling",
                     None,
                     wang_result,
                     None,
                 )
-            if not is_valid_assignment(formula, extracted):
-                _raise_crosscheck_failure(
-                    "native SAT tiling decoded to an invalid Boolean "
-                    "assignment",
-                    extracted,
-                    wang_result,
-                    extracted,
-                )
-            return formula, region, wang_result, extracted
+            extracted = instance.extract(wang_result.tiling)
+
+        if wang_result.status is TilingSolveStatus.UNSAT:
+            return formula, region, wang_result, None
+        if wang_result.status is not TilingSolveStatus.SAT:
+            _raise_crosscheck_failure(
+                "native Wang solver returned an unsupported status",
+                extracted,
+                wang_result,
+                extracted,
+            )
+        if wang_result.tiling is None or not is_valid_tiling(
+            region,
+            TILESET,
+            wang_result.tiling,
+        ):
+            _raise_crosscheck_failure(
+                "native SAT tiling was rejected by the Python checker",
+                extracted,
+                wang_result,
+                extracted,
+            )
+        if extracted is None:
+            _raise_crosscheck_failure(
+                "native SAT tiling did not encode a Boolean assignment",
+                None,
+                wang_result,
+                None,
+            )
+        if not is_valid_assignment(formula, extracted):
+            _raise_crosscheck_failure(
+                "native SAT tiling decoded to an invalid Boolean "
+                "assignment",
+                extracted,
+                wang_result,
+                extracted,
+            )
+        return formula, region, wang_result, extracted
 
 
 def extract_wang_assignment(
-    path: PathLike,
+    source: FormulaSource | NativeInstance,
     tiling: Sequence[int | None],
 ) -> tuple[bool, ...] | None:
     """Decode a normalized tiling without evaluating the resulting assignment."""
-    with _loaded_formula(path) as native_formula:
-        with _built_reduction(native_formula) as native_reduction:
-            region = _copy_region(native_reduction.region)
-            return _extract_assignment(
-                native_formula,
-                native_reduction,
-                region,
-                tiling,
-            )
+    with _scoped_instance(source) as instance:
+        return instance.extract(tiling)
@@ -0,0 +1,96 @@
+"""Compact dense storage for one Wang tiling.
+
+One byte per row-major cell stores the tile ID, and ``TILE_NONE`` marks an
+inactive cell. The buffer reads as a ``Sequence[int | None]`` and compares
+equal to the tuple form, so checkers written for tuples accept it unchanged.
+"""
+
+from collections.abc import Iterator, Sequence
+from typing import Final, overload
+
+from model.tileset import TILE_COUNT
+
+
+TILE_NONE: Final = 255
+
+# Maps a stored byte to 1 for a canonical tile, 0 for TILE_NONE and 2 for
+# anything else, so one bytes.translate() classifies a whole tiling.
+_CELL_KINDS: Final = bytes(
+    1 if value < TILE_COUNT else 0 if value == TILE_NONE else 2
+    for value in range(256)
+)
+
+
+class TilingBuffer(Sequence[int | None]):
+    """An immutable byte-per-cell tiling with ``TILE_NONE`` for ``None``."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: bytes) -> None:
+        if type(data) is not bytes:
+            raise TypeError("tiling data must be bytes")
+        if 2 in data.translate(_CELL_KINDS):
+            raise ValueError("tiling contains a tile outside the canonical tileset")
+        self._data = data
+
+    @classmethod
+    def from_tiling(cls, tiling: Sequence[int | None]) -> "TilingBuffer":
+        """Encode a dense tuple-style tiling, rejecting non-integer tiles."""
+        if type(tiling) is cls:
+            return tiling
+        encoded = bytearray()
+        for tile_id in tiling:
+            if tile_id is None:
+                encoded.append(TILE_NONE)
+            elif type(tile_id) is not int or not 0 <= tile_id < TILE_COUNT:
+                raise ValueError("tiling contains an invalid integer tile ID")
+            else:
+                encoded.append(tile_id)
+        return cls(bytes(encoded))
+
+    @property
+    def data(self) -> bytes:
+        return self._data
+
+    def occupancy(self) -> bytes:
+        """Return one byte per cell: 1 for a tile and 0 for ``TILE_NONE``."""
+        return self._data.translate(_CELL_KINDS)
+
+    def to_tuple(self) -> tuple[int | None, ...]:
+        return tuple(None if value == TILE_NONE else value for value in self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @overload
+    def __getitem__(self, index: int) -> int | None: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "TilingBuffer": ...
+
+    def __getitem__(self, index: int | slice) -> "int | None | TilingBuffer":
+        if isinstance(index, slice):
+            return TilingBuffer(self._data[index])
+        value = self._data[index]
+        return None if value == TILE_NONE else value
+
+    def __iter__(self) -> Iterator[int | None]:
+        return iter(self.to_tuple())
+
+    def __contains__(self, value: object) -> bool:
+        if value is None:
+            return TILE_NONE in self._data
+        return type(value) is int and 0 <= value < TILE_COUNT and value in self._data
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is TilingBuffer:
+            return self._data == other._data
+        if type(other) is tuple:
+            return self.to_tuple() == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.to_tuple())
+
+    def __repr__(self) -> str:
+        return f"TilingBuffer({self._data!r})"
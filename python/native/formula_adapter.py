@@ -1,5 +1,6 @@
-"""Copy Cubic Monotone 1-in-3 SAT formulas from the native parser."""
+"""Copy Cubic Monotone 1-in-3 SAT formulas from and to the native parser."""
 
+from array import array
 from contextlib import contextmanager
 from ctypes import (
     CDLL,
@@ -10,9 +11,11 @@ from ctypes import (
     c_int,
     c_size_t,
     c_uint32,
+    sizeof,
 )
 from enum import IntEnum
 from functools import cache
+from itertools import chain
 import os
 from typing import Iterator, TypeAlias
 
@@ -21,6 +24,9 @@ from native._lib import library
 
 
 PathLike: TypeAlias = str | bytes | os.PathLike[str] | os.PathLike[bytes]
+FormulaSource: TypeAlias = PathLike | Formula
+
+_BUFFER_NAME = "<memory>"
 
 
 class FormulaParseStatus(IntEnum):
@@ -90,6 +96,20 @@ def _formula_library() -> CDLL:
         POINTER(_Cm13ParseLocation),
     ]
     lib.cm13_formula_load_path.restype = c_int
+    lib.cm13_formula_parse_buffer.argtypes = [
+        c_char_p,
+        c_size_t,
+        POINTER(_Cm13Formula),
+        POINTER(_Cm13ParseLocation),
+    ]
+    lib.cm13_formula_parse_buffer.restype = c_int
+    lib.cm13_formula_from_packed.argtypes = [
+        c_uint32,
+        POINTER(c_uint32),
+        c_size_t,
+        POINTER(_Cm13Formula),
+    ]
+    lib.cm13_formula_from_packed.restype = c_int
     lib.cm13_formula_destroy.argtypes = [POINTER(_Cm13Formula)]
     lib.cm13_formula_destroy.restype = None
     return lib
@@ -107,6 +127,26 @@ def _copy_formula(native_formula: _Cm13Formula) -> Formula:
     return Formula(variable_count=int(native_formula.variable_count), clauses=clauses)
 
 
+def _check_parse_status(
+    status_code: int,
+    source: str | bytes,
+    location: _Cm13ParseLocation,
+) -> None:
+    try:
+        status = FormulaParseStatus(status_code)
+    except ValueError as error:
+        raise RuntimeError(
+            f"native parser returned unknown status {status_code}"
+        ) from error
+    if status is not FormulaParseStatus.OK:
+        raise FormulaLoadError(
+            source,
+            status,
+            int(location.line),
+            int(location.column),
+        )
+
+
 @contextmanager
 def _loaded_formula(
     path: PathLike,
@@ -122,24 +162,69 @@ def _loaded_formula(
             byref(native_formula),
             byref(location),
         )
-        try:
-            status = FormulaParseStatus(status_code)
-        except ValueError as error:
-            raise RuntimeError(
-                f"native parser returned unknown status {status_code}"
-            ) from error
-        if status is not FormulaParseStatus.OK:
-            raise FormulaLoadError(
-                filesystem_path,
-                status,
-                int(location.line),
-                int(location.column),
-            )
+        _check_parse_status(status_code, filesystem_path, location)
+        yield native_formula
+    finally:
+        lib.cm13_formula_destroy(byref(native_formula))
+
+
+@contextmanager
+def _parsed_formula(text: str | bytes) -> Iterator[_Cm13Formula]:
+    data = text.encode("utf-8") if isinstance(text, str) else bytes(text)
+    native_formula = _Cm13Formula()
+    location = _Cm13ParseLocation()
+    lib = _formula_library()
+    try:
+        status_code = lib.cm13_formula_parse_buffer(
+            data,
+            len(data),
+            byref(native_formula),
+            byref(location),
+        )
+        _check_parse_status(status_code, _BUFFER_NAME, location)
         yield native_formula
     finally:
         lib.cm13_formula_destroy(byref(native_formula))
 
 
+def _packed_indices(formula: Formula) -> object:
+    indices = array("I", chain.from_iterable(formula.clauses))
+    if indices.itemsize == sizeof(c_uint32):
+        return (c_uint32 * len(indices)).from_buffer(indices)
+    return (c_uint32 * len(indices))(*indices)
+
+
+@contextmanager
+def _marshalled_formula(formula: Formula) -> Iterator[_Cm13Formula]:
+    """Build a native formula from a validated model through one packed array."""
+    if not isinstance(formula, Formula):
+        raise TypeError("formula must be a model.formula.Formula")
+    indices = _packed_indices(formula)
+    native_formula = _Cm13Formula()
+    lib = _formula_library()
+    try:
+        status_code = lib.cm13_formula_from_packed(
+            formula.variable_count,
+            indices,
+            len(indices),
+            byref(native_formula),
+        )
+        _check_parse_status(status_code, _BUFFER_NAME, _Cm13ParseLocation())
+        yield native_formula
+    finally:
+        lib.cm13_formula_destroy(byref(native_formula))
+
+
+@contextmanager
+def _native_formula(source: FormulaSource) -> Iterator[_Cm13Formula]:
+    if isinstance(source, Formula):
+        with _marshalled_formula(source) as native_formula:
+            yield native_formula
+    else:
+        with _loaded_formula(source) as native_formula:
+            yield native_formula
+
+
 def load_formula(path: PathLike) -> Formula:
     """Parse ``path`` in C and return a fully Python-owned formula.
 
@@ -150,3 +235,14 @@ def load_formula(path: PathLike) -> Formula:
 
     with _loaded_formula(path) as native_formula:
         return _copy_formula(native_formula)
+
+
+def parse_formula(text: str | bytes) -> Formula:
+    """Parse in-memory CM13 text in C and return a Python-owned formula.
+
+    Diagnostics match :func:`load_formula`; the reported path is
+    ``"<memory>"``.
+    """
+
+    with _parsed_formula(text) as native_formula:
+        return _copy_formula(native_formula)
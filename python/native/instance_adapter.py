@@ -0,0 +1,590 @@
+"""Keep one parsed formula and Yang–Zhang reduction alive across native calls."""
+
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import ExitStack
+from ctypes import c_int
+import os
+from threading import Lock
+from time import monotonic_ns
+from types import ModuleType
+from typing import TYPE_CHECKING, BinaryIO
+
+from model.formula import Formula
+from model.region import Region
+from model.tiling import TilingBuffer
+from native.formula_adapter import (
+    FormulaSource,
+    PathLike,
+    _Cm13Formula,
+    _copy_formula,
+    _loaded_formula,
+    _marshalled_formula,
+)
+from native.region_adapter import (
+    _YangZhangReduction,
+    _built_reduction,
+    _copy_region,
+)
+from native.witness_adapter import (
+    CancelFlag,
+    SolverContext,
+    _DEFAULT_COUNT_CACHE_BYTES,
+    _SolveOptions,
+    _count_tilings,
+    _duration_ns,
+    _extract_assignment,
+    _solve_assignment_batch,
+    _solve_assignment_extension,
+    _solve_native,
+    _split_cubes,
+    _witnesses_correspond,
+)
+from oracles.tiling_solver import TilingSolveResult, TilingSolveStatus
+
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+
+_DEFAULT_CACHE_CAPACITY = 8
+
+
+class NativeInstance:
+    """A live native formula and reduction with Python-owned copies of both.
+
+    The source is a ``.cm13`` path or an in-memory :class:`Formula`, which
+    is marshalled without a text round trip. It is parsed and reduced once.
+    Every method reuses the same native objects and copies only Python-owned
+    results out. Call :meth:`close`, or use the instance as a context
+    manager, to destroy the reduction and then the formula. Closing is
+    idempotent; any other method raises :class:`ValueError` once the
+    instance is closed.
+    """
+
+    __slots__ = (
+        "_path",
+        "_stack",
+        "_native_formula",
+        "_native_reduction",
+        "_formula",
+        "_region",
+    )
+
+    def __init__(self, source: FormulaSource) -> None:
+        stack = ExitStack()
+        try:
+            if isinstance(source, Formula):
+                native_formula = stack.enter_context(
+                    _marshalled_formula(source)
+                )
+            else:
+                native_formula = stack.enter_context(_loaded_formula(source))
+            native_reduction = stack.enter_context(
+                _built_reduction(native_formula)
+            )
+            formula = (
+                source
+                if isinstance(source, Formula)
+                else _copy_formula(native_formula)
+            )
+            region = _copy_region(native_reduction.region)
+        except BaseException:
+            stack.close()
+            raise
+
+        self._path = (
+            None if isinstance(source, Formula) else os.fspath(source)
+        )
+        self._stack: ExitStack | None = stack
+        self._native_formula: _Cm13Formula = native_formula
+        self._native_reduction: _YangZhangReduction = native_reduction
+        self._formula = formula
+        self._region = region
+
+    @property
+    def path(self) -> str | bytes | None:
+        """The source path, or ``None`` for an in-memory formula."""
+        return self._path
+
+    @property
+    def formula(self) -> Formula:
+        return self._formula
+
+    @property
+    def region(self) -> Region:
+        return self._region
+
+    @property
+    def closed(self) -> bool:
+        return self._stack is None
+
+    def close(self) -> None:
+        stack, self._stack = self._stack, None
+        if stack is not None:
+            stack.close()
+
+    def __enter__(self) -> "NativeInstance":
+        self._check_open()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def solve(
+        self,
+        *,
+        optimized: bool = False,
+        timeout: float | None = None,
+        node_limit: int | None = None,
+        cancel: CancelFlag | None = None,
+        context: SolverContext | None = None,
+        threads: int | None = None,
+        decompose: bool = False,
+        learn: bool = False,
+        restarts: str | None = None,
+        seed: int = 0,
+        bitslice: bool = False,
+        frontier: bool = False,
+        least_constraining: bool = False,
+        probe: bool = False,
+        probe_budget: float | None = None,
+        weighted_degree: bool = False,
+        checkpoint: str | os.PathLike[str] | None = None,
+        checkpoint_interval: float | None = None,
+        resume: bool = False,
+        initial_domains: Sequence[int] | None = None,
+    ) -> TilingSolveResult:
+        """Solve the unpinned reduction natively and copy its witness.
+
+        Any of ``timeout`` (seconds), ``node_limit`` (DFS nodes) and
+        ``cancel`` may bound the search; hitting one returns ``UNKNOWN``.
+        A ``context`` reuses native solver storage across calls. ``threads``
+        searches one instance on that many OpenMP threads; a SAT witness may
+        then differ from the serial one. ``initial_domains`` restricts each
+        cell of :attr:`region` to a tile bitmask, such as a cube from
+        :meth:`split`.
+
+        The remaining options but ``seed`` select search mechanisms that
+        only the optimized engine implements, and setting one without
+        ``optimized`` raises :class:`ValueError`. ``decompose`` solves
+        independent root components separately, in parallel with
+        ``threads``. ``learn`` backjumps with nogood learning. ``restarts``
+        (``"luby"`` or ``"geometric"``) restarts on a growing failed-leaf
+        budget, reseeding every run from ``seed``. ``bitslice`` propagates
+        the root over tile bitplanes. ``frontier`` sweeps a narrow region
+        with a row-profile dynamic program. ``least_constraining`` tries
+        first the tile that leaves the neighbors the most tiles. ``probe``
+        first removes every tile whose assignment propagation refutes,
+        within ``probe_budget`` seconds when given. ``weighted_degree``
+        branches on the cell whose arcs saw the most conflicts per domain
+        tile. ``checkpoint`` saves the search to that path every
+        ``checkpoint_interval`` seconds, and when a bound stops it;
+        ``resume`` continues the search saved there, given the same options.
+        """
+        self._check_open()
+        solve_options = _SolveOptions(
+            optimized=optimized,
+            decompose=decompose,
+            learn=learn,
+            restarts=restarts,
+            seed=seed,
+            bitslice=bitslice,
+            frontier=frontier,
+            least_constraining=least_constraining,
+            probe=probe,
+            probe_budget=probe_budget,
+            weighted_degree=weighted_degree,
+            checkpoint=checkpoint,
+            checkpoint_interval=checkpoint_interval,
+        )
+        return _solve_native(
+            self._native_reduction,
+            self._region,
+            solve_options,
+            timeout=timeout,
+            node_limit=node_limit,
+            cancel=cancel,
+            context=context,
+            threads=threads,
+            resume=resume,
+            initial_domains=initial_domains,
+        )
+
+    def split(
+        self,
+        cube_count: int,
+        *,
+        context: SolverContext | None = None,
+    ) -> tuple[tuple[int, ...], ...]:
+        """Split the reduction into at least ``cube_count`` disjoint cubes.
+
+        Each cube is a dense tuple of tile bitmasks that :meth:`solve`
+        accepts as ``initial_domains``. A lookahead on the smallest open
+        cells chooses every split, and propagation drops refuted branches.
+        The reduction is SAT exactly when some cube is, so an empty tuple
+        means it is UNSAT. Splitting stops early once every cell is resolved.
+        """
+        self._check_open()
+        return _split_cubes(
+            self._native_reduction,
+            cube_count,
+            context=context,
+        )
+
+    def count_tilings(
+        self,
+        *,
+        visit: Callable[[TilingBuffer], bool | None] | None = None,
+        stream: BinaryIO | None = None,
+        cache_bytes: int = _DEFAULT_COUNT_CACHE_BYTES,
+        timeout: float | None = None,
+        node_limit: int | None = None,
+        cancel: CancelFlag | None = None,
+    ) -> int | None:
+        """Count the tilings of the unpinned reduction exactly.
+
+        Independent components are counted separately, and their counts
+        are cached in at most ``cache_bytes`` bytes. ``visit`` receives
+        every tiling as a :class:`TilingBuffer` instead, and returning
+        ``False`` stops it; ``stream`` gets every tiling's bytes, one per
+        cell. ``timeout`` (seconds), ``node_limit`` (decisions) and
+        ``cancel`` bound the count. Returns ``None`` when a bound or
+        ``visit`` stops it.
+        """
+        self._check_open()
+        return _count_tilings(
+            self._native_reduction,
+            visit=visit,
+            stream=stream,
+            cache_bytes=cache_bytes,
+            timeout=timeout,
+            node_limit=node_limit,
+            cancel=cancel,
+        )
+
+    def extend(
+        self,
+        assignment: Sequence[bool],
+        *,
+        optimized: bool = False,
+    ) -> TilingSolveResult:
+        """Solve the reduction with the variable gadgets pinned to ``assignment``."""
+        self._check_open()
+        return _solve_assignment_extension(
+            self._native_formula,
+            self._native_reduction,
+            self._region,
+            assignment,
+            optimized=optimized,
+        )
+
+    def extend_many(
+        self,
+        assignments: Iterable[Sequence[bool]],
+        *,
+        optimized: bool = False,
+    ) -> tuple[TilingSolveResult, ...]:
+        """Extend every assignment in one native call, in input order.
+
+        The rows share one native solver workspace and one root-domain mask,
+        so setup is paid once per call instead of once per assignment. Each
+        result equals :meth:`extend` for the same assignment.
+        """
+        self._check_open()
+        statuses, tilings = _solve_assignment_batch(
+            self._native_formula,
+            self._native_reduction,
+            self._region,
+            assignments,
+            optimized=optimized,
+            tilings=True,
+        )
+        return tuple(
+            TilingSolveResult(status, tiling)
+            for status, tiling in zip(statuses, tilings, strict=True)
+        )
+
+    def extension_statuses(
+        self,
+        assignments: Iterable[Sequence[bool]],
+        *,
+        optimized: bool = False,
+    ) -> tuple[TilingSolveStatus, ...]:
+        """Like :meth:`extend_many` but copy only one status per assignment."""
+        self._check_open()
+        statuses, _ = _solve_assignment_batch(
+            self._native_formula,
+            self._native_reduction,
+            self._region,
+            assignments,
+            optimized=optimized,
+            tilings=False,
+        )
+        return statuses
+
+    def extract(
+        self,
+        tiling: Sequence[int | None],
+    ) -> tuple[bool, ...] | None:
+        """Decode the assignment encoded by a dense tiling, if any."""
+        self._check_open()
+        return _extract_assignment(
+            self._native_formula,
+            self._native_reduction,
+            self._region,
+            tiling,
+        )
+
+    def correspond(
+        self,
+        assignment: Sequence[bool],
+        tiling: Sequence[int | None],
+    ) -> bool:
+        """Return whether ``tiling`` represents ``assignment``."""
+        self._check_open()
+        return _witnesses_correspond(
+            self._native_formula,
+            self._native_reduction,
+            self._region,
+            assignment,
+            tiling,
+        )
+
+    def _check_open(self) -> None:
+        if self._stack is None:
+            raise ValueError("operation on a closed NativeInstance")
+
+
+class _InstanceCache:
+    """A small LRU of open instances keyed by path, mtime and size."""
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._entries: OrderedDict[
+            tuple[bytes, int, int],
+            NativeInstance,
+        ] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, path: PathLike) -> NativeInstance:
+        encoded_path = os.fsencode(os.path.abspath(os.fspath(path)))
+        status = os.stat(encoded_path)
+        key = (encoded_path, status.st_mtime_ns, status.st_size)
+        with self._lock:
+            instance = self._entries.get(key)
+            if instance is not None and not instance.closed:
+                self._entries.move_to_end(key)
+                return instance
+
+            for stale_key in [
+                cached for cached in self._entries if cached[0] == encoded_path
+            ]:
+                self._entries.pop(stale_key).close()
+            instance = NativeInstance(path)
+            self._entries[key] = instance
+            while len(self._entries) > self._capacity:
+                _, evicted = self._entries.popitem(last=False)
+                evicted.close()
+            return instance
+
+    def clear(self) -> None:
+        with self._lock:
+            while self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                evicted.close()
+
+
+_INSTANCE_CACHE = _InstanceCache(_DEFAULT_CACHE_CAPACITY)
+
+
+def cached_instance(path: PathLike) -> NativeInstance:
+    """Return a shared open instance for the current contents of ``path``.
+
+    The cache owns the returned instance. Callers must not close it. A file
+    whose mtime or size has changed is parsed again, and the least recently
+    used instance is closed once the cache holds more than eight.
+    """
+    return _INSTANCE_CACHE.get(path)
+
+
+def clear_instance_cache() -> None:
+    """Close and forget every cached instance."""
+    _INSTANCE_CACHE.clear()
+
+
+def _futures() -> ModuleType:
+    """Import :mod:`concurrent.futures` for the pooled solvers.
+
+    It pulls in logging, so single-solve callers never import it.
+    """
+    import concurrent.futures
+
+    return concurrent.futures
+
+
+def solve_many(
+    instances: Iterable[NativeInstance],
+    *,
+    optimized: bool = False,
+    workers: int | None = None,
+    timeout: float | None = None,
+    node_limit: int | None = None,
+    cancel: CancelFlag | None = None,
+) -> Iterator[tuple[NativeInstance, TilingSolveResult]]:
+    """Solve independent instances on a thread pool in completion order.
+
+    ctypes releases the GIL for the duration of each native solve, so the
+    solves run in parallel within one process. Every solve owns its own
+    ``WangSolveResult``, and results are copied out on the worker thread.
+    At most ``workers`` solves (default ``os.cpu_count()``) are in flight;
+    closing the generator early cancels those not yet started. An exception
+    from a solve propagates at the point its result would have been yielded.
+    ``timeout`` and ``node_limit`` bound each solve separately, and ``cancel``
+    stops every solve that is still running.
+    """
+    concurrent = _futures()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if type(workers) is not int or workers <= 0:
+        raise ValueError("workers must be a positive integer")
+
+    pending = iter(instances)
+    with concurrent.ThreadPoolExecutor(max_workers=workers) as executor:
+        running: dict[Future[TilingSolveResult], NativeInstance] = {}
+
+        def submit_next() -> None:
+            instance = next(pending, None)
+            if instance is not None:
+                future = executor.submit(
+                    instance.solve,
+                    optimized=optimized,
+                    timeout=timeout,
+                    node_limit=node_limit,
+                    cancel=cancel,
+                )
+                running[future] = instance
+
+        try:
+            for _ in range(workers):
+                submit_next()
+            while running:
+                done, _ = concurrent.wait(
+                    running, return_when=concurrent.FIRST_COMPLETED
+                )
+                for future in done:
+                    instance = running.pop(future)
+                    submit_next()
+                    yield instance, future.result()
+        finally:
+            for future in running:
+                future.cancel()
+
+
+# The stop flag of a cube worker process, in memory shared with its driver.
+_cube_cancel: CancelFlag | None = None
+
+
+def _start_cube_worker(stop: c_int) -> None:
+    global _cube_cancel
+    cancel = CancelFlag()
+    cancel._value = stop
+    _cube_cancel = cancel
+
+
+def _solve_cube(
+    path: str | bytes,
+    cube: tuple[int, ...],
+    optimized: bool,
+    deadline_ns: int | None,
+    node_limit: int | None,
+) -> TilingSolveResult:
+    timeout = None
+    if deadline_ns is not None:
+        remaining_ns = deadline_ns - monotonic_ns()
+        if remaining_ns <= 0:
+            return TilingSolveResult(TilingSolveStatus.UNKNOWN)
+        timeout = remaining_ns / 1e9
+    return cached_instance(path).solve(
+        optimized=optimized,
+        timeout=timeout,
+        node_limit=node_limit,
+        cancel=_cube_cancel,
+        initial_domains=cube,
+    )
+
+
+def solve_cubes(
+    path: PathLike,
+    *,
+    cube_count: int | None = None,
+    workers: int | None = None,
+    optimized: bool = True,
+    timeout: float | None = None,
+    node_limit: int | None = None,
+) -> TilingSolveResult:
+    """Solve one instance by cube-and-conquer on a process pool.
+
+    The reduction of ``path`` is split by :meth:`NativeInstance.split` into
+    ``cube_count`` cubes (default eight per worker), which ``workers``
+    processes (default ``os.cpu_count()``) solve natively, each through its
+    own :func:`cached_instance`. The first SAT cube wins: its witness is
+    returned, a flag in shared memory cancels the running solves, and cubes
+    not yet started are dropped. The cubes hold every tiling between them,
+    so UNSAT needs every cube UNSAT; an ``UNKNOWN`` cube makes the result
+    ``UNKNOWN``. Cubes are solved on the optimized engine unless
+    ``optimized`` is false. ``timeout`` bounds the whole solve and
+    ``node_limit`` each cube.
+    """
+    import multiprocessing
+
+    concurrent = _futures()
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if type(workers) is not int or workers <= 0:
+        raise ValueError("workers must be a positive integer")
+    if cube_count is None:
+        cube_count = 8 * workers
+    timeout_ns = None if timeout is None else _duration_ns(timeout, "timeout")
+    if node_limit is not None and (
+        type(node_limit) is not int or node_limit <= 0
+    ):
+        raise ValueError("node_limit must be a positive integer")
+    deadline_ns = None if timeout_ns is None else monotonic_ns() + timeout_ns
+
+    source = os.fspath(path)
+    cubes = cached_instance(source).split(cube_count)
+    if not cubes:
+        return TilingSolveResult(TilingSolveStatus.UNSAT)
+
+    stop = multiprocessing.RawValue(c_int, 0)
+    executor = concurrent.ProcessPoolExecutor(
+        max_workers=min(workers, len(cubes)),
+        initializer=_start_cube_worker,
+        initargs=(stop,),
+    )
+    try:
+        futures = [
+            executor.submit(
+                _solve_cube,
+                source,
+                cube,
+                optimized,
+                deadline_ns,
+                node_limit,
+            )
+            for cube in cubes
+        ]
+        unknown = False
+        for future in concurrent.as_completed(futures):
+            result = future.result()
+            if result.status is TilingSolveStatus.SAT:
+                return result
+            unknown = unknown or result.status is TilingSolveStatus.UNKNOWN
+        return TilingSolveResult(
+            TilingSolveStatus.UNKNOWN if unknown else TilingSolveStatus.UNSAT
+        )
+    finally:
+        stop.value = 1
+        executor.shutdown(wait=True, cancel_futures=True)
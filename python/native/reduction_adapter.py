@@ -2,14 +2,47 @@
 
 from model.formula import Formula
 from model.region import Region
-from native.formula_adapter import PathLike, _copy_formula, _loaded_formula
-from native.region_adapter import _build_region
+from native.formula_adapter import (
+    FormulaSource,
+    _Cm13Formula,
+    _copy_formula,
+    _native_formula,
+)
+from native.region_adapter import (
+    NativeRegion,
+    _build_native_region,
+    _build_region,
+)
 
 
-def load_formula_and_region(path: PathLike) -> tuple[Formula, Region]:
-    """Parse once, build the Yang–Zhang region, and copy both results."""
+def _source_formula(
+    source: FormulaSource,
+    native_formula: _Cm13Formula,
+) -> Formula:
+    if isinstance(source, Formula):
+        return source
+    return _copy_formula(native_formula)
 
-    with _loaded_formula(path) as native_formula:
-        formula = _copy_formula(native_formula)
+
+def load_formula_and_region(source: FormulaSource) -> tuple[Formula, Region]:
+    """Parse once, build the Yang–Zhang region, and copy both results.
+
+    ``source`` is a ``.cm13`` path or an in-memory :class:`Formula`, which is
+    marshalled directly and returned unchanged.
+    """
+
+    with _native_formula(source) as native_formula:
+        formula = _source_formula(source, native_formula)
         region = _build_region(native_formula)
         return formula, region
+
+
+def load_formula_and_native_region(
+    source: FormulaSource,
+) -> tuple[Formula, NativeRegion]:
+    """Parse once and return the formula with a packed region copy."""
+
+    with _native_formula(source) as native_formula:
+        formula = _source_formula(source, native_formula)
+        region = _build_native_region(native_formula)
+        return formula, region
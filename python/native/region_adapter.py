@@ -1,19 +1,26 @@
-"""Copy native Wang regions into immutable Python storage."""
+"""Read native Wang regions into packed or immutable Python storage.
+
+Native cells are read through a borrowed buffer over the native array,
+valid only while the native region is alive: building the immutable model
+reads that buffer directly, and only :class:`NativeRegion` keeps a copy.
+"""
 
 from contextlib import contextmanager
 from ctypes import (
     CDLL,
     POINTER,
     Structure,
+    addressof,
     byref,
     c_bool,
     c_int32,
     c_size_t,
     c_uint8,
     c_void_p,
+    sizeof,
 )
 from functools import cache
-from typing import Iterator
+from typing import Any, Iterator
 
 from model.region import Region
 from native._lib import library
@@ -66,7 +73,135 @@ def _region_library() -> CDLL:
     return lib
 
 
-def _copy_region(native_region: _Region) -> Region:
+class NativeRegion:
+    """A Python-owned packed copy of one native ``RegionCell`` array.
+
+    The whole array is copied with one ``memmove`` and split into an active
+    plane and a boundary plane by slice operations, so no per-cell ctypes
+    access happens. ``active`` and ``boundary`` are read-only memoryviews;
+    :meth:`to_region` builds the validated immutable model only on request.
+    No native pointer is retained.
+    """
+
+    __slots__ = ("_width", "_height", "_cells", "_active", "_boundary")
+
+    def __init__(self, width: int, height: int, cells: bytes) -> None:
+        stride = sizeof(_RegionCell)
+        if (
+            type(width) is not int
+            or type(height) is not int
+            or width <= 0
+            or height <= 0
+            or type(cells) is not bytes
+            or len(cells) != width * height * stride
+        ):
+            raise ValueError("packed cells must match the region extent")
+
+        boundary = bytearray(width * height * _DIRECTION_COUNT)
+        active_offset = _RegionCell.active.offset
+        boundary_offset = _RegionCell.boundary.offset
+        for direction in range(_DIRECTION_COUNT):
+            boundary[direction::_DIRECTION_COUNT] = cells[
+                boundary_offset + direction::stride
+            ]
+
+        self._width = width
+        self._height = height
+        self._cells = cells
+        self._active = cells[active_offset::stride]
+        self._boundary = bytes(boundary)
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    @property
+    def cell_count(self) -> int:
+        return self._width * self._height
+
+    @property
+    def cells(self) -> memoryview:
+        """Raw packed ``RegionCell`` bytes shaped ``(cell_count, stride)``."""
+        return memoryview(self._cells).cast(
+            "B",
+            (self.cell_count, sizeof(_RegionCell)),
+        )
+
+    @property
+    def active(self) -> memoryview:
+        """One ``bool`` per dense row-major cell."""
+        return memoryview(self._active).cast("?")
+
+    @property
+    def boundary(self) -> memoryview:
+        """``(N, E, S, W)`` colors shaped ``(cell_count, 4)``."""
+        return memoryview(self._boundary).cast(
+            "B",
+            (self.cell_count, _DIRECTION_COUNT),
+        )
+
+    def to_numpy(self) -> Any:
+        """Return a read-only NumPy structured view over the packed cells.
+
+        NumPy is optional and imported only by this method.
+        """
+        import numpy
+
+        dtype = numpy.dtype(
+            {
+                "names": ["active", "boundary"],
+                "formats": ["?", ("u1", (_DIRECTION_COUNT,))],
+                "offsets": [
+                    _RegionCell.active.offset,
+                    _RegionCell.boundary.offset,
+                ],
+                "itemsize": sizeof(_RegionCell),
+            }
+        )
+        return numpy.frombuffer(self._cells, dtype=dtype)
+
+    def to_region(self) -> Region:
+        """Copy the packed planes into a validated immutable :class:`Region`."""
+        return _region_from_cells(
+            self._width,
+            self._height,
+            memoryview(self._cells),
+        )
+
+
+def _region_from_cells(width: int, height: int, cells: memoryview) -> Region:
+    """Build the immutable model from packed ``RegionCell`` bytes.
+
+    Strided memoryview slices read the planes in place, so the only copies
+    are the tuples the model keeps.
+    """
+    stride = sizeof(_RegionCell)
+    boundary_offset = _RegionCell.boundary.offset
+    return Region(
+        width=width,
+        height=height,
+        active=tuple(map(bool, cells[_RegionCell.active.offset::stride])),
+        boundary=tuple(
+            zip(
+                *(
+                    cells[boundary_offset + direction::stride]
+                    for direction in range(_DIRECTION_COUNT)
+                )
+            )
+        ),
+    )
+
+
+def _native_cells(native_region: _Region) -> tuple[int, int, memoryview]:
+    """Borrow the native cell array without copying it.
+
+    The returned memoryview aliases native memory and must not outlive the
+    native region it was taken from.
+    """
     width = int(native_region.width)
     height = int(native_region.height)
     cell_count = int(native_region.cell_count)
@@ -78,26 +213,19 @@ def _copy_region(native_region: _Region) -> Region:
     ):
         raise RuntimeError("invalid native region metadata")
 
-    active = tuple(
-        bool(native_region.cells[index].active)
-        for index in range(cell_count)
-    )
-    boundary = tuple(
-        (
-            int(native_region.cells[index].boundary[0]),
-            int(native_region.cells[index].boundary[1]),
-            int(native_region.cells[index].boundary[2]),
-            int(native_region.cells[index].boundary[3]),
-        )
-        for index in range(cell_count)
+    cells = (c_uint8 * (cell_count * sizeof(_RegionCell))).from_address(
+        addressof(native_region.cells.contents)
     )
+    return width, height, memoryview(cells).cast("B")
 
-    return Region(
-        width=width,
-        height=height,
-        active=active,
-        boundary=boundary,
-    )
+
+def _packed_region(native_region: _Region) -> NativeRegion:
+    width, height, cells = _native_cells(native_region)
+    return NativeRegion(width, height, cells.tobytes())
+
+
+def _copy_region(native_region: _Region) -> Region:
+    return _region_from_cells(*_native_cells(native_region))
 
 
 @contextmanager
@@ -120,3 +248,8 @@ def _built_reduction(
 def _build_region(native_formula: _Cm13Formula) -> Region:
     with _built_reduction(native_formula) as native_reduction:
         return _copy_region(native_reduction.region)
+
+
+def _build_native_region(native_formula: _Cm13Formula) -> NativeRegion:
+    with _built_reduction(native_formula) as native_reduction:
+        return _packed_region(native_reduction.region)
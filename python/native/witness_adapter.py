@@ -1,31 +1,73 @@
 """Scoped ctypes adaptation for native Boolean/Wang witness operations."""
 
-from collections.abc import Sequence
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, fields
 from ctypes import (
     CDLL,
+    CFUNCTYPE,
     POINTER,
     Structure,
     byref,
     c_bool,
     c_char_p,
     c_int,
+    c_int8,
     c_size_t,
     c_uint8,
     c_uint32,
     c_uint64,
+    c_void_p,
+    pointer,
+    sizeof,
+    string_at,
 )
 from enum import IntEnum
 from functools import cache
+import math
+import os
+import sys
+from threading import Lock
+from time import monotonic_ns
+from typing import BinaryIO, Final
 
 from model.region import Region
 from model.tileset import TILE_COUNT
+from model.tiling import TILE_NONE, TilingBuffer
 from native._lib import library
 from native.formula_adapter import _Cm13Formula
 from native.region_adapter import _Region, _YangZhangReduction
 from oracles.tiling_solver import TilingSolveResult, TilingSolveStatus
 
 
-_TILE_NONE = 255
+_DOMAIN_BYTES: Final = sizeof(c_uint32)
+_DOMAIN_BYTE_OFFSETS: Final = (
+    tuple(range(_DOMAIN_BYTES))
+    if sys.byteorder == "little"
+    else tuple(reversed(range(_DOMAIN_BYTES)))
+)
+_CODE_NOT_SINGLETON: Final = 0xFE
+_CODE_OUTSIDE_TILESET: Final = 0xFF
+# One translate() table per domain byte: zero stays zero, a single set bit
+# becomes ``tile_id + 1`` and anything else becomes an error code.
+_DOMAIN_PLANE_CODES: Final = tuple(
+    bytes(
+        0
+        if value == 0
+        else _CODE_NOT_SINGLETON
+        if value & (value - 1)
+        else plane * 8 + value.bit_length()
+        if plane * 8 + value.bit_length() <= TILE_COUNT
+        else _CODE_OUTSIDE_TILESET
+        for value in range(256)
+    )
+    for plane in range(_DOMAIN_BYTES)
+)
+# Durations are capped so that monotonic_ns() plus one stays in uint64.
+_MAX_DURATION_NS: Final = 1 << 63
+_NONZERO: Final = bytes(0 if value == 0 else 1 for value in range(256))
+_CODE_TO_TILE: Final = bytes(
+    TILE_NONE if value == 0 else value - 1 for value in range(256)
+)
 
 
 class NativeWitnessError(RuntimeError):
@@ -36,6 +78,7 @@ class _WangSolveStatus(IntEnum):
     ERROR = -1
     UNSAT = 0
     SAT = 1
+    UNKNOWN = 2
 
 
 class _YangZhangWitnessStatus(IntEnum):
@@ -49,6 +92,37 @@ class _YangZhangExtensionSolver(IntEnum):
     OPTIMIZED = 1
 
 
+class _WangSolverEngine(IntEnum):
+    REFERENCE = 0
+    OPTIMIZED = 1
+    FRONTIER = 2
+
+
+class _WangValueOrder(IntEnum):
+    ASCENDING = 0
+    DESCENDING = 1
+    RANDOM = 2
+    LEAST_CONSTRAINING = 3
+
+
+class _WangRestartSchedule(IntEnum):
+    NONE = 0
+    LUBY = 1
+    GEOMETRIC = 2
+
+
+_WANG_SOLVE_COLLECT_METRICS: Final = 1 << 0
+_WANG_SOLVE_DECOMPOSE_COMPONENTS: Final = 1 << 3
+_WANG_SOLVE_LEARN_NOGOODS: Final = 1 << 5
+_WANG_SOLVE_BITSLICE_PROPAGATION: Final = 1 << 6
+_WANG_SOLVE_FRONTIER_WHEN_NARROW: Final = 1 << 7
+_WANG_SOLVE_PROBE_SINGLETONS: Final = 1 << 8
+_WANG_SOLVE_WEIGHTED_DEGREE: Final = 1 << 9
+_WANG_SOLVE_CHECKPOINT: Final = 1 << 10
+_WANG_DOMAIN_ALL: Final = (1 << TILE_COUNT) - 1
+_DEFAULT_COUNT_CACHE_BYTES: Final = 64 << 20
+
+
 class _WangSolverMetrics(Structure):
     _fields_ = [
         ("dfs_nodes", c_uint64),
@@ -61,6 +135,25 @@ class _WangSolverMetrics(Structure):
         ("support_byte_lookups", c_uint64),
         ("support_table_bytes", c_size_t),
         ("mrv_cells_scanned", c_uint64),
+        ("mrv_index_updates", c_uint64),
+        ("mrv_index_bytes", c_size_t),
+        ("component_splits", c_uint64),
+        ("components", c_uint64),
+        ("nogoods_learned", c_uint64),
+        ("nogoods_evicted", c_uint64),
+        ("nogood_hits", c_uint64),
+        ("backjumps", c_uint64),
+        ("backjump_levels", c_uint64),
+        ("restarts", c_uint64),
+        ("bitslice_passes", c_uint64),
+        ("bitslice_words", c_uint64),
+        ("frontier_states", c_uint64),
+        ("frontier_peak_states", c_size_t),
+        ("value_scorings", c_uint64),
+        ("value_score_lookups", c_uint64),
+        ("probes", c_uint64),
+        ("probe_prunes", c_uint64),
+        ("weight_bumps", c_uint64),
         ("initial_trail_writes", c_uint64),
         ("search_trail_writes", c_uint64),
         ("initial_trail_rewrites", c_uint64),
@@ -80,6 +173,54 @@ class _WangSolverMetrics(Structure):
     ]
 
 
+class _WangRootFixpoint(Structure):
+    _fields_ = [
+        ("domains", POINTER(c_uint32)),
+        ("domain_count", c_size_t),
+        ("region_fingerprint", c_uint64),
+        ("contradiction", c_bool),
+    ]
+
+
+class _WangRootCacheStats(Structure):
+    _fields_ = [
+        ("hits", c_uint64),
+        ("disk_hits", c_uint64),
+        ("misses", c_uint64),
+        ("evictions", c_uint64),
+        ("disk_writes", c_uint64),
+        ("disk_failures", c_uint64),
+        ("entry_count", c_size_t),
+        ("bytes", c_size_t),
+    ]
+
+
+class _WangCubeSet(Structure):
+    _fields_ = [
+        ("domains", POINTER(c_uint32)),
+        ("cube_count", c_size_t),
+        ("domain_count", c_size_t),
+        ("refuted_count", c_size_t),
+        ("lookahead_propagations", c_uint64),
+    ]
+
+
+class _WangTilingCount(Structure):
+    _fields_ = [
+        ("limbs", POINTER(c_uint32)),
+        ("limb_count", c_size_t),
+        ("decisions", c_uint64),
+        ("components", c_uint64),
+        ("cache_hits", c_uint64),
+        ("cache_entries", c_size_t),
+        ("cache_bytes", c_size_t),
+        ("cache_refused", c_uint64),
+    ]
+
+
+_WangTilingVisitor = CFUNCTYPE(c_bool, c_void_p, POINTER(c_uint8), c_size_t)
+
+
 class _WangSolverOptions(Structure):
     _fields_ = [
         ("flags", c_uint32),
@@ -87,9 +228,44 @@ class _WangSolverOptions(Structure):
         ("failed_leaf_capacity", c_size_t),
         ("initial_domains", POINTER(c_uint32)),
         ("initial_domain_count", c_size_t),
+        ("deadline_ns", c_uint64),
+        ("node_limit", c_uint64),
+        ("cancel_flag", POINTER(c_int)),
+        ("root_fixpoint", POINTER(_WangRootFixpoint)),
+        ("value_order", c_int),
+        ("tie_break", c_int),
+        ("seed", c_uint64),
+        ("restart_schedule", c_int),
+        ("restart_base", c_uint64),
+        ("probe_budget_ns", c_uint64),
+        ("probe_depth", c_size_t),
+        ("checkpoint_path", c_char_p),
+        ("checkpoint_interval_ns", c_uint64),
     ]
 
 
+class CancelFlag:
+    """A flag that stops an in-flight native solve from another thread.
+
+    The native solver polls the underlying ``atomic_int`` between decisions
+    and returns ``UNKNOWN`` once it is set. One flag may bound many solves.
+    """
+
+    __slots__ = ("_value",)
+
+    def __init__(self) -> None:
+        self._value = c_int(0)
+
+    def set(self) -> None:
+        self._value.value = 1
+
+    def clear(self) -> None:
+        self._value.value = 0
+
+    def is_set(self) -> bool:
+        return self._value.value != 0
+
+
 class _WangSolveResult(Structure):
     _fields_ = [
         ("domains", POINTER(c_uint32)),
@@ -103,6 +279,109 @@ class _WangSolveResult(Structure):
     ]
 
 
+@dataclass(frozen=True, slots=True)
+class RootCacheStats:
+    """Root-cache counters of a :class:`SolverContext` since it was enabled.
+
+    ``entry_count`` and ``bytes`` describe the memory tier now.
+    """
+
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    disk_writes: int
+    disk_failures: int
+    entry_count: int
+    bytes: int
+
+
+class SolverContext:
+    """Native solver storage reused across solves of any region.
+
+    The context keeps the derived tileset tables and grows its work buffers
+    to the largest region solved, so repeated small solves skip most setup.
+    Results are identical to solves without a context. A lock serializes
+    concurrent use; give each thread its own context to solve in parallel.
+    :meth:`reset` drops the work buffers and root-cache entries and
+    :meth:`close` frees everything.
+    """
+
+    __slots__ = ("_handle", "_lock")
+
+    def __init__(self) -> None:
+        handle = _witness_library().wang_solver_context_create()
+        if not handle:
+            raise MemoryError("could not allocate a native solver context")
+        self._handle: int | None = handle
+        self._lock = Lock()
+
+    @property
+    def closed(self) -> bool:
+        return self._handle is None
+
+    def reset(self) -> None:
+        with self._lock:
+            _witness_library().wang_solver_context_reset(self._open_handle())
+
+    def enable_root_cache(
+        self,
+        limit_bytes: int,
+        directory: str | os.PathLike[str] | None = None,
+    ) -> None:
+        """Reuse the root fixpoint of each region this context solves again.
+
+        Fixpoints are keyed by the region's content and kept in at most
+        ``limit_bytes`` bytes, evicting the least recently used. With a
+        ``directory``, each computed fixpoint is also written there, and a
+        later solve in any process that shares it reads the file back.
+        ``limit_bytes`` of zero without a directory disables the cache.
+        Enabling drops every cached entry and counter.
+        """
+        if type(limit_bytes) is not int or limit_bytes < 0:
+            raise ValueError("limit_bytes must be a non-negative integer")
+        encoded = None if directory is None else os.fsencode(directory)
+        if encoded is not None and not os.path.isdir(encoded):
+            raise ValueError("directory must be an existing directory")
+        with self._lock:
+            if not _witness_library().wang_solver_context_enable_root_cache(
+                self._open_handle(),
+                limit_bytes,
+                encoded,
+            ):
+                raise MemoryError("could not enable the native root cache")
+
+    def root_cache_stats(self) -> RootCacheStats:
+        stats = _WangRootCacheStats()
+        with self._lock:
+            if not _witness_library().wang_solver_context_root_cache_stats(
+                self._open_handle(),
+                byref(stats),
+            ):
+                raise NativeWitnessError("native root-cache stats failed")
+        return RootCacheStats(
+            *(int(getattr(stats, name)) for name, _ in stats._fields_)
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            handle, self._handle = self._handle, None
+            if handle is not None:
+                _witness_library().wang_solver_context_destroy(handle)
+
+    def __enter__(self) -> "SolverContext":
+        self._open_handle()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _open_handle(self) -> int:
+        if self._handle is None:
+            raise ValueError("operation on a closed SolverContext")
+        return self._handle
+
+
 @cache
 def _witness_library() -> CDLL:
     lib = library()
@@ -116,6 +395,18 @@ def _witness_library() -> CDLL:
         POINTER(_WangSolveResult),
     ]
     lib.yang_zhang_solve_assignment_extension.restype = c_int
+    lib.yang_zhang_solve_assignment_batch.argtypes = [
+        POINTER(_Cm13Formula),
+        POINTER(_YangZhangReduction),
+        POINTER(c_bool),
+        c_size_t,
+        c_size_t,
+        c_int,
+        POINTER(c_int8),
+        POINTER(c_uint8),
+        c_size_t,
+    ]
+    lib.yang_zhang_solve_assignment_batch.restype = c_bool
     lib.yang_zhang_extract_assignment.argtypes = [
         POINTER(_Cm13Formula),
         POINTER(_YangZhangReduction),
@@ -143,8 +434,64 @@ def _witness_library() -> CDLL:
     lib.wang_solve_serial.restype = c_int
     lib.wang_solve_optimized.argtypes = solver_arguments
     lib.wang_solve_optimized.restype = c_int
+    lib.wang_solve_resume.argtypes = solver_arguments
+    lib.wang_solve_resume.restype = c_int
     lib.wang_solve_result_destroy.argtypes = [POINTER(_WangSolveResult)]
     lib.wang_solve_result_destroy.restype = None
+    lib.wang_solver_context_create.argtypes = []
+    lib.wang_solver_context_create.restype = c_void_p
+    lib.wang_solver_context_solve.argtypes = [
+        c_void_p,
+        POINTER(_Region),
+        POINTER(_WangSolverOptions),
+        c_int,
+        POINTER(_WangSolveResult),
+    ]
+    lib.wang_solver_context_solve.restype = c_int
+    lib.wang_solver_context_reset.argtypes = [c_void_p]
+    lib.wang_solver_context_reset.restype = None
+    lib.wang_solver_context_destroy.argtypes = [c_void_p]
+    lib.wang_solver_context_destroy.restype = None
+    lib.wang_solver_context_enable_root_cache.argtypes = [
+        c_void_p,
+        c_size_t,
+        c_char_p,
+    ]
+    lib.wang_solver_context_enable_root_cache.restype = c_bool
+    lib.wang_solver_context_root_cache_stats.argtypes = [
+        c_void_p,
+        POINTER(_WangRootCacheStats),
+    ]
+    lib.wang_solver_context_root_cache_stats.restype = c_bool
+    lib.wang_solve_parallel.argtypes = [
+        POINTER(_Region),
+        POINTER(_WangSolverOptions),
+        c_int,
+        c_size_t,
+        POINTER(_WangSolveResult),
+    ]
+    lib.wang_solve_parallel.restype = c_int
+    lib.wang_solver_context_split_cubes.argtypes = [
+        c_void_p,
+        POINTER(_Region),
+        POINTER(_WangSolverOptions),
+        c_size_t,
+        POINTER(_WangCubeSet),
+    ]
+    lib.wang_solver_context_split_cubes.restype = c_int
+    lib.wang_cube_set_destroy.argtypes = [POINTER(_WangCubeSet)]
+    lib.wang_cube_set_destroy.restype = None
+    lib.wang_count_tilings.argtypes = [
+        POINTER(_Region),
+        POINTER(_WangSolverOptions),
+        c_size_t,
+        _WangTilingVisitor,
+        c_void_p,
+        POINTER(_WangTilingCount),
+    ]
+    lib.wang_count_tilings.restype = c_int
+    lib.wang_tiling_count_destroy.argtypes = [POINTER(_WangTilingCount)]
+    lib.wang_tiling_count_destroy.restype = None
     return lib
 
 
@@ -166,25 +513,36 @@ def _native_assignment(
 def _native_tiling(
     region: Region,
     tiling: Sequence[int | None],
-) -> tuple[tuple[int | None, ...], object]:
+) -> tuple[TilingBuffer, object]:
+    if not isinstance(tiling, TilingBuffer):
+        try:
+            tiling = TilingBuffer.from_tiling(tuple(tiling))
+        except TypeError as error:
+            raise ValueError("tiling must be a finite dense sequence") from error
+    if len(tiling) != len(region.active):
+        raise ValueError("tiling length must match the region area")
+    if tiling.occupancy() != bytes(region.active):
+        raise ValueError("only active cells may contain an integer tile ID")
+    return tiling, (c_uint8 * len(tiling)).from_buffer_copy(tiling.data)
+
+
+def _native_domains(region: Region, domains: Sequence[int]) -> object:
     try:
-        copied = tuple(tiling)
+        copied = tuple(domains)
     except TypeError as error:
-        raise ValueError("tiling must be a finite dense sequence") from error
+        raise ValueError(
+            "initial_domains must be a finite integer sequence"
+        ) from error
     if len(copied) != len(region.active):
-        raise ValueError("tiling length must match the region area")
-
-    encoded: list[int] = []
-    for active, tile_id in zip(region.active, copied, strict=True):
-        if not active:
-            if tile_id is not None:
-                raise ValueError("inactive cells must contain None")
-            encoded.append(_TILE_NONE)
-            continue
-        if type(tile_id) is not int or not 0 <= tile_id < TILE_COUNT:
-            raise ValueError("active cells must contain a valid integer tile ID")
-        encoded.append(tile_id)
-    return copied, (c_uint8 * len(encoded))(*encoded)
+        raise ValueError("initial_domains length must match the region area")
+    if any(
+        type(mask) is not int or not 0 <= mask <= _WANG_DOMAIN_ALL
+        for mask in copied
+    ):
+        raise ValueError("initial_domains must contain tile bitmasks")
+    if any(mask and not active for mask, active in zip(copied, region.active)):
+        raise ValueError("inactive cells must have empty initial domains")
+    return (c_uint32 * len(copied))(*copied)
 
 
 def _solve_status(status_code: int, operation: str) -> _WangSolveStatus:
@@ -218,34 +576,45 @@ def _copy_sat_tiling(
     region: Region,
     result: _WangSolveResult,
     operation: str,
-) -> tuple[int | None, ...]:
+) -> TilingBuffer:
     cell_count = len(region.active)
     if int(result.domain_count) != cell_count or not result.domains:
         raise NativeWitnessError(
             f"{operation} returned malformed SAT domain storage"
         )
 
-    tiling: list[int | None] = []
-    for index, active in enumerate(region.active):
-        domain = int(result.domains[index])
-        if not active:
-            if domain != 0:
-                raise NativeWitnessError(
-                    f"{operation} assigned an inactive cell"
-                )
-            tiling.append(None)
-            continue
-        if domain == 0 or domain & (domain - 1):
-            raise NativeWitnessError(
-                f"{operation} returned a non-singleton active domain"
-            )
-        tile_id = domain.bit_length() - 1
-        if tile_id >= TILE_COUNT:
-            raise NativeWitnessError(
-                f"{operation} returned a tile outside the canonical tileset"
-            )
-        tiling.append(tile_id)
-    return tuple(tiling)
+    raw = string_at(result.domains, cell_count * _DOMAIN_BYTES)
+    planes = tuple(
+        raw[offset::_DOMAIN_BYTES].translate(_DOMAIN_PLANE_CODES[plane])
+        for plane, offset in enumerate(_DOMAIN_BYTE_OFFSETS)
+    )
+    assigned = 0
+    overlap = 0
+    codes = 0
+    for plane in planes:
+        nonzero = int.from_bytes(plane.translate(_NONZERO), "big")
+        overlap |= assigned & nonzero
+        assigned |= nonzero
+        codes |= int.from_bytes(plane, "big")
+
+    active = int.from_bytes(bytes(region.active), "big")
+    if assigned & ~active:
+        raise NativeWitnessError(f"{operation} assigned an inactive cell")
+    if (
+        assigned != active
+        or overlap
+        or any(_CODE_NOT_SINGLETON in plane for plane in planes)
+    ):
+        raise NativeWitnessError(
+            f"{operation} returned a non-singleton active domain"
+        )
+    if any(_CODE_OUTSIDE_TILESET in plane for plane in planes):
+        raise NativeWitnessError(
+            f"{operation} returned a tile outside the canonical tileset"
+        )
+    return TilingBuffer(
+        codes.to_bytes(cell_count, "big").translate(_CODE_TO_TILE)
+    )
 
 
 def _adapt_solve_result(
@@ -257,6 +626,8 @@ def _adapt_solve_result(
     status = _solve_status(status_code, operation)
     if status is _WangSolveStatus.UNSAT:
         return TilingSolveResult(TilingSolveStatus.UNSAT)
+    if status is _WangSolveStatus.UNKNOWN:
+        return TilingSolveResult(TilingSolveStatus.UNKNOWN)
     return TilingSolveResult(
         TilingSolveStatus.SAT,
         _copy_sat_tiling(region, result, operation),
@@ -299,22 +670,331 @@ def _solve_assignment_extension(
         lib.wang_solve_result_destroy(byref(result))
 
 
-def _solve_native(
+def _solve_assignment_batch(
+    native_formula: _Cm13Formula,
     native_reduction: _YangZhangReduction,
     region: Region,
+    assignments: Iterable[Sequence[bool]],
     *,
     optimized: bool,
+    tilings: bool,
+) -> tuple[tuple[TilingSolveStatus, ...], tuple[TilingBuffer | None, ...] | None]:
+    """Extend many assignments in one native call over one solver workspace.
+
+    Returns one status per row and, when ``tilings`` is true, one tiling per
+    row that is ``None`` unless the row is SAT.
+    """
+    packed: list[bool] = []
+    for assignment in assignments:
+        copied, _ = _native_assignment(native_formula, assignment)
+        packed.extend(copied)
+    assignment_count = int(native_formula.variable_count)
+    row_count = len(packed) // assignment_count
+    cell_count = len(region.active)
+    solver = (
+        _YangZhangExtensionSolver.OPTIMIZED
+        if optimized
+        else _YangZhangExtensionSolver.REFERENCE
+    )
+    native_statuses = (c_int8 * row_count)()
+    native_tilings = (c_uint8 * (row_count * cell_count))() if tilings else None
+    if not _witness_library().yang_zhang_solve_assignment_batch(
+        byref(native_formula),
+        byref(native_reduction),
+        (c_bool * len(packed))(*packed),
+        row_count,
+        assignment_count,
+        int(solver),
+        native_statuses,
+        native_tilings,
+        0 if native_tilings is None else len(native_tilings),
+    ):
+        raise NativeWitnessError("assignment batch failed in native code")
+
+    row_statuses = {
+        _solve_status(code, "assignment batch") for code in native_statuses
+    }
+    if _WangSolveStatus.UNKNOWN in row_statuses:
+        raise NativeWitnessError("assignment batch returned an UNKNOWN row")
+    statuses = tuple(
+        TilingSolveStatus.SAT
+        if code == _WangSolveStatus.SAT
+        else TilingSolveStatus.UNSAT
+        for code in native_statuses
+    )
+    if native_tilings is None:
+        return statuses, None
+
+    raw = bytes(native_tilings)
+    active = bytes(region.active)
+    copied_tilings: list[TilingBuffer | None] = []
+    for row, status in enumerate(statuses):
+        if status is not TilingSolveStatus.SAT:
+            copied_tilings.append(None)
+            continue
+        try:
+            tiling = TilingBuffer(raw[row * cell_count : (row + 1) * cell_count])
+        except ValueError as error:
+            raise NativeWitnessError(
+                "assignment batch returned a tile outside the canonical tileset"
+            ) from error
+        if tiling.occupancy() != active:
+            raise NativeWitnessError(
+                "assignment batch returned a tiling with the wrong occupancy"
+            )
+        copied_tilings.append(tiling)
+    return statuses, tuple(copied_tilings)
+
+
+def _duration_ns(seconds: float, name: str) -> int:
+    """Convert a positive finite number of seconds to nanoseconds.
+
+    Infinity and NaN are rejected like zero, and a sub-nanosecond duration
+    rounds up to one nanosecond.
+    """
+    if not (seconds > 0 and math.isfinite(seconds)):
+        raise ValueError(f"{name} must be a positive number of seconds")
+    return min(max(1, int(seconds * 1e9)), _MAX_DURATION_NS)
+
+
+def _search_bounds(
+    timeout: float | None,
+    node_limit: int | None,
+    cancel: CancelFlag | None,
+) -> _WangSolverOptions | None:
+    if timeout is None and node_limit is None and cancel is None:
+        return None
+    timeout_ns = None if timeout is None else _duration_ns(timeout, "timeout")
+    if node_limit is not None and (
+        type(node_limit) is not int or node_limit <= 0
+    ):
+        raise ValueError("node_limit must be a positive integer")
+    return _WangSolverOptions(
+        deadline_ns=(
+            0 if timeout_ns is None else monotonic_ns() + timeout_ns
+        ),
+        node_limit=0 if node_limit is None else node_limit,
+        cancel_flag=None if cancel is None else pointer(cancel._value),
+    )
+
+
+# Fields of _SolveOptions that the reference engine accepts too.
+_ENGINE_NEUTRAL_OPTIONS: Final = frozenset(("optimized", "seed"))
+# Boolean fields of _SolveOptions that each set one solve flag.
+_SOLVE_OPTION_FLAGS: Final = (
+    ("decompose", _WANG_SOLVE_DECOMPOSE_COMPONENTS),
+    ("learn", _WANG_SOLVE_LEARN_NOGOODS),
+    ("bitslice", _WANG_SOLVE_BITSLICE_PROPAGATION),
+    ("frontier", _WANG_SOLVE_FRONTIER_WHEN_NARROW),
+    ("probe", _WANG_SOLVE_PROBE_SINGLETONS),
+    ("weighted_degree", _WANG_SOLVE_WEIGHTED_DEGREE),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class _SolveOptions:
+    """The engine and search mechanisms of one native solve.
+
+    Creation validates every field, and every field but ``optimized`` and
+    ``seed`` requires ``optimized``. ``decompose`` solves the independent
+    components of the propagated root separately. ``learn`` backjumps over
+    irrelevant decisions while recording nogoods. ``restarts`` (``"luby"``
+    or ``"geometric"``) restarts the search on a growing failed-leaf budget,
+    reseeding each run from ``seed``. ``bitslice`` propagates the root over
+    tile bitplanes, with the same fixpoint as the cell queue. ``frontier``
+    decides a region at most ``WANG_FRONTIER_MAX_WIDTH`` cells across by a
+    row-profile sweep. ``least_constraining`` tries first the tile that
+    leaves the neighbors the most tiles. ``probe`` removes, before the
+    search, every tile whose assignment propagation refutes, within
+    ``probe_budget`` seconds when given. ``weighted_degree`` branches on the
+    cell with the smallest domain per unit of conflict weight on its arcs.
+    ``checkpoint`` saves the search to that path every
+    ``checkpoint_interval`` seconds, or at every bound poll without one, and
+    when a bound stops it.
+    """
+
+    optimized: bool = False
+    decompose: bool = False
+    learn: bool = False
+    restarts: str | None = None
+    seed: int = 0
+    bitslice: bool = False
+    frontier: bool = False
+    least_constraining: bool = False
+    probe: bool = False
+    probe_budget: float | None = None
+    weighted_degree: bool = False
+    checkpoint: str | os.PathLike[str] | None = None
+    checkpoint_interval: float | None = None
+
+    def __post_init__(self) -> None:
+        if not self.optimized:
+            for field in fields(self):
+                if (
+                    field.name not in _ENGINE_NEUTRAL_OPTIONS
+                    and getattr(self, field.name) != field.default
+                ):
+                    raise ValueError(
+                        f"{field.name} requires the optimized solver"
+                    )
+        if self.learn and self.decompose:
+            raise ValueError("learn cannot be combined with decompose")
+        if self.restarts is not None:
+            if self.restarts not in ("luby", "geometric"):
+                raise ValueError("restarts must be 'luby' or 'geometric'")
+            if self.decompose:
+                raise ValueError("restarts cannot be combined with decompose")
+        if type(self.seed) is not int or not 0 <= self.seed < 1 << 64:
+            raise ValueError("seed must be an unsigned 64-bit integer")
+        if self.probe_budget is not None:
+            if not self.probe:
+                raise ValueError("probe_budget requires probe")
+            _duration_ns(self.probe_budget, "probe_budget")
+        if self.checkpoint is not None and (self.decompose or self.learn):
+            raise ValueError(
+                "checkpoint cannot be combined with decompose or learn"
+            )
+        if self.checkpoint_interval is not None:
+            if self.checkpoint is None:
+                raise ValueError("checkpoint_interval requires checkpoint")
+            _duration_ns(self.checkpoint_interval, "checkpoint_interval")
+
+    @property
+    def is_default(self) -> bool:
+        """Whether these options select no mechanism beyond the engine."""
+        return self == _SolveOptions(optimized=self.optimized)
+
+    def apply(self, options: _WangSolverOptions) -> None:
+        """Set the flags and fields these options select in ``options``."""
+        for name, flag in _SOLVE_OPTION_FLAGS:
+            if getattr(self, name):
+                options.flags |= flag
+        if self.least_constraining:
+            options.value_order = int(_WangValueOrder.LEAST_CONSTRAINING)
+        if self.probe_budget is not None:
+            options.probe_budget_ns = _duration_ns(
+                self.probe_budget,
+                "probe_budget",
+            )
+        if self.checkpoint is not None:
+            options.flags |= _WANG_SOLVE_CHECKPOINT
+            options.checkpoint_path = os.fsencode(self.checkpoint)
+            if self.checkpoint_interval is not None:
+                options.checkpoint_interval_ns = _duration_ns(
+                    self.checkpoint_interval,
+                    "checkpoint_interval",
+                )
+        if self.restarts is not None:
+            options.restart_schedule = int(
+                _WangRestartSchedule[self.restarts.upper()]
+            )
+        options.seed = self.seed
+
+
+def _solve_native(
+    native_reduction: _YangZhangReduction,
+    region: Region,
+    solve_options: _SolveOptions,
+    *,
+    timeout: float | None = None,
+    node_limit: int | None = None,
+    cancel: CancelFlag | None = None,
+    context: SolverContext | None = None,
+    threads: int | None = None,
+    resume: bool = False,
+    initial_domains: Sequence[int] | None = None,
+    metrics: _WangSolverMetrics | None = None,
 ) -> TilingSolveResult:
-    """Run one unconstrained native solve and copy its dense witness."""
+    """Run one unconstrained native solve and copy its dense witness.
+
+    ``solve_options`` select the engine and its search mechanisms.
+    ``timeout`` (seconds), ``node_limit`` (DFS nodes) and ``cancel`` bound
+    the search; a bound that stops it first yields ``UNKNOWN``. A
+    ``context`` supplies reusable native storage for the solve. ``threads``
+    splits the search over that many OpenMP threads instead; the node limit
+    then bounds all threads together. ``resume`` continues the search saved
+    at ``solve_options.checkpoint`` instead of starting anew, and requires
+    the options of the solve that saved it. ``initial_domains`` restricts
+    every cell to a dense tile bitmask, such as a cube from
+    :func:`_split_cubes`; inactive cells take zero. ``metrics``, when given,
+    receives the native counters of the solve.
+    """
+    if threads is not None:
+        if type(threads) is not int or threads <= 0:
+            raise ValueError("threads must be a positive integer")
+        if context is not None:
+            raise ValueError("threads cannot be combined with a context")
+    if resume:
+        if solve_options.checkpoint is None:
+            raise ValueError("resume requires checkpoint")
+        if threads is not None or context is not None:
+            raise ValueError(
+                "resume cannot be combined with threads or a context"
+            )
+    native_domains = (
+        None
+        if initial_domains is None
+        else _native_domains(region, initial_domains)
+    )
+    options = _search_bounds(timeout, node_limit, cancel)
+    if (
+        not solve_options.is_default
+        or native_domains is not None
+        or metrics is not None
+    ):
+        if options is None:
+            options = _WangSolverOptions()
+        solve_options.apply(options)
+        if native_domains is not None:
+            options.initial_domains = native_domains
+            options.initial_domain_count = len(region.active)
+        if metrics is not None:
+            options.flags |= _WANG_SOLVE_COLLECT_METRICS
+    native_options = None if options is None else byref(options)
+    engine = int(
+        _WangSolverEngine.OPTIMIZED
+        if solve_options.optimized
+        else _WangSolverEngine.REFERENCE
+    )
     lib = _witness_library()
-    solve = lib.wang_solve_optimized if optimized else lib.wang_solve_serial
     result = _WangSolveResult()
     try:
-        status_code = solve(
-            byref(native_reduction.region),
-            None,
-            byref(result),
-        )
+        if threads is not None:
+            status_code = lib.wang_solve_parallel(
+                byref(native_reduction.region),
+                native_options,
+                engine,
+                threads,
+                byref(result),
+            )
+        elif resume:
+            status_code = lib.wang_solve_resume(
+                byref(native_reduction.region),
+                native_options,
+                byref(result),
+            )
+        elif context is None:
+            solve = (
+                lib.wang_solve_optimized
+                if solve_options.optimized
+                else lib.wang_solve_serial
+            )
+            status_code = solve(
+                byref(native_reduction.region),
+                native_options,
+                byref(result),
+            )
+        else:
+            with context._lock:
+                status_code = lib.wang_solver_context_solve(
+                    context._open_handle(),
+                    byref(native_reduction.region),
+                    native_options,
+                    engine,
+                    byref(result),
+                )
+        if metrics is not None:
+            pointer(metrics)[0] = result.metrics
         return _adapt_solve_result(
             status_code,
             result,
@@ -325,6 +1005,128 @@ def _solve_native(
         lib.wang_solve_result_destroy(byref(result))
 
 
+def _split_cubes(
+    native_reduction: _YangZhangReduction,
+    cube_count: int,
+    *,
+    context: SolverContext | None = None,
+) -> tuple[tuple[int, ...], ...]:
+    """Split the unpinned reduction into at least ``cube_count`` cubes.
+
+    Each cube is a dense tuple of tile bitmasks for ``initial_domains``.
+    The cubes are disjoint and hold every tiling between them, so the
+    reduction is SAT exactly when some cube is; an empty tuple means
+    propagation alone refuted it. Fewer cubes come back when every cell is
+    resolved first. ``context`` supplies the native propagation storage.
+    """
+    if type(cube_count) is not int or cube_count <= 0:
+        raise ValueError("cube_count must be a positive integer")
+    lib = _witness_library()
+    cubes = _WangCubeSet()
+    try:
+        if context is None:
+            with SolverContext() as owned:
+                status_code = lib.wang_solver_context_split_cubes(
+                    owned._open_handle(),
+                    byref(native_reduction.region),
+                    None,
+                    cube_count,
+                    byref(cubes),
+                )
+        else:
+            with context._lock:
+                status_code = lib.wang_solver_context_split_cubes(
+                    context._open_handle(),
+                    byref(native_reduction.region),
+                    None,
+                    cube_count,
+                    byref(cubes),
+                )
+        if (
+            _solve_status(status_code, "native cube split")
+            is _WangSolveStatus.UNSAT
+        ):
+            return ()
+        count = int(cubes.cube_count)
+        width = int(cubes.domain_count)
+        if count == 0 or not cubes.domains:
+            raise NativeWitnessError(
+                "native cube split returned malformed cube storage"
+            )
+        masks = cubes.domains[: count * width]
+        return tuple(
+            tuple(masks[start : start + width])
+            for start in range(0, count * width, width)
+        )
+    finally:
+        lib.wang_cube_set_destroy(byref(cubes))
+
+
+def _count_tilings(
+    native_reduction: _YangZhangReduction,
+    *,
+    visit: Callable[[TilingBuffer], bool | None] | None = None,
+    stream: BinaryIO | None = None,
+    cache_bytes: int = _DEFAULT_COUNT_CACHE_BYTES,
+    timeout: float | None = None,
+    node_limit: int | None = None,
+    cancel: CancelFlag | None = None,
+) -> int | None:
+    """Count the tilings of the unpinned reduction exactly.
+
+    Independent components of the propagated domains are counted
+    separately and multiplied, and each component's count is cached under
+    its shape and domains in at most ``cache_bytes`` bytes; zero disables
+    the cache. With ``visit`` or ``stream``, every tiling is enumerated
+    instead: ``visit`` receives each as a :class:`TilingBuffer` and stops
+    the enumeration by returning ``False``, and ``stream`` gets each
+    tiling's bytes, one byte per cell, back to back. An exception raised
+    by either stops the enumeration and propagates. ``timeout`` (seconds),
+    ``node_limit`` (decisions) and ``cancel`` bound the count. Returns
+    ``None`` when a bound or ``visit`` stops it.
+    """
+    if type(cache_bytes) is not int or cache_bytes < 0:
+        raise ValueError("cache_bytes must be a non-negative integer")
+    options = _search_bounds(timeout, node_limit, cancel)
+    errors: list[BaseException] = []
+
+    def forward(_context: int | None, tiles: object, tile_count: int) -> bool:
+        try:
+            tiling = TilingBuffer(string_at(tiles, tile_count))
+            if stream is not None:
+                stream.write(tiling.data)
+            return visit is None or visit(tiling) is not False
+        except BaseException as error:
+            errors.append(error)
+            return False
+
+    visitor = (
+        _WangTilingVisitor()
+        if visit is None and stream is None
+        else _WangTilingVisitor(forward)
+    )
+    lib = _witness_library()
+    count = _WangTilingCount()
+    try:
+        status_code = lib.wang_count_tilings(
+            byref(native_reduction.region),
+            None if options is None else byref(options),
+            cache_bytes,
+            visitor,
+            None,
+            byref(count),
+        )
+        if errors:
+            raise errors[0]
+        status = _solve_status(status_code, "native tiling count")
+        if status is _WangSolveStatus.UNKNOWN:
+            return None
+        limbs = count.limbs[: int(count.limb_count)] if count.limbs else []
+        return sum(limb << (32 * index) for index, limb in enumerate(limbs))
+    finally:
+        lib.wang_tiling_count_destroy(byref(count))
+
+
 def _extract_assignment(
     native_formula: _Cm13Formula,
     native_reduction: _YangZhangReduction,
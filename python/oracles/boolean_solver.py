@@ -8,8 +8,6 @@ not belong here.
 from dataclasses import dataclass
 from enum import Enum
 
-from z3 import Bool, If, Solver, Sum, is_true, sat, unsat
-
 from model.formula import Formula
 
 
@@ -32,6 +30,9 @@ class BooleanSolveResult:
 
 def solve_boolean(formula: Formula) -> BooleanSolveResult:
     """Solve ``formula`` while counting all three positions of each clause."""
+    # Z3 costs tens of milliseconds to import, so load it on first use only.
+    from z3 import Bool, If, Solver, Sum, is_true, sat, unsat
+
     variables = [Bool(f"x_{index}") for index in range(formula.variable_count)]
 
     solver = Solver()
@@ -4,6 +4,7 @@ from collections.abc import Sequence
 
 from model.region import Region
 from model.tileset import COLOR_NONE, E, N, S, W, Tileset
+from model.tiling import TilingBuffer
 
 
 def is_valid_tiling(
@@ -11,7 +12,19 @@ def is_valid_tiling(
     tileset: Tileset,
     tiling: Sequence[int | None],
 ) -> bool:
-    """Check dense storage, boundaries, and adjacency without using Z3."""
+    """Check dense storage, boundaries, and adjacency without using Z3.
+
+    A :class:`TilingBuffer` is checked for occupancy in one bulk comparison
+    and then decoded once instead of being indexed cell by cell.
+    """
+    if isinstance(tiling, TilingBuffer):
+        if (
+            len(tiling) != len(region.active)
+            or tiling.occupancy() != bytes(region.active)
+        ):
+            return False
+        tiling = tiling.to_tuple()
+
     if len(tiling) != len(region.active):
         return False
 
@@ -2,10 +2,10 @@
 
 from dataclasses import dataclass
 from enum import Enum
-
-from z3 import ArithRef, Implies, Int, Or, Solver, sat, unsat
+from typing import TYPE_CHECKING
 
 from model.region import Region
+from model.tiling import TilingBuffer
 from model.tileset import (
     COLOR_COUNT,
     COLOR_NONE,
@@ -15,6 +15,9 @@ from model.tileset import (
     Tileset,
 )
 
+if TYPE_CHECKING:
+    from z3 import ArithRef
+
 
 class TilingSolveStatus(Enum):
     SAT = "sat"
@@ -25,7 +28,7 @@ class TilingSolveStatus(Enum):
 @dataclass(frozen=True, slots=True)
 class TilingSolveResult:
     status: TilingSolveStatus
-    tiling: tuple[int | None, ...] | None = None
+    tiling: tuple[int | None, ...] | TilingBuffer | None = None
 
     def __post_init__(self) -> None:
         has_tiling = self.tiling is not None
@@ -57,6 +60,7 @@ def solve_tiling(region: Region, tileset: Tileset) -> TilingSolveResult:
     and UNKNOWN return no tiling.
     """
     _validate_tileset(tileset)
+    from z3 import Implies, Int, Or, Solver, sat, unsat
 
     solver = Solver()
     variables: list[ArithRef | None] = [
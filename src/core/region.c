@@ -168,6 +168,31 @@ bool region_validate(const Region *region)
     return true;
 }
 
+uint64_t region_content_hash(const Region *region)
+{
+    uint64_t hash = UINT64_C(14695981039346656037);
+    const uint32_t dimensions[2] = {
+        (uint32_t)region->width,
+        (uint32_t)region->height,
+    };
+    for (size_t i = 0; i < 2; ++i) {
+        for (unsigned byte = 0; byte < 4; ++byte) {
+            hash ^= (dimensions[i] >> (8u * byte)) & UINT32_C(0xff);
+            hash *= UINT64_C(1099511628211);
+        }
+    }
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        const RegionCell *cell = &region->cells[i];
+        hash ^= cell->active ? 1u : 0u;
+        hash *= UINT64_C(1099511628211);
+        for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+            hash ^= cell->boundary[dir];
+            hash *= UINT64_C(1099511628211);
+        }
+    }
+    return hash;
+}
+
 
 /* =========================
  * Geometry
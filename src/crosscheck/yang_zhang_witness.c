@@ -2,6 +2,8 @@
 
 #include "wang/verify.h"
 
+#include "../solver/solver_internal.h"
+
 #include <stdint.h>
 #include <stdlib.h>
 #include <string.h>
@@ -63,37 +65,34 @@ static bool assignment_storage_is_valid(
         assignment_count == (size_t)formula->variable_count;
 }
 
-WangSolveStatus yang_zhang_solve_assignment_extension(
-    const Cm13Formula *formula,
-    const YangZhangReduction *reduction,
-    const bool *assignment,
-    size_t assignment_count,
-    YangZhangExtensionSolver solver,
-    WangSolveResult *out_result
-)
+static bool solver_is_valid(YangZhangExtensionSolver solver)
 {
-    if (!witness_layout_is_valid(formula, reduction) ||
-        !assignment_storage_is_valid(
-            formula,
-            assignment,
-            assignment_count
-        ) ||
-        (solver != YANG_ZHANG_EXTENSION_REFERENCE &&
-         solver != YANG_ZHANG_EXTENSION_OPTIMIZED) ||
-        out_result == NULL) {
-        return WANG_SOLVE_ERROR;
-    }
+    return solver == YANG_ZHANG_EXTENSION_REFERENCE ||
+        solver == YANG_ZHANG_EXTENSION_OPTIMIZED;
+}
 
-    const Region *region = &reduction->region;
+/* Dense root domains with every active cell unrestricted. */
+static uint32_t *unpinned_domains(const Region *region)
+{
     uint32_t *domains = malloc(region->cell_count * sizeof(*domains));
     if (domains == NULL) {
-        return WANG_SOLVE_ERROR;
+        return NULL;
     }
 
     for (size_t index = 0; index < region->cell_count; ++index) {
         domains[index] = region->cells[index].active ? WANG_DOMAIN_ALL : 0;
     }
+    return domains;
+}
 
+/* Overwrite only the three variable-gadget cells of every variable. */
+static void pin_assignment(
+    const Cm13Formula *formula,
+    const Region *region,
+    const bool *assignment,
+    uint32_t *domains
+)
+{
     static const TileId false_tiles[3] = {
         TILE_V0_TOP,
         TILE_V0_MID,
@@ -111,6 +110,44 @@ WangSolveStatus yang_zhang_solve_assignment_extension(
             domains[index] = UINT32_C(1) << tile;
         }
     }
+}
+
+static TileId singleton_tile(uint32_t domain)
+{
+    TileId tile = 0;
+    while ((domain & UINT32_C(1)) == 0) {
+        domain >>= 1;
+        ++tile;
+    }
+    return tile;
+}
+
+WangSolveStatus yang_zhang_solve_assignment_extension(
+    const Cm13Formula *formula,
+    const YangZhangReduction *reduction,
+    const bool *assignment,
+    size_t assignment_count,
+    YangZhangExtensionSolver solver,
+    WangSolveResult *out_result
+)
+{
+    if (!witness_layout_is_valid(formula, reduction) ||
+        !assignment_storage_is_valid(
+            formula,
+            assignment,
+            assignment_count
+        ) ||
+        !solver_is_valid(solver) ||
+        out_result == NULL) {
+        return WANG_SOLVE_ERROR;
+    }
+
+    const Region *region = &reduction->region;
+    uint32_t *domains = unpinned_domains(region);
+    if (domains == NULL) {
+        return WANG_SOLVE_ERROR;
+    }
+    pin_assignment(formula, region, assignment, domains);
 
     const WangSolverOptions options = {
         .initial_domains = domains,
@@ -125,6 +162,106 @@ WangSolveStatus yang_zhang_solve_assignment_extension(
     return status;
 }
 
+bool yang_zhang_solve_assignment_batch(
+    const Cm13Formula *formula,
+    const YangZhangReduction *reduction,
+    const bool *assignments,
+    size_t row_count,
+    size_t assignment_count,
+    YangZhangExtensionSolver solver,
+    int8_t *out_statuses,
+    TileId *out_tilings,
+    size_t tiling_count
+)
+{
+    if (!witness_layout_is_valid(formula, reduction) ||
+        assignment_count != (size_t)formula->variable_count ||
+        !solver_is_valid(solver) ||
+        (row_count != 0 &&
+         (assignments == NULL || out_statuses == NULL)) ||
+        row_count > SIZE_MAX / assignment_count) {
+        return false;
+    }
+
+    const Region *region = &reduction->region;
+    size_t expected_tiling_count = 0;
+    if (out_tilings != NULL) {
+        if (row_count > SIZE_MAX / region->cell_count) {
+            return false;
+        }
+        expected_tiling_count = row_count * region->cell_count;
+    }
+    if (tiling_count != expected_tiling_count) {
+        return false;
+    }
+    if (row_count == 0) {
+        return true;
+    }
+
+    uint32_t *domains = unpinned_domains(region);
+    WangSolverContext *context = wang_solver_context_create();
+    WangRootFixpoint root_fixpoint = {0};
+    if (domains == NULL || context == NULL ||
+        !wang_root_fixpoint_compute(region, &root_fixpoint)) {
+        wang_solver_context_destroy(context);
+        free(domains);
+        return false;
+    }
+
+    /*
+     * Every row starts from the shared unpinned root fixpoint. Only statuses
+     * and witnesses are read, so a contradictory row keeps its warm
+     * diagnostics.
+     */
+    const WangSolverOptions options = {
+        .initial_domains = domains,
+        .initial_domain_count = region->cell_count,
+        .root_fixpoint = &root_fixpoint,
+    };
+    bool ok = true;
+    for (size_t row = 0; row < row_count && ok; ++row) {
+        pin_assignment(
+            formula,
+            region,
+            assignments + row * assignment_count,
+            domains
+        );
+
+        WangSolveResult result = {0};
+        const WangSolveStatus status = solver_context_solve_status(
+            context,
+            region,
+            &options,
+            solver == YANG_ZHANG_EXTENSION_OPTIMIZED
+                ? WANG_SOLVER_OPTIMIZED
+                : WANG_SOLVER_REFERENCE,
+            NULL,
+            &result
+        );
+        if (status != WANG_SOLVE_SAT && status != WANG_SOLVE_UNSAT) {
+            ok = false;
+        } else {
+            out_statuses[row] = (int8_t)status;
+        }
+
+        if (ok && out_tilings != NULL) {
+            TileId *tiling = out_tilings + row * region->cell_count;
+            for (size_t index = 0; index < region->cell_count; ++index) {
+                tiling[index] =
+                    status == WANG_SOLVE_SAT && region->cells[index].active
+                        ? singleton_tile(result.domains[index])
+                        : TILE_NONE;
+            }
+        }
+        wang_solve_result_destroy(&result);
+    }
+
+    wang_root_fixpoint_destroy(&root_fixpoint);
+    wang_solver_context_destroy(context);
+    free(domains);
+    return ok;
+}
+
 YangZhangWitnessStatus yang_zhang_extract_assignment(
     const Cm13Formula *formula,
     const YangZhangReduction *reduction,
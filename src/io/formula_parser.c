@@ -3,6 +3,14 @@
 #include <stdint.h>
 #include <stdlib.h>
 
+/* Exactly one of file and buffer is the byte source. */
+typedef struct {
+    FILE *file;
+    const char *buffer;
+    size_t size;
+    size_t offset;
+} Cm13Input;
+
 typedef struct {
     char *data;
     size_t length;
@@ -20,13 +28,24 @@ static void cm13_set_error(Cm13ParseLocation *location, size_t line, size_t colu
     }
 }
 
-static int cm13_read_line(FILE *input, Cm13LineReader *reader)
+static int cm13_next_character(Cm13Input *input)
+{
+    if (input->file != NULL) {
+        return fgetc(input->file);
+    }
+    if (input->offset == input->size) {
+        return EOF;
+    }
+    return (unsigned char)input->buffer[input->offset++];
+}
+
+static int cm13_read_line(Cm13Input *input, Cm13LineReader *reader)
 {
     int character;
 
     reader->length = 0;
     reader->line = reader->next_line;
-    while ((character = fgetc(input)) != EOF) {
+    while ((character = cm13_next_character(input)) != EOF) {
         if (character == '\n') {
             if (reader->length != 0 && reader->data[reader->length - 1] == '\r') {
                 reader->length--;
@@ -51,7 +70,7 @@ static int cm13_read_line(FILE *input, Cm13LineReader *reader)
         reader->data[reader->length++] = (char)character;
         reader->next_column++;
     }
-    if (ferror(input)) {
+    if (input->file != NULL && ferror(input->file)) {
         return -2;
     }
     return reader->length == 0 ? 0 : 1;
@@ -138,8 +157,14 @@ static int cm13_allocation_overflow(size_t count, size_t element_size)
     return count != 0 && element_size > SIZE_MAX / count;
 }
 
-Cm13ParseStatus cm13_formula_parse(FILE *input, Cm13Formula *out_formula,
-                                    Cm13ParseLocation *out_error_location)
+static int cm13_formula_is_empty(const Cm13Formula *formula)
+{
+    return formula->variable_count == 0 && formula->clauses == NULL &&
+        formula->clause_count == 0;
+}
+
+static Cm13ParseStatus cm13_parse_input(Cm13Input *input, Cm13Formula *out_formula,
+                                        Cm13ParseLocation *out_error_location)
 {
     Cm13LineReader reader = { .line = 1, .next_line = 1, .next_column = 1 };
     Cm13Clause *clauses = NULL;
@@ -151,10 +176,6 @@ Cm13ParseStatus cm13_formula_parse(FILE *input, Cm13Formula *out_formula,
     int read_result;
 
     cm13_set_error(out_error_location, 0, 0);
-    if (input == NULL || out_formula == NULL || out_formula->variable_count != 0 ||
-        out_formula->clauses != NULL || out_formula->clause_count != 0) {
-        return CM13_PARSE_INVALID_ARGUMENT;
-    }
 
     while ((read_result = cm13_read_line(input, &reader)) == 1) {
         size_t position = 0;
@@ -308,6 +329,71 @@ Cm13ParseStatus cm13_formula_parse(FILE *input, Cm13Formula *out_formula,
     return CM13_PARSE_OK;
 }
 
+Cm13ParseStatus cm13_formula_parse(FILE *input, Cm13Formula *out_formula,
+                                    Cm13ParseLocation *out_error_location)
+{
+    Cm13Input source = { .file = input };
+
+    cm13_set_error(out_error_location, 0, 0);
+    if (input == NULL || out_formula == NULL || !cm13_formula_is_empty(out_formula)) {
+        return CM13_PARSE_INVALID_ARGUMENT;
+    }
+    return cm13_parse_input(&source, out_formula, out_error_location);
+}
+
+Cm13ParseStatus cm13_formula_parse_buffer(const char *data, size_t size,
+                                           Cm13Formula *out_formula,
+                                           Cm13ParseLocation *out_error_location)
+{
+    Cm13Input source = { .buffer = data, .size = size };
+
+    cm13_set_error(out_error_location, 0, 0);
+    if (data == NULL || out_formula == NULL || !cm13_formula_is_empty(out_formula)) {
+        return CM13_PARSE_INVALID_ARGUMENT;
+    }
+    return cm13_parse_input(&source, out_formula, out_error_location);
+}
+
+Cm13ParseStatus cm13_formula_from_packed(uint32_t variable_count,
+                                          const uint32_t *variable_indices,
+                                          size_t index_count,
+                                          Cm13Formula *out_formula)
+{
+    Cm13Clause *clauses;
+    uint32_t *occurrences;
+    const size_t clause_count = (size_t)variable_count;
+
+    if (variable_indices == NULL || out_formula == NULL ||
+        !cm13_formula_is_empty(out_formula)) {
+        return CM13_PARSE_INVALID_ARGUMENT;
+    }
+    if (variable_count == 0 || index_count / 3 != clause_count || index_count % 3 != 0 ||
+        cm13_allocation_overflow(clause_count, sizeof(*clauses)) ||
+        cm13_allocation_overflow(clause_count, sizeof(*occurrences))) {
+        return CM13_PARSE_DOMAIN_ERROR;
+    }
+
+    clauses = malloc(clause_count * sizeof(*clauses));
+    occurrences = calloc(clause_count, sizeof(*occurrences));
+    if (clauses == NULL || occurrences == NULL) {
+        return cm13_failure(out_formula, clauses, occurrences, CM13_PARSE_OUT_OF_MEMORY);
+    }
+    for (size_t index = 0; index < index_count; index++) {
+        const uint32_t variable = variable_indices[index];
+        if (variable >= variable_count || occurrences[variable] == 3) {
+            return cm13_failure(out_formula, clauses, occurrences, CM13_PARSE_DOMAIN_ERROR);
+        }
+        occurrences[variable]++;
+        clauses[index / 3].variable_index[index % 3] = variable;
+    }
+    /* Exactly 3 * variable_count indices, none seen more than three times. */
+    free(occurrences);
+    out_formula->variable_count = variable_count;
+    out_formula->clauses = clauses;
+    out_formula->clause_count = clause_count;
+    return CM13_PARSE_OK;
+}
+
 Cm13ParseStatus cm13_formula_load_path(const char *path, Cm13Formula *out_formula,
                                         Cm13ParseLocation *out_error_location)
 {
@@ -315,8 +401,7 @@ Cm13ParseStatus cm13_formula_load_path(const char *path, Cm13Formula *out_formul
     Cm13ParseStatus status;
 
     cm13_set_error(out_error_location, 0, 0);
-    if (path == NULL || out_formula == NULL || out_formula->variable_count != 0 ||
-        out_formula->clauses != NULL || out_formula->clause_count != 0) {
+    if (path == NULL || out_formula == NULL || !cm13_formula_is_empty(out_formula)) {
         return CM13_PARSE_INVALID_ARGUMENT;
     }
 
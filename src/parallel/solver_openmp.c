@@ -1,2 +1,1080 @@
-/* Reserved for the future OpenMP solver; keeps the C translation unit valid. */
-enum { WANG_OPENMP_PLACEHOLDER = 0 };
+#include "wang/solver_parallel.h"
+
+#include "wang/verify.h"
+
+#include "../solver/frontier_dp.h"
+#include "../solver/solver_internal.h"
+
+#include <stdatomic.h>
+#include <stdbool.h>
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+/* Subtree tasks per thread; spare tasks even out uneven subtrees. */
+#define PARALLEL_TASKS_PER_THREAD 8u
+
+typedef struct {
+    size_t cell;
+    uint32_t tile_bit;
+} TaskPin;
+
+typedef struct {
+    /* Split decisions between the root and this subtree, in order. */
+    TaskPin *pins;
+    size_t depth;
+    /* MRV cell of the propagated subtree and its tiles; SIZE_MAX if none. */
+    size_t split_cell;
+    uint32_t split_tiles;
+} SubtreeTask;
+
+typedef struct {
+    SubtreeTask *items;
+    size_t count;
+    size_t capacity;
+} TaskList;
+
+typedef struct {
+    WangSolverContext *context;
+    /* Pinned initial domains of the current task. */
+    uint32_t *initial;
+    WangSolverMetrics metrics;
+    /* Best UNSAT or UNKNOWN leaf this thread has seen, by task order. */
+    WangSolveResult best;
+    size_t best_task;
+    bool has_best;
+    bool unknown;
+    bool error;
+} ParallelWorker;
+
+static void task_list_destroy(TaskList *tasks)
+{
+    for (size_t i = 0; i < tasks->count; ++i) {
+        free(tasks->items[i].pins);
+    }
+    free(tasks->items);
+    *tasks = (TaskList){0};
+}
+
+static bool task_list_push(TaskList *tasks, SubtreeTask task)
+{
+    if (tasks->count == tasks->capacity) {
+        const size_t capacity = tasks->capacity == 0
+            ? 16
+            : tasks->capacity * 2;
+        if (capacity > SIZE_MAX / sizeof(*tasks->items)) {
+            return false;
+        }
+        SubtreeTask *items = realloc(
+            tasks->items,
+            capacity * sizeof(*tasks->items)
+        );
+        if (items == NULL) {
+            return false;
+        }
+        tasks->items = items;
+        tasks->capacity = capacity;
+    }
+    tasks->items[tasks->count++] = task;
+    return true;
+}
+
+static unsigned domain_size(uint32_t domain)
+{
+    unsigned count = 0;
+    while (domain != 0) {
+        domain &= domain - UINT32_C(1);
+        ++count;
+    }
+    return count;
+}
+
+/* The serial MRV rule: first smallest open domain, stopping at two. */
+static size_t select_split_cell(const Region *region, const uint32_t *domains)
+{
+    size_t selected = SIZE_MAX;
+    unsigned best_size = TILE_COUNT + 1u;
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        if (!region->cells[i].active) {
+            continue;
+        }
+        const unsigned size = domain_size(domains[i]);
+        if (size > 1 && size < best_size) {
+            selected = i;
+            best_size = size;
+            if (size == 2) {
+                break;
+            }
+        }
+    }
+    return selected;
+}
+
+/* Write base narrowed by the pins of task to domains. */
+static void apply_pins(
+    uint32_t *domains,
+    const uint32_t *base,
+    size_t cell_count,
+    const SubtreeTask *task
+)
+{
+    memcpy(domains, base, cell_count * sizeof(*domains));
+    for (size_t i = 0; i < task->depth; ++i) {
+        domains[task->pins[i].cell] &= task->pins[i].tile_bit;
+    }
+}
+
+static WangSolverOptions task_options(
+    const WangSolverOptions *options,
+    const Region *region,
+    const uint32_t *domains
+)
+{
+    WangSolverOptions result = *options;
+    result.initial_domains = domains;
+    result.initial_domain_count = region->cell_count;
+    return result;
+}
+
+/*
+ * Replace every task with its children on its MRV cell, level by level,
+ * until there are at least target tasks or none can split further. A task
+ * keeps only its pins and the next cell to split, so each child is
+ * propagated once, and children that conflict are dropped; the list may end
+ * up empty.
+ */
+static bool split_tasks(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    const uint32_t *base,
+    size_t target,
+    TaskList *tasks
+)
+{
+    const size_t domain_count = region->cell_count == 0
+        ? 1
+        : region->cell_count;
+    uint32_t *pinned = malloc(domain_count * sizeof(*pinned));
+    uint32_t *propagated = malloc(domain_count * sizeof(*propagated));
+    bool ok = pinned != NULL && propagated != NULL;
+
+    while (ok && tasks->count != 0 && tasks->count < target) {
+        TaskList next = {0};
+        bool split_any = false;
+        for (size_t i = 0; ok && i < tasks->count; ++i) {
+            SubtreeTask *parent = &tasks->items[i];
+            if (parent->split_cell == SIZE_MAX) {
+                ok = task_list_push(&next, *parent);
+                if (ok) {
+                    parent->pins = NULL;
+                }
+                continue;
+            }
+
+            split_any = true;
+            for (uint32_t tiles = parent->split_tiles;
+                 ok && tiles != 0;
+                 tiles &= tiles - UINT32_C(1)) {
+                SubtreeTask child = {
+                    .pins = malloc((parent->depth + 1) * sizeof(TaskPin)),
+                    .depth = parent->depth + 1,
+                };
+                if (child.pins == NULL) {
+                    ok = false;
+                    break;
+                }
+                if (parent->depth != 0) {
+                    memcpy(
+                        child.pins,
+                        parent->pins,
+                        parent->depth * sizeof(TaskPin)
+                    );
+                }
+                child.pins[parent->depth] = (TaskPin) {
+                    .cell = parent->split_cell,
+                    .tile_bit = tiles & (~tiles + UINT32_C(1)),
+                };
+
+                apply_pins(pinned, base, region->cell_count, &child);
+                const WangSolverOptions child_options =
+                    task_options(options, region, pinned);
+                bool contradiction = false;
+                ok = solver_context_propagate(
+                    context,
+                    region,
+                    &child_options,
+                    propagated,
+                    &contradiction
+                );
+                if (ok && !contradiction) {
+                    child.split_cell = select_split_cell(region, propagated);
+                    child.split_tiles = child.split_cell != SIZE_MAX
+                        ? propagated[child.split_cell]
+                        : 0;
+                    ok = task_list_push(&next, child);
+                    if (ok) {
+                        continue;
+                    }
+                }
+                free(child.pins);
+            }
+        }
+
+        task_list_destroy(tasks);
+        *tasks = next;
+        if (!split_any) {
+            break;
+        }
+    }
+
+    free(propagated);
+    free(pinned);
+    return ok;
+}
+
+static void merge_metrics(
+    WangSolverMetrics *total,
+    const WangSolverMetrics *part,
+    size_t depth
+)
+{
+#define WANG_SUM(field) total->field += part->field
+#define WANG_MAX(field) \
+    total->field = part->field > total->field ? part->field : total->field
+    WANG_SUM(dfs_nodes);
+    WANG_SUM(decisions);
+    WANG_SUM(backtracks);
+    WANG_SUM(failed_leaves);
+    WANG_SUM(domain_reductions);
+    WANG_SUM(propagated_arcs);
+    WANG_SUM(support_tile_visits);
+    WANG_SUM(support_byte_lookups);
+    WANG_MAX(support_table_bytes);
+    WANG_SUM(mrv_cells_scanned);
+    WANG_SUM(mrv_index_updates);
+    WANG_MAX(mrv_index_bytes);
+    WANG_SUM(component_splits);
+    WANG_SUM(components);
+    WANG_SUM(nogoods_learned);
+    WANG_SUM(nogoods_evicted);
+    WANG_SUM(nogood_hits);
+    WANG_SUM(backjumps);
+    WANG_SUM(backjump_levels);
+    WANG_SUM(restarts);
+    WANG_SUM(bitslice_passes);
+    WANG_SUM(bitslice_words);
+    WANG_SUM(frontier_states);
+    WANG_MAX(frontier_peak_states);
+    WANG_SUM(value_scorings);
+    WANG_SUM(value_score_lookups);
+    WANG_SUM(probes);
+    WANG_SUM(probe_prunes);
+    WANG_SUM(weight_bumps);
+    WANG_SUM(initial_trail_writes);
+    WANG_SUM(search_trail_writes);
+    WANG_SUM(initial_trail_rewrites);
+    WANG_SUM(search_trail_rewrites);
+    WANG_MAX(trail_peak);
+    WANG_MAX(trail_capacity_peak);
+    WANG_MAX(trail_bytes_peak);
+    WANG_SUM(enqueue_attempts);
+    WANG_SUM(duplicate_enqueue_attempts);
+    WANG_MAX(queue_dedup_index_bytes);
+    WANG_MAX(queue_peak);
+    WANG_MAX(queue_unique_peak);
+    WANG_MAX(dfs_stack_capacity_peak);
+    WANG_MAX(dfs_stack_bytes_peak);
+    WANG_SUM(sat_result_copy_bytes);
+#undef WANG_SUM
+#undef WANG_MAX
+    if (part->max_depth + depth > total->max_depth) {
+        total->max_depth = part->max_depth + depth;
+    }
+}
+
+/* The serial leaf order, with the earlier task winning exact ties. */
+static bool leaf_is_better(
+    const WangSolveResult *candidate,
+    size_t candidate_task,
+    const WangSolveResult *best,
+    size_t best_task
+)
+{
+    if (candidate->resolved_count != best->resolved_count) {
+        return candidate->resolved_count > best->resolved_count;
+    }
+    if (candidate->decision_depth != best->decision_depth) {
+        return candidate->decision_depth > best->decision_depth;
+    }
+    return candidate_task < best_task;
+}
+
+static void worker_offer_leaf(
+    ParallelWorker *worker,
+    WangSolveResult *result,
+    size_t task
+)
+{
+    if (worker->has_best &&
+        !leaf_is_better(result, task, &worker->best, worker->best_task)) {
+        wang_solve_result_destroy(result);
+        return;
+    }
+    wang_solve_result_destroy(&worker->best);
+    worker->best = *result;
+    worker->best_task = task;
+    worker->has_best = true;
+    *result = (WangSolveResult){0};
+}
+
+static size_t default_thread_count(void)
+{
+#ifdef _OPENMP
+    const int threads = omp_get_max_threads();
+    return threads > 0 ? (size_t)threads : 1;
+#else
+    return 1;
+#endif
+}
+
+static size_t current_worker(void)
+{
+#ifdef _OPENMP
+    return (size_t)omp_get_thread_num();
+#else
+    return 0;
+#endif
+}
+
+static WangSolveStatus solve_tasks(
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolverEngine engine,
+    const uint32_t *base,
+    const TaskList *tasks,
+    ParallelWorker *workers,
+    size_t thread_count,
+    WangSolveResult *out_result
+)
+{
+    atomic_int stop = 0;
+    atomic_uint_fast64_t node_count = 0;
+    const SolverSharedBounds shared = {
+        .stop_flag = &stop,
+        .node_count = &node_count,
+    };
+    WangSolveResult sat = {0};
+    size_t sat_task = SIZE_MAX;
+
+#pragma omp parallel for schedule(dynamic, 1) num_threads((int)thread_count)
+    for (size_t task = 0; task < tasks->count; ++task) {
+        ParallelWorker *worker = &workers[current_worker()];
+        if (atomic_load_explicit(&stop, memory_order_relaxed) != 0) {
+            worker->unknown = true;
+            continue;
+        }
+
+        apply_pins(
+            worker->initial,
+            base,
+            region->cell_count,
+            &tasks->items[task]
+        );
+        const WangSolverOptions subtree_options = task_options(
+            options,
+            region,
+            worker->initial
+        );
+        /*
+         * A task whose pins contradict the shared root fails with warm
+         * diagnostics: its leaf only competes for the best one.
+         */
+        WangSolveResult result = {0};
+        const WangSolveStatus status = solver_context_solve_status(
+            worker->context,
+            region,
+            &subtree_options,
+            engine,
+            &shared,
+            &result
+        );
+        const size_t depth = tasks->items[task].depth;
+        merge_metrics(&worker->metrics, &result.metrics, depth);
+        result.decision_depth += depth;
+
+        switch (status) {
+        case WANG_SOLVE_SAT:
+#pragma omp critical(wang_parallel_sat)
+            {
+                if (sat_task == SIZE_MAX) {
+                    sat = result;
+                    sat_task = task;
+                    result = (WangSolveResult){0};
+                }
+            }
+            atomic_store_explicit(&stop, 1, memory_order_relaxed);
+            wang_solve_result_destroy(&result);
+            break;
+        case WANG_SOLVE_UNSAT:
+            worker_offer_leaf(worker, &result, task);
+            break;
+        case WANG_SOLVE_UNKNOWN:
+            worker->unknown = true;
+            worker_offer_leaf(worker, &result, task);
+            break;
+        case WANG_SOLVE_ERROR:
+        default:
+            worker->error = true;
+            atomic_store_explicit(&stop, 1, memory_order_relaxed);
+            wang_solve_result_destroy(&result);
+            break;
+        }
+    }
+
+    bool error = false;
+    bool unknown = false;
+    WangSolverMetrics metrics = {0};
+    ParallelWorker *best = NULL;
+    for (size_t i = 0; i < thread_count; ++i) {
+        ParallelWorker *worker = &workers[i];
+        error = error || worker->error;
+        unknown = unknown || worker->unknown;
+        merge_metrics(&metrics, &worker->metrics, 0);
+        if (worker->has_best && (best == NULL || leaf_is_better(
+                &worker->best,
+                worker->best_task,
+                &best->best,
+                best->best_task
+            ))) {
+            best = worker;
+        }
+    }
+
+    const bool collect_metrics =
+        (options->flags & WANG_SOLVE_COLLECT_METRICS) != 0;
+    if (error) {
+        wang_solve_result_destroy(&sat);
+        return WANG_SOLVE_ERROR;
+    }
+    if (sat_task != SIZE_MAX) {
+        sat.metrics = collect_metrics ? metrics : (WangSolverMetrics){0};
+        *out_result = sat;
+        return WANG_SOLVE_SAT;
+    }
+    if (best == NULL) {
+        return WANG_SOLVE_ERROR;
+    }
+
+    WangSolveResult result = best->best;
+    best->best = (WangSolveResult){0};
+    best->has_best = false;
+    result.metrics = collect_metrics ? metrics : (WangSolverMetrics){0};
+    result.traced_leaf_count = 0;
+    result.trace_truncated = false;
+    if (unknown) {
+        free(result.domains);
+        result.domains = NULL;
+        result.domain_count = 0;
+        result.conflict_cell = SIZE_MAX;
+        *out_result = result;
+        return WANG_SOLVE_UNKNOWN;
+    }
+    *out_result = result;
+    return WANG_SOLVE_UNSAT;
+}
+
+/*
+ * Write merged as a TileId witness to tiles and check it; every active cell
+ * must be a singleton.
+ */
+static bool verify_merged_witness(
+    const Region *region,
+    const uint32_t *merged,
+    TileId *tiles,
+    size_t *out_resolved
+)
+{
+    size_t resolved = 0;
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        uint32_t domain = merged[i];
+        tiles[i] = TILE_NONE;
+        if (!region->cells[i].active) {
+            continue;
+        }
+        if (domain == 0 || (domain & (domain - UINT32_C(1))) != 0) {
+            return false;
+        }
+        TileId tile = 0;
+        while ((domain & UINT32_C(1)) == 0) {
+            domain >>= 1;
+            ++tile;
+        }
+        tiles[i] = tile;
+        ++resolved;
+    }
+    *out_resolved = resolved;
+    return wang_verify_tiling(region, tiles, region->cell_count) ==
+        WANG_VERIFY_VALID;
+}
+
+/*
+ * Solve each component of the propagated root base on its own, one scoped
+ * optimized search per component, and merge their cells into one witness.
+ * The components share no open neighbor, so the region is SAT exactly when
+ * every component is; the first UNSAT stops the others.
+ */
+static WangSolveStatus solve_components(
+    const Region *region,
+    const WangSolverOptions *options,
+    const uint32_t *base,
+    const size_t *cells,
+    const size_t *starts,
+    size_t component_count,
+    ParallelWorker *workers,
+    size_t thread_count,
+    WangSolveResult *out_result
+)
+{
+    const size_t domain_count = region->cell_count == 0
+        ? 1
+        : region->cell_count;
+    uint32_t *merged = malloc(domain_count * sizeof(*merged));
+    if (merged == NULL) {
+        return WANG_SOLVE_ERROR;
+    }
+    memcpy(merged, base, region->cell_count * sizeof(*merged));
+
+    atomic_int stop = 0;
+    atomic_uint_fast64_t node_count = 0;
+    atomic_size_t decision_depth = 0;
+    const SolverSharedBounds shared = {
+        .stop_flag = &stop,
+        .node_count = &node_count,
+    };
+    const WangSolverOptions component_options = task_options(
+        options,
+        region,
+        base
+    );
+    WangSolveResult unsat = {0};
+    size_t unsat_component = SIZE_MAX;
+
+#pragma omp parallel for schedule(dynamic, 1) num_threads((int)thread_count)
+    for (size_t component = 0; component < component_count; ++component) {
+        ParallelWorker *worker = &workers[current_worker()];
+        if (atomic_load_explicit(&stop, memory_order_relaxed) != 0) {
+            worker->unknown = true;
+            continue;
+        }
+
+        const size_t first = starts[component];
+        WangSolveResult result = {0};
+        const WangSolveStatus status = solver_context_solve_scoped(
+            worker->context,
+            region,
+            &component_options,
+            &shared,
+            cells + first,
+            starts[component + 1u] - first,
+            &result
+        );
+        merge_metrics(&worker->metrics, &result.metrics, 0);
+
+        switch (status) {
+        case WANG_SOLVE_SAT:
+            /* Components own disjoint cells, so the writes never overlap. */
+            for (size_t i = first; i < starts[component + 1u]; ++i) {
+                merged[cells[i]] = result.domains[cells[i]];
+            }
+            atomic_fetch_add_explicit(
+                &decision_depth,
+                result.decision_depth,
+                memory_order_relaxed
+            );
+            wang_solve_result_destroy(&result);
+            break;
+        case WANG_SOLVE_UNSAT:
+#pragma omp critical(wang_parallel_component_unsat)
+            {
+                if (component < unsat_component) {
+                    wang_solve_result_destroy(&unsat);
+                    unsat = result;
+                    unsat_component = component;
+                    result = (WangSolveResult){0};
+                }
+            }
+            atomic_store_explicit(&stop, 1, memory_order_relaxed);
+            wang_solve_result_destroy(&result);
+            break;
+        case WANG_SOLVE_UNKNOWN:
+            worker->unknown = true;
+            worker_offer_leaf(worker, &result, component);
+            break;
+        case WANG_SOLVE_ERROR:
+        default:
+            worker->error = true;
+            atomic_store_explicit(&stop, 1, memory_order_relaxed);
+            wang_solve_result_destroy(&result);
+            break;
+        }
+    }
+
+    bool error = false;
+    bool unknown = false;
+    WangSolverMetrics metrics = {0};
+    ParallelWorker *best = NULL;
+    for (size_t i = 0; i < thread_count; ++i) {
+        ParallelWorker *worker = &workers[i];
+        error = error || worker->error;
+        unknown = unknown || worker->unknown;
+        merge_metrics(&metrics, &worker->metrics, 0);
+        if (worker->has_best && (best == NULL || leaf_is_better(
+                &worker->best,
+                worker->best_task,
+                &best->best,
+                best->best_task
+            ))) {
+            best = worker;
+        }
+    }
+
+    const bool collect_metrics =
+        (options->flags & WANG_SOLVE_COLLECT_METRICS) != 0;
+    if (collect_metrics) {
+        ++metrics.component_splits;
+        metrics.components += component_count;
+    } else {
+        metrics = (WangSolverMetrics){0};
+    }
+    if (error) {
+        wang_solve_result_destroy(&unsat);
+        free(merged);
+        return WANG_SOLVE_ERROR;
+    }
+    if (unsat_component != SIZE_MAX) {
+        free(merged);
+        unsat.metrics = metrics;
+        *out_result = unsat;
+        return WANG_SOLVE_UNSAT;
+    }
+    if (unknown) {
+        free(merged);
+        if (best == NULL) {
+            return WANG_SOLVE_ERROR;
+        }
+        WangSolveResult result = best->best;
+        best->best = (WangSolveResult){0};
+        best->has_best = false;
+        free(result.domains);
+        result.domains = NULL;
+        result.domain_count = 0;
+        result.conflict_cell = SIZE_MAX;
+        result.metrics = metrics;
+        *out_result = result;
+        return WANG_SOLVE_UNKNOWN;
+    }
+
+    TileId *tiles = malloc(domain_count * sizeof(*tiles));
+    size_t resolved = 0;
+    const bool valid = tiles != NULL &&
+        verify_merged_witness(region, merged, tiles, &resolved);
+    free(tiles);
+    if (!valid) {
+        free(merged);
+        return WANG_SOLVE_ERROR;
+    }
+    *out_result = (WangSolveResult) {
+        .domains = merged,
+        .domain_count = region->cell_count,
+        .conflict_cell = SIZE_MAX,
+        .resolved_count = resolved,
+        .decision_depth = atomic_load(&decision_depth),
+        .metrics = metrics,
+    };
+    return WANG_SOLVE_SAT;
+}
+
+WangSolveStatus wang_solve_parallel(
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolverEngine engine,
+    size_t thread_count,
+    WangSolveResult *out_result
+)
+{
+    if (!solver_result_is_destroyed(out_result) || region == NULL) {
+        return WANG_SOLVE_ERROR;
+    }
+    if (thread_count == 0) {
+        thread_count = default_thread_count();
+    }
+    if (thread_count > INT32_MAX ||
+        (engine != WANG_SOLVER_REFERENCE && engine != WANG_SOLVER_OPTIMIZED)) {
+        return WANG_SOLVE_ERROR;
+    }
+    const bool decompose = options != NULL && (options->flags & (
+        WANG_SOLVE_DECOMPOSE_COMPONENTS |
+        WANG_SOLVE_DECOMPOSE_EACH_DECISION)) != 0;
+    const bool learn = options != NULL &&
+        (options->flags & WANG_SOLVE_LEARN_NOGOODS) != 0;
+    const bool bitslice = options != NULL &&
+        (options->flags & WANG_SOLVE_BITSLICE_PROPAGATION) != 0;
+    const bool frontier = options != NULL &&
+        (options->flags & WANG_SOLVE_FRONTIER_WHEN_NARROW) != 0;
+    const bool value_scoring = options != NULL &&
+        options->value_order == WANG_VALUE_ORDER_LEAST_CONSTRAINING;
+    const bool probe = options != NULL &&
+        (options->flags & WANG_SOLVE_PROBE_SINGLETONS) != 0;
+    const bool weighted_degree = options != NULL &&
+        (options->flags & WANG_SOLVE_WEIGHTED_DEGREE) != 0;
+    const bool checkpoint = options != NULL &&
+        (options->flags & WANG_SOLVE_CHECKPOINT) != 0;
+    if ((decompose || learn || bitslice || frontier || value_scoring ||
+         probe || weighted_degree || checkpoint) &&
+        engine != WANG_SOLVER_OPTIMIZED) {
+        return WANG_SOLVE_ERROR;
+    }
+    if (decompose && learn) {
+        return WANG_SOLVE_ERROR;
+    }
+
+    WangSolverContext *root_context = wang_solver_context_create();
+    if (root_context == NULL) {
+        return WANG_SOLVE_ERROR;
+    }
+
+    const bool traced = options != NULL &&
+        (options->flags & WANG_SOLVE_TRACE_FAILED_LEAVES) != 0;
+    bool serial = thread_count == 1 || traced || checkpoint;
+    /* A narrow region is swept once instead of once per subtree task. */
+    if (frontier && !serial && region_validate(region)) {
+        FrontierSweep sweep;
+        frontier_sweep_plan(region, &sweep);
+        serial = sweep.width <= WANG_FRONTIER_MAX_WIDTH;
+    }
+    /*
+     * Split children and subtree searches start warm from the unpinned root
+     * fixpoint, so each one propagates only the cells its pins narrowed.
+     */
+    WangSolverOptions parallel_options = options != NULL
+        ? *options
+        : (WangSolverOptions){0};
+    WangRootFixpoint fixpoint = {0};
+    TaskList tasks = {0};
+    if (!serial && parallel_options.root_fixpoint == NULL) {
+        if (!wang_root_fixpoint_compute(region, &fixpoint)) {
+            wang_solver_context_destroy(root_context);
+            return WANG_SOLVE_ERROR;
+        }
+        parallel_options.root_fixpoint = &fixpoint;
+        serial = fixpoint.contradiction;
+    }
+    const size_t domain_count = region->cell_count == 0
+        ? 1
+        : region->cell_count;
+    uint32_t *base = NULL;
+    size_t *component_cells = NULL;
+    size_t *component_starts = NULL;
+    size_t component_count = 0;
+    bool contradiction = false;
+    if (!serial) {
+        base = malloc(domain_count * sizeof(*base));
+        if (base == NULL ||
+            !solver_context_propagate(
+                root_context,
+                region,
+                &parallel_options,
+                base,
+                &contradiction
+            )) {
+            free(base);
+            wang_root_fixpoint_destroy(&fixpoint);
+            wang_solver_context_destroy(root_context);
+            return WANG_SOLVE_ERROR;
+        }
+        if (decompose && !contradiction) {
+            component_cells = malloc(domain_count * sizeof(size_t));
+            component_starts = malloc((domain_count + 1u) * sizeof(size_t));
+            component_count = component_cells != NULL &&
+                    component_starts != NULL
+                ? solver_label_components(
+                    region,
+                    base,
+                    component_cells,
+                    component_starts
+                )
+                : SIZE_MAX;
+            if (component_count == SIZE_MAX) {
+                free(component_starts);
+                free(component_cells);
+                free(base);
+                wang_root_fixpoint_destroy(&fixpoint);
+                wang_solver_context_destroy(root_context);
+                return WANG_SOLVE_ERROR;
+            }
+        }
+    }
+    /*
+     * Two or more root components are solved one per task from the
+     * propagated base; otherwise the root is split into subtrees.
+     */
+    if (!serial && component_count < 2) {
+        const size_t split_cell = contradiction
+            ? SIZE_MAX
+            : select_split_cell(region, base);
+        const SubtreeTask root = {
+            .split_cell = split_cell,
+            .split_tiles = split_cell != SIZE_MAX ? base[split_cell] : 0,
+        };
+        serial = split_cell == SIZE_MAX;
+
+        /* Tasks pin cells of the unpropagated input, not of the fixpoint. */
+        for (size_t i = 0; i < region->cell_count; ++i) {
+            base[i] = parallel_options.initial_domains != NULL
+                ? parallel_options.initial_domains[i]
+                : region->cells[i].active ? WANG_DOMAIN_ALL : 0;
+        }
+        if (!serial && !task_list_push(&tasks, root)) {
+            serial = true;
+        } else if (!serial && !split_tasks(
+                root_context,
+                region,
+                &parallel_options,
+                base,
+                thread_count * PARALLEL_TASKS_PER_THREAD,
+                &tasks
+            )) {
+            task_list_destroy(&tasks);
+            free(component_starts);
+            free(component_cells);
+            free(base);
+            wang_root_fixpoint_destroy(&fixpoint);
+            wang_solver_context_destroy(root_context);
+            return WANG_SOLVE_ERROR;
+        }
+        /* Every subtree conflicted: the serial search is just as short. */
+        serial = serial || tasks.count == 0;
+    }
+
+    if (serial) {
+        task_list_destroy(&tasks);
+        free(component_starts);
+        free(component_cells);
+        free(base);
+        wang_root_fixpoint_destroy(&fixpoint);
+        const WangSolveStatus status = wang_solver_context_solve(
+            root_context,
+            region,
+            options,
+            engine,
+            out_result
+        );
+        wang_solver_context_destroy(root_context);
+        return status;
+    }
+
+    const size_t work_count = component_count >= 2
+        ? component_count
+        : tasks.count;
+    if (thread_count > work_count) {
+        thread_count = work_count;
+    }
+    ParallelWorker *workers = calloc(thread_count, sizeof(*workers));
+    WangSolveStatus status = workers == NULL
+        ? WANG_SOLVE_ERROR
+        : WANG_SOLVE_UNSAT;
+    for (size_t i = 0; status != WANG_SOLVE_ERROR && i < thread_count; ++i) {
+        workers[i].context = i == 0
+            ? root_context
+            : wang_solver_context_create();
+        workers[i].initial = malloc(domain_count * sizeof(uint32_t));
+        if (workers[i].context == NULL || workers[i].initial == NULL) {
+            status = WANG_SOLVE_ERROR;
+        }
+    }
+    if (status != WANG_SOLVE_ERROR && component_count >= 2) {
+        status = solve_components(
+            region,
+            &parallel_options,
+            base,
+            component_cells,
+            component_starts,
+            component_count,
+            workers,
+            thread_count,
+            out_result
+        );
+    } else if (status != WANG_SOLVE_ERROR) {
+        status = solve_tasks(
+            region,
+            &parallel_options,
+            engine,
+            base,
+            &tasks,
+            workers,
+            thread_count,
+            out_result
+        );
+    }
+
+    for (size_t i = 0; workers != NULL && i < thread_count; ++i) {
+        wang_solve_result_destroy(&workers[i].best);
+        free(workers[i].initial);
+        if (i != 0) {
+            wang_solver_context_destroy(workers[i].context);
+        }
+    }
+    free(workers);
+    wang_solver_context_destroy(root_context);
+    task_list_destroy(&tasks);
+    free(component_starts);
+    free(component_cells);
+    free(base);
+    wang_root_fixpoint_destroy(&fixpoint);
+    return status;
+}
+
+static WangPortfolioMember default_portfolio_member(
+    uint64_t seed,
+    size_t index
+)
+{
+    switch (index) {
+    case 0:
+        return (WangPortfolioMember) { .engine = WANG_SOLVER_OPTIMIZED };
+    case 1:
+        return (WangPortfolioMember) {
+            .engine = WANG_SOLVER_OPTIMIZED,
+            .value_order = WANG_VALUE_ORDER_DESCENDING,
+            .tie_break = WANG_TIE_BREAK_LAST,
+        };
+    default:
+        return (WangPortfolioMember) {
+            .engine = WANG_SOLVER_OPTIMIZED,
+            .value_order = WANG_VALUE_ORDER_RANDOM,
+            .tie_break = WANG_TIE_BREAK_RANDOM,
+            .seed = seed + index,
+        };
+    }
+}
+
+WangSolveStatus wang_solve_portfolio(
+    const Region *region,
+    const WangSolverOptions *options,
+    const WangPortfolioMember *members,
+    size_t member_count,
+    WangPortfolioReport *out_reports,
+    WangSolveResult *out_result
+)
+{
+    for (size_t i = 0; out_reports != NULL && i < member_count; ++i) {
+        out_reports[i] = (WangPortfolioReport) {
+            .status = WANG_SOLVE_ERROR,
+        };
+    }
+    if (!solver_result_is_destroyed(out_result) || region == NULL ||
+        member_count == 0 || member_count > INT32_MAX ||
+        (options != NULL &&
+         (options->flags & (WANG_SOLVE_TRACE_FAILED_LEAVES |
+                            WANG_SOLVE_CHECKPOINT)) != 0)) {
+        return WANG_SOLVE_ERROR;
+    }
+    for (size_t i = 0; members != NULL && i < member_count; ++i) {
+        if ((members[i].engine != WANG_SOLVER_REFERENCE &&
+             members[i].engine != WANG_SOLVER_OPTIMIZED) ||
+            (members[i].engine != WANG_SOLVER_OPTIMIZED &&
+             members[i].value_order == WANG_VALUE_ORDER_LEAST_CONSTRAINING)) {
+            return WANG_SOLVE_ERROR;
+        }
+    }
+
+    WangSolverContext **contexts = calloc(member_count, sizeof(*contexts));
+    WangSolveResult *results = calloc(member_count, sizeof(*results));
+    WangSolveStatus *statuses = calloc(member_count, sizeof(*statuses));
+    bool ready = contexts != NULL && results != NULL && statuses != NULL;
+    for (size_t i = 0; ready && i < member_count; ++i) {
+        contexts[i] = wang_solver_context_create();
+        ready = contexts[i] != NULL;
+    }
+
+    const WangSolverOptions shared_options = options != NULL
+        ? *options
+        : (WangSolverOptions){0};
+    atomic_int stop = 0;
+    const SolverSharedBounds shared = { .stop_flag = &stop };
+    size_t winner = SIZE_MAX;
+
+    if (ready) {
+#pragma omp parallel for schedule(dynamic, 1) num_threads((int)member_count)
+        for (size_t i = 0; i < member_count; ++i) {
+            const WangPortfolioMember member = members != NULL
+                ? members[i]
+                : default_portfolio_member(shared_options.seed, i);
+            WangSolverOptions member_options = shared_options;
+            member_options.value_order = member.value_order;
+            member_options.tie_break = member.tie_break;
+            member_options.seed = member.seed;
+
+            statuses[i] = solver_context_solve_shared(
+                contexts[i],
+                region,
+                &member_options,
+                member.engine,
+                &shared,
+                &results[i]
+            );
+            if (statuses[i] == WANG_SOLVE_SAT ||
+                statuses[i] == WANG_SOLVE_UNSAT) {
+#pragma omp critical(wang_portfolio_winner)
+                {
+                    if (winner == SIZE_MAX) {
+                        winner = i;
+                    }
+                }
+                atomic_store_explicit(&stop, 1, memory_order_relaxed);
+            } else if (statuses[i] == WANG_SOLVE_ERROR) {
+                atomic_store_explicit(&stop, 1, memory_order_relaxed);
+            }
+        }
+    }
+
+    bool error = !ready;
+    for (size_t i = 0; ready && i < member_count; ++i) {
+        error = error || statuses[i] == WANG_SOLVE_ERROR;
+        if (out_reports != NULL) {
+            out_reports[i] = (WangPortfolioReport) {
+                .status = statuses[i],
+                .winner = i == winner,
+                .metrics = results[i].metrics,
+            };
+        }
+    }
+
+    WangSolveStatus status = WANG_SOLVE_ERROR;
+    if (!error) {
+        const size_t returned = winner != SIZE_MAX ? winner : 0;
+        status = statuses[returned];
+        *out_result = results[returned];
+        results[returned] = (WangSolveResult){0};
+    } else if (out_reports != NULL) {
+        for (size_t i = 0; i < member_count; ++i) {
+            out_reports[i].winner = false;
+        }
+    }
+
+    for (size_t i = 0; contexts != NULL && i < member_count; ++i) {
+        if (results != NULL) {
+            wang_solve_result_destroy(&results[i]);
+        }
+        wang_solver_context_destroy(contexts[i]);
+    }
+    free(statuses);
+    free(results);
+    free(contexts);
+    return status;
+}
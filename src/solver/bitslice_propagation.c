@@ -0,0 +1,345 @@
+#include "bitslice_propagation.h"
+
+#include <string.h>
+
+/*
+ * Storage order: TILE_COUNT tile planes, DIR_COUNT link planes, the plane of
+ * cells loaded with a nonempty domain, then the dirty and the narrowed
+ * bitsets with one bit per plane word each.
+ */
+enum {
+    BITSLICE_LINK_PLANE = TILE_COUNT,
+    BITSLICE_LIVE_PLANE = TILE_COUNT + DIR_COUNT,
+    BITSLICE_PLANE_COUNT = TILE_COUNT + DIR_COUNT + 1
+};
+
+static size_t words_for_bits(size_t bits)
+{
+    return bits / 64u + (bits % 64u != 0 ? 1u : 0u);
+}
+
+static uint64_t *plane(const BitslicePlanes *planes, size_t index)
+{
+    return planes->words + index * planes->plane_words;
+}
+
+static uint64_t *dirty_bits(const BitslicePlanes *planes)
+{
+    return plane(planes, BITSLICE_PLANE_COUNT);
+}
+
+static uint64_t *narrowed_bits(const BitslicePlanes *planes)
+{
+    return dirty_bits(planes) + words_for_bits(planes->plane_words);
+}
+
+static void mark_dirty(BitslicePlanes *planes, size_t word)
+{
+    dirty_bits(planes)[word / 64u] |= UINT64_C(1) << (word % 64u);
+}
+
+/* Index of the lowest set bit of a nonzero word (de Bruijn lookup). */
+static unsigned lowest_bit_index(uint64_t word)
+{
+    static const unsigned char positions[64] = {
+        0, 1, 2, 53, 3, 7, 54, 27, 4, 38, 41, 8, 34, 55, 48, 28,
+        62, 5, 39, 46, 44, 42, 22, 9, 24, 35, 59, 56, 49, 18, 29, 11,
+        63, 52, 6, 26, 37, 40, 33, 47, 61, 45, 43, 21, 23, 58, 17, 10,
+        51, 25, 36, 32, 60, 20, 57, 16, 50, 31, 19, 15, 30, 14, 13, 12,
+    };
+    return positions[((word & (~word + UINT64_C(1))) *
+                      UINT64_C(0x022fdd63cc95386d)) >> 58];
+}
+
+bool bitslice_storage_words(size_t width, size_t height, size_t *out_words)
+{
+    const size_t words_per_row = words_for_bits(width);
+    if (height != 0 && words_per_row > SIZE_MAX / height) {
+        return false;
+    }
+    const size_t plane_words = words_per_row * height;
+    if (plane_words != 0 &&
+        BITSLICE_PLANE_COUNT > SIZE_MAX / plane_words) {
+        return false;
+    }
+    const size_t planes_total = plane_words * BITSLICE_PLANE_COUNT;
+    const size_t bitset_total = 2u * words_for_bits(plane_words);
+    if (planes_total > SIZE_MAX - bitset_total) {
+        return false;
+    }
+    *out_words = planes_total + bitset_total;
+    return true;
+}
+
+void bitslice_load(
+    BitslicePlanes *planes,
+    uint64_t *words,
+    size_t width,
+    size_t height,
+    const uint32_t *domains,
+    const uint8_t *neighbor_mask
+)
+{
+    const size_t words_per_row = words_for_bits(width);
+    *planes = (BitslicePlanes) {
+        .words = words,
+        .width = width,
+        .height = height,
+        .words_per_row = words_per_row,
+        .plane_words = words_per_row * height,
+    };
+    memset(
+        dirty_bits(planes),
+        0,
+        2u * words_for_bits(planes->plane_words) * sizeof(*words)
+    );
+
+    /* Gather each word's 64 cells before touching the planes. */
+    for (size_t y = 0; y < height; ++y) {
+        for (size_t column = 0; column < words_per_row; ++column) {
+            const size_t word = y * words_per_row + column;
+            const size_t first_x = column * 64u;
+            const size_t cells = width - first_x < 64u
+                ? width - first_x
+                : 64u;
+            uint64_t tiles[TILE_COUNT] = {0};
+            uint64_t links[DIR_COUNT] = {0};
+            uint64_t live = 0;
+            for (size_t bit = 0; bit < cells; ++bit) {
+                const size_t cell_index = y * width + first_x + bit;
+                const uint32_t domain = domains[cell_index];
+                const uint8_t mask = neighbor_mask[cell_index];
+                live |= (uint64_t)(domain != 0) << bit;
+                for (size_t tile = 0; tile < TILE_COUNT; ++tile) {
+                    tiles[tile] |= (uint64_t)((domain >> tile) & 1u) << bit;
+                }
+                for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+                    links[dir] |= (uint64_t)((mask >> dir) & 1u) << bit;
+                }
+            }
+            for (size_t tile = 0; tile < TILE_COUNT; ++tile) {
+                plane(planes, tile)[word] = tiles[tile];
+            }
+            for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+                plane(planes, BITSLICE_LINK_PLANE + dir)[word] = links[dir];
+            }
+            plane(planes, BITSLICE_LIVE_PLANE)[word] = live;
+            if ((links[N] | links[E] | links[S] | links[W]) != 0) {
+                mark_dirty(planes, word);
+            }
+        }
+    }
+}
+
+/* The color of each tile's side in each direction, from an edge mask. */
+typedef struct {
+    ColorId color[DIR_COUNT][TILE_COUNT];
+} BitsliceSides;
+
+static void build_sides(
+    const BitsliceEdgeMask *edge_mask,
+    BitsliceSides *sides
+)
+{
+    for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+        for (ColorId color = 0; color < COLOR_COUNT; ++color) {
+            for (size_t tile = 0; tile < TILE_COUNT; ++tile) {
+                if (((*edge_mask)[dir][color] & (UINT32_C(1) << tile)) != 0) {
+                    sides->color[dir][tile] = color;
+                }
+            }
+        }
+    }
+}
+
+/*
+ * Set bit x of support[k] when cell x of word still has a tile whose side
+ * in dir has color k.
+ */
+static void load_support(
+    const BitslicePlanes *planes,
+    const BitsliceSides *sides,
+    Dir dir,
+    size_t word,
+    uint64_t support[COLOR_COUNT]
+)
+{
+    memset(support, 0, COLOR_COUNT * sizeof(*support));
+    for (size_t tile = 0; tile < TILE_COUNT; ++tile) {
+        support[sides->color[dir][tile]] |= plane(planes, tile)[word];
+    }
+}
+
+/*
+ * Keep only the tiles of the 64 cells in word that their linked neighbor
+ * along dir still supports. A tile survives when the neighbor has a tile
+ * whose facing side has the same color. Return whether any domain shrank.
+ */
+static bool revise_word(
+    BitslicePlanes *planes,
+    const BitsliceSides *sides,
+    Dir dir,
+    size_t word
+)
+{
+    const uint64_t links = plane(planes, BITSLICE_LINK_PLANE + dir)[word];
+    if (links == 0) {
+        return false;
+    }
+
+    const size_t column = word % planes->words_per_row;
+    const Dir back = opposite(dir);
+    uint64_t support[COLOR_COUNT];
+    uint64_t carry[COLOR_COUNT];
+    switch (dir) {
+    case N:
+        load_support(planes, sides, back, word - planes->words_per_row,
+                     support);
+        break;
+    case S:
+        load_support(planes, sides, back, word + planes->words_per_row,
+                     support);
+        break;
+    case E:
+        load_support(planes, sides, back, word, support);
+        memset(carry, 0, sizeof(carry));
+        if (column + 1u < planes->words_per_row) {
+            load_support(planes, sides, back, word + 1u, carry);
+        }
+        for (size_t color = 0; color < COLOR_COUNT; ++color) {
+            support[color] = (support[color] >> 1) | (carry[color] << 63);
+        }
+        break;
+    case W:
+        load_support(planes, sides, back, word, support);
+        memset(carry, 0, sizeof(carry));
+        if (column > 0) {
+            load_support(planes, sides, back, word - 1u, carry);
+        }
+        for (size_t color = 0; color < COLOR_COUNT; ++color) {
+            support[color] = (support[color] << 1) | (carry[color] >> 63);
+        }
+        break;
+    case DIR_COUNT:
+        return false;
+    }
+
+    uint64_t shrunk = 0;
+    for (size_t tile = 0; tile < TILE_COUNT; ++tile) {
+        uint64_t *cells = plane(planes, tile) + word;
+        const uint64_t narrowed =
+            *cells & (support[sides->color[dir][tile]] | ~links);
+        shrunk |= *cells ^ narrowed;
+        *cells = narrowed;
+    }
+    return shrunk != 0;
+}
+
+/* Mark the words whose cells border a cell of word. */
+static void mark_neighbors_dirty(BitslicePlanes *planes, size_t word)
+{
+    const size_t column = word % planes->words_per_row;
+    if (word >= planes->words_per_row) {
+        mark_dirty(planes, word - planes->words_per_row);
+    }
+    if (word + planes->words_per_row < planes->plane_words) {
+        mark_dirty(planes, word + planes->words_per_row);
+    }
+    if (column > 0) {
+        mark_dirty(planes, word - 1u);
+    }
+    if (column + 1u < planes->words_per_row) {
+        mark_dirty(planes, word + 1u);
+    }
+}
+
+/* Whether a live cell of word has no tile left. */
+static bool word_has_wipeout(const BitslicePlanes *planes, size_t word)
+{
+    uint64_t covered = 0;
+    for (size_t tile = 0; tile < TILE_COUNT; ++tile) {
+        covered |= plane(planes, tile)[word];
+    }
+    return (plane(planes, BITSLICE_LIVE_PLANE)[word] & ~covered) != 0;
+}
+
+BitsliceStatus bitslice_propagate(
+    BitslicePlanes *planes,
+    const BitsliceEdgeMask *edge_mask,
+    uint64_t *out_passes,
+    uint64_t *out_words_revised
+)
+{
+    BitsliceSides sides;
+    build_sides(edge_mask, &sides);
+    uint64_t *dirty = dirty_bits(planes);
+    const size_t dirty_words = words_for_bits(planes->plane_words);
+    bool pending = true;
+    while (pending) {
+        pending = false;
+        ++*out_passes;
+        for (size_t chunk = 0; chunk < dirty_words; ++chunk) {
+            while (dirty[chunk] != 0) {
+                const unsigned bit = lowest_bit_index(dirty[chunk]);
+                dirty[chunk] &= dirty[chunk] - 1u;
+                const size_t word = chunk * 64u + bit;
+
+                bool changed = false;
+                for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+                    changed |= revise_word(planes, &sides, dir, word);
+                }
+                ++*out_words_revised;
+                /*
+                 * Shifts move support one cell per revision along the row;
+                 * the rows above and below did not change meanwhile.
+                 */
+                bool revising = changed;
+                while (revising) {
+                    revising = revise_word(planes, &sides, E, word);
+                    revising |= revise_word(planes, &sides, W, word);
+                    ++*out_words_revised;
+                }
+                if (!changed) {
+                    continue;
+                }
+                if (word_has_wipeout(planes, word)) {
+                    return BITSLICE_WIPEOUT;
+                }
+                narrowed_bits(planes)[chunk] |= UINT64_C(1) << bit;
+                /* Words behind this one wait for the next pass. */
+                mark_neighbors_dirty(planes, word);
+            }
+        }
+        for (size_t chunk = 0; chunk < dirty_words && !pending; ++chunk) {
+            pending = dirty[chunk] != 0;
+        }
+    }
+    return BITSLICE_FIXPOINT;
+}
+
+bool bitslice_word_narrowed(const BitslicePlanes *planes, size_t word)
+{
+    return (narrowed_bits(planes)[word / 64u] >> (word % 64u) & 1u) != 0;
+}
+
+size_t bitslice_word_domains(
+    const BitslicePlanes *planes,
+    size_t word,
+    uint32_t domains[64]
+)
+{
+    const size_t first_x = (word % planes->words_per_row) * 64u;
+    const size_t cells = planes->width - first_x < 64u
+        ? planes->width - first_x
+        : 64u;
+    memset(domains, 0, cells * sizeof(*domains));
+    for (size_t tile = 0; tile < TILE_COUNT; ++tile) {
+        uint64_t cells_with_tile = plane(planes, tile)[word];
+        while (cells_with_tile != 0) {
+            domains[lowest_bit_index(cells_with_tile)] |=
+                UINT32_C(1) << tile;
+            cells_with_tile &= cells_with_tile - 1u;
+        }
+    }
+    return cells;
+}
@@ -0,0 +1,83 @@
+#ifndef WANG_BITSLICE_PROPAGATION_H
+#define WANG_BITSLICE_PROPAGATION_H
+
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+
+#include "wang/tile.h"
+
+/*
+ * Domains stored as one bitplane per tile over row-aligned 64-cell words:
+ * row y starts at word y * words_per_row, and bit x % 64 of its word x / 64
+ * is cell (x, y). Padding bits past the row width stay clear. Each of the
+ * DIR_COUNT link planes marks the cells whose neighbor in that direction is
+ * active. Two bitsets mark the words still to revise and the words whose
+ * domains narrowed.
+ */
+typedef struct {
+    uint64_t *words;
+    size_t width;
+    size_t height;
+    size_t words_per_row;
+    size_t plane_words;
+} BitslicePlanes;
+
+/* Tiles whose side in a direction has a color, as in SolverTables. */
+typedef uint32_t BitsliceEdgeMask[DIR_COUNT][COLOR_COUNT];
+
+/*
+ * Store the number of uint64_t words a width x height region needs in
+ * *out_words. False when the count overflows size_t.
+ */
+bool bitslice_storage_words(size_t width, size_t height, size_t *out_words);
+
+/*
+ * Lay out planes over words, which must hold bitslice_storage_words(), load
+ * the row-major domains and neighbor masks of every cell, and mark every
+ * word with a linked cell dirty.
+ */
+void bitslice_load(
+    BitslicePlanes *planes,
+    uint64_t *words,
+    size_t width,
+    size_t height,
+    const uint32_t *domains,
+    const uint8_t *neighbor_mask
+);
+
+typedef enum {
+    BITSLICE_FIXPOINT,
+    BITSLICE_WIPEOUT
+} BitsliceStatus;
+
+/*
+ * Revise dirty words against their four neighbors until none is left, so
+ * every linked cell keeps only the tiles each neighbor still supports. Each
+ * revision handles the 64 cells of one word; a word that shrinks marks the
+ * words around it dirty. Words ahead in row-major order are revised in the
+ * same pass, words behind it in the next. Add the passes and word revisions
+ * to the counters. Stops at the first cell left without a tile, leaving the
+ * planes partly revised.
+ */
+BitsliceStatus bitslice_propagate(
+    BitslicePlanes *planes,
+    const BitsliceEdgeMask *edge_mask,
+    uint64_t *out_passes,
+    uint64_t *out_words_revised
+);
+
+/* Whether bitslice_propagate() narrowed a domain in word. */
+bool bitslice_word_narrowed(const BitslicePlanes *planes, size_t word);
+
+/*
+ * Store the domains of the cells in word, in row order, and return how many
+ * there are: 64, or fewer in the last word of a row.
+ */
+size_t bitslice_word_domains(
+    const BitslicePlanes *planes,
+    size_t word,
+    uint32_t domains[64]
+);
+
+#endif /* WANG_BITSLICE_PROPAGATION_H */
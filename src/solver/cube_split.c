@@ -0,0 +1,339 @@
+#include "solver_internal.h"
+
+#include "wang/solver.h"
+
+#include <stdint.h>
+#include <stdlib.h>
+#include <string.h>
+
+/* Smallest open cells of a cube that the lookahead tries as split cells. */
+#define CUBE_LOOKAHEAD_CELLS 8u
+
+typedef struct {
+    const Region *region;
+    WangSolverContext *context;
+    WangSolverOptions options;
+    size_t cell_count;
+
+    /* cube_count cubes of cell_count domains each, and their open tiles. */
+    uint32_t *cubes;
+    uint64_t *open_tiles;
+    size_t cube_count;
+    size_t cube_capacity;
+
+    /*
+     * The pinned parent, and the surviving branches of the candidate under
+     * trial and of the best candidate so far: TILE_COUNT cubes each.
+     */
+    uint32_t *pinned;
+    uint32_t *trial;
+    uint32_t *best;
+    uint64_t trial_open[TILE_COUNT];
+    uint64_t best_open[TILE_COUNT];
+
+    size_t refuted_count;
+    uint64_t propagations;
+} CubeSplit;
+
+static unsigned domain_popcount(uint32_t domain)
+{
+    unsigned count = 0;
+    while (domain != 0) {
+        domain &= domain - UINT32_C(1);
+        ++count;
+    }
+    return count;
+}
+
+static uint64_t cube_open_tiles(const CubeSplit *split, const uint32_t *cube)
+{
+    uint64_t open = 0;
+    for (size_t i = 0; i < split->cell_count; ++i) {
+        const unsigned size = domain_popcount(cube[i]);
+        if (size > 1) {
+            open += size - 1u;
+        }
+    }
+    return open;
+}
+
+/*
+ * Propagate the pinned parent into out_cube. Returns false on failure; a
+ * refuted branch sets *out_refuted instead.
+ */
+static bool cube_propagate(
+    CubeSplit *split,
+    uint32_t *out_cube,
+    bool *out_refuted
+)
+{
+    WangSolverOptions options = split->options;
+    options.initial_domains = split->pinned;
+    options.initial_domain_count = split->cell_count;
+    ++split->propagations;
+    return solver_context_propagate(
+        split->context,
+        split->region,
+        &options,
+        out_cube,
+        out_refuted
+    );
+}
+
+/* Make room for count more cubes. */
+static bool cube_reserve(CubeSplit *split, size_t count)
+{
+    if (split->cube_capacity - split->cube_count >= count) {
+        return true;
+    }
+    size_t capacity = split->cube_capacity == 0 ? 16u : split->cube_capacity;
+    while (capacity - split->cube_count < count) {
+        if (capacity > SIZE_MAX / 2u) {
+            return false;
+        }
+        capacity *= 2u;
+    }
+    if (capacity > SIZE_MAX / sizeof(uint32_t) / split->cell_count) {
+        return false;
+    }
+
+    uint32_t *cubes = realloc(
+        split->cubes,
+        capacity * split->cell_count * sizeof(*cubes)
+    );
+    if (cubes == NULL) {
+        return false;
+    }
+    split->cubes = cubes;
+    uint64_t *open_tiles = realloc(
+        split->open_tiles,
+        capacity * sizeof(*open_tiles)
+    );
+    if (open_tiles == NULL) {
+        return false;
+    }
+    split->open_tiles = open_tiles;
+    split->cube_capacity = capacity;
+    return true;
+}
+
+/*
+ * Write up to CUBE_LOOKAHEAD_CELLS open cells of cube to out_cells, smallest
+ * domains first and then in row-major order. Returns how many.
+ */
+static size_t lookahead_candidates(
+    const CubeSplit *split,
+    const uint32_t *cube,
+    size_t out_cells[CUBE_LOOKAHEAD_CELLS]
+)
+{
+    unsigned sizes[CUBE_LOOKAHEAD_CELLS];
+    size_t count = 0;
+    for (size_t i = 0; i < split->cell_count; ++i) {
+        const unsigned size = domain_popcount(cube[i]);
+        if (size < 2u ||
+            (count == CUBE_LOOKAHEAD_CELLS && size >= sizes[count - 1u])) {
+            continue;
+        }
+        size_t slot = count < CUBE_LOOKAHEAD_CELLS ? count++ : count - 1u;
+        while (slot > 0 && sizes[slot - 1u] > size) {
+            sizes[slot] = sizes[slot - 1u];
+            out_cells[slot] = out_cells[slot - 1u];
+            --slot;
+        }
+        sizes[slot] = size;
+        out_cells[slot] = i;
+    }
+    return count;
+}
+
+/*
+ * Branch the cube at index on its best lookahead candidate, replacing it
+ * with the surviving branches. The cube must have an open cell.
+ */
+static bool cube_split_one(CubeSplit *split, size_t index)
+{
+    const size_t cells = split->cell_count;
+    const uint32_t *cube = split->cubes + index * cells;
+    const uint64_t parent_open = split->open_tiles[index];
+
+    size_t candidates[CUBE_LOOKAHEAD_CELLS];
+    const size_t candidate_count =
+        lookahead_candidates(split, cube, candidates);
+
+    bool have_best = false;
+    uint64_t best_weakest = 0;
+    uint64_t best_total = 0;
+    size_t best_count = 0;
+    size_t best_refuted = 0;
+    memcpy(split->pinned, cube, cells * sizeof(*split->pinned));
+    for (size_t c = 0; c < candidate_count; ++c) {
+        const size_t cell = candidates[c];
+        const uint32_t domain = cube[cell];
+        uint64_t weakest = UINT64_MAX;
+        uint64_t total = 0;
+        size_t count = 0;
+        size_t refuted = 0;
+        for (uint32_t rest = domain; rest != 0; rest &= rest - 1u) {
+            split->pinned[cell] = rest & (~rest + 1u);
+            uint32_t *branch = split->trial + count * cells;
+            bool contradiction = false;
+            if (!cube_propagate(split, branch, &contradiction)) {
+                return false;
+            }
+            uint64_t removed = parent_open;
+            if (contradiction) {
+                ++refuted;
+            } else {
+                const uint64_t open = cube_open_tiles(split, branch);
+                split->trial_open[count++] = open;
+                removed = parent_open - open;
+            }
+            weakest = removed < weakest ? removed : weakest;
+            total += removed;
+        }
+        split->pinned[cell] = domain;
+
+        if (!have_best || weakest > best_weakest ||
+            (weakest == best_weakest && total > best_total)) {
+            uint32_t *swap = split->best;
+            split->best = split->trial;
+            split->trial = swap;
+            memcpy(split->best_open, split->trial_open,
+                   count * sizeof(*split->best_open));
+            have_best = true;
+            best_weakest = weakest;
+            best_total = total;
+            best_count = count;
+            best_refuted = refuted;
+        }
+        if (count == 0) {
+            break;
+        }
+    }
+
+    split->refuted_count += best_refuted;
+    if (best_count == 0) {
+        const size_t last = split->cube_count - 1u;
+        if (index != last) {
+            memcpy(split->cubes + index * cells, split->cubes + last * cells,
+                   cells * sizeof(*split->cubes));
+            split->open_tiles[index] = split->open_tiles[last];
+        }
+        --split->cube_count;
+        return true;
+    }
+    if (!cube_reserve(split, best_count - 1u)) {
+        return false;
+    }
+    memcpy(split->cubes + index * cells, split->best,
+           cells * sizeof(*split->cubes));
+    split->open_tiles[index] = split->best_open[0];
+    for (size_t b = 1; b < best_count; ++b) {
+        memcpy(split->cubes + split->cube_count * cells,
+               split->best + b * cells, cells * sizeof(*split->cubes));
+        split->open_tiles[split->cube_count++] = split->best_open[b];
+    }
+    return true;
+}
+
+static bool cube_split_run(CubeSplit *split, size_t target_count)
+{
+    const size_t cells = split->cell_count;
+    split->pinned = malloc(cells * sizeof(*split->pinned));
+    split->trial = malloc(TILE_COUNT * cells * sizeof(*split->trial));
+    split->best = malloc(TILE_COUNT * cells * sizeof(*split->best));
+    if (split->pinned == NULL || split->trial == NULL ||
+        split->best == NULL || !cube_reserve(split, 1)) {
+        return false;
+    }
+
+    bool contradiction = false;
+    ++split->propagations;
+    if (!solver_context_propagate(split->context, split->region,
+                                  &split->options, split->cubes,
+                                  &contradiction)) {
+        return false;
+    }
+    if (contradiction) {
+        return true;
+    }
+    split->open_tiles[0] = cube_open_tiles(split, split->cubes);
+    split->cube_count = 1;
+
+    while (split->cube_count > 0 && split->cube_count < target_count) {
+        size_t heaviest = 0;
+        for (size_t i = 1; i < split->cube_count; ++i) {
+            if (split->open_tiles[i] > split->open_tiles[heaviest]) {
+                heaviest = i;
+            }
+        }
+        if (split->open_tiles[heaviest] == 0) {
+            break;
+        }
+        if (!cube_split_one(split, heaviest)) {
+            return false;
+        }
+    }
+    return true;
+}
+
+WangSolveStatus wang_solver_context_split_cubes(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    size_t target_count,
+    WangCubeSet *out_cubes
+)
+{
+    if (out_cubes == NULL || out_cubes->domains != NULL ||
+        out_cubes->cube_count != 0 || out_cubes->domain_count != 0 ||
+        out_cubes->refuted_count != 0 ||
+        out_cubes->lookahead_propagations != 0) {
+        return WANG_SOLVE_ERROR;
+    }
+    if (context == NULL || target_count == 0 ||
+        !region_validate(region) || region->cell_count == 0) {
+        return WANG_SOLVE_ERROR;
+    }
+
+    CubeSplit split = {
+        .region = region,
+        .context = context,
+        .cell_count = region->cell_count,
+    };
+    if (options != NULL) {
+        split.options = *options;
+    }
+    const bool ok = cube_split_run(&split, target_count);
+    free(split.pinned);
+    free(split.trial);
+    free(split.best);
+    free(split.open_tiles);
+    if (!ok) {
+        free(split.cubes);
+        return WANG_SOLVE_ERROR;
+    }
+
+    if (split.cube_count == 0) {
+        free(split.cubes);
+        split.cubes = NULL;
+    }
+    *out_cubes = (WangCubeSet){
+        .domains = split.cubes,
+        .cube_count = split.cube_count,
+        .domain_count = split.cube_count == 0 ? 0 : split.cell_count,
+        .refuted_count = split.refuted_count,
+        .lookahead_propagations = split.propagations,
+    };
+    return split.cube_count == 0 ? WANG_SOLVE_UNSAT : WANG_SOLVE_UNKNOWN;
+}
+
+void wang_cube_set_destroy(WangCubeSet *cubes)
+{
+    if (cubes == NULL) {
+        return;
+    }
+    free(cubes->domains);
+    *cubes = (WangCubeSet){0};
+}
@@ -0,0 +1,436 @@
+#include "frontier_dp.h"
+
+#include "wang/solver.h"
+
+#include <stdlib.h>
+#include <string.h>
+
+/*
+ * A profile packs one 5-bit entry per sweep position, plus the entry for
+ * the next cell along the line at position width, twelve entries to a
+ * word. FRONTIER_FREE marks a position whose next cell is inactive or
+ * outside the box, so profiles that differ only in unconstrained colors
+ * merge.
+ */
+#define FRONTIER_ENTRY_BITS 5u
+#define FRONTIER_ENTRIES_PER_WORD 12u
+#define FRONTIER_FREE ((uint64_t)COLOR_COUNT)
+#define FRONTIER_ENTRY_MASK ((UINT64_C(1) << FRONTIER_ENTRY_BITS) - 1u)
+
+/* Profiles one layer, and all layers together, may hold. */
+#define FRONTIER_MAX_LAYER_STATES (UINT32_C(1) << 20)
+#define FRONTIER_MAX_STATES (UINT64_C(1) << 24)
+
+_Static_assert(FRONTIER_FREE <= FRONTIER_ENTRY_MASK,
+               "every color and the free marker fit an entry");
+_Static_assert(WANG_FRONTIER_MAX_WIDTH + 1u <= 2u * FRONTIER_ENTRIES_PER_WORD,
+               "a profile of the widest sweep fits two words");
+
+typedef struct {
+    uint64_t word[2];
+} FrontierProfile;
+
+/* Open-addressing slot; valid only when generation is the current one. */
+typedef struct {
+    uint32_t state;
+    uint32_t generation;
+} FrontierSlot;
+
+/* The active cell a layer placed, and its first back-pointer. */
+typedef struct {
+    size_t cell_index;
+    uint64_t first_link;
+} FrontierLayer;
+
+typedef struct {
+    FrontierProfile *profiles[2];
+    size_t profile_capacity[2];
+    FrontierSlot *slots;
+    size_t slot_capacity;
+    uint32_t generation;
+    uint32_t *parents;
+    TileId *tiles;
+    uint64_t link_capacity;
+    uint64_t link_count;
+    FrontierLayer *layers;
+} FrontierWork;
+
+static uint64_t profile_get(const FrontierProfile *profile, size_t position)
+{
+    const size_t shift =
+        (position % FRONTIER_ENTRIES_PER_WORD) * FRONTIER_ENTRY_BITS;
+    return (profile->word[position / FRONTIER_ENTRIES_PER_WORD] >> shift) &
+        FRONTIER_ENTRY_MASK;
+}
+
+static void profile_set(
+    FrontierProfile *profile,
+    size_t position,
+    uint64_t entry
+)
+{
+    const size_t shift =
+        (position % FRONTIER_ENTRIES_PER_WORD) * FRONTIER_ENTRY_BITS;
+    uint64_t *word = &profile->word[position / FRONTIER_ENTRIES_PER_WORD];
+    *word = (*word & ~(FRONTIER_ENTRY_MASK << shift)) | (entry << shift);
+}
+
+static size_t profile_hash(const FrontierProfile *profile)
+{
+    uint64_t hash = profile->word[0] * UINT64_C(0x9e3779b97f4a7c15) ^
+        profile->word[1] * UINT64_C(0xc2b2ae3d27d4eb4f);
+    hash ^= hash >> 31;
+    return (size_t)hash;
+}
+
+static bool profiles_equal(
+    const FrontierProfile *left,
+    const FrontierProfile *right
+)
+{
+    return left->word[0] == right->word[0] &&
+        left->word[1] == right->word[1];
+}
+
+void frontier_sweep_plan(const Region *region, FrontierSweep *out_sweep)
+{
+    const size_t width = (size_t)region->width;
+    const size_t height = (size_t)region->height;
+    size_t min_x = width;
+    size_t min_y = height;
+    size_t max_x = 0;
+    size_t max_y = 0;
+    for (size_t y = 0; y < height; ++y) {
+        for (size_t x = 0; x < width; ++x) {
+            if (!region->cells[y * width + x].active) {
+                continue;
+            }
+            min_x = x < min_x ? x : min_x;
+            min_y = y < min_y ? y : min_y;
+            max_x = x > max_x ? x : max_x;
+            max_y = y > max_y ? y : max_y;
+        }
+    }
+    if (min_x == width) {
+        *out_sweep = (FrontierSweep){0};
+        return;
+    }
+
+    const size_t box_width = max_x - min_x + 1u;
+    const size_t box_height = max_y - min_y + 1u;
+    const bool transposed = box_height < box_width;
+    *out_sweep = (FrontierSweep) {
+        .width = transposed ? box_height : box_width,
+        .lines = transposed ? box_width : box_height,
+        .origin_x = min_x,
+        .origin_y = min_y,
+        .transposed = transposed,
+    };
+}
+
+static size_t sweep_cell(
+    const Region *region,
+    const FrontierSweep *sweep,
+    size_t position,
+    size_t line
+)
+{
+    const size_t x = sweep->origin_x + (sweep->transposed ? line : position);
+    const size_t y = sweep->origin_y + (sweep->transposed ? position : line);
+    return y * (size_t)region->width + x;
+}
+
+static void frontier_work_free(FrontierWork *work)
+{
+    free(work->profiles[0]);
+    free(work->profiles[1]);
+    free(work->slots);
+    free(work->parents);
+    free(work->tiles);
+    free(work->layers);
+    *work = (FrontierWork){0};
+}
+
+static bool reserve_profiles(FrontierWork *work, size_t layer, size_t needed)
+{
+    if (needed <= work->profile_capacity[layer]) {
+        return true;
+    }
+    size_t capacity = work->profile_capacity[layer] == 0
+        ? 64u
+        : work->profile_capacity[layer];
+    while (capacity < needed) {
+        capacity *= 2u;
+    }
+    FrontierProfile *profiles = realloc(
+        work->profiles[layer],
+        capacity * sizeof(*profiles)
+    );
+    if (profiles == NULL) {
+        return false;
+    }
+    work->profiles[layer] = profiles;
+    work->profile_capacity[layer] = capacity;
+    return true;
+}
+
+static bool reserve_links(FrontierWork *work, uint64_t needed)
+{
+    if (needed <= work->link_capacity) {
+        return true;
+    }
+    uint64_t capacity = work->link_capacity == 0 ? 256u : work->link_capacity;
+    while (capacity < needed) {
+        capacity *= 2u;
+    }
+    if (capacity > SIZE_MAX / sizeof(*work->parents)) {
+        return false;
+    }
+    uint32_t *parents = realloc(
+        work->parents,
+        (size_t)capacity * sizeof(*parents)
+    );
+    if (parents == NULL) {
+        return false;
+    }
+    work->parents = parents;
+    TileId *tiles = realloc(work->tiles, (size_t)capacity * sizeof(*tiles));
+    if (tiles == NULL) {
+        return false;
+    }
+    work->tiles = tiles;
+    work->link_capacity = capacity;
+    return true;
+}
+
+/* Insert state into the slots of the current generation. */
+static void slot_insert(
+    FrontierWork *work,
+    const FrontierProfile *profile,
+    uint32_t state
+)
+{
+    const size_t mask = work->slot_capacity - 1u;
+    size_t slot = profile_hash(profile) & mask;
+    while (work->slots[slot].generation == work->generation) {
+        slot = (slot + 1u) & mask;
+    }
+    work->slots[slot] = (FrontierSlot) {
+        .state = state,
+        .generation = work->generation,
+    };
+}
+
+/* Keep the slots at most half full for count + 1 states of layer. */
+static bool reserve_slots(FrontierWork *work, size_t layer, size_t count)
+{
+    if (work->slot_capacity != 0 && 2u * (count + 1u) <= work->slot_capacity) {
+        return true;
+    }
+    size_t capacity = work->slot_capacity == 0
+        ? 128u
+        : 2u * work->slot_capacity;
+    FrontierSlot *slots = calloc(capacity, sizeof(*slots));
+    if (slots == NULL) {
+        return false;
+    }
+    free(work->slots);
+    work->slots = slots;
+    work->slot_capacity = capacity;
+    work->generation = 1;
+    for (size_t state = 0; state < count; ++state) {
+        slot_insert(work, &work->profiles[layer][state], (uint32_t)state);
+    }
+    return true;
+}
+
+/* Start an empty layer: every slot of the previous one becomes stale. */
+static void next_generation(FrontierWork *work)
+{
+    if (++work->generation == 0) {
+        memset(work->slots, 0, work->slot_capacity * sizeof(*work->slots));
+        work->generation = 1;
+    }
+}
+
+FrontierStatus frontier_solve(
+    const Region *region,
+    const FrontierSweep *sweep,
+    const uint32_t *domains,
+    bool (*stop)(void *stop_context),
+    void *stop_context,
+    TileId *out_tiles,
+    size_t *out_conflict_cell,
+    FrontierCounters *counters
+)
+{
+    Dir up = N;
+    Dir down = S;
+    Dir back = W;
+    Dir ahead = E;
+    if (sweep->transposed) {
+        up = W;
+        down = E;
+        back = N;
+        ahead = S;
+    }
+    uint32_t tiles_with[DIR_COUNT][COLOR_COUNT] = {{0}};
+    for (TileId tile = 0; tile < TILE_COUNT; ++tile) {
+        for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+            tiles_with[dir][TILESET[tile].edge[dir]] |= UINT32_C(1) << tile;
+        }
+    }
+
+    size_t active_count = 0;
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        out_tiles[i] = TILE_NONE;
+        active_count += region->cells[i].active ? 1u : 0u;
+    }
+
+    FrontierWork work = {0};
+    if (!reserve_profiles(&work, 0, 1) ||
+        !reserve_slots(&work, 0, 0) ||
+        (active_count != 0 &&
+         (work.layers = malloc(active_count * sizeof(*work.layers))) ==
+             NULL)) {
+        frontier_work_free(&work);
+        return FRONTIER_ERROR;
+    }
+    FrontierProfile initial = {{0, 0}};
+    for (size_t position = 0; position <= sweep->width; ++position) {
+        profile_set(&initial, position, FRONTIER_FREE);
+    }
+    work.profiles[0][0] = initial;
+    size_t current = 0;
+    size_t current_count = 1;
+    size_t layer_count = 0;
+
+    for (size_t line = 0; line < sweep->lines; ++line) {
+        for (size_t position = 0; position < sweep->width; ++position) {
+            const size_t cell_index =
+                sweep_cell(region, sweep, position, line);
+            if (!region->cells[cell_index].active) {
+                continue;
+            }
+            if (stop != NULL && stop(stop_context)) {
+                frontier_work_free(&work);
+                return FRONTIER_STOPPED;
+            }
+            const bool down_linked = line + 1u < sweep->lines &&
+                region->cells[
+                    sweep_cell(region, sweep, position, line + 1u)
+                ].active;
+            const bool ahead_linked = position + 1u < sweep->width &&
+                region->cells[
+                    sweep_cell(region, sweep, position + 1u, line)
+                ].active;
+
+            const size_t next = 1u - current;
+            size_t next_count = 0;
+            next_generation(&work);
+            work.layers[layer_count] = (FrontierLayer) {
+                .cell_index = cell_index,
+                .first_link = work.link_count,
+            };
+            for (size_t state = 0; state < current_count; ++state) {
+                const FrontierProfile profile = work.profiles[current][state];
+                const uint64_t above = profile_get(&profile, position);
+                const uint64_t before = profile_get(&profile, sweep->width);
+                uint32_t candidates = domains[cell_index];
+                if (above != FRONTIER_FREE) {
+                    candidates &= tiles_with[up][above];
+                }
+                if (before != FRONTIER_FREE) {
+                    candidates &= tiles_with[back][before];
+                }
+                while (candidates != 0) {
+                    TileId tile = 0;
+                    while ((candidates & (UINT32_C(1) << tile)) == 0) {
+                        ++tile;
+                    }
+                    candidates &= candidates - 1u;
+
+                    FrontierProfile successor = profile;
+                    profile_set(
+                        &successor,
+                        position,
+                        down_linked ? TILESET[tile].edge[down] : FRONTIER_FREE
+                    );
+                    profile_set(
+                        &successor,
+                        sweep->width,
+                        ahead_linked
+                            ? TILESET[tile].edge[ahead]
+                            : FRONTIER_FREE
+                    );
+
+                    const size_t mask = work.slot_capacity - 1u;
+                    size_t slot = profile_hash(&successor) & mask;
+                    bool merged = false;
+                    while (work.slots[slot].generation == work.generation) {
+                        if (profiles_equal(
+                                &work.profiles[next][work.slots[slot].state],
+                                &successor)) {
+                            merged = true;
+                            break;
+                        }
+                        slot = (slot + 1u) & mask;
+                    }
+                    if (merged) {
+                        continue;
+                    }
+                    if (next_count == FRONTIER_MAX_LAYER_STATES ||
+                        work.link_count == FRONTIER_MAX_STATES) {
+                        frontier_work_free(&work);
+                        return FRONTIER_OVERFLOW;
+                    }
+                    if (!reserve_profiles(&work, next, next_count + 1u) ||
+                        !reserve_links(&work, work.link_count + 1u)) {
+                        frontier_work_free(&work);
+                        return FRONTIER_ERROR;
+                    }
+                    work.profiles[next][next_count] = successor;
+                    work.parents[work.link_count] = (uint32_t)state;
+                    work.tiles[work.link_count] = tile;
+                    ++work.link_count;
+                    if (2u * (next_count + 1u) > work.slot_capacity) {
+                        ++next_count;
+                        if (!reserve_slots(&work, next, next_count)) {
+                            frontier_work_free(&work);
+                            return FRONTIER_ERROR;
+                        }
+                    } else {
+                        work.slots[slot] = (FrontierSlot) {
+                            .state = (uint32_t)next_count,
+                            .generation = work.generation,
+                        };
+                        ++next_count;
+                    }
+                }
+            }
+
+            counters->states += next_count;
+            if (next_count > counters->peak_states) {
+                counters->peak_states = next_count;
+            }
+            if (next_count == 0) {
+                frontier_work_free(&work);
+                *out_conflict_cell = cell_index;
+                return FRONTIER_UNSAT;
+            }
+            current = next;
+            current_count = next_count;
+            ++layer_count;
+        }
+    }
+
+    /* Every final entry is free, so exactly one profile remains. */
+    size_t state = 0;
+    for (size_t layer = layer_count; layer-- > 0;) {
+        const uint64_t link = work.layers[layer].first_link + state;
+        out_tiles[work.layers[layer].cell_index] = work.tiles[link];
+        state = work.parents[link];
+    }
+    frontier_work_free(&work);
+    return FRONTIER_SAT;
+}
@@ -0,0 +1,71 @@
+#ifndef WANG_FRONTIER_DP_H
+#define WANG_FRONTIER_DP_H
+
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+
+#include "wang/region.h"
+#include "wang/tile.h"
+
+/*
+ * Sweep of the active cells' bounding box along its shorter side. Lines run
+ * across the narrow side, width cells each, and the sweep visits them in
+ * order: rows top to bottom, or columns left to right when transposed.
+ * Regions without active cells have zero width and lines.
+ */
+typedef struct {
+    size_t width;
+    size_t lines;
+    size_t origin_x;
+    size_t origin_y;
+    bool transposed;
+} FrontierSweep;
+
+/* Plan the sweep of region, which must be valid. */
+void frontier_sweep_plan(const Region *region, FrontierSweep *out_sweep);
+
+typedef enum {
+    FRONTIER_SAT,
+    FRONTIER_UNSAT,
+    /* A frontier layer, or all layers together, outgrew their bound. */
+    FRONTIER_OVERFLOW,
+    /* The stop callback asked to end the sweep. */
+    FRONTIER_STOPPED,
+    FRONTIER_ERROR
+} FrontierStatus;
+
+typedef struct {
+    /* Frontier profiles stored over every layer, and the largest layer. */
+    uint64_t states;
+    size_t peak_states;
+} FrontierCounters;
+
+/*
+ * Decide region under the dense row-major domains by dynamic programming
+ * over frontier profiles. A profile holds, for every position of the sweep
+ * line, the color the next cell there must present towards the swept
+ * side, and the color the next cell along the line must present to the
+ * cell before it. Each active cell turns the set of reachable profiles into
+ * the next one, one tile of its domain at a time; equal profiles merge and
+ * keep one back-pointer each. sweep must come from frontier_sweep_plan()
+ * and be at most WANG_FRONTIER_MAX_WIDTH wide.
+ *
+ * On SAT, out_tiles (cell_count entries) holds a tiling that matches every
+ * active neighbor and stays within the domains; inactive cells hold
+ * TILE_NONE. On UNSAT, *out_conflict_cell is the first active cell in sweep
+ * order that no reachable profile can tile. stop is polled once per active
+ * cell and may be NULL. The counters are added to.
+ */
+FrontierStatus frontier_solve(
+    const Region *region,
+    const FrontierSweep *sweep,
+    const uint32_t *domains,
+    bool (*stop)(void *stop_context),
+    void *stop_context,
+    TileId *out_tiles,
+    size_t *out_conflict_cell,
+    FrontierCounters *counters
+);
+
+#endif /* WANG_FRONTIER_DP_H */
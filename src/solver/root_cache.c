@@ -0,0 +1,550 @@
+#define _POSIX_C_SOURCE 200809L
+
+#include "root_cache.h"
+
+#include "wang/tile.h"
+
+#include <fcntl.h>
+#include <inttypes.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <sys/types.h>
+#include <unistd.h>
+
+#define ROOT_CACHE_INITIAL_BUCKETS 16u
+#define ROOT_FILE_HEADER_SIZE 48u
+#define ROOT_FILE_CHECKSUM_OFFSET 40u
+#define ROOT_FILE_CELL_RECORD_SIZE 5u
+#define ROOT_FILE_VERSION UINT32_C(1)
+#define ROOT_FILE_FLAG_CONTRADICTION UINT32_C(1)
+
+static const unsigned char root_file_magic[8] = {
+    'W', '2', '3', 'R', 'O', 'O', 'T', '\0'
+};
+
+static void put_u32(unsigned char *destination, uint32_t value)
+{
+    for (unsigned byte = 0; byte < 4; ++byte) {
+        destination[byte] = (unsigned char)(value >> (8u * byte));
+    }
+}
+
+static void put_u64(unsigned char *destination, uint64_t value)
+{
+    for (unsigned byte = 0; byte < 8; ++byte) {
+        destination[byte] = (unsigned char)(value >> (8u * byte));
+    }
+}
+
+static uint32_t get_u32(const unsigned char *source)
+{
+    uint32_t value = 0;
+    for (unsigned byte = 0; byte < 4; ++byte) {
+        value |= (uint32_t)source[byte] << (8u * byte);
+    }
+    return value;
+}
+
+static uint64_t get_u64(const unsigned char *source)
+{
+    uint64_t value = 0;
+    for (unsigned byte = 0; byte < 8; ++byte) {
+        value |= (uint64_t)source[byte] << (8u * byte);
+    }
+    return value;
+}
+
+/* FNV-1a over every byte except the checksum field itself. */
+static uint64_t root_file_checksum(const unsigned char *bytes, size_t size)
+{
+    uint64_t hash = UINT64_C(14695981039346656037);
+    for (size_t i = 0; i < size; ++i) {
+        if (i >= ROOT_FILE_CHECKSUM_OFFSET &&
+            i < ROOT_FILE_CHECKSUM_OFFSET + 8u) {
+            continue;
+        }
+        hash ^= bytes[i];
+        hash *= UINT64_C(1099511628211);
+    }
+    return hash;
+}
+
+/* Byte size of the file of a cell_count region, or zero on overflow. */
+static size_t root_file_size(size_t cell_count, bool contradiction)
+{
+    const size_t record_size = ROOT_FILE_CELL_RECORD_SIZE +
+        (contradiction ? 0u : sizeof(uint32_t));
+    if (cell_count > (SIZE_MAX - ROOT_FILE_HEADER_SIZE) / record_size) {
+        return 0;
+    }
+    return ROOT_FILE_HEADER_SIZE + cell_count * record_size;
+}
+
+/* directory/<hash in hex>.root followed by suffix; NULL on failure. */
+static char *root_file_path(
+    const char *directory,
+    uint64_t hash,
+    const char *suffix
+)
+{
+    const int length = snprintf(NULL, 0, "%s/%016" PRIx64 ".root%s",
+                                directory, hash, suffix);
+    if (length < 0) {
+        return NULL;
+    }
+    char *path = malloc((size_t)length + 1u);
+    if (path != NULL) {
+        (void)snprintf(path, (size_t)length + 1u, "%s/%016" PRIx64 ".root%s",
+                       directory, hash, suffix);
+    }
+    return path;
+}
+
+static void encode_root_file(
+    unsigned char *bytes,
+    size_t size,
+    const Region *region,
+    const WangRootFixpoint *fixpoint
+)
+{
+    memset(bytes, 0, ROOT_FILE_HEADER_SIZE);
+    memcpy(bytes, root_file_magic, sizeof(root_file_magic));
+    put_u32(bytes + 8, ROOT_FILE_VERSION);
+    put_u32(bytes + 12, ROOT_FILE_HEADER_SIZE);
+    put_u32(bytes + 16, (uint32_t)region->width);
+    put_u32(bytes + 20, (uint32_t)region->height);
+    put_u32(bytes + 24, TILE_COUNT);
+    put_u32(bytes + 28,
+            fixpoint->contradiction ? ROOT_FILE_FLAG_CONTRADICTION : 0);
+    put_u64(bytes + 32, fixpoint->region_fingerprint);
+
+    unsigned char *output = bytes + ROOT_FILE_HEADER_SIZE;
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        const RegionCell *cell = &region->cells[i];
+        output[0] = cell->active ? 1u : 0u;
+        memcpy(output + 1, cell->boundary, DIR_COUNT);
+        output += ROOT_FILE_CELL_RECORD_SIZE;
+    }
+    for (size_t i = 0; i < fixpoint->domain_count; ++i, output += 4) {
+        put_u32(output, fixpoint->domains[i]);
+    }
+
+    put_u64(
+        bytes + ROOT_FILE_CHECKSUM_OFFSET,
+        root_file_checksum(bytes, size)
+    );
+}
+
+/*
+ * Write the file under a unique temporary name in the directory and rename
+ * it over the final one, so that concurrent writers and readers only ever
+ * see whole files. It is not synced: a file lost or torn by a crash fails
+ * its checksum, and the root is computed again.
+ */
+static bool root_file_write(
+    const char *directory,
+    const Region *region,
+    const WangRootFixpoint *fixpoint
+)
+{
+    const size_t size =
+        root_file_size(region->cell_count, fixpoint->contradiction);
+    const off_t file_size = (off_t)size;
+    if (size == 0 || file_size < 0 ||
+        (uintmax_t)file_size != (uintmax_t)size) {
+        return false;
+    }
+    char *path = root_file_path(directory, fixpoint->region_fingerprint, "");
+    char *temporary = root_file_path(
+        directory,
+        fixpoint->region_fingerprint,
+        ".XXXXXX"
+    );
+    const int fd = path != NULL && temporary != NULL
+        ? mkstemp(temporary)
+        : -1;
+    if (fd < 0) {
+        free(temporary);
+        free(path);
+        return false;
+    }
+
+    bool ok = ftruncate(fd, file_size) == 0;
+    void *mapping = ok
+        ? mmap(NULL, size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0)
+        : MAP_FAILED;
+    ok = ok && mapping != MAP_FAILED;
+    if (ok) {
+        encode_root_file(mapping, size, region, fixpoint);
+        if (munmap(mapping, size) != 0) {
+            ok = false;
+        }
+    }
+    if (close(fd) != 0) {
+        ok = false;
+    }
+    if (ok && rename(temporary, path) != 0) {
+        ok = false;
+    }
+    if (!ok) {
+        (void)unlink(temporary);
+    }
+    free(temporary);
+    free(path);
+    return ok;
+}
+
+static bool decode_root_file(
+    const unsigned char *bytes,
+    size_t size,
+    const Region *region,
+    uint64_t hash,
+    WangRootFixpoint *out
+)
+{
+    if (size < ROOT_FILE_HEADER_SIZE ||
+        memcmp(bytes, root_file_magic, sizeof(root_file_magic)) != 0 ||
+        get_u32(bytes + 8) != ROOT_FILE_VERSION ||
+        get_u32(bytes + 12) != ROOT_FILE_HEADER_SIZE ||
+        get_u32(bytes + 16) != (uint32_t)region->width ||
+        get_u32(bytes + 20) != (uint32_t)region->height ||
+        get_u32(bytes + 24) != TILE_COUNT ||
+        (get_u32(bytes + 28) & ~ROOT_FILE_FLAG_CONTRADICTION) != 0 ||
+        get_u64(bytes + 32) != hash) {
+        return false;
+    }
+    const bool contradiction =
+        (get_u32(bytes + 28) & ROOT_FILE_FLAG_CONTRADICTION) != 0;
+    const size_t cell_count = region->cell_count;
+    if (root_file_size(cell_count, contradiction) != size ||
+        get_u64(bytes + ROOT_FILE_CHECKSUM_OFFSET) !=
+            root_file_checksum(bytes, size)) {
+        return false;
+    }
+
+    const unsigned char *input = bytes + ROOT_FILE_HEADER_SIZE;
+    for (size_t i = 0; i < cell_count; ++i) {
+        const RegionCell *cell = &region->cells[i];
+        if (input[0] != (cell->active ? 1u : 0u) ||
+            memcmp(input + 1, cell->boundary, DIR_COUNT) != 0) {
+            return false;
+        }
+        input += ROOT_FILE_CELL_RECORD_SIZE;
+    }
+
+    *out = (WangRootFixpoint){
+        .region_fingerprint = hash,
+        .contradiction = contradiction,
+    };
+    if (contradiction) {
+        return true;
+    }
+    out->domains = malloc(cell_count * sizeof(*out->domains));
+    if (out->domains == NULL) {
+        return false;
+    }
+    out->domain_count = cell_count;
+    for (size_t i = 0; i < cell_count; ++i, input += 4) {
+        const uint32_t domain = get_u32(input);
+        const bool active = region->cells[i].active;
+        if ((domain & ~WANG_DOMAIN_ALL) != 0 ||
+            (active ? domain == 0 : domain != 0)) {
+            return false;
+        }
+        out->domains[i] = domain;
+    }
+    return true;
+}
+
+/* Read the file of region, if the directory holds a valid one. */
+static bool root_file_read(
+    const char *directory,
+    const Region *region,
+    uint64_t hash,
+    WangRootFixpoint *out
+)
+{
+    *out = (WangRootFixpoint){0};
+    char *path = root_file_path(directory, hash, "");
+    const int fd = path != NULL ? open(path, O_RDONLY) : -1;
+    free(path);
+    if (fd < 0) {
+        return false;
+    }
+    struct stat info;
+    bool ok = fstat(fd, &info) == 0 && info.st_size > 0 &&
+        (uintmax_t)info.st_size <= (uintmax_t)SIZE_MAX;
+    const size_t size = ok ? (size_t)info.st_size : 0;
+    void *mapping = ok
+        ? mmap(NULL, size, PROT_READ, MAP_PRIVATE, fd, 0)
+        : MAP_FAILED;
+    if (mapping != MAP_FAILED) {
+        ok = decode_root_file(mapping, size, region, hash, out);
+        if (munmap(mapping, size) != 0) {
+            ok = false;
+        }
+    } else {
+        ok = false;
+    }
+    if (close(fd) != 0) {
+        ok = false;
+    }
+    if (!ok) {
+        wang_root_fixpoint_destroy(out);
+    }
+    return ok;
+}
+
+static void entry_destroy(RootCacheEntry *entry)
+{
+    if (entry == NULL) {
+        return;
+    }
+    free(entry->cells);
+    wang_root_fixpoint_destroy(&entry->fixpoint);
+    free(entry);
+}
+
+static bool entry_holds(
+    const RootCacheEntry *entry,
+    const Region *region,
+    uint64_t hash
+)
+{
+    if (entry->fixpoint.region_fingerprint != hash ||
+        entry->width != region->width || entry->height != region->height) {
+        return false;
+    }
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        const RegionCell *cached = &entry->cells[i];
+        const RegionCell *cell = &region->cells[i];
+        if (cached->active != cell->active ||
+            memcmp(cached->boundary, cell->boundary,
+                   sizeof(cell->boundary)) != 0) {
+            return false;
+        }
+    }
+    return true;
+}
+
+static RootCacheEntry **bucket_of(const RootCache *cache, uint64_t hash)
+{
+    return &cache->buckets[(size_t)hash & (cache->bucket_count - 1u)];
+}
+
+static void recency_remove(RootCache *cache, RootCacheEntry *entry)
+{
+    if (entry->newer != NULL) {
+        entry->newer->older = entry->older;
+    } else {
+        cache->newest = entry->older;
+    }
+    if (entry->older != NULL) {
+        entry->older->newer = entry->newer;
+    } else {
+        cache->oldest = entry->newer;
+    }
+    entry->newer = NULL;
+    entry->older = NULL;
+}
+
+static void recency_push(RootCache *cache, RootCacheEntry *entry)
+{
+    entry->older = cache->newest;
+    entry->newer = NULL;
+    if (cache->newest != NULL) {
+        cache->newest->newer = entry;
+    } else {
+        cache->oldest = entry;
+    }
+    cache->newest = entry;
+}
+
+static void cache_evict_oldest(RootCache *cache)
+{
+    RootCacheEntry *entry = cache->oldest;
+    RootCacheEntry **link =
+        bucket_of(cache, entry->fixpoint.region_fingerprint);
+    while (*link != entry) {
+        link = &(*link)->bucket_next;
+    }
+    *link = entry->bucket_next;
+    recency_remove(cache, entry);
+    --cache->stats.entry_count;
+    cache->stats.bytes -= entry->bytes;
+    ++cache->stats.evictions;
+    entry_destroy(entry);
+}
+
+/* Double the buckets, rechaining every entry; false when allocation fails. */
+static bool cache_grow_buckets(RootCache *cache)
+{
+    const size_t bucket_count = cache->bucket_count == 0
+        ? ROOT_CACHE_INITIAL_BUCKETS
+        : cache->bucket_count * 2u;
+    RootCacheEntry **buckets = calloc(bucket_count, sizeof(*buckets));
+    if (buckets == NULL) {
+        return false;
+    }
+    free(cache->buckets);
+    cache->buckets = buckets;
+    cache->bucket_count = bucket_count;
+    for (RootCacheEntry *entry = cache->newest; entry != NULL;
+         entry = entry->older) {
+        RootCacheEntry **bucket =
+            bucket_of(cache, entry->fixpoint.region_fingerprint);
+        entry->bucket_next = *bucket;
+        *bucket = entry;
+    }
+    return true;
+}
+
+/*
+ * Move fixpoint into a new entry for region, stored as the most recently
+ * used one when it fits and kept as the spare otherwise.
+ */
+static const WangRootFixpoint *cache_keep(
+    RootCache *cache,
+    const Region *region,
+    WangRootFixpoint *fixpoint
+)
+{
+    entry_destroy(cache->spare);
+    cache->spare = NULL;
+
+    RootCacheEntry *entry = calloc(1, sizeof(*entry));
+    RegionCell *cells = malloc(region->cell_count * sizeof(*cells));
+    if (entry == NULL || cells == NULL) {
+        free(cells);
+        free(entry);
+        wang_root_fixpoint_destroy(fixpoint);
+        return NULL;
+    }
+    memcpy(cells, region->cells, region->cell_count * sizeof(*cells));
+    *entry = (RootCacheEntry){
+        .width = region->width,
+        .height = region->height,
+        .cells = cells,
+        .fixpoint = *fixpoint,
+        .bytes = sizeof(*entry) + region->cell_count * sizeof(*cells) +
+            fixpoint->domain_count * sizeof(*fixpoint->domains),
+    };
+    *fixpoint = (WangRootFixpoint){0};
+
+    if (entry->bytes > cache->byte_limit ||
+        (cache->stats.entry_count >= cache->bucket_count &&
+         !cache_grow_buckets(cache))) {
+        cache->spare = entry;
+        return &entry->fixpoint;
+    }
+    while (cache->stats.bytes > cache->byte_limit - entry->bytes) {
+        cache_evict_oldest(cache);
+    }
+    RootCacheEntry **bucket =
+        bucket_of(cache, entry->fixpoint.region_fingerprint);
+    entry->bucket_next = *bucket;
+    *bucket = entry;
+    recency_push(cache, entry);
+    ++cache->stats.entry_count;
+    cache->stats.bytes += entry->bytes;
+    return &entry->fixpoint;
+}
+
+bool root_cache_configure(
+    RootCache *cache,
+    size_t byte_limit,
+    const char *directory
+)
+{
+    root_cache_destroy(cache);
+    if (directory != NULL) {
+        struct stat info;
+        if (directory[0] == '\0' || stat(directory, &info) != 0 ||
+            !S_ISDIR(info.st_mode)) {
+            return false;
+        }
+        cache->directory = strdup(directory);
+        if (cache->directory == NULL) {
+            return false;
+        }
+    }
+    cache->byte_limit = byte_limit;
+    cache->enabled = byte_limit != 0 || directory != NULL;
+    return true;
+}
+
+const WangRootFixpoint *root_cache_lookup(
+    RootCache *cache,
+    const Region *region,
+    uint64_t hash
+)
+{
+    entry_destroy(cache->spare);
+    cache->spare = NULL;
+
+    for (RootCacheEntry *entry = cache->bucket_count != 0
+             ? *bucket_of(cache, hash)
+             : NULL;
+         entry != NULL; entry = entry->bucket_next) {
+        if (entry_holds(entry, region, hash)) {
+            ++cache->stats.hits;
+            recency_remove(cache, entry);
+            recency_push(cache, entry);
+            return &entry->fixpoint;
+        }
+    }
+
+    WangRootFixpoint fixpoint;
+    if (cache->directory != NULL &&
+        root_file_read(cache->directory, region, hash, &fixpoint)) {
+        ++cache->stats.disk_hits;
+        return cache_keep(cache, region, &fixpoint);
+    }
+    ++cache->stats.misses;
+    return NULL;
+}
+
+const WangRootFixpoint *root_cache_store(
+    RootCache *cache,
+    const Region *region,
+    WangRootFixpoint *fixpoint
+)
+{
+    if (cache->directory != NULL) {
+        if (root_file_write(cache->directory, region, fixpoint)) {
+            ++cache->stats.disk_writes;
+        } else {
+            ++cache->stats.disk_failures;
+        }
+    }
+    return cache_keep(cache, region, fixpoint);
+}
+
+void root_cache_clear(RootCache *cache)
+{
+    RootCacheEntry *entry = cache->newest;
+    while (entry != NULL) {
+        RootCacheEntry *older = entry->older;
+        entry_destroy(entry);
+        entry = older;
+    }
+    entry_destroy(cache->spare);
+    free(cache->buckets);
+    cache->newest = NULL;
+    cache->oldest = NULL;
+    cache->spare = NULL;
+    cache->buckets = NULL;
+    cache->bucket_count = 0;
+    cache->stats.entry_count = 0;
+    cache->stats.bytes = 0;
+}
+
+void root_cache_destroy(RootCache *cache)
+{
+    root_cache_clear(cache);
+    free(cache->directory);
+    *cache = (RootCache){0};
+}
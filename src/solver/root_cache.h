@@ -0,0 +1,88 @@
+#ifndef WANG_ROOT_CACHE_H
+#define WANG_ROOT_CACHE_H
+
+#include "wang/region.h"
+#include "wang/solver.h"
+
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+
+/*
+ * One cached root fixpoint, with a copy of the cells of the region it
+ * belongs to, so that a content-hash collision is a miss rather than a
+ * wrong root. Entries chain within their bucket and form one recency list.
+ */
+typedef struct RootCacheEntry RootCacheEntry;
+struct RootCacheEntry {
+    RootCacheEntry *bucket_next;
+    RootCacheEntry *newer;
+    RootCacheEntry *older;
+    int32_t width;
+    int32_t height;
+    RegionCell *cells;
+    WangRootFixpoint fixpoint;
+    size_t bytes;
+};
+
+/*
+ * Root fixpoints keyed by region_content_hash(), in a chained hash table
+ * whose entries never hold more than byte_limit bytes together: inserting
+ * evicts the least recently used entries first. With a directory, every
+ * computed fixpoint is also written there, and a memory miss reads it back
+ * through mmap before counting a miss. Zero-initialize, configure with
+ * root_cache_configure(), and release with root_cache_destroy().
+ */
+typedef struct {
+    bool enabled;
+    size_t byte_limit;
+    char *directory;
+    RootCacheEntry **buckets;
+    size_t bucket_count;
+    RootCacheEntry *newest;
+    RootCacheEntry *oldest;
+    /* A fixpoint too large for byte_limit, kept until the next lookup. */
+    RootCacheEntry *spare;
+    WangRootCacheStats stats;
+} RootCache;
+
+/*
+ * Drop every entry, reset the counters, and enable the cache with these
+ * limits; a zero byte_limit and a NULL directory disable it. Returns false,
+ * leaving the cache disabled, when allocation fails.
+ */
+bool root_cache_configure(
+    RootCache *cache,
+    size_t byte_limit,
+    const char *directory
+);
+
+/*
+ * The fixpoint cached for region, whose content hash is hash, or NULL on a
+ * miss, counting a hit, a disk hit, or a miss. The fixpoint stays valid
+ * until the next lookup, store, clear, or configure.
+ */
+const WangRootFixpoint *root_cache_lookup(
+    RootCache *cache,
+    const Region *region,
+    uint64_t hash
+);
+
+/*
+ * Take ownership of the fixpoint computed for region after a miss, write
+ * it to the directory, and keep it in memory if it fits. Returns where it
+ * now lives, valid as for a lookup, or NULL when allocation fails; the
+ * fixpoint is released either way. A failed disk write is only counted.
+ */
+const WangRootFixpoint *root_cache_store(
+    RootCache *cache,
+    const Region *region,
+    WangRootFixpoint *fixpoint
+);
+
+/* Drop every entry, keeping the configuration and the counters. */
+void root_cache_clear(RootCache *cache);
+
+void root_cache_destroy(RootCache *cache);
+
+#endif /* WANG_ROOT_CACHE_H */
@@ -0,0 +1,542 @@
+#define _POSIX_C_SOURCE 200809L
+
+#include "search_checkpoint.h"
+
+#include "wang/solver.h"
+#include "wang/tile.h"
+
+#include <fcntl.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <sys/types.h>
+#include <unistd.h>
+
+#define CHECKPOINT_HEADER_SIZE 160u
+#define CHECKPOINT_CHECKSUM_OFFSET 152u
+#define CHECKPOINT_TRAIL_RECORD_SIZE 16u
+#define CHECKPOINT_FRAME_RECORD_SIZE 24u
+#define CHECKPOINT_VERSION UINT32_C(1)
+
+#define CHECKPOINT_FLAG_BEST_LEAF UINT32_C(1)
+#define CHECKPOINT_FLAG_BEST_SNAPSHOT (UINT32_C(1) << 1)
+#define CHECKPOINT_FLAG_WEIGHTS (UINT32_C(1) << 2)
+#define CHECKPOINT_FLAG_WEIGHTS_ACTIVE (UINT32_C(1) << 3)
+#define CHECKPOINT_FLAG_PROBE_STOPPED (UINT32_C(1) << 4)
+#define CHECKPOINT_KNOWN_FLAGS (UINT32_C(0x1f))
+
+static const unsigned char checkpoint_magic[8] = {
+    'W', '2', '3', 'C', 'K', 'P', 'T', '\0'
+};
+
+static bool checked_add(size_t a, size_t b, size_t *out)
+{
+    if (a > SIZE_MAX - b) {
+        return false;
+    }
+    *out = a + b;
+    return true;
+}
+
+static bool checked_mul(size_t a, size_t b, size_t *out)
+{
+    if (a != 0 && b > SIZE_MAX / a) {
+        return false;
+    }
+    *out = a * b;
+    return true;
+}
+
+static void put_u32(unsigned char *destination, uint32_t value)
+{
+    for (unsigned byte = 0; byte < 4; ++byte) {
+        destination[byte] = (unsigned char)(value >> (8u * byte));
+    }
+}
+
+static void put_u64(unsigned char *destination, uint64_t value)
+{
+    for (unsigned byte = 0; byte < 8; ++byte) {
+        destination[byte] = (unsigned char)(value >> (8u * byte));
+    }
+}
+
+static uint32_t get_u32(const unsigned char *source)
+{
+    uint32_t value = 0;
+    for (unsigned byte = 0; byte < 4; ++byte) {
+        value |= (uint32_t)source[byte] << (8u * byte);
+    }
+    return value;
+}
+
+static uint64_t get_u64(const unsigned char *source)
+{
+    uint64_t value = 0;
+    for (unsigned byte = 0; byte < 8; ++byte) {
+        value |= (uint64_t)source[byte] << (8u * byte);
+    }
+    return value;
+}
+
+static uint64_t double_bits(double value)
+{
+    uint64_t bits;
+    memcpy(&bits, &value, sizeof(bits));
+    return bits;
+}
+
+static double bits_double(uint64_t bits)
+{
+    double value;
+    memcpy(&value, &bits, sizeof(value));
+    return value;
+}
+
+/* SIZE_MAX travels as UINT64_MAX, so sentinels survive any size_t width. */
+static uint64_t size_to_u64(size_t value)
+{
+    return value == SIZE_MAX ? UINT64_MAX : (uint64_t)value;
+}
+
+static bool u64_to_size(uint64_t value, size_t *out)
+{
+    if (value == UINT64_MAX) {
+        *out = SIZE_MAX;
+        return true;
+    }
+    if (value >= SIZE_MAX) {
+        return false;
+    }
+    *out = (size_t)value;
+    return true;
+}
+
+/* FNV-1a over every byte except the checksum field itself. */
+static uint64_t checkpoint_checksum(const unsigned char *bytes, size_t size)
+{
+    uint64_t hash = UINT64_C(14695981039346656037);
+    for (size_t i = 0; i < size; ++i) {
+        if (i >= CHECKPOINT_CHECKSUM_OFFSET &&
+            i < CHECKPOINT_CHECKSUM_OFFSET + 8u) {
+            continue;
+        }
+        hash ^= bytes[i];
+        hash *= UINT64_C(1099511628211);
+    }
+    return hash;
+}
+
+/* Byte size of a checkpoint with these counts and optional sections. */
+static bool checkpoint_size(
+    size_t cell_count,
+    size_t trail_count,
+    size_t frame_count,
+    uint32_t flags,
+    size_t *out_size
+)
+{
+    size_t domain_bytes;
+    size_t trail_bytes;
+    size_t frame_bytes;
+    size_t weight_bytes = 0;
+    size_t size;
+    if (!checked_mul(cell_count, sizeof(uint32_t), &domain_bytes) ||
+        !checked_mul(
+            trail_count,
+            CHECKPOINT_TRAIL_RECORD_SIZE,
+            &trail_bytes
+        ) ||
+        !checked_mul(
+            frame_count,
+            CHECKPOINT_FRAME_RECORD_SIZE,
+            &frame_bytes
+        ) ||
+        ((flags & CHECKPOINT_FLAG_WEIGHTS) != 0 &&
+         !checked_mul(cell_count, 2u * sizeof(uint64_t), &weight_bytes)) ||
+        !checked_add(CHECKPOINT_HEADER_SIZE, domain_bytes, &size) ||
+        ((flags & CHECKPOINT_FLAG_BEST_SNAPSHOT) != 0 &&
+         !checked_add(size, domain_bytes, &size)) ||
+        !checked_add(size, trail_bytes, &size) ||
+        !checked_add(size, frame_bytes, &size) ||
+        !checked_add(size, weight_bytes, out_size)) {
+        return false;
+    }
+    return true;
+}
+
+static uint32_t checkpoint_flags(const SearchCheckpoint *checkpoint)
+{
+    uint32_t flags = 0;
+    if (checkpoint->has_best_leaf) {
+        flags |= CHECKPOINT_FLAG_BEST_LEAF;
+    }
+    if (checkpoint->has_best_leaf && checkpoint->best_snapshot != NULL) {
+        flags |= CHECKPOINT_FLAG_BEST_SNAPSHOT;
+    }
+    if (checkpoint->arc_weights != NULL) {
+        flags |= CHECKPOINT_FLAG_WEIGHTS;
+    }
+    if (checkpoint->weights_active) {
+        flags |= CHECKPOINT_FLAG_WEIGHTS_ACTIVE;
+    }
+    if (checkpoint->probe_stopped) {
+        flags |= CHECKPOINT_FLAG_PROBE_STOPPED;
+    }
+    return flags;
+}
+
+static void encode_checkpoint(
+    unsigned char *bytes,
+    size_t size,
+    const SearchCheckpoint *checkpoint,
+    uint32_t flags
+)
+{
+    memset(bytes, 0, CHECKPOINT_HEADER_SIZE);
+    memcpy(bytes, checkpoint_magic, sizeof(checkpoint_magic));
+    put_u32(bytes + 8, CHECKPOINT_VERSION);
+    put_u32(bytes + 12, CHECKPOINT_HEADER_SIZE);
+    put_u32(bytes + 16, checkpoint->width);
+    put_u32(bytes + 20, checkpoint->height);
+    put_u32(bytes + 24, TILE_COUNT);
+    put_u32(bytes + 28, flags);
+    put_u64(bytes + 32, (uint64_t)checkpoint->cell_count);
+    put_u64(bytes + 40, (uint64_t)checkpoint->trail_count);
+    put_u64(bytes + 48, (uint64_t)checkpoint->frame_count);
+    put_u64(bytes + 56, checkpoint->region_fingerprint);
+    put_u64(bytes + 64, checkpoint->options_fingerprint);
+    put_u64(bytes + 72, checkpoint->dfs_node_count);
+    put_u64(bytes + 80, checkpoint->random_state);
+    put_u64(bytes + 88, checkpoint->restart_count);
+    put_u64(bytes + 96, checkpoint->restart_leaves_left);
+    put_u64(bytes + 104, checkpoint->probe_budget_ns);
+    put_u64(bytes + 112, double_bits(checkpoint->weight_bump));
+    put_u64(bytes + 120, size_to_u64(checkpoint->best_resolved_count));
+    put_u64(bytes + 128, size_to_u64(checkpoint->best_depth));
+    put_u64(bytes + 136, size_to_u64(checkpoint->best_conflict_cell));
+    put_u32(bytes + 144, checkpoint->value_order);
+    put_u32(bytes + 148, checkpoint->tie_break);
+
+    unsigned char *output = bytes + CHECKPOINT_HEADER_SIZE;
+    for (size_t i = 0; i < checkpoint->cell_count; ++i, output += 4) {
+        put_u32(output, checkpoint->domains[i]);
+    }
+    if ((flags & CHECKPOINT_FLAG_BEST_SNAPSHOT) != 0) {
+        for (size_t i = 0; i < checkpoint->cell_count; ++i, output += 4) {
+            put_u32(output, checkpoint->best_snapshot[i]);
+        }
+    }
+    for (size_t i = 0; i < checkpoint->trail_count; ++i) {
+        const TrailEntry *entry = &checkpoint->trail[i];
+        put_u64(output, (uint64_t)entry->cell_index);
+        put_u32(output + 8, entry->old_domain);
+        put_u32(output + 12, 0);
+        output += CHECKPOINT_TRAIL_RECORD_SIZE;
+    }
+    for (size_t i = 0; i < checkpoint->frame_count; ++i) {
+        const SearchFrame *frame = &checkpoint->frames[i];
+        put_u64(output, (uint64_t)frame->cell_index);
+        put_u64(output + 8, (uint64_t)frame->entry_mark);
+        put_u32(output + 16, frame->candidates);
+        put_u32(output + 20, 0);
+        output += CHECKPOINT_FRAME_RECORD_SIZE;
+    }
+    if ((flags & CHECKPOINT_FLAG_WEIGHTS) != 0) {
+        for (size_t i = 0; i < 2u * checkpoint->cell_count; ++i) {
+            put_u64(output, double_bits(checkpoint->arc_weights[i]));
+            output += 8;
+        }
+    }
+
+    put_u64(
+        bytes + CHECKPOINT_CHECKSUM_OFFSET,
+        checkpoint_checksum(bytes, size)
+    );
+}
+
+/*
+ * Sync the directory that holds path, so that a rename into it survives a
+ * crash.
+ */
+static bool sync_parent_directory(const char *path)
+{
+    const char *slash = strrchr(path, '/');
+    const size_t length = slash == NULL
+        ? 1u
+        : slash == path ? 1u : (size_t)(slash - path);
+    char *directory = malloc(length + 1u);
+    if (directory == NULL) {
+        return false;
+    }
+    memcpy(directory, slash == NULL ? "." : path, length);
+    directory[length] = '\0';
+
+    const int fd = open(directory, O_RDONLY | O_DIRECTORY);
+    free(directory);
+    if (fd < 0) {
+        return false;
+    }
+    bool ok = fsync(fd) == 0;
+    if (close(fd) != 0) {
+        ok = false;
+    }
+    return ok;
+}
+
+bool search_checkpoint_write(
+    const char *path,
+    const SearchCheckpoint *checkpoint
+)
+{
+    static const char suffix[] = ".XXXXXX";
+
+    const uint32_t flags = checkpoint_flags(checkpoint);
+    size_t size;
+    size_t path_length;
+    if (path == NULL || path[0] == '\0' || checkpoint->frame_count == 0 ||
+        !checkpoint_size(
+            checkpoint->cell_count,
+            checkpoint->trail_count,
+            checkpoint->frame_count,
+            flags,
+            &size
+        ) ||
+        !checked_add(strlen(path), sizeof(suffix), &path_length)) {
+        return false;
+    }
+    const off_t file_size = (off_t)size;
+    if (file_size < 0 || (uintmax_t)file_size != (uintmax_t)size) {
+        return false;
+    }
+
+    char *temporary = malloc(path_length);
+    if (temporary == NULL) {
+        return false;
+    }
+    memcpy(temporary, path, path_length - sizeof(suffix));
+    memcpy(temporary + path_length - sizeof(suffix), suffix, sizeof(suffix));
+
+    const int fd = mkstemp(temporary);
+    if (fd < 0) {
+        free(temporary);
+        return false;
+    }
+    bool ok = ftruncate(fd, file_size) == 0;
+    void *mapping = ok
+        ? mmap(NULL, size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0)
+        : MAP_FAILED;
+    ok = ok && mapping != MAP_FAILED;
+    if (ok) {
+        encode_checkpoint(mapping, size, checkpoint, flags);
+        ok = msync(mapping, size, MS_SYNC) == 0;
+        if (munmap(mapping, size) != 0) {
+            ok = false;
+        }
+    }
+    if (close(fd) != 0) {
+        ok = false;
+    }
+    if (ok && rename(temporary, path) != 0) {
+        ok = false;
+    }
+    if (!ok) {
+        (void)unlink(temporary);
+    }
+    free(temporary);
+    return ok && sync_parent_directory(path);
+}
+
+/* Every domain in words is a subset of the tileset. */
+static bool domains_are_valid(const uint32_t *words, size_t count)
+{
+    for (size_t i = 0; i < count; ++i) {
+        if ((words[i] & ~WANG_DOMAIN_ALL) != 0) {
+            return false;
+        }
+    }
+    return true;
+}
+
+static bool decode_checkpoint(
+    const unsigned char *bytes,
+    size_t size,
+    SearchCheckpoint *out
+)
+{
+    if (size < CHECKPOINT_HEADER_SIZE ||
+        memcmp(bytes, checkpoint_magic, sizeof(checkpoint_magic)) != 0 ||
+        get_u32(bytes + 8) != CHECKPOINT_VERSION ||
+        get_u32(bytes + 12) != CHECKPOINT_HEADER_SIZE ||
+        get_u32(bytes + 24) != TILE_COUNT) {
+        return false;
+    }
+    const uint32_t flags = get_u32(bytes + 28);
+    size_t cell_count;
+    size_t trail_count;
+    size_t frame_count;
+    size_t expected_size;
+    if ((flags & ~CHECKPOINT_KNOWN_FLAGS) != 0 ||
+        ((flags & CHECKPOINT_FLAG_BEST_SNAPSHOT) != 0 &&
+         (flags & CHECKPOINT_FLAG_BEST_LEAF) == 0) ||
+        !u64_to_size(get_u64(bytes + 32), &cell_count) ||
+        !u64_to_size(get_u64(bytes + 40), &trail_count) ||
+        !u64_to_size(get_u64(bytes + 48), &frame_count) ||
+        cell_count == SIZE_MAX || trail_count == SIZE_MAX ||
+        frame_count == 0 || frame_count > cell_count ||
+        !checkpoint_size(
+            cell_count,
+            trail_count,
+            frame_count,
+            flags,
+            &expected_size
+        ) ||
+        expected_size != size ||
+        get_u64(bytes + CHECKPOINT_CHECKSUM_OFFSET) !=
+            checkpoint_checksum(bytes, size)) {
+        return false;
+    }
+
+    *out = (SearchCheckpoint) {
+        .width = get_u32(bytes + 16),
+        .height = get_u32(bytes + 20),
+        .cell_count = cell_count,
+        .region_fingerprint = get_u64(bytes + 56),
+        .options_fingerprint = get_u64(bytes + 64),
+        .trail_count = trail_count,
+        .frame_count = frame_count,
+        .dfs_node_count = get_u64(bytes + 72),
+        .random_state = get_u64(bytes + 80),
+        .restart_count = get_u64(bytes + 88),
+        .restart_leaves_left = get_u64(bytes + 96),
+        .probe_budget_ns = get_u64(bytes + 104),
+        .probe_stopped = (flags & CHECKPOINT_FLAG_PROBE_STOPPED) != 0,
+        .weight_bump = bits_double(get_u64(bytes + 112)),
+        .weights_active = (flags & CHECKPOINT_FLAG_WEIGHTS_ACTIVE) != 0,
+        .has_best_leaf = (flags & CHECKPOINT_FLAG_BEST_LEAF) != 0,
+        .value_order = get_u32(bytes + 144),
+        .tie_break = get_u32(bytes + 148),
+    };
+    if (!u64_to_size(get_u64(bytes + 120), &out->best_resolved_count) ||
+        !u64_to_size(get_u64(bytes + 128), &out->best_depth) ||
+        !u64_to_size(get_u64(bytes + 136), &out->best_conflict_cell)) {
+        return false;
+    }
+
+    const bool snapshot = (flags & CHECKPOINT_FLAG_BEST_SNAPSHOT) != 0;
+    const bool weights = (flags & CHECKPOINT_FLAG_WEIGHTS) != 0;
+    /* cell_count is at least frame_count, so no allocation is empty. */
+    out->domains = malloc(cell_count * sizeof(*out->domains));
+    out->best_snapshot = snapshot
+        ? malloc(cell_count * sizeof(*out->best_snapshot))
+        : NULL;
+    out->trail = malloc(
+        (trail_count != 0 ? trail_count : 1u) * sizeof(*out->trail)
+    );
+    out->frames = malloc(frame_count * sizeof(*out->frames));
+    out->arc_weights = weights
+        ? malloc(2u * cell_count * sizeof(*out->arc_weights))
+        : NULL;
+    if (out->domains == NULL || out->trail == NULL || out->frames == NULL ||
+        (snapshot && out->best_snapshot == NULL) ||
+        (weights && out->arc_weights == NULL)) {
+        return false;
+    }
+
+    const unsigned char *input = bytes + CHECKPOINT_HEADER_SIZE;
+    for (size_t i = 0; i < cell_count; ++i, input += 4) {
+        out->domains[i] = get_u32(input);
+    }
+    for (size_t i = 0; snapshot && i < cell_count; ++i, input += 4) {
+        out->best_snapshot[i] = get_u32(input);
+    }
+    if (!domains_are_valid(out->domains, cell_count) ||
+        (snapshot && !domains_are_valid(out->best_snapshot, cell_count))) {
+        return false;
+    }
+
+    for (size_t i = 0; i < trail_count; ++i) {
+        const uint64_t cell_index = get_u64(input);
+        const uint32_t old_domain = get_u32(input + 8);
+        if (cell_index >= cell_count ||
+            (old_domain & ~WANG_DOMAIN_ALL) != 0) {
+            return false;
+        }
+        out->trail[i] = (TrailEntry) {
+            .cell_index = (size_t)cell_index,
+            .old_domain = old_domain,
+        };
+        input += CHECKPOINT_TRAIL_RECORD_SIZE;
+    }
+
+    size_t previous_mark = 0;
+    for (size_t i = 0; i < frame_count; ++i) {
+        const uint64_t cell_index = get_u64(input);
+        const uint64_t entry_mark = get_u64(input + 8);
+        const uint32_t candidates = get_u32(input + 16);
+        if (cell_index >= cell_count || entry_mark > trail_count ||
+            entry_mark < previous_mark || (i == 0 && entry_mark != 0) ||
+            (candidates & ~WANG_DOMAIN_ALL) != 0) {
+            return false;
+        }
+        previous_mark = (size_t)entry_mark;
+        out->frames[i] = (SearchFrame) {
+            .cell_index = (size_t)cell_index,
+            .candidates = candidates,
+            .entry_mark = (size_t)entry_mark,
+        };
+        input += CHECKPOINT_FRAME_RECORD_SIZE;
+    }
+
+    for (size_t i = 0; weights && i < 2u * cell_count; ++i, input += 8) {
+        out->arc_weights[i] = bits_double(get_u64(input));
+    }
+    return true;
+}
+
+bool search_checkpoint_read(const char *path, SearchCheckpoint *out)
+{
+    *out = (SearchCheckpoint){0};
+    if (path == NULL || path[0] == '\0') {
+        return false;
+    }
+
+    const int fd = open(path, O_RDONLY);
+    if (fd < 0) {
+        return false;
+    }
+    struct stat info;
+    bool ok = fstat(fd, &info) == 0 && info.st_size > 0 &&
+        (uintmax_t)info.st_size <= (uintmax_t)SIZE_MAX;
+    const size_t size = ok ? (size_t)info.st_size : 0;
+    void *mapping = ok
+        ? mmap(NULL, size, PROT_READ, MAP_PRIVATE, fd, 0)
+        : MAP_FAILED;
+    if (mapping != MAP_FAILED) {
+        ok = decode_checkpoint(mapping, size, out);
+        if (munmap(mapping, size) != 0) {
+            ok = false;
+        }
+    } else {
+        ok = false;
+    }
+    if (close(fd) != 0) {
+        ok = false;
+    }
+    if (!ok) {
+        search_checkpoint_destroy(out);
+    }
+    return ok;
+}
+
+void search_checkpoint_destroy(SearchCheckpoint *checkpoint)
+{
+    free(checkpoint->domains);
+    free(checkpoint->best_snapshot);
+    free(checkpoint->trail);
+    free(checkpoint->frames);
+    free(checkpoint->arc_weights);
+    *checkpoint = (SearchCheckpoint){0};
+}
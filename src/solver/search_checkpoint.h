@@ -0,0 +1,83 @@
+#ifndef WANG_SEARCH_CHECKPOINT_H
+#define WANG_SEARCH_CHECKPOINT_H
+
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+
+/* One undo record of the search trail. */
+typedef struct {
+    size_t cell_index;
+    uint32_t old_domain;
+} TrailEntry;
+
+typedef struct {
+    size_t cell_index;
+    uint32_t candidates;
+    /* Trail position before the parent branch entered this node. */
+    size_t entry_mark;
+} SearchFrame;
+
+/*
+ * The DFS state at the top of one search step: everything the search reads
+ * to choose and undo its next decisions. A checkpoint being written borrows
+ * the solver's arrays; one read by search_checkpoint_read() owns them.
+ * best_snapshot and arc_weights are NULL when the solve keeps none.
+ */
+typedef struct {
+    uint32_t width;
+    uint32_t height;
+    size_t cell_count;
+    uint64_t region_fingerprint;
+    uint64_t options_fingerprint;
+
+    uint32_t *domains;
+    TrailEntry *trail;
+    size_t trail_count;
+    SearchFrame *frames;
+    size_t frame_count;
+
+    uint64_t dfs_node_count;
+    uint64_t random_state;
+    uint32_t value_order;
+    uint32_t tie_break;
+    uint64_t restart_count;
+    uint64_t restart_leaves_left;
+    uint64_t probe_budget_ns;
+    bool probe_stopped;
+
+    double *arc_weights;
+    double weight_bump;
+    bool weights_active;
+
+    bool has_best_leaf;
+    uint32_t *best_snapshot;
+    size_t best_resolved_count;
+    size_t best_depth;
+    size_t best_conflict_cell;
+} SearchCheckpoint;
+
+/*
+ * Replace path with checkpoint. The file is written beside path under a
+ * unique name, synced, and renamed over it, and then the directory is
+ * synced, so path holds either the previous checkpoint or this one in full,
+ * and concurrent writers never share a temporary file. Returns false when
+ * any step fails, leaving no temporary file behind; path is as it was
+ * unless only the directory sync failed.
+ */
+bool search_checkpoint_write(
+    const char *path,
+    const SearchCheckpoint *checkpoint
+);
+
+/*
+ * Read the checkpoint at path into out, which owns its arrays afterwards.
+ * Returns false, with out zeroed, when the file is missing, truncated,
+ * fails its checksum, or holds records outside its own counts.
+ */
+bool search_checkpoint_read(const char *path, SearchCheckpoint *out);
+
+/* Release the arrays of a checkpoint read by search_checkpoint_read(). */
+void search_checkpoint_destroy(SearchCheckpoint *checkpoint);
+
+#endif /* WANG_SEARCH_CHECKPOINT_H */
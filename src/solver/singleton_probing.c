@@ -0,0 +1,61 @@
+#include "singleton_probing.h"
+
+static bool cell_is_open(
+    const Region *region,
+    const uint32_t *domains,
+    size_t cell_index
+)
+{
+    return region->cells[cell_index].active &&
+        (domains[cell_index] & (domains[cell_index] - UINT32_C(1))) != 0;
+}
+
+ProbeStatus probe_passes(
+    const Region *region,
+    const uint32_t *domains,
+    const ProbeHooks *hooks,
+    size_t *out_conflict_cell,
+    ProbeCounters *counters
+)
+{
+    bool pruned = true;
+    while (pruned) {
+        pruned = false;
+        for (size_t i = 0; i < region->cell_count; ++i) {
+            for (uint32_t tiles = domains[i];
+                 tiles != 0 && cell_is_open(region, domains, i);
+                 tiles &= tiles - UINT32_C(1)) {
+                const uint32_t tile = tiles & (~tiles + UINT32_C(1));
+                if ((domains[i] & tile) == 0) {
+                    continue;
+                }
+                if (hooks->stop(hooks->context)) {
+                    return PROBE_OK;
+                }
+
+                const ProbeStatus probed =
+                    hooks->try_tile(hooks->context, i, tile);
+                ++counters->probes;
+                if (probed != PROBE_CONFLICT) {
+                    if (probed == PROBE_ERROR) {
+                        return PROBE_ERROR;
+                    }
+                    continue;
+                }
+
+                ++counters->prunes;
+                pruned = true;
+                const ProbeStatus status = hooks->remove_tile(
+                    hooks->context,
+                    i,
+                    tile,
+                    out_conflict_cell
+                );
+                if (status != PROBE_OK) {
+                    return status;
+                }
+            }
+        }
+    }
+    return PROBE_OK;
+}
@@ -0,0 +1,58 @@
+#ifndef WANG_SINGLETON_PROBING_H
+#define WANG_SINGLETON_PROBING_H
+
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+
+#include "wang/region.h"
+
+typedef enum {
+    PROBE_ERROR = -1,
+    PROBE_CONFLICT = 0,
+    PROBE_OK = 1
+} ProbeStatus;
+
+/*
+ * The propagator that probing drives, over the domains it narrows.
+ * try_tile assigns the single-tile set tile to cell, propagates, undoes
+ * both, and returns the propagation status. remove_tile removes tile from
+ * cell and propagates the removal, storing the cell left without a tile on
+ * conflict. stop is polled before every probe; a true result ends probing
+ * with PROBE_OK.
+ */
+typedef struct {
+    ProbeStatus (*try_tile)(void *context, size_t cell, uint32_t tile);
+    ProbeStatus (*remove_tile)(
+        void *context,
+        size_t cell,
+        uint32_t tile,
+        size_t *out_conflict_cell
+    );
+    bool (*stop)(void *context);
+    void *context;
+} ProbeHooks;
+
+typedef struct {
+    /* Tiles probed, and those removed because their probe wiped out. */
+    uint64_t probes;
+    uint64_t prunes;
+} ProbeCounters;
+
+/*
+ * Singleton arc consistency by failed-literal probing. Each tile of each
+ * open cell of region is tried; a tile whose assignment wipes out a domain
+ * is removed and the removal propagated. Passes repeat until one removes
+ * nothing. domains is the live row-major array the hooks narrow. On
+ * PROBE_CONFLICT, *out_conflict_cell is the cell remove_tile reported. The
+ * counters are added to.
+ */
+ProbeStatus probe_passes(
+    const Region *region,
+    const uint32_t *domains,
+    const ProbeHooks *hooks,
+    size_t *out_conflict_cell,
+    ProbeCounters *counters
+);
+
+#endif /* WANG_SINGLETON_PROBING_H */
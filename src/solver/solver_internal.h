@@ -0,0 +1,108 @@
+#ifndef WANG_SOLVER_INTERNAL_H
+#define WANG_SOLVER_INTERNAL_H
+
+#include <stdatomic.h>
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+
+#include "wang/region.h"
+#include "wang/solver.h"
+
+/*
+ * Private hooks between the serial core and the OpenMP driver. They are not
+ * installed with the public headers and may change with either side.
+ */
+
+/*
+ * Bounds shared by cooperating solves of one region. Any nonzero stop_flag
+ * ends the solve as UNKNOWN, like options->cancel_flag. When node_count is
+ * non-NULL, each solve adds its DFS nodes to it at every bound poll and at
+ * return, and options->node_limit bounds that shared total instead of the
+ * solve's own count; the limit is then approximate by at most one poll
+ * interval per solve.
+ */
+typedef struct {
+    const atomic_int *stop_flag;
+    atomic_uint_fast64_t *node_count;
+} SolverSharedBounds;
+
+/* wang_solver_context_solve() with shared bounds; shared may be NULL. */
+WangSolveStatus solver_context_solve_shared(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolverEngine engine,
+    const SolverSharedBounds *shared,
+    WangSolveResult *out_result
+);
+
+/*
+ * solver_context_solve_shared() for callers that read only the status, the
+ * witness, and the counters they merge. A root that options->root_fixpoint
+ * contradicts is not propagated again cold, so its conflict cell, snapshot,
+ * and counters describe the warm propagation.
+ */
+WangSolveStatus solver_context_solve_status(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolverEngine engine,
+    const SolverSharedBounds *shared,
+    WangSolveResult *out_result
+);
+
+/*
+ * solver_context_solve_shared() with the optimized engine, resolving only
+ * the cell_count cells of cells: typically one component written by
+ * solver_label_components() for the same options. The cells must be active;
+ * other cells keep their propagated domains and are never branched on, so
+ * SAT returns a partial dense witness that the caller must merge and verify.
+ * UNSAT means no assignment of these cells extends the root.
+ */
+WangSolveStatus solver_context_solve_scoped(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    const SolverSharedBounds *shared,
+    const size_t *cells,
+    size_t cell_count,
+    WangSolveResult *out_result
+);
+
+/*
+ * Group the open active cells of domains, those with two or more tiles, into
+ * components joined through open N/E/S/W neighbors. Writes each component's
+ * cells in ascending order to out_cells, components in order of their lowest
+ * cell, and each component's offset followed by the total to out_starts.
+ * out_cells needs region->cell_count entries and out_starts one more.
+ * Returns the component count, or SIZE_MAX when allocation fails.
+ */
+size_t solver_label_components(
+    const Region *region,
+    const uint32_t *domains,
+    size_t *out_cells,
+    size_t *out_starts
+);
+
+/*
+ * Initialize and propagate the root of region under options, without
+ * searching, and copy the dense domains to out_domains (cell_count entries).
+ * Only options->initial_domains, options->root_fixpoint and
+ * WANG_SOLVE_BITSLICE_PROPAGATION are used; all are validated like a
+ * solve. *out_contradiction reports a root conflict, after which
+ * out_domains is unspecified. Returns false on invalid input or allocation
+ * failure.
+ */
+bool solver_context_propagate(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    uint32_t *out_domains,
+    bool *out_contradiction
+);
+
+/* Whether result is zeroed or destroyed, as every entry point requires. */
+bool solver_result_is_destroyed(const WangSolveResult *result);
+
+#endif /* WANG_SOLVER_INTERNAL_H */
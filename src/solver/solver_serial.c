@@ -1,7 +1,17 @@
+#define _POSIX_C_SOURCE 200809L
+
 #include "wang/solver.h"
 
+#include "bitslice_propagation.h"
 #include "byte_support_table.h"
 #include "failed_leaf_trace.h"
+#include "frontier_dp.h"
+#include "root_cache.h"
+#include "search_checkpoint.h"
+#include "singleton_probing.h"
+#include "solver_internal.h"
+#include "tiling_count.h"
+#include "weighted_degree.h"
 #include "wang/tile.h"
 #include "wang/verify.h"
 
@@ -9,28 +19,35 @@
 #include <stdint.h>
 #include <stdlib.h>
 #include <string.h>
+#include <time.h>
 
 #ifndef WANG_OPTIMIZED_QUEUE_DEDUP
 #define WANG_OPTIMIZED_QUEUE_DEDUP 1
 #endif
 
+#ifndef WANG_OPTIMIZED_MRV_INDEX
+#define WANG_OPTIMIZED_MRV_INDEX 1
+#endif
+
+/* Open domains have 2..TILE_COUNT tiles; bucket b holds size b + 2. */
+#define MRV_BUCKET_COUNT (TILE_COUNT - 1u)
+
+/* Decisions between polls of the deadline clock and the cancel flag. */
+#define SEARCH_BOUND_POLL_INTERVAL 64u
+
+/* Learned nogoods kept at once, and the longest one worth keeping. */
+#define NOGOOD_CAPACITY 1024u
+#define NOGOOD_MAX_LITERALS 8u
+#define NOGOOD_NONE UINT32_MAX
+
+/* Failed leaves per restart budget unit when the options leave it zero. */
+#define RESTART_DEFAULT_BASE 100u
+
 typedef struct {
     uint32_t edge_mask[DIR_COUNT][COLOR_COUNT];
     uint32_t compat[DIR_COUNT][TILE_COUNT];
 } SolverTables;
 
-typedef struct {
-    size_t cell_index;
-    uint32_t old_domain;
-} TrailEntry;
-
-typedef struct {
-    size_t cell_index;
-    uint32_t candidates;
-    /* Trail position before the parent branch entered this node. */
-    size_t entry_mark;
-} SearchFrame;
-
 typedef enum {
     SEARCH_STACK_FIXED,
     SEARCH_STACK_DYNAMIC
@@ -42,13 +59,98 @@ typedef struct {
     bool transfer_sat_domains;
     bool use_bytewise_support;
     bool deduplicate_queue;
+    bool use_mrv_index;
+    bool allow_decomposition;
+    bool allow_learning;
+    bool allow_restarts;
+    bool allow_bitslice;
+    bool allow_frontier;
+    bool allow_value_scoring;
+    bool allow_probing;
+    bool allow_weighted_degree;
+    bool allow_checkpoint;
+    /* Always decide by the frontier engine, never by DFS. */
+    bool force_frontier;
+    /* Continue the DFS saved at options->checkpoint_path. */
+    bool resume_checkpoint;
+    /* Keep the warm diagnostics of a root that root_fixpoint contradicts. */
+    bool keep_warm_root_conflict;
 } SolverMechanisms;
 
+static const SolverMechanisms REFERENCE_MECHANISMS = {
+    .stack_mode = SEARCH_STACK_FIXED,
+    .record_initial_trail = true,
+    .transfer_sat_domains = false,
+    .use_bytewise_support = false,
+    .deduplicate_queue = false,
+    .use_mrv_index = false,
+    .allow_decomposition = false,
+    .allow_learning = false,
+    .allow_restarts = false,
+    .allow_bitslice = false,
+    .allow_frontier = false,
+    .allow_value_scoring = false,
+    .allow_probing = false,
+    .allow_weighted_degree = false,
+    .allow_checkpoint = false,
+    .force_frontier = false,
+    .resume_checkpoint = false,
+    .keep_warm_root_conflict = false,
+};
+
+static const SolverMechanisms OPTIMIZED_MECHANISMS = {
+    .stack_mode = SEARCH_STACK_DYNAMIC,
+    .record_initial_trail = false,
+    .transfer_sat_domains = true,
+    .use_bytewise_support = true,
+    .deduplicate_queue = WANG_OPTIMIZED_QUEUE_DEDUP != 0,
+    .use_mrv_index = WANG_OPTIMIZED_MRV_INDEX != 0,
+    .allow_decomposition = true,
+    .allow_learning = true,
+    .allow_restarts = true,
+    .allow_bitslice = true,
+    .allow_frontier = true,
+    .allow_value_scoring = true,
+    .allow_probing = true,
+    .allow_weighted_degree = true,
+    .allow_checkpoint = true,
+    .force_frontier = false,
+    .resume_checkpoint = false,
+    .keep_warm_root_conflict = false,
+};
+
+static const SolverMechanisms FRONTIER_MECHANISMS = {
+    .stack_mode = SEARCH_STACK_DYNAMIC,
+    .record_initial_trail = false,
+    .transfer_sat_domains = true,
+    .use_bytewise_support = true,
+    .deduplicate_queue = WANG_OPTIMIZED_QUEUE_DEDUP != 0,
+    .use_mrv_index = false,
+    .allow_decomposition = false,
+    .allow_learning = false,
+    .allow_restarts = false,
+    .allow_bitslice = true,
+    .allow_frontier = true,
+    .allow_value_scoring = true,
+    .allow_probing = false,
+    .allow_weighted_degree = false,
+    .allow_checkpoint = false,
+    .force_frontier = true,
+    .resume_checkpoint = false,
+    .keep_warm_root_conflict = false,
+};
+
 typedef enum {
     TRAIL_PHASE_INITIAL,
     TRAIL_PHASE_SEARCH
 } TrailPhase;
 
+/* Cells a component solve must resolve; see solver_context_solve_scoped(). */
+typedef struct {
+    const size_t *cells;
+    size_t count;
+} SolverScope;
+
 typedef struct {
     SearchFrame *frames;
     size_t count;
@@ -57,13 +159,149 @@ typedef struct {
     size_t allocated_bytes;
 } SearchStack;
 
+/*
+ * Components that one decision (or the root) split the current scope into.
+ * They are searched in order; the group is discarded when the last one is
+ * resolved, or when one of them fails.
+ */
+typedef struct {
+    /* First of component_count + 1 offsets into ComponentStorage.starts. */
+    size_t first_start;
+    size_t component_count;
+    size_t current;
+    /* Frame whose decision split the scope, or SIZE_MAX at the root. */
+    size_t split_frame;
+    /* Trail mark before that decision. */
+    size_t split_mark;
+    /* Stack index of the current component's first frame. */
+    size_t root_frame;
+} ComponentGroup;
+
+/* Component decomposition state; empty unless decomposition was requested. */
+typedef struct {
+    /* Per-cell labelling scratch; SIZE_MAX outside a labelling pass. */
+    size_t *labels;
+    size_t label_capacity;
+    /* Cells of every live component, ascending within each component. */
+    size_t *cells;
+    size_t cell_count;
+    size_t cell_capacity;
+    /* Each group's component offsets into cells, plus its end offset. */
+    size_t *starts;
+    size_t start_count;
+    size_t start_capacity;
+    ComponentGroup *groups;
+    size_t group_count;
+    size_t group_capacity;
+} ComponentStorage;
+
+/*
+ * A learned nogood: decisions cell == tile that cannot all hold at once.
+ * next and prev link each literal into the occurrence list of its cell;
+ * an occurrence is nogood index * NOGOOD_MAX_LITERALS + literal slot.
+ */
+typedef struct {
+    size_t cells[NOGOOD_MAX_LITERALS];
+    uint32_t next[NOGOOD_MAX_LITERALS];
+    uint32_t prev[NOGOOD_MAX_LITERALS];
+    TileId tiles[NOGOOD_MAX_LITERALS];
+    uint8_t count;
+    /* Least recently used order; lru_head is the most recent. */
+    uint32_t lru_prev;
+    uint32_t lru_next;
+} Nogood;
+
+/* A frame's conflict set, stored at offset words into the row pool. */
+typedef struct {
+    size_t level;
+    size_t offset;
+} ConflictRow;
+
+/* Conflict analysis and nogood state; empty unless learning was requested. */
+typedef struct {
+    /*
+     * Why each trail entry was written, parallel to the trail: the cell whose
+     * propagation narrowed it, or cell_count + level for a decision.
+     */
+    size_t *reasons;
+    size_t reason_capacity;
+    /* Cells still to explain during one analysis, by stamp. */
+    uint32_t *marks;
+    size_t mark_capacity;
+    uint32_t mark_stamp;
+    /*
+     * Conflict set of a DFS frame: a bitset of the shallower decision levels
+     * its failed values depended on, level / 64 + 1 words long. Only frames
+     * that saw a failure get a row, so a deep search without failures needs
+     * none. Rows are stacked in level order in row_words; frame_rows maps a
+     * live level to its row, or SIZE_MAX.
+     */
+    uint64_t *row_words;
+    size_t row_word_capacity;
+    ConflictRow *rows;
+    size_t row_count;
+    size_t row_capacity;
+    size_t *frame_rows;
+    size_t frame_row_capacity;
+    /* A copy of an exhausted frame's row while its target row is made. */
+    uint64_t *scratch;
+    size_t scratch_capacity;
+    Nogood *nogoods;
+    size_t nogood_count;
+    uint32_t lru_head;
+    uint32_t lru_tail;
+    /* First occurrence on each cell, or NOGOOD_NONE. */
+    uint32_t *cell_heads;
+    size_t head_capacity;
+} LearningStorage;
+
+/*
+ * Storage that outlives one solve. The one-shot entry points use a
+ * zero-initialized workspace on the stack and clear it before returning;
+ * a WangSolverContext owns one across calls.
+ */
+typedef struct {
+    SolverTables tables;
+    bool tables_ready;
+    ByteSupportTables *byte_support;
+
+    uint32_t *domains;
+    size_t domain_capacity;
+    uint8_t *neighbor_mask;
+    size_t neighbor_capacity;
+    TrailEntry *trail;
+    size_t trail_capacity;
+    size_t *queue;
+    size_t queue_capacity;
+    uint64_t *queue_pending_storage;
+    size_t queue_pending_capacity;
+    uint64_t *mrv_index_storage;
+    size_t mrv_index_capacity;
+    uint64_t *bitslice_storage;
+    size_t bitslice_capacity;
+    double *arc_weights;
+    size_t arc_weight_capacity;
+    uint32_t *best_snapshot;
+    size_t best_snapshot_capacity;
+    SearchStack stack;
+    ComponentStorage components;
+    LearningStorage learning;
+} SolverWorkspace;
+
+struct WangSolverContext {
+    SolverWorkspace workspace;
+    RootCache root_cache;
+};
+
 typedef struct {
     const Region *region;
     SolverTables tables;
     ByteSupportTables *byte_support;
 
     uint32_t *domains;
+    size_t domain_capacity;
     uint8_t *neighbor_mask;
+    size_t neighbor_capacity;
     size_t cell_count;
     size_t active_count;
     size_t resolved_count;
@@ -79,18 +317,111 @@ typedef struct {
     size_t *queue;
     size_t queue_count;
     size_t queue_capacity;
+    /* Either NULL or queue_pending_storage, when deduplication is active. */
     uint64_t *queue_pending_bits;
+    uint64_t *queue_pending_storage;
+    size_t queue_pending_capacity;
     size_t *queue_pending_counts;
     size_t queue_unique_count;
     bool has_neighbor_arcs;
     bool deduplicate_queue;
 
+    /*
+     * Optimized MRV index over open active cells: for each domain size, a
+     * cell bitset plus a summary bitset of its nonzero words. It exists only
+     * during search, when mrv_index_active is set.
+     */
+    uint64_t *mrv_index_storage;
+    size_t mrv_index_capacity;
+    uint64_t *mrv_index_bits;
+    uint64_t *mrv_index_summary;
+    size_t mrv_index_words;
+    size_t mrv_index_summary_words;
+    size_t mrv_bucket_counts[MRV_BUCKET_COUNT];
+    bool use_mrv_index;
+    bool mrv_index_active;
+
+    /* Tile bitplanes for bit-sliced root propagation; see bitslice_load(). */
+    uint64_t *bitslice_storage;
+    size_t bitslice_capacity;
+
+    /*
+     * Cells the search must resolve, or NULL for every active cell. Groups
+     * in components narrow it further while decomposition is active.
+     */
+    const size_t *scope_cells;
+    size_t scope_count;
+    bool decompose_root;
+    bool decompose_each_decision;
+    ComponentStorage components;
+
+    bool learn_nogoods;
+    LearningStorage learning;
+
     uint32_t *best_snapshot;
+    size_t best_snapshot_capacity;
     size_t best_resolved_count;
     size_t best_depth;
     size_t best_conflict_cell;
     bool has_best_leaf;
 
+    uint64_t dfs_node_count;
+    uint64_t node_limit;
+    uint64_t deadline_ns;
+    const atomic_int *cancel_flag;
+    const atomic_int *stop_flag;
+    atomic_uint_fast64_t *shared_node_count;
+    uint64_t flushed_node_count;
+    unsigned bound_poll_countdown;
+
+    WangValueOrder value_order;
+    WangTieBreak tie_break;
+    uint64_t random_state;
+
+    /* Restarts: failed leaves left in the current run, and runs so far. */
+    WangRestartSchedule restart_schedule;
+    uint64_t restart_base;
+    uint64_t restart_seed;
+    uint64_t restart_leaves_left;
+    uint64_t restart_count;
+
+    /*
+     * Singleton probing: after root propagation, and after decisions up to
+     * probe_depth. probe_budget_ns is what remains of the budget, or zero
+     * without one, and probe_deadline_ns ends the current pass; once a bound
+     * is reached, probe_stopped ends probing for the rest of the solve.
+     */
+    bool probe_singletons;
+    size_t probe_depth;
+    uint64_t probe_budget_ns;
+    uint64_t probe_deadline_ns;
+    bool probe_stopped;
+
+    /*
+     * Weighted-degree selection: the arc weights laid over arc_weights, two
+     * per cell. MRV selects until the first failed leaf sets
+     * weights_active.
+     */
+    bool weighted_degree;
+    bool weights_active;
+    double *arc_weights;
+    size_t arc_weight_capacity;
+    ArcWeights weights;
+
+    /*
+     * Checkpointing: the file each checkpoint replaces, the time between
+     * checkpoints, when the next one is due, and decisions until the clock
+     * is next read. The fingerprints identify the solve in the file.
+     */
+    const char *checkpoint_path;
+    uint64_t checkpoint_interval_ns;
+    uint64_t checkpoint_due_ns;
+    unsigned checkpoint_countdown;
+    uint64_t checkpoint_region_fingerprint;
+    uint64_t checkpoint_options_fingerprint;
+
+    SearchStack stack;
+
     bool collect_metrics;
     bool capture_unsat_snapshot;
     WangSolverMetrics metrics;
@@ -138,6 +469,25 @@ static TileId first_set_tile(uint32_t domain)
     return tile;
 }
 
+static TileId last_set_tile(uint32_t domain)
+{
+    TileId tile = 0;
+    while ((domain >>= 1) != 0) {
+        ++tile;
+    }
+    return tile;
+}
+
+/* splitmix64, so that nearby seeds, including zero, start far apart. */
+static uint64_t seed_random_state(uint64_t seed)
+{
+    uint64_t mixed = seed + UINT64_C(0x9e3779b97f4a7c15);
+    mixed = (mixed ^ (mixed >> 30)) * UINT64_C(0xbf58476d1ce4e5b9);
+    mixed = (mixed ^ (mixed >> 27)) * UINT64_C(0x94d049bb133111eb);
+    mixed ^= mixed >> 31;
+    return mixed != 0 ? mixed : UINT64_C(1);
+}
+
 static bool metrics_are_zero(const WangSolverMetrics *metrics)
 {
     return metrics->dfs_nodes == 0 &&
@@ -150,6 +500,25 @@ static bool metrics_are_zero(const WangSolverMetrics *metrics)
         metrics->support_byte_lookups == 0 &&
         metrics->support_table_bytes == 0 &&
         metrics->mrv_cells_scanned == 0 &&
+        metrics->mrv_index_updates == 0 &&
+        metrics->mrv_index_bytes == 0 &&
+        metrics->component_splits == 0 &&
+        metrics->components == 0 &&
+        metrics->nogoods_learned == 0 &&
+        metrics->nogoods_evicted == 0 &&
+        metrics->nogood_hits == 0 &&
+        metrics->backjumps == 0 &&
+        metrics->backjump_levels == 0 &&
+        metrics->restarts == 0 &&
+        metrics->bitslice_passes == 0 &&
+        metrics->bitslice_words == 0 &&
+        metrics->frontier_states == 0 &&
+        metrics->frontier_peak_states == 0 &&
+        metrics->value_scorings == 0 &&
+        metrics->value_score_lookups == 0 &&
+        metrics->probes == 0 &&
+        metrics->probe_prunes == 0 &&
+        metrics->weight_bumps == 0 &&
         metrics->initial_trail_writes == 0 &&
         metrics->search_trail_writes == 0 &&
         metrics->initial_trail_rewrites == 0 &&
@@ -168,7 +537,7 @@ static bool metrics_are_zero(const WangSolverMetrics *metrics)
         metrics->sat_result_copy_bytes == 0;
 }
 
-static bool result_is_destroyed(const WangSolveResult *result)
+bool solver_result_is_destroyed(const WangSolveResult *result)
 {
     return result != NULL &&
         result->domains == NULL &&
@@ -217,28 +586,153 @@ static bool solver_tables_are_valid(const SolverTables *tables)
     return true;
 }
 
-static void solver_state_destroy(SolverState *state)
+static void solver_state_adopt(
+    SolverState *state,
+    SolverWorkspace *workspace
+)
 {
-    if (state == NULL) {
-        return;
-    }
+    state->byte_support = workspace->byte_support;
+    state->domains = workspace->domains;
+    state->domain_capacity = workspace->domain_capacity;
+    state->neighbor_mask = workspace->neighbor_mask;
+    state->neighbor_capacity = workspace->neighbor_capacity;
+    state->trail = workspace->trail;
+    state->trail_capacity = workspace->trail_capacity;
+    state->queue = workspace->queue;
+    state->queue_capacity = workspace->queue_capacity;
+    state->queue_pending_storage = workspace->queue_pending_storage;
+    state->queue_pending_capacity = workspace->queue_pending_capacity;
+    state->mrv_index_storage = workspace->mrv_index_storage;
+    state->mrv_index_capacity = workspace->mrv_index_capacity;
+    state->bitslice_storage = workspace->bitslice_storage;
+    state->bitslice_capacity = workspace->bitslice_capacity;
+    state->arc_weights = workspace->arc_weights;
+    state->arc_weight_capacity = workspace->arc_weight_capacity;
+    state->best_snapshot = workspace->best_snapshot;
+    state->best_snapshot_capacity = workspace->best_snapshot_capacity;
+    state->stack = workspace->stack;
+    state->components = workspace->components;
+    state->learning = workspace->learning;
+}
 
+/*
+ * Finish the per-solve trace and metric storage and hand every retained
+ * buffer back to the workspace. A buffer transferred into a result has
+ * already been detached from the state and is simply not returned. The
+ * byte support table stays owned by the workspace throughout.
+ */
+static void solver_state_release(
+    SolverState *state,
+    SolverWorkspace *workspace
+)
+{
     if (state->writer.active) {
         (void)failed_leaf_writer_finish(&state->writer);
     }
-    free(state->domains);
-    free(state->neighbor_mask);
-    free(state->byte_support);
-    free(state->trail);
     free(state->trail_cell_interval);
-    free(state->queue);
-    free(state->queue_pending_bits);
     free(state->queue_pending_counts);
-    free(state->best_snapshot);
+
+    workspace->domains = state->domains;
+    workspace->domain_capacity = state->domain_capacity;
+    workspace->neighbor_mask = state->neighbor_mask;
+    workspace->neighbor_capacity = state->neighbor_capacity;
+    workspace->trail = state->trail;
+    workspace->trail_capacity = state->trail_capacity;
+    workspace->queue = state->queue;
+    workspace->queue_capacity = state->queue_capacity;
+    workspace->queue_pending_storage = state->queue_pending_storage;
+    workspace->queue_pending_capacity = state->queue_pending_capacity;
+    workspace->mrv_index_storage = state->mrv_index_storage;
+    workspace->mrv_index_capacity = state->mrv_index_capacity;
+    workspace->bitslice_storage = state->bitslice_storage;
+    workspace->bitslice_capacity = state->bitslice_capacity;
+    workspace->arc_weights = state->arc_weights;
+    workspace->arc_weight_capacity = state->arc_weight_capacity;
+    workspace->best_snapshot = state->best_snapshot;
+    workspace->best_snapshot_capacity = state->best_snapshot_capacity;
+    workspace->stack = state->stack;
+    workspace->stack.count = 0;
+    workspace->components = state->components;
+    workspace->components.cell_count = 0;
+    workspace->components.start_count = 0;
+    workspace->components.group_count = 0;
+    workspace->learning = state->learning;
+    workspace->learning.nogood_count = 0;
+    workspace->learning.row_count = 0;
+
     memset(state, 0, sizeof(*state));
     state->writer.fd = -1;
 }
 
+static void solver_workspace_clear(SolverWorkspace *workspace)
+{
+    free(workspace->byte_support);
+    free(workspace->domains);
+    free(workspace->neighbor_mask);
+    free(workspace->trail);
+    free(workspace->queue);
+    free(workspace->queue_pending_storage);
+    free(workspace->mrv_index_storage);
+    free(workspace->bitslice_storage);
+    free(workspace->arc_weights);
+    free(workspace->best_snapshot);
+    free(workspace->stack.frames);
+    free(workspace->components.labels);
+    free(workspace->components.cells);
+    free(workspace->components.starts);
+    free(workspace->components.groups);
+    free(workspace->learning.reasons);
+    free(workspace->learning.marks);
+    free(workspace->learning.row_words);
+    free(workspace->learning.rows);
+    free(workspace->learning.frame_rows);
+    free(workspace->learning.scratch);
+    free(workspace->learning.nogoods);
+    free(workspace->learning.cell_heads);
+    memset(workspace, 0, sizeof(*workspace));
+}
+
+/*
+ * Return a buffer of at least needed elements, reusing the current one when
+ * it is large enough. The old contents are dead, so a larger buffer replaces
+ * it without a realloc() copy. NULL means the old buffer was released too.
+ */
+static void *reserve_cell_buffer(
+    void *buffer,
+    size_t *capacity,
+    size_t needed,
+    size_t element_size
+)
+{
+    if (buffer != NULL && needed <= *capacity) {
+        return buffer;
+    }
+
+    free(buffer);
+    *capacity = 0;
+    size_t bytes;
+    if (!checked_mul_size(needed, element_size, &bytes)) {
+        return NULL;
+    }
+
+    void *reserved = malloc(bytes == 0 ? 1 : bytes);
+    if (reserved != NULL) {
+        *capacity = needed;
+    }
+    return reserved;
+}
+
+/* A reused trail never grows past its retained capacity. */
+static void note_retained_trail_capacity(SolverState *state)
+{
+    if (state->collect_metrics &&
+        state->trail_capacity > state->metrics.trail_capacity_peak) {
+        state->metrics.trail_capacity_peak = state->trail_capacity;
+        state->metrics.trail_bytes_peak =
+            state->trail_capacity * sizeof(*state->trail);
+    }
+}
+
 static bool ensure_trail_capacity(SolverState *state, size_t needed)
 {
     if (needed <= state->trail_capacity) {
@@ -304,22 +798,49 @@ static bool ensure_queue_capacity(SolverState *state, size_t needed)
     return true;
 }
 
-static bool ensure_best_snapshot(SolverState *state)
+/*
+ * Return buffer grown to at least needed elements with its contents kept,
+ * or NULL with buffer and *capacity untouched when that fails.
+ */
+static void *grow_buffer(
+    void *buffer,
+    size_t *capacity,
+    size_t needed,
+    size_t element_size
+)
 {
-    if (state->best_snapshot != NULL) {
-        return true;
+    if (buffer != NULL && needed <= *capacity) {
+        return buffer;
+    }
+
+    size_t grown = *capacity == 0 ? 64 : *capacity;
+    while (grown < needed) {
+        if (grown > SIZE_MAX / 2) {
+            grown = needed;
+            break;
+        }
+        grown *= 2;
     }
 
     size_t bytes;
-    if (!checked_mul_size(
-            state->cell_count,
-            sizeof(*state->best_snapshot),
-            &bytes
-        )) {
-        return false;
+    if (!checked_mul_size(grown, element_size, &bytes)) {
+        return NULL;
     }
+    void *resized = realloc(buffer, bytes);
+    if (resized != NULL) {
+        *capacity = grown;
+    }
+    return resized;
+}
 
-    state->best_snapshot = malloc(bytes);
+static bool ensure_best_snapshot(SolverState *state)
+{
+    state->best_snapshot = reserve_cell_buffer(
+        state->best_snapshot,
+        &state->best_snapshot_capacity,
+        state->cell_count,
+        sizeof(*state->best_snapshot)
+    );
     return state->best_snapshot != NULL;
 }
 
@@ -340,13 +861,17 @@ static bool allocate_queue_dedup_index(SolverState *state)
         return false;
     }
 
-    state->queue_pending_bits = calloc(
+    state->queue_pending_storage = reserve_cell_buffer(
+        state->queue_pending_storage,
+        &state->queue_pending_capacity,
         word_count,
-        sizeof(*state->queue_pending_bits)
+        sizeof(*state->queue_pending_storage)
     );
-    if (state->queue_pending_bits == NULL) {
+    if (state->queue_pending_storage == NULL) {
         return false;
     }
+    memset(state->queue_pending_storage, 0, bytes);
+    state->queue_pending_bits = state->queue_pending_storage;
     if (state->collect_metrics) {
         state->metrics.queue_dedup_index_bytes = bytes;
     }
@@ -449,6 +974,93 @@ static void note_queue_occupancy(SolverState *state, size_t occupancy)
     }
 }
 
+/* Index of the lowest set bit of a nonzero word (de Bruijn lookup). */
+static unsigned lowest_bit_index(uint64_t word)
+{
+    static const unsigned char positions[64] = {
+        0, 1, 2, 53, 3, 7, 54, 27, 4, 38, 41, 8, 34, 55, 48, 28,
+        62, 5, 39, 46, 44, 42, 22, 9, 24, 35, 59, 56, 49, 18, 29, 11,
+        63, 52, 6, 26, 37, 40, 33, 47, 61, 45, 43, 21, 23, 58, 17, 10,
+        51, 25, 36, 32, 60, 20, 57, 16, 50, 31, 19, 15, 30, 14, 13, 12,
+    };
+    return positions[((word & (~word + UINT64_C(1))) *
+                      UINT64_C(0x022fdd63cc95386d)) >> 58];
+}
+
+/* Index of the highest set bit of a nonzero word. */
+static unsigned highest_bit_index(uint64_t word)
+{
+    word |= word >> 1;
+    word |= word >> 2;
+    word |= word >> 4;
+    word |= word >> 8;
+    word |= word >> 16;
+    word |= word >> 32;
+    return lowest_bit_index(word ^ (word >> 1));
+}
+
+static void mrv_index_insert(
+    SolverState *state,
+    size_t cell_index,
+    unsigned size
+)
+{
+    const size_t bucket = size - 2u;
+    const size_t word = cell_index / 64u;
+    state->mrv_index_bits[bucket * state->mrv_index_words + word] |=
+        UINT64_C(1) << (cell_index % 64u);
+    state->mrv_index_summary[
+        bucket * state->mrv_index_summary_words + word / 64u
+    ] |= UINT64_C(1) << (word % 64u);
+    ++state->mrv_bucket_counts[bucket];
+}
+
+static void mrv_index_remove(
+    SolverState *state,
+    size_t cell_index,
+    unsigned size
+)
+{
+    const size_t bucket = size - 2u;
+    const size_t word = cell_index / 64u;
+    uint64_t *bits =
+        &state->mrv_index_bits[bucket * state->mrv_index_words + word];
+    *bits &= ~(UINT64_C(1) << (cell_index % 64u));
+    if (*bits == 0) {
+        state->mrv_index_summary[
+            bucket * state->mrv_index_summary_words + word / 64u
+        ] &= ~(UINT64_C(1) << (word % 64u));
+    }
+    --state->mrv_bucket_counts[bucket];
+}
+
+/* Move a cell between buckets after its domain changed. */
+static void mrv_index_update(
+    SolverState *state,
+    size_t cell_index,
+    uint32_t old_domain,
+    uint32_t new_domain
+)
+{
+    const unsigned old_size = domain_popcount(old_domain);
+    const unsigned new_size = domain_popcount(new_domain);
+    if (old_size == new_size) {
+        return;
+    }
+    if (old_size > 1) {
+        mrv_index_remove(state, cell_index, old_size);
+        if (state->collect_metrics) {
+            ++state->metrics.mrv_index_updates;
+        }
+    }
+    if (new_size > 1) {
+        mrv_index_insert(state, cell_index, new_size);
+        if (state->collect_metrics) {
+            ++state->metrics.mrv_index_updates;
+        }
+    }
+}
+
 static void begin_trail_interval(SolverState *state)
 {
     if (!state->collect_metrics) {
@@ -467,10 +1079,15 @@ static void begin_trail_interval(SolverState *state)
     }
 }
 
+/*
+ * Narrow cell_index to new_domain. reason is recorded for conflict analysis
+ * when learning: the propagating cell, or cell_count + level for a decision.
+ */
 static bool restrict_domain(
     SolverState *state,
     size_t cell_index,
-    uint32_t new_domain
+    uint32_t new_domain,
+    size_t reason
 )
 {
     const uint32_t old_domain = state->domains[cell_index];
@@ -485,6 +1102,20 @@ static bool restrict_domain(
         if (!ensure_trail_capacity(state, state->trail_count + 1)) {
             return false;
         }
+        if (state->learn_nogoods) {
+            LearningStorage *learning = &state->learning;
+            size_t *reasons = grow_buffer(
+                learning->reasons,
+                &learning->reason_capacity,
+                state->trail_count + 1u,
+                sizeof(*learning->reasons)
+            );
+            if (reasons == NULL) {
+                return false;
+            }
+            learning->reasons = reasons;
+            reasons[state->trail_count] = reason;
+        }
 
         state->trail[state->trail_count++] = (TrailEntry) {
             .cell_index = cell_index,
@@ -513,6 +1144,9 @@ static bool restrict_domain(
         ++state->resolved_count;
     }
 
+    if (state->mrv_index_active) {
+        mrv_index_update(state, cell_index, old_domain, new_domain);
+    }
     state->domains[cell_index] = new_domain;
     if (state->collect_metrics) {
         ++state->metrics.domain_reductions;
@@ -544,6 +1178,14 @@ static void rollback_to(SolverState *state, size_t mark)
             ++state->resolved_count;
         }
 
+        if (state->mrv_index_active) {
+            mrv_index_update(
+                state,
+                entry.cell_index,
+                current,
+                entry.old_domain
+            );
+        }
         state->domains[entry.cell_index] = entry.old_domain;
     }
 }
@@ -645,7 +1287,7 @@ static PropagateStatus propagate_queue(
                 continue;
             }
 
-            if (!restrict_domain(state, adjacent, new_domain)) {
+            if (!restrict_domain(state, adjacent, new_domain, cell_index)) {
                 queue_discard_pending(state, head);
                 return PROPAGATE_ERROR;
             }
@@ -694,6 +1336,116 @@ static PropagateStatus propagate_initial(
     return propagate_queue(state, out_conflict_cell);
 }
 
+/*
+ * Reach the same root fixpoint as propagate_initial() over tile bitplanes,
+ * revising 64 cells per word. Arc consistency has one greatest fixpoint, so
+ * the domains written back match the queue's exactly. A wipeout runs the
+ * queue from the untouched domains instead, so the conflict cell and best
+ * leaf match a queue solve too.
+ */
+static PropagateStatus propagate_initial_bitsliced(
+    SolverState *state,
+    size_t *out_conflict_cell
+)
+{
+    const size_t width = (size_t)state->region->width;
+    const size_t height = (size_t)state->region->height;
+    size_t word_count;
+    if (!bitslice_storage_words(width, height, &word_count)) {
+        return PROPAGATE_ERROR;
+    }
+    state->bitslice_storage = reserve_cell_buffer(
+        state->bitslice_storage,
+        &state->bitslice_capacity,
+        word_count == 0 ? 1u : word_count,
+        sizeof(*state->bitslice_storage)
+    );
+    if (state->bitslice_storage == NULL) {
+        return PROPAGATE_ERROR;
+    }
+
+    BitslicePlanes planes;
+    bitslice_load(
+        &planes,
+        state->bitslice_storage,
+        width,
+        height,
+        state->domains,
+        state->neighbor_mask
+    );
+    uint64_t passes = 0;
+    uint64_t words_revised = 0;
+    const BitsliceStatus status = bitslice_propagate(
+        &planes,
+        (const BitsliceEdgeMask *)&state->tables.edge_mask,
+        &passes,
+        &words_revised
+    );
+    if (state->collect_metrics) {
+        state->metrics.bitslice_passes += passes;
+        state->metrics.bitslice_words += words_revised;
+    }
+
+    if (status == BITSLICE_WIPEOUT) {
+        return propagate_initial(state, out_conflict_cell);
+    }
+    for (size_t word = 0; word < planes.plane_words; ++word) {
+        if (!bitslice_word_narrowed(&planes, word)) {
+            continue;
+        }
+        uint32_t domains[64];
+        const size_t cells = bitslice_word_domains(&planes, word, domains);
+        const size_t first = (word / planes.words_per_row) * width +
+            (word % planes.words_per_row) * 64u;
+        for (size_t bit = 0; bit < cells; ++bit) {
+            const size_t i = first + bit;
+            if (state->neighbor_mask[i] != 0 &&
+                !restrict_domain(state, i, domains[bit], i)) {
+                return PROPAGATE_ERROR;
+            }
+        }
+    }
+    return PROPAGATE_OK;
+}
+
+/*
+ * Start from a stored root fixpoint instead of the full root queue. Every
+ * linked cell keeps only the tiles allowed by both its initialized domain
+ * and the fixpoint, and only cells narrower than the fixpoint are queued.
+ * Isolated cells keep their initialized choice, exactly as in a cold solve.
+ */
+static PropagateStatus propagate_from_root_fixpoint(
+    SolverState *state,
+    const uint32_t *root_domains,
+    size_t *out_conflict_cell
+)
+{
+    state->queue_count = 0;
+    state->resolved_count = 0;
+    for (size_t i = 0; i < state->cell_count; ++i) {
+        if (!state->region->cells[i].active) {
+            continue;
+        }
+        if (state->neighbor_mask[i] != 0) {
+            const uint32_t narrowed = state->domains[i] & root_domains[i];
+            state->domains[i] = narrowed;
+            if (narrowed == 0) {
+                *out_conflict_cell = i;
+                queue_discard_pending(state, 0);
+                return PROPAGATE_CONFLICT;
+            }
+            if (narrowed != root_domains[i] && !queue_push(state, i)) {
+                queue_discard_pending(state, 0);
+                return PROPAGATE_ERROR;
+            }
+        }
+        if (domain_is_singleton(state->domains[i])) {
+            ++state->resolved_count;
+        }
+    }
+    return propagate_queue(state, out_conflict_cell);
+}
+
 static bool record_failed_leaf(
     SolverState *state,
     size_t conflict_cell,
@@ -736,693 +1488,3455 @@ static bool record_failed_leaf(
     );
 }
 
-static size_t select_mrv_cell(SolverState *state)
+/* xorshift64*, reduced to [0, bound); the modulo bias is negligible. */
+static size_t random_below(SolverState *state, size_t bound)
 {
-    size_t selected = SIZE_MAX;
-    unsigned best_size = TILE_COUNT + 1u;
+    uint64_t value = state->random_state;
+    value ^= value >> 12;
+    value ^= value << 25;
+    value ^= value >> 27;
+    state->random_state = value;
+    return (size_t)((value * UINT64_C(2685821657736338717)) % bound);
+}
 
-    for (size_t i = 0; i < state->cell_count; ++i) {
-        if (!state->region->cells[i].active) {
+static bool cell_is_open(
+    const Region *region,
+    const uint32_t *domains,
+    size_t cell_index
+)
+{
+    return region->cells[cell_index].active &&
+        (domains[cell_index] & (domains[cell_index] - UINT32_C(1))) != 0;
+}
+
+/*
+ * Group the open cells of parent, or of the whole region when parent is
+ * NULL, into components joined through open N/E/S/W neighbors. Writes each
+ * component's cells in ascending order to out_cells, components in order of
+ * their lowest cell, and each component's offset followed by the total to
+ * out_starts. labels must be SIZE_MAX for every cell and is restored;
+ * out_cells needs one entry per open cell. Returns the component count.
+ */
+static size_t label_components(
+    const Region *region,
+    const uint32_t *domains,
+    const size_t *parent,
+    size_t parent_count,
+    size_t *labels,
+    size_t *out_cells,
+    size_t *out_starts
+)
+{
+    const size_t width = (size_t)region->width;
+    const size_t count = parent != NULL ? parent_count : region->cell_count;
+    size_t component_count = 0;
+    size_t total = 0;
+
+    for (size_t position = 0; position < count; ++position) {
+        const size_t first = parent != NULL ? parent[position] : position;
+        if (labels[first] != SIZE_MAX ||
+            !cell_is_open(region, domains, first)) {
             continue;
         }
-        if (state->collect_metrics) {
-            ++state->metrics.mrv_cells_scanned;
-        }
 
-        const unsigned size = domain_popcount(state->domains[i]);
-        if (size > 1 && size < best_size) {
-            selected = i;
-            best_size = size;
-            if (size == 2) {
-                break;
+        /* Search breadth-first, queueing each component where it will go. */
+        size_t head = total;
+        size_t tail = total;
+        labels[first] = component_count;
+        out_cells[tail++] = first;
+        while (head < tail) {
+            const size_t cell = out_cells[head++];
+            const size_t x = cell % width;
+            const size_t neighbors[DIR_COUNT] = {
+                [N] = cell >= width ? cell - width : SIZE_MAX,
+                [E] = x + 1u < width ? cell + 1u : SIZE_MAX,
+                [S] = region->cell_count - cell > width
+                    ? cell + width
+                    : SIZE_MAX,
+                [W] = x != 0 ? cell - 1u : SIZE_MAX,
+            };
+            for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+                const size_t neighbor = neighbors[dir];
+                if (neighbor != SIZE_MAX && labels[neighbor] == SIZE_MAX &&
+                    cell_is_open(region, domains, neighbor)) {
+                    labels[neighbor] = component_count;
+                    out_cells[tail++] = neighbor;
+                }
             }
         }
+        out_starts[component_count++] = total;
+        total = tail;
     }
-
-    return selected;
-}
-
-static void note_dfs_node(SolverState *state, size_t depth)
-{
-    if (state->collect_metrics) {
-        ++state->metrics.dfs_nodes;
-        if (depth > state->metrics.max_depth) {
-            state->metrics.max_depth = depth;
+    out_starts[component_count] = total;
+
+    /*
+     * The labels now say where each cell goes, so rewrite out_cells in
+     * ascending order, using each start as a cursor.
+     */
+    for (size_t position = 0; position < count; ++position) {
+        const size_t cell = parent != NULL ? parent[position] : position;
+        if (labels[cell] != SIZE_MAX) {
+            out_cells[out_starts[labels[cell]]++] = cell;
+            labels[cell] = SIZE_MAX;
         }
     }
+    for (size_t i = component_count; i > 1; --i) {
+        out_starts[i - 1] = out_starts[i - 2];
+    }
+    out_starts[0] = 0;
+    return component_count;
 }
 
-static bool search_stack_resize(SearchStack *stack, size_t capacity)
+/* The cells the search is resolving now; NULL means every cell. */
+static const size_t *current_scope(
+    const SolverState *state,
+    size_t *out_count
+)
 {
-    size_t bytes;
-    if (capacity == 0 || capacity > stack->limit ||
-        !checked_mul_size(capacity, sizeof(*stack->frames), &bytes)) {
-        return false;
+    const ComponentStorage *storage = &state->components;
+    if (storage->group_count != 0) {
+        const ComponentGroup *group =
+            &storage->groups[storage->group_count - 1];
+        const size_t start = group->first_start + group->current;
+        *out_count = storage->starts[start + 1] - storage->starts[start];
+        return storage->cells + storage->starts[start];
     }
+    *out_count = state->scope_cells != NULL
+        ? state->scope_count
+        : state->cell_count;
+    return state->scope_cells;
+}
 
-    SearchFrame *resized = realloc(stack->frames, bytes);
-    if (resized == NULL) {
+static bool prepare_component_storage(SolverState *state)
+{
+    ComponentStorage *storage = &state->components;
+    storage->labels = reserve_cell_buffer(
+        storage->labels,
+        &storage->label_capacity,
+        state->cell_count,
+        sizeof(*storage->labels)
+    );
+    if (storage->labels == NULL) {
         return false;
     }
-    stack->frames = resized;
-    stack->capacity = capacity;
-    stack->allocated_bytes = bytes;
+    memset(
+        storage->labels,
+        0xff,
+        state->cell_count * sizeof(*storage->labels)
+    );
     return true;
 }
 
-static bool search_stack_init(
-    SearchStack *stack,
-    size_t limit,
-    SearchStackMode mode
+/*
+ * Split the open cells of the current scope into components. Two or more
+ * become a new group whose first component starts at stack index
+ * root_frame; a single component leaves the scope as it is.
+ */
+static bool split_scope(
+    SolverState *state,
+    size_t split_frame,
+    size_t split_mark,
+    size_t root_frame
 )
 {
-    enum { INITIAL_DYNAMIC_CAPACITY = 16 };
+    ComponentStorage *storage = &state->components;
+    size_t scope_count;
+    (void)current_scope(state, &scope_count);
+
+    size_t *cells = grow_buffer(
+        storage->cells,
+        &storage->cell_capacity,
+        storage->cell_count + scope_count,
+        sizeof(*storage->cells)
+    );
+    if (cells == NULL) {
+        return false;
+    }
+    storage->cells = cells;
+    size_t *starts = grow_buffer(
+        storage->starts,
+        &storage->start_capacity,
+        storage->start_count + scope_count + 1u,
+        sizeof(*storage->starts)
+    );
+    if (starts == NULL) {
+        return false;
+    }
+    storage->starts = starts;
 
-    *stack = (SearchStack){ .limit = limit };
-    const size_t initial_capacity =
-        mode == SEARCH_STACK_DYNAMIC && limit > INITIAL_DYNAMIC_CAPACITY
-            ? INITIAL_DYNAMIC_CAPACITY
-            : limit;
-    size_t bytes;
-    if (initial_capacity == 0 ||
-        !checked_mul_size(
-            initial_capacity,
-            sizeof(*stack->frames),
-            &bytes
-        )) {
-        return false;
+    const size_t *scope = current_scope(state, &scope_count);
+    const size_t component_count = label_components(
+        state->region,
+        state->domains,
+        scope,
+        scope_count,
+        storage->labels,
+        storage->cells + storage->cell_count,
+        storage->starts + storage->start_count
+    );
+    if (component_count < 2) {
+        return true;
     }
-    stack->frames = malloc(bytes);
-    if (stack->frames == NULL) {
+
+    ComponentGroup *groups = grow_buffer(
+        storage->groups,
+        &storage->group_capacity,
+        storage->group_count + 1u,
+        sizeof(*storage->groups)
+    );
+    if (groups == NULL) {
         return false;
     }
-    stack->capacity = initial_capacity;
-    stack->allocated_bytes = bytes;
+    storage->groups = groups;
+    for (size_t i = 0; i <= component_count; ++i) {
+        storage->starts[storage->start_count + i] += storage->cell_count;
+    }
+    storage->groups[storage->group_count++] = (ComponentGroup) {
+        .first_start = storage->start_count,
+        .component_count = component_count,
+        .split_frame = split_frame,
+        .split_mark = split_mark,
+        .root_frame = root_frame,
+    };
+    storage->cell_count = storage->starts[storage->start_count +
+                                          component_count];
+    storage->start_count += component_count + 1u;
+    state->mrv_index_active = false;
+    if (state->collect_metrics) {
+        ++state->metrics.component_splits;
+        state->metrics.components += component_count;
+    }
     return true;
 }
 
-static bool search_stack_push(SearchStack *stack, SearchFrame frame)
+/*
+ * Whether the open N/E/S/W neighbors of cell are joined through the open
+ * cells among the eight around it, so that any path through cell can detour
+ * around it once it is resolved. Resolved cells that labels ranks after
+ * rank still count as open.
+ */
+static bool neighbors_joined_around(
+    const SolverState *state,
+    const size_t *labels,
+    size_t cell,
+    size_t rank
+)
 {
-    if (stack->count == stack->limit) {
-        return false;
+    /* The eight cells in ring order, starting at N; even entries are edges. */
+    static const int32_t dx[8] = { 0, 1, 1, 1, 0, -1, -1, -1 };
+    static const int32_t dy[8] = { -1, -1, 0, 1, 1, 1, 0, -1 };
+    const Region *region = state->region;
+    const int32_t x = (int32_t)(cell % (size_t)region->width);
+    const int32_t y = (int32_t)(cell / (size_t)region->width);
+    bool ring_open[8];
+    for (size_t i = 0; i < 8; ++i) {
+        const int32_t nx = x + dx[i];
+        const int32_t ny = y + dy[i];
+        if (nx < 0 || ny < 0 || nx >= region->width || ny >= region->height) {
+            ring_open[i] = false;
+            continue;
+        }
+        const size_t around = region_index(region, nx, ny);
+        ring_open[i] = cell_is_open(region, state->domains, around) ||
+            (labels[around] != SIZE_MAX && labels[around] > rank);
     }
-    if (stack->count == stack->capacity) {
-        size_t capacity = stack->capacity;
-        if (capacity > stack->limit / 2) {
-            capacity = stack->limit;
-        } else {
-            capacity *= 2;
+
+    /* Count the runs of open ring cells that hold an open neighbor. */
+    size_t start = 0;
+    while (start < 8 && ring_open[start]) {
+        ++start;
+    }
+    if (start == 8) {
+        return true;
+    }
+    size_t neighbor_runs = 0;
+    bool run_has_neighbor = false;
+    for (size_t step = 1; step <= 8; ++step) {
+        const size_t i = (start + step) % 8u;
+        if (ring_open[i] && i % 2u == 0) {
+            run_has_neighbor = true;
+        } else if (!ring_open[i]) {
+            if (run_has_neighbor) {
+                ++neighbor_runs;
+            }
+            run_has_neighbor = false;
         }
-        if (capacity <= stack->capacity ||
-            !search_stack_resize(stack, capacity)) {
-            return false;
+    }
+    return neighbor_runs <= 1;
+}
+
+/*
+ * Whether the decision whose trail starts at mark may have cut its component
+ * in two, so that split_scope() must relabel it. Taking the newly resolved
+ * cells out one at a time, the component stays connected as long as each
+ * one's open neighbors are joined around it. The labels rank those cells
+ * and are restored.
+ */
+static bool decision_may_split(SolverState *state, size_t mark)
+{
+    size_t *labels = state->components.labels;
+    size_t resolved = 0;
+    for (size_t entry = mark; entry < state->trail_count; ++entry) {
+        const size_t cell = state->trail[entry].cell_index;
+        if (labels[cell] == SIZE_MAX &&
+            !domain_is_singleton(state->trail[entry].old_domain) &&
+            domain_is_singleton(state->domains[cell])) {
+            labels[cell] = resolved++;
         }
     }
 
-    stack->frames[stack->count++] = frame;
+    bool may_split = false;
+    for (size_t entry = mark; !may_split && entry < state->trail_count;
+         ++entry) {
+        const size_t cell = state->trail[entry].cell_index;
+        may_split = labels[cell] != SIZE_MAX &&
+            !neighbors_joined_around(state, labels, cell, labels[cell]);
+    }
+
+    for (size_t entry = mark; entry < state->trail_count; ++entry) {
+        labels[state->trail[entry].cell_index] = SIZE_MAX;
+    }
+    return may_split;
+}
+
+static void discard_component_group(SolverState *state)
+{
+    ComponentStorage *storage = &state->components;
+    const ComponentGroup *group = &storage->groups[--storage->group_count];
+    storage->cell_count = storage->starts[group->first_start];
+    storage->start_count = group->first_start;
+    state->mrv_index_active = false;
+}
+
+static bool prepare_learning_storage(SolverState *state)
+{
+    LearningStorage *learning = &state->learning;
+    learning->marks = reserve_cell_buffer(
+        learning->marks,
+        &learning->mark_capacity,
+        state->cell_count,
+        sizeof(*learning->marks)
+    );
+    learning->cell_heads = reserve_cell_buffer(
+        learning->cell_heads,
+        &learning->head_capacity,
+        state->cell_count,
+        sizeof(*learning->cell_heads)
+    );
+    /* The DFS never holds more frames than there are active cells. */
+    learning->frame_rows = reserve_cell_buffer(
+        learning->frame_rows,
+        &learning->frame_row_capacity,
+        state->active_count,
+        sizeof(*learning->frame_rows)
+    );
+    learning->scratch = reserve_cell_buffer(
+        learning->scratch,
+        &learning->scratch_capacity,
+        state->active_count / 64u + 1u,
+        sizeof(*learning->scratch)
+    );
+    if (learning->nogoods == NULL) {
+        learning->nogoods = malloc(
+            NOGOOD_CAPACITY * sizeof(*learning->nogoods)
+        );
+    }
+    if (learning->marks == NULL || learning->cell_heads == NULL ||
+        learning->frame_rows == NULL || learning->scratch == NULL ||
+        learning->nogoods == NULL) {
+        return false;
+    }
+    memset(
+        learning->marks,
+        0,
+        state->cell_count * sizeof(*learning->marks)
+    );
+    memset(
+        learning->cell_heads,
+        0xff,
+        state->cell_count * sizeof(*learning->cell_heads)
+    );
+    learning->mark_stamp = 0;
+    learning->row_count = 0;
+    learning->nogood_count = 0;
+    learning->lru_head = NOGOOD_NONE;
+    learning->lru_tail = NOGOOD_NONE;
     return true;
 }
 
-static void search_stack_destroy(SearchStack *stack)
+static size_t conflict_words(size_t level)
 {
-    free(stack->frames);
-    *stack = (SearchStack){0};
+    return level / 64u + 1u;
 }
 
-static void note_search_stack_capacity(
-    SolverState *state,
-    const SearchStack *stack
-)
+/*
+ * The conflict set of the top frame at level, created empty on first use.
+ * Rows of deeper frames are stale by then and are dropped first, which
+ * keeps the rows in level order. Returns NULL when the pool cannot grow.
+ * The pointer is valid until the next call.
+ */
+static uint64_t *conflict_set(SolverState *state, size_t level)
 {
-    if (state->collect_metrics &&
-        stack->capacity > state->metrics.dfs_stack_capacity_peak) {
-        state->metrics.dfs_stack_capacity_peak = stack->capacity;
-        state->metrics.dfs_stack_bytes_peak = stack->allocated_bytes;
+    LearningStorage *learning = &state->learning;
+    if (learning->frame_rows[level] != SIZE_MAX) {
+        return learning->row_words +
+            learning->rows[learning->frame_rows[level]].offset;
+    }
+
+    while (learning->row_count != 0 &&
+           learning->rows[learning->row_count - 1u].level >= level) {
+        --learning->row_count;
+    }
+    size_t offset = 0;
+    if (learning->row_count != 0) {
+        const ConflictRow *below = &learning->rows[learning->row_count - 1u];
+        offset = below->offset + conflict_words(below->level);
+    }
+    const size_t words = conflict_words(level);
+    uint64_t *row_words = grow_buffer(
+        learning->row_words,
+        &learning->row_word_capacity,
+        offset + words,
+        sizeof(*learning->row_words)
+    );
+    if (row_words == NULL) {
+        return NULL;
+    }
+    learning->row_words = row_words;
+    ConflictRow *rows = grow_buffer(
+        learning->rows,
+        &learning->row_capacity,
+        learning->row_count + 1u,
+        sizeof(*learning->rows)
+    );
+    if (rows == NULL) {
+        return NULL;
     }
+    learning->rows = rows;
+
+    rows[learning->row_count] = (ConflictRow) {
+        .level = level,
+        .offset = offset,
+    };
+    learning->frame_rows[level] = learning->row_count++;
+    memset(row_words + offset, 0, words * sizeof(*row_words));
+    return row_words + offset;
 }
 
-static WangSolveStatus search(
+/*
+ * Add to levels the decision levels that the current domains of cells
+ * depend on. The trail is walked back from its top: a propagated entry of
+ * a marked cell also marks the cell that narrowed it, and a decision entry
+ * contributes its level and settles its cell. Root propagation is not on
+ * the search trail, so cells still marked at the bottom follow from the
+ * root alone.
+ */
+static void explain_cells(
     SolverState *state,
-    SearchStackMode stack_mode
+    const size_t *cells,
+    size_t count,
+    uint64_t *levels
 )
 {
-    note_dfs_node(state, 0);
+    LearningStorage *learning = &state->learning;
+    if (learning->mark_stamp == UINT32_MAX) {
+        memset(
+            learning->marks,
+            0,
+            state->cell_count * sizeof(*learning->marks)
+        );
+        learning->mark_stamp = 0;
+    }
+    const uint32_t stamp = ++learning->mark_stamp;
+    size_t pending = 0;
+    for (size_t i = 0; i < count; ++i) {
+        if (learning->marks[cells[i]] != stamp) {
+            learning->marks[cells[i]] = stamp;
+            ++pending;
+        }
+    }
 
-    if (state->resolved_count == state->active_count) {
-        state->best_depth = 0;
-        return WANG_SOLVE_SAT;
+    for (size_t position = state->trail_count;
+         pending != 0 && position > 0;) {
+        --position;
+        const size_t cell = state->trail[position].cell_index;
+        if (learning->marks[cell] != stamp) {
+            continue;
+        }
+        const size_t reason = learning->reasons[position];
+        if (reason >= state->cell_count) {
+            const size_t level = reason - state->cell_count;
+            levels[level / 64u] |= UINT64_C(1) << (level % 64u);
+            learning->marks[cell] = 0;
+            --pending;
+        } else if (learning->marks[reason] != stamp) {
+            learning->marks[reason] = stamp;
+            ++pending;
+        }
     }
+}
 
-    SearchStack stack;
-    if (!search_stack_init(&stack, state->active_count, stack_mode)) {
-        return WANG_SOLVE_ERROR;
+static size_t highest_level(const uint64_t *levels, size_t words)
+{
+    for (size_t word = words; word > 0; --word) {
+        if (levels[word - 1u] != 0) {
+            return (word - 1u) * 64u + highest_bit_index(levels[word - 1u]);
+        }
     }
-    note_search_stack_capacity(state, &stack);
+    return SIZE_MAX;
+}
 
-    const size_t root_cell = select_mrv_cell(state);
-    if (root_cell == SIZE_MAX) {
-        search_stack_destroy(&stack);
-        return WANG_SOLVE_ERROR;
+static void nogood_lru_unlink(LearningStorage *learning, uint32_t index)
+{
+    Nogood *nogood = &learning->nogoods[index];
+    if (nogood->lru_prev != NOGOOD_NONE) {
+        learning->nogoods[nogood->lru_prev].lru_next = nogood->lru_next;
+    } else {
+        learning->lru_head = nogood->lru_next;
+    }
+    if (nogood->lru_next != NOGOOD_NONE) {
+        learning->nogoods[nogood->lru_next].lru_prev = nogood->lru_prev;
+    } else {
+        learning->lru_tail = nogood->lru_prev;
     }
+}
 
-    if (!search_stack_push(&stack, (SearchFrame) {
-            .cell_index = root_cell,
-            .candidates = state->domains[root_cell],
-            .entry_mark = 0,
-        })) {
-        search_stack_destroy(&stack);
-        return WANG_SOLVE_ERROR;
+static void nogood_lru_push_front(LearningStorage *learning, uint32_t index)
+{
+    Nogood *nogood = &learning->nogoods[index];
+    nogood->lru_prev = NOGOOD_NONE;
+    nogood->lru_next = learning->lru_head;
+    if (learning->lru_head != NOGOOD_NONE) {
+        learning->nogoods[learning->lru_head].lru_prev = index;
+    } else {
+        learning->lru_tail = index;
     }
-    WangSolveStatus status = WANG_SOLVE_ERROR;
+    learning->lru_head = index;
+}
 
-    while (stack.count != 0) {
-        SearchFrame *frame = &stack.frames[stack.count - 1];
-        if (frame->candidates == 0) {
-            const size_t entry_mark = frame->entry_mark;
-            --stack.count;
-            if (stack.count == 0) {
-                status = WANG_SOLVE_UNSAT;
-                break;
-            }
+/* Unlink every literal of a nogood from its cell's occurrence list. */
+static void nogood_evict(LearningStorage *learning, uint32_t index)
+{
+    Nogood *nogood = &learning->nogoods[index];
+    for (uint8_t slot = 0; slot < nogood->count; ++slot) {
+        const uint32_t prev = nogood->prev[slot];
+        const uint32_t next = nogood->next[slot];
+        if (prev != NOGOOD_NONE) {
+            learning->nogoods[prev / NOGOOD_MAX_LITERALS]
+                .next[prev % NOGOOD_MAX_LITERALS] = next;
+        } else {
+            learning->cell_heads[nogood->cells[slot]] = next;
+        }
+        if (next != NOGOOD_NONE) {
+            learning->nogoods[next / NOGOOD_MAX_LITERALS]
+                .prev[next % NOGOOD_MAX_LITERALS] = prev;
+        }
+    }
+    nogood_lru_unlink(learning, index);
+}
 
-            rollback_to(state, entry_mark);
-            if (state->collect_metrics) {
-                ++state->metrics.backtracks;
+/*
+ * Store the current decisions at levels as a nogood, unless there are more
+ * than NOGOOD_MAX_LITERALS of them. A full store evicts its least recently
+ * used nogood.
+ */
+static void learn_nogood(
+    SolverState *state,
+    const uint64_t *levels,
+    size_t words
+)
+{
+    LearningStorage *learning = &state->learning;
+    Nogood nogood = { .count = 0 };
+    for (size_t word = 0; word < words; ++word) {
+        for (uint64_t bits = levels[word]; bits != 0; bits &= bits - 1u) {
+            if (nogood.count == NOGOOD_MAX_LITERALS) {
+                return;
             }
-            continue;
+            const size_t level = word * 64u + lowest_bit_index(bits);
+            const size_t cell = state->stack.frames[level].cell_index;
+            nogood.cells[nogood.count] = cell;
+            nogood.tiles[nogood.count] =
+                first_set_tile(state->domains[cell]);
+            ++nogood.count;
         }
+    }
 
-        const TileId tile = first_set_tile(frame->candidates);
-        const uint32_t singleton = UINT32_C(1) << tile;
-        frame->candidates &= frame->candidates - UINT32_C(1);
-
+    uint32_t index;
+    if (learning->nogood_count < NOGOOD_CAPACITY) {
+        index = (uint32_t)learning->nogood_count++;
+    } else {
+        index = learning->lru_tail;
+        nogood_evict(learning, index);
         if (state->collect_metrics) {
-            ++state->metrics.decisions;
+            ++state->metrics.nogoods_evicted;
         }
+    }
 
-        const size_t mark = state->trail_count;
-        begin_trail_interval(state);
-        if (!restrict_domain(state, frame->cell_index, singleton)) {
-            rollback_to(state, mark);
-            break;
+    for (uint8_t slot = 0; slot < nogood.count; ++slot) {
+        const uint32_t occurrence = index * NOGOOD_MAX_LITERALS + slot;
+        const uint32_t head = learning->cell_heads[nogood.cells[slot]];
+        nogood.prev[slot] = NOGOOD_NONE;
+        nogood.next[slot] = head;
+        if (head != NOGOOD_NONE) {
+            learning->nogoods[head / NOGOOD_MAX_LITERALS]
+                .prev[head % NOGOOD_MAX_LITERALS] = occurrence;
         }
+        learning->cell_heads[nogood.cells[slot]] = occurrence;
+    }
+    learning->nogoods[index] = nogood;
+    nogood_lru_push_front(learning, index);
+    if (state->collect_metrics) {
+        ++state->metrics.nogoods_learned;
+    }
+}
 
-        size_t conflict_cell = SIZE_MAX;
-        const PropagateStatus propagated = propagate_from_cell(
-            state,
-            frame->cell_index,
-            &conflict_cell
-        );
-
-        if (propagated == PROPAGATE_ERROR) {
-            rollback_to(state, mark);
-            break;
+/*
+ * Set *out_refuted when a stored nogood refutes singleton on the cell of
+ * the top frame at level: one whose other literals all hold under the
+ * current domains. The decisions behind those literals then join the
+ * frame's conflict set. Returns false when that set cannot be stored.
+ */
+static bool refuted_by_nogood(
+    SolverState *state,
+    size_t level,
+    uint32_t singleton,
+    bool *out_refuted
+)
+{
+    LearningStorage *learning = &state->learning;
+    const size_t cell = state->stack.frames[level].cell_index;
+    const TileId tile = first_set_tile(singleton);
+    *out_refuted = false;
+
+    uint32_t occurrence = learning->cell_heads[cell];
+    while (occurrence != NOGOOD_NONE) {
+        const uint32_t index = occurrence / NOGOOD_MAX_LITERALS;
+        const uint32_t slot = occurrence % NOGOOD_MAX_LITERALS;
+        const Nogood *nogood = &learning->nogoods[index];
+        occurrence = nogood->next[slot];
+        if (nogood->tiles[slot] != tile) {
+            continue;
         }
 
-        const size_t branch_depth = stack.count;
-        if (propagated == PROPAGATE_CONFLICT) {
-            if (!record_failed_leaf(
-                    state,
-                    conflict_cell,
-                    branch_depth
-                )) {
-                rollback_to(state, mark);
-                break;
-            }
-        } else {
-            note_dfs_node(state, branch_depth);
-
-            if (state->resolved_count == state->active_count) {
-                state->best_depth = branch_depth;
-                status = WANG_SOLVE_SAT;
-                break;
-            }
-
-            const size_t child_cell = select_mrv_cell(state);
-            if (child_cell == SIZE_MAX ||
-                !search_stack_push(&stack, (SearchFrame) {
-                    .cell_index = child_cell,
-                    .candidates = state->domains[child_cell],
-                    .entry_mark = mark,
-                })) {
-                rollback_to(state, mark);
-                break;
+        size_t others[NOGOOD_MAX_LITERALS];
+        size_t other_count = 0;
+        bool holds = true;
+        for (uint8_t i = 0; holds && i < nogood->count; ++i) {
+            if (i == slot) {
+                continue;
             }
-            note_search_stack_capacity(state, &stack);
+            holds = state->domains[nogood->cells[i]] ==
+                (UINT32_C(1) << nogood->tiles[i]);
+            others[other_count++] = nogood->cells[i];
+        }
+        if (!holds) {
             continue;
         }
 
-        rollback_to(state, mark);
+        uint64_t *conflict = conflict_set(state, level);
+        if (conflict == NULL) {
+            return false;
+        }
+        explain_cells(state, others, other_count, conflict);
+        nogood_lru_unlink(learning, index);
+        nogood_lru_push_front(learning, index);
         if (state->collect_metrics) {
-            ++state->metrics.backtracks;
+            ++state->metrics.nogood_hits;
         }
+        *out_refuted = true;
+        return true;
     }
+    return true;
+}
 
-    search_stack_destroy(&stack);
-    return status;
+/* Charge the decisions behind the conflict cell to the top frame's value. */
+static bool record_leaf_conflict(SolverState *state, size_t conflict_cell)
+{
+    const size_t level = state->stack.count - 1u;
+    uint64_t *conflict = conflict_set(state, level);
+    if (conflict == NULL) {
+        return false;
+    }
+    explain_cells(state, &conflict_cell, 1, conflict);
+    conflict[level / 64u] &= ~(UINT64_C(1) << (level % 64u));
+    return true;
 }
 
-static bool allocate_solver_arrays(SolverState *state)
+/*
+ * The top frame has no values left. Its conflict set, together with
+ * whatever narrowed its cell before it was entered, refutes the current
+ * decisions at those levels. Learn them as a nogood, return to the deepest
+ * one while skipping the frames in between, and charge the set to that
+ * decision. Sets *out_refuted when the set is empty, which proves UNSAT.
+ * Returns false when storage cannot grow.
+ */
+static bool backjump(SolverState *state, bool *out_refuted)
 {
-    size_t domain_bytes;
-    size_t neighbor_bytes;
-    size_t queue_metric_bytes = 0;
-    size_t trail_metric_bytes = 0;
-    if (!checked_mul_size(
-            state->cell_count,
-            sizeof(*state->domains),
-            &domain_bytes
-        ) ||
-        !checked_mul_size(
-            state->cell_count,
-            sizeof(*state->neighbor_mask),
-            &neighbor_bytes
-        ) ||
-        (state->collect_metrics && !checked_mul_size(
-            state->cell_count,
-            sizeof(*state->queue_pending_counts),
-            &queue_metric_bytes
-        )) ||
-        (state->collect_metrics && !checked_mul_size(
-            state->cell_count,
-            sizeof(*state->trail_cell_interval),
-            &trail_metric_bytes
-        ))) {
+    SearchStack *stack = &state->stack;
+    LearningStorage *learning = &state->learning;
+    const size_t level = stack->count - 1u;
+    const size_t words = conflict_words(level);
+    uint64_t *conflict = conflict_set(state, level);
+    if (conflict == NULL) {
         return false;
     }
+    explain_cells(state, &stack->frames[level].cell_index, 1, conflict);
+    const size_t target = highest_level(conflict, words);
+    *out_refuted = target == SIZE_MAX;
+    if (*out_refuted) {
+        stack->count = 0;
+        return true;
+    }
 
-    state->domains = malloc(domain_bytes);
-    state->neighbor_mask = malloc(neighbor_bytes);
-    if (state->domains == NULL || state->neighbor_mask == NULL) {
+    learn_nogood(state, conflict, words);
+    memcpy(learning->scratch, conflict, words * sizeof(*conflict));
+    uint64_t *target_conflict = conflict_set(state, target);
+    if (target_conflict == NULL) {
         return false;
     }
+    for (size_t word = 0; word < conflict_words(target); ++word) {
+        target_conflict[word] |= learning->scratch[word];
+    }
+    target_conflict[target / 64u] &= ~(UINT64_C(1) << (target % 64u));
+
+    rollback_to(state, stack->frames[target + 1u].entry_mark);
+    stack->count = target + 1u;
     if (state->collect_metrics) {
-        state->queue_pending_counts = calloc(
-            state->cell_count,
-            sizeof(*state->queue_pending_counts)
-        );
-        state->trail_cell_interval = calloc(
-            state->cell_count,
-            sizeof(*state->trail_cell_interval)
-        );
-        if (state->queue_pending_counts == NULL ||
-            state->trail_cell_interval == NULL) {
-            return false;
+        const size_t skipped = level - 1u - target;
+        ++state->metrics.backtracks;
+        if (skipped != 0) {
+            ++state->metrics.backjumps;
+            state->metrics.backjump_levels += skipped;
         }
-        state->trail_interval = 1;
     }
     return true;
 }
 
-static bool initialize_domains(
-    SolverState *state,
-    const uint32_t *initial_domains,
-    size_t *out_initial_conflict
-)
+/*
+ * Build the optimized MRV index from the current domains before the first
+ * child selection; the root keeps the scan, which often stops at the first
+ * two-tile cell of a shallow search. Search then keeps the index in step
+ * through restrict_domain() and rollback_to(), so selection reads the
+ * smallest nonempty bucket instead of scanning every cell. Random ties keep
+ * the scan, which draws once per tied cell.
+ *
+ * The index covers the current scope only. Search inside a component never
+ * narrows an open cell outside it, so the index stays exact until the scope
+ * changes, which drops it for the next selection to rebuild. Probing below
+ * the root narrows cells anywhere, so a scoped search that probes scans.
+ */
+static bool build_mrv_index(SolverState *state)
 {
-    *out_initial_conflict = SIZE_MAX;
-    static const int32_t dx[DIR_COUNT] = { 0, 1, 0, -1 };
-    static const int32_t dy[DIR_COUNT] = { -1, 0, 1, 0 };
+    const bool scoped = state->scope_cells != NULL ||
+        state->components.group_count != 0;
+    if (state->mrv_index_active || !state->use_mrv_index ||
+        state->tie_break == WANG_TIE_BREAK_RANDOM || state->weights_active ||
+        (scoped && state->probe_singletons && state->probe_depth != 0)) {
+        return true;
+    }
 
-    for (int32_t y = 0; y < state->region->height; ++y) {
-        for (int32_t x = 0; x < state->region->width; ++x) {
-            const size_t index = region_index(state->region, x, y);
-            const RegionCell *cell = &state->region->cells[index];
-            state->neighbor_mask[index] = 0;
+    const size_t word_count = state->cell_count / 64u +
+        (state->cell_count % 64u != 0 ? 1u : 0u);
+    const size_t summary_count = word_count / 64u +
+        (word_count % 64u != 0 ? 1u : 0u);
+    size_t element_count;
+    size_t bytes;
+    if (!checked_mul_size(
+            word_count + summary_count,
+            MRV_BUCKET_COUNT,
+            &element_count
+        ) ||
+        !checked_mul_size(
+            element_count,
+            sizeof(*state->mrv_index_storage),
+            &bytes
+        )) {
+        return false;
+    }
 
-            if (!cell->active) {
-                state->domains[index] = 0;
-                continue;
-            }
+    state->mrv_index_storage = reserve_cell_buffer(
+        state->mrv_index_storage,
+        &state->mrv_index_capacity,
+        element_count,
+        sizeof(*state->mrv_index_storage)
+    );
+    if (state->mrv_index_storage == NULL) {
+        return false;
+    }
+    memset(state->mrv_index_storage, 0, bytes);
+    memset(state->mrv_bucket_counts, 0, sizeof(state->mrv_bucket_counts));
+    state->mrv_index_bits = state->mrv_index_storage;
+    state->mrv_index_summary =
+        state->mrv_index_storage + word_count * MRV_BUCKET_COUNT;
+    state->mrv_index_words = word_count;
+    state->mrv_index_summary_words = summary_count;
+
+    size_t scope_count;
+    const size_t *scope = current_scope(state, &scope_count);
+    for (size_t position = 0; position < scope_count; ++position) {
+        const size_t i = scope != NULL ? scope[position] : position;
+        if (!state->region->cells[i].active) {
+            continue;
+        }
+        if (state->collect_metrics) {
+            ++state->metrics.mrv_cells_scanned;
+        }
+        const unsigned size = domain_popcount(state->domains[i]);
+        if (size > 1) {
+            mrv_index_insert(state, i, size);
+        }
+    }
+    state->mrv_index_active = true;
+    if (state->collect_metrics) {
+        state->metrics.mrv_index_bytes = bytes;
+    }
+    return true;
+}
 
-            ++state->active_count;
-            uint32_t domain = initial_domains != NULL
-                ? initial_domains[index]
-                : WANG_DOMAIN_ALL;
-            if (state->collect_metrics && domain != WANG_DOMAIN_ALL) {
-                ++state->metrics.domain_reductions;
-            }
+/*
+ * The first (or, for WANG_TIE_BREAK_LAST, last) cell of the smallest
+ * bucket.
+ */
+static size_t select_indexed_mrv_cell(SolverState *state)
+{
+    size_t bucket = 0;
+    while (bucket < MRV_BUCKET_COUNT &&
+           state->mrv_bucket_counts[bucket] == 0) {
+        ++bucket;
+    }
+    if (bucket == MRV_BUCKET_COUNT) {
+        return SIZE_MAX;
+    }
 
-            for (Dir dir = N; dir < DIR_COUNT; ++dir) {
-                const RegionCell *neighbor = region_cell_const(
-                    state->region,
-                    x + dx[dir],
-                    y + dy[dir]
-                );
+    const uint64_t *summary =
+        state->mrv_index_summary + bucket * state->mrv_index_summary_words;
+    const uint64_t *bits =
+        state->mrv_index_bits + bucket * state->mrv_index_words;
+    if (state->tie_break == WANG_TIE_BREAK_LAST) {
+        size_t s = state->mrv_index_summary_words;
+        while (summary[--s] == 0) {
+        }
+        const size_t word = s * 64u + highest_bit_index(summary[s]);
+        return word * 64u + highest_bit_index(bits[word]);
+    }
 
-                if (neighbor != NULL && neighbor->active) {
-                    state->neighbor_mask[index] |=
-                        (uint8_t)(UINT8_C(1) << dir);
-                    state->has_neighbor_arcs = true;
-                    continue;
-                }
+    size_t s = 0;
+    while (summary[s] == 0) {
+        ++s;
+    }
+    const size_t word = s * 64u + lowest_bit_index(summary[s]);
+    return word * 64u + lowest_bit_index(bits[word]);
+}
 
-                const ColorId boundary = cell->boundary[dir];
-                if (boundary != COLOR_NONE) {
-                    const uint32_t restricted =
-                        domain & state->tables.edge_mask[dir][boundary];
-                    if (state->collect_metrics && restricted != domain) {
-                        ++state->metrics.domain_reductions;
-                    }
-                    domain = restricted;
-                }
+static bool prepare_weight_storage(SolverState *state)
+{
+    size_t weight_count;
+    if (!checked_mul_size(state->cell_count, 2u, &weight_count)) {
+        return false;
+    }
+    state->arc_weights = reserve_cell_buffer(
+        state->arc_weights,
+        &state->arc_weight_capacity,
+        weight_count,
+        sizeof(*state->arc_weights)
+    );
+    if (state->arc_weights == NULL) {
+        return false;
+    }
+    arc_weights_reset(
+        &state->weights,
+        state->arc_weights,
+        (size_t)state->region->width,
+        state->cell_count
+    );
+    state->weights_active = false;
+    return true;
+}
+
+/*
+ * Weight the arcs around a failed leaf's conflict cell. The first failed
+ * leaf also ends MRV selection: weighted selection scans the cells, so the
+ * MRV index is no longer kept.
+ */
+static void bump_conflict_weights(SolverState *state, size_t conflict_cell)
+{
+    state->weights_active = true;
+    state->mrv_index_active = false;
+    const unsigned bumped = arc_weights_bump(
+        &state->weights,
+        conflict_cell,
+        state->neighbor_mask[conflict_cell]
+    );
+    if (state->collect_metrics) {
+        state->metrics.weight_bumps += bumped;
+    }
+}
+
+static size_t draw_random_tie(void *context, size_t bound)
+{
+    return random_below(context, bound);
+}
+
+/* Weighted selection over the current scope, as select_mrv_cell() scans. */
+static size_t select_weighted_cell(SolverState *state)
+{
+    size_t scope_count;
+    const size_t *scope = current_scope(state, &scope_count);
+    uint64_t scanned = 0;
+    const size_t selected = weighted_degree_select(
+        &state->weights,
+        state->region,
+        state->domains,
+        state->neighbor_mask,
+        scope,
+        scope_count,
+        state->tie_break,
+        draw_random_tie,
+        state,
+        &scanned
+    );
+    if (state->collect_metrics) {
+        state->metrics.mrv_cells_scanned += scanned;
+    }
+    return selected;
+}
+
+static size_t select_mrv_cell(SolverState *state)
+{
+    if (state->weights_active) {
+        return select_weighted_cell(state);
+    }
+    if (state->mrv_index_active) {
+        return select_indexed_mrv_cell(state);
+    }
+
+    size_t scope_count;
+    const size_t *scope = current_scope(state, &scope_count);
+    size_t selected = SIZE_MAX;
+    unsigned best_size = TILE_COUNT + 1u;
+    const bool reverse = state->tie_break == WANG_TIE_BREAK_LAST;
+    const bool random_tie = state->tie_break == WANG_TIE_BREAK_RANDOM;
+    size_t tied = 0;
+
+    for (size_t scanned = 0; scanned < scope_count; ++scanned) {
+        const size_t position = reverse
+            ? scope_count - 1u - scanned
+            : scanned;
+        const size_t i = scope != NULL ? scope[position] : position;
+        if (!state->region->cells[i].active) {
+            continue;
+        }
+        if (state->collect_metrics) {
+            ++state->metrics.mrv_cells_scanned;
+        }
+
+        const unsigned size = domain_popcount(state->domains[i]);
+        if (size > 1 && size < best_size) {
+            selected = i;
+            best_size = size;
+            tied = 1;
+            if (size == 2 && !random_tie) {
+                break;
             }
+        } else if (random_tie && size == best_size &&
+                   random_below(state, ++tied) == 0) {
+            /* Reservoir sampling keeps every tied cell equally likely. */
+            selected = i;
+        }
+    }
 
-            /* An isolated cell cannot constrain any other choice. */
-            if (state->neighbor_mask[index] == 0 &&
-                !domain_is_singleton(domain) && domain != 0) {
-                domain &= UINT32_C(0) - domain;
-                if (state->collect_metrics) {
-                    ++state->metrics.domain_reductions;
-                }
+    return selected;
+}
+
+/*
+ * Store the MRV cell of the current scope in *out_cell, moving on to the
+ * next component of a group whenever the current one is resolved, so each
+ * component is searched to completion with its own MRV index. The next
+ * component's first frame will sit at stack index next_frame. SIZE_MAX
+ * means the whole scope is resolved. Returns false when the index cannot
+ * be built.
+ */
+static bool select_branch_cell(
+    SolverState *state,
+    size_t next_frame,
+    size_t *out_cell
+)
+{
+    ComponentStorage *storage = &state->components;
+    for (;;) {
+        *out_cell = select_mrv_cell(state);
+        if (*out_cell != SIZE_MAX || storage->group_count == 0) {
+            return true;
+        }
+
+        /* A resolved group also resolves the component it split. */
+        ComponentGroup *group = &storage->groups[storage->group_count - 1];
+        if (++group->current < group->component_count) {
+            group->root_frame = next_frame;
+            state->mrv_index_active = false;
+            if (!build_mrv_index(state)) {
+                return false;
             }
+        } else {
+            discard_component_group(state);
+        }
+    }
+}
 
-            state->domains[index] = domain;
-            if (domain_is_singleton(domain)) {
-                ++state->resolved_count;
-            } else if (domain == 0 && *out_initial_conflict == SIZE_MAX) {
-                *out_initial_conflict = index;
+/*
+ * The candidate of cell_index that leaves its active neighbors the most
+ * tiles, as a singleton domain. A tile's support in one direction is the
+ * byte support table entry of its own byte, so scoring reads the same rows
+ * as propagation. The first, lowest tile wins ties.
+ */
+static uint32_t least_constraining_value(
+    SolverState *state,
+    size_t cell_index,
+    uint32_t candidates
+)
+{
+    uint32_t best = candidates & (~candidates + UINT32_C(1));
+    if (candidates == best) {
+        return best;
+    }
+
+    unsigned best_score = 0;
+    const uint8_t linked = state->neighbor_mask[cell_index];
+    if (state->collect_metrics) {
+        ++state->metrics.value_scorings;
+    }
+    while (candidates != 0) {
+        const TileId tile = first_set_tile(candidates);
+        unsigned score = 0;
+        for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+            if ((linked & (uint8_t)(UINT8_C(1) << dir)) == 0) {
+                continue;
+            }
+            const uint32_t support = state->byte_support != NULL
+                ? state->byte_support->support[dir]
+                    [tile / WANG_DOMAIN_BYTE_BITS]
+                    [UINT8_C(1) << (tile % WANG_DOMAIN_BYTE_BITS)]
+                : state->tables.compat[dir][tile];
+            score += domain_popcount(
+                state->domains[neighbor_index(state, cell_index, dir)] &
+                support
+            );
+            if (state->collect_metrics) {
+                ++state->metrics.value_score_lookups;
             }
         }
+        if (score > best_score) {
+            best_score = score;
+            best = UINT32_C(1) << tile;
+        }
+        candidates &= candidates - UINT32_C(1);
     }
+    return best;
+}
 
-    return true;
+/* The next tile of cell_index to try from candidates, as a singleton. */
+static uint32_t select_value(
+    SolverState *state,
+    size_t cell_index,
+    uint32_t candidates
+)
+{
+    switch (state->value_order) {
+    case WANG_VALUE_ORDER_LEAST_CONSTRAINING:
+        return least_constraining_value(state, cell_index, candidates);
+    case WANG_VALUE_ORDER_DESCENDING:
+        return UINT32_C(1) << last_set_tile(candidates);
+    case WANG_VALUE_ORDER_RANDOM:
+        for (size_t skip = random_below(state, domain_popcount(candidates));
+             skip != 0;
+             --skip) {
+            candidates &= candidates - UINT32_C(1);
+        }
+        break;
+    case WANG_VALUE_ORDER_ASCENDING:
+    default:
+        break;
+    }
+    return candidates & (~candidates + UINT32_C(1));
 }
 
-static bool verify_sat_domains(const SolverState *state)
+static void note_dfs_node(SolverState *state, size_t depth)
 {
-    size_t bytes;
-    if (!checked_mul_size(state->cell_count, sizeof(TileId), &bytes)) {
-        return false;
+    ++state->dfs_node_count;
+    if (state->collect_metrics) {
+        ++state->metrics.dfs_nodes;
+        if (depth > state->metrics.max_depth) {
+            state->metrics.max_depth = depth;
+        }
     }
+}
 
-    TileId *tiles = malloc(bytes);
-    if (tiles == NULL) {
+static uint64_t monotonic_now_ns(void)
+{
+    struct timespec now;
+    if (clock_gettime(CLOCK_MONOTONIC, &now) != 0) {
+        return UINT64_MAX;
+    }
+    return (uint64_t)now.tv_sec * UINT64_C(1000000000) +
+        (uint64_t)now.tv_nsec;
+}
+
+/* Add the nodes searched since the last flush to the shared total. */
+static uint64_t flush_shared_node_count(SolverState *state)
+{
+    const uint64_t pending =
+        state->dfs_node_count - state->flushed_node_count;
+    state->flushed_node_count = state->dfs_node_count;
+    return atomic_fetch_add_explicit(
+        state->shared_node_count,
+        pending,
+        memory_order_relaxed
+    ) + pending;
+}
+
+static bool search_bound_reached(SolverState *state)
+{
+    if (state->node_limit != 0 && state->shared_node_count == NULL &&
+        state->dfs_node_count >= state->node_limit) {
+        return true;
+    }
+    if (state->deadline_ns == 0 && state->cancel_flag == NULL &&
+        state->stop_flag == NULL && state->shared_node_count == NULL) {
+        return false;
+    }
+    if (--state->bound_poll_countdown != 0) {
         return false;
     }
+    state->bound_poll_countdown = SEARCH_BOUND_POLL_INTERVAL;
 
-    bool complete = true;
-    for (size_t i = 0; i < state->cell_count; ++i) {
-        if (!state->region->cells[i].active) {
-            tiles[i] = TILE_NONE;
-        } else if (!domain_is_singleton(state->domains[i])) {
-            complete = false;
-            break;
-        } else {
-            tiles[i] = first_set_tile(state->domains[i]);
+    if (state->cancel_flag != NULL &&
+        atomic_load_explicit(state->cancel_flag, memory_order_relaxed) != 0) {
+        return true;
+    }
+    if (state->stop_flag != NULL &&
+        atomic_load_explicit(state->stop_flag, memory_order_relaxed) != 0) {
+        return true;
+    }
+    if (state->shared_node_count != NULL) {
+        const uint64_t shared_nodes = flush_shared_node_count(state);
+        if (state->node_limit != 0 && shared_nodes >= state->node_limit) {
+            return true;
         }
     }
-
-    const bool valid = complete &&
-        wang_verify_tiling(state->region, tiles, state->cell_count) ==
-            WANG_VERIFY_VALID;
-    free(tiles);
-    return valid;
+    return state->deadline_ns != 0 &&
+        monotonic_now_ns() >= state->deadline_ns;
 }
 
-static bool solver_options_are_valid(const WangSolverOptions *options)
+/*
+ * Probing stops, without stopping the solve, when its budget runs out or
+ * the solve's own deadline, cancel, or stop flag fires; the search then
+ * reports those itself. Polled before every probe: a probe propagates, which
+ * costs far more than reading the clock, and the budget is usually short.
+ */
+static bool probe_bound_reached(SolverState *state)
 {
-    if (options == NULL) {
+    if (state->probe_stopped) {
         return true;
     }
-
-    const uint32_t known_flags =
-        WANG_SOLVE_COLLECT_METRICS |
-        WANG_SOLVE_TRACE_FAILED_LEAVES |
-        WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT;
-    if ((options->flags & ~known_flags) != 0) {
+    if (state->probe_deadline_ns == 0 && state->deadline_ns == 0 &&
+        state->cancel_flag == NULL && state->stop_flag == NULL) {
         return false;
     }
 
-    if ((options->flags & WANG_SOLVE_TRACE_FAILED_LEAVES) != 0 &&
-        (options->failed_leaf_path == NULL ||
-         options->failed_leaf_path[0] == '\0' ||
-         options->failed_leaf_capacity == 0)) {
-        return false;
+    bool reached = (state->cancel_flag != NULL &&
+                    atomic_load_explicit(
+                        state->cancel_flag,
+                        memory_order_relaxed
+                    ) != 0) ||
+        (state->stop_flag != NULL &&
+         atomic_load_explicit(state->stop_flag, memory_order_relaxed) != 0);
+    if (!reached &&
+        (state->probe_deadline_ns != 0 || state->deadline_ns != 0)) {
+        const uint64_t now = monotonic_now_ns();
+        reached = (state->probe_deadline_ns != 0 &&
+                   now >= state->probe_deadline_ns) ||
+            (state->deadline_ns != 0 && now >= state->deadline_ns);
     }
+    state->probe_stopped = reached;
+    return reached;
+}
 
-    return true;
+/* One probing call: the state it narrows and the reason its removals give. */
+typedef struct {
+    SolverState *state;
+    size_t reason;
+} ProbeContext;
+
+static ProbeStatus probe_status(PropagateStatus status)
+{
+    switch (status) {
+    case PROPAGATE_OK:
+        return PROBE_OK;
+    case PROPAGATE_CONFLICT:
+        return PROBE_CONFLICT;
+    case PROPAGATE_ERROR:
+        break;
+    }
+    return PROBE_ERROR;
 }
 
-static bool initial_domains_are_valid(
-    const Region *region,
-    const WangSolverOptions *options
+static PropagateStatus propagate_status(ProbeStatus status)
+{
+    switch (status) {
+    case PROBE_OK:
+        return PROPAGATE_OK;
+    case PROBE_CONFLICT:
+        return PROPAGATE_CONFLICT;
+    case PROBE_ERROR:
+        break;
+    }
+    return PROPAGATE_ERROR;
+}
+
+/* Assign tile under a trail mark, propagate, and roll back. */
+static ProbeStatus try_probe_tile(void *context, size_t cell, uint32_t tile)
+{
+    const ProbeContext *probe = context;
+    SolverState *state = probe->state;
+    const bool record_trail = state->record_trail;
+    const size_t mark = state->trail_count;
+    state->record_trail = true;
+    begin_trail_interval(state);
+    size_t conflict_cell = SIZE_MAX;
+    const PropagateStatus status =
+        restrict_domain(state, cell, tile, probe->reason)
+        ? propagate_from_cell(state, cell, &conflict_cell)
+        : PROPAGATE_ERROR;
+    rollback_to(state, mark);
+    state->record_trail = record_trail;
+    return probe_status(status);
+}
+
+/*
+ * Remove a failed tile and propagate. The removal is trailed only when
+ * record_trail is set, so it is permanent at the root and undone with the
+ * decision below it.
+ */
+static ProbeStatus remove_probe_tile(
+    void *context,
+    size_t cell,
+    uint32_t tile,
+    size_t *out_conflict_cell
+)
+{
+    const ProbeContext *probe = context;
+    SolverState *state = probe->state;
+    const uint32_t remaining = state->domains[cell] & ~tile;
+    if (!restrict_domain(state, cell, remaining, probe->reason)) {
+        return PROBE_ERROR;
+    }
+    if (remaining == 0) {
+        *out_conflict_cell = cell;
+        return PROBE_CONFLICT;
+    }
+    return probe_status(propagate_from_cell(state, cell, out_conflict_cell));
+}
+
+static bool probe_stop(void *context)
+{
+    return probe_bound_reached(((ProbeContext *)context)->state);
+}
+
+/*
+ * Run probe_passes() over the state and charge the time it took to the
+ * probe budget. reason is passed to restrict_domain().
+ */
+static PropagateStatus probe_singletons(
+    SolverState *state,
+    size_t reason,
+    size_t *out_conflict_cell
+)
+{
+    if (state->probe_stopped) {
+        return PROPAGATE_OK;
+    }
+    const uint64_t budget = state->probe_budget_ns;
+    if (budget != 0) {
+        const uint64_t now = monotonic_now_ns();
+        state->probe_deadline_ns = now > UINT64_MAX - budget
+            ? UINT64_MAX
+            : now + budget;
+    }
+
+    ProbeContext context = { .state = state, .reason = reason };
+    const ProbeHooks hooks = {
+        .try_tile = try_probe_tile,
+        .remove_tile = remove_probe_tile,
+        .stop = probe_stop,
+        .context = &context,
+    };
+    ProbeCounters counters = {0};
+    const PropagateStatus status = propagate_status(probe_passes(
+        state->region,
+        state->domains,
+        &hooks,
+        out_conflict_cell,
+        &counters
+    ));
+    if (state->collect_metrics) {
+        state->metrics.probes += counters.probes;
+        state->metrics.probe_prunes += counters.prunes;
+    }
+
+    if (budget != 0) {
+        const uint64_t now = monotonic_now_ns();
+        state->probe_budget_ns = state->probe_deadline_ns > now
+            ? state->probe_deadline_ns - now
+            : 0;
+        state->probe_stopped = state->probe_stopped ||
+            state->probe_budget_ns == 0;
+    }
+    return status;
+}
+
+static bool search_stack_resize(SearchStack *stack, size_t capacity)
+{
+    size_t bytes;
+    if (capacity == 0 || capacity > stack->limit ||
+        !checked_mul_size(capacity, sizeof(*stack->frames), &bytes)) {
+        return false;
+    }
+
+    SearchFrame *resized = realloc(stack->frames, bytes);
+    if (resized == NULL) {
+        return false;
+    }
+    stack->frames = resized;
+    stack->capacity = capacity;
+    stack->allocated_bytes = bytes;
+    return true;
+}
+
+static bool search_stack_init(
+    SearchStack *stack,
+    size_t limit,
+    SearchStackMode mode
+)
+{
+    enum { INITIAL_DYNAMIC_CAPACITY = 16 };
+
+    stack->count = 0;
+    stack->limit = limit;
+    const size_t initial_capacity =
+        mode == SEARCH_STACK_DYNAMIC && limit > INITIAL_DYNAMIC_CAPACITY
+            ? INITIAL_DYNAMIC_CAPACITY
+            : limit;
+    if (initial_capacity == 0) {
+        return false;
+    }
+    /* Frames retained by a workspace are reused when already large enough. */
+    if (stack->frames != NULL && stack->capacity >= initial_capacity) {
+        return true;
+    }
+
+    size_t bytes;
+    if (!checked_mul_size(
+            initial_capacity,
+            sizeof(*stack->frames),
+            &bytes
+        )) {
+        return false;
+    }
+    free(stack->frames);
+    stack->capacity = 0;
+    stack->allocated_bytes = 0;
+    stack->frames = malloc(bytes);
+    if (stack->frames == NULL) {
+        return false;
+    }
+    stack->capacity = initial_capacity;
+    stack->allocated_bytes = bytes;
+    return true;
+}
+
+static bool search_stack_push(SearchStack *stack, SearchFrame frame)
+{
+    if (stack->count == stack->limit) {
+        return false;
+    }
+    if (stack->count == stack->capacity) {
+        size_t capacity = stack->capacity;
+        if (capacity > stack->limit / 2) {
+            capacity = stack->limit;
+        } else {
+            capacity *= 2;
+        }
+        if (capacity <= stack->capacity ||
+            !search_stack_resize(stack, capacity)) {
+            return false;
+        }
+    }
+
+    stack->frames[stack->count++] = frame;
+    return true;
+}
+
+static void note_search_stack_capacity(
+    SolverState *state,
+    const SearchStack *stack
+)
+{
+    if (state->collect_metrics &&
+        stack->capacity > state->metrics.dfs_stack_capacity_peak) {
+        state->metrics.dfs_stack_capacity_peak = stack->capacity;
+        state->metrics.dfs_stack_bytes_peak = stack->allocated_bytes;
+    }
+}
+
+/* Term index of the Luby sequence 1, 1, 2, 1, 1, 2, 4, ..., from zero. */
+static uint64_t luby_term(uint64_t index)
+{
+    uint64_t size = 1;
+    unsigned power = 0;
+    while (size < index + 1u) {
+        ++power;
+        size = 2u * size + 1u;
+    }
+    while (size - 1u != index) {
+        size = (size - 1u) / 2u;
+        --power;
+        index %= size;
+    }
+    return UINT64_C(1) << power;
+}
+
+/* The failed-leaf budget of the next run, saturating. */
+static uint64_t next_restart_budget(const SolverState *state)
+{
+    uint64_t units = 1;
+    if (state->restart_schedule == WANG_RESTART_LUBY) {
+        units = luby_term(state->restart_count);
+    } else {
+        for (uint64_t run = 0;
+             run < state->restart_count && units < UINT64_MAX / 2u;
+             ++run) {
+            units += (units + 1u) / 2u;
+        }
+    }
+    return units > UINT64_MAX / state->restart_base
+        ? UINT64_MAX
+        : units * state->restart_base;
+}
+
+/*
+ * Abandon the current run once its budget is spent: return to the
+ * propagated root and start the next run with random ties and values,
+ * reseeded from the restart seed and the run number. The best failed leaf,
+ * the node count, and learned nogoods carry over, since they hold at the
+ * root.
+ */
+static bool restart_search(SolverState *state)
+{
+    SearchStack *stack = &state->stack;
+    rollback_to(state, stack->frames[0].entry_mark);
+    stack->count = 0;
+
+    ++state->restart_count;
+    if (state->collect_metrics) {
+        ++state->metrics.restarts;
+    }
+    state->restart_leaves_left = next_restart_budget(state);
+    state->random_state = seed_random_state(
+        state->restart_seed + state->restart_count
+    );
+    state->value_order = WANG_VALUE_ORDER_RANDOM;
+    state->tie_break = WANG_TIE_BREAK_RANDOM;
+    /* Random ties scan the cells, so the MRV index is no longer kept. */
+    state->mrv_index_active = false;
+
+    size_t root_cell;
+    if (!select_branch_cell(state, 0, &root_cell) ||
+        root_cell == SIZE_MAX ||
+        !search_stack_push(stack, (SearchFrame) {
+            .cell_index = root_cell,
+            .candidates = state->domains[root_cell],
+            .entry_mark = 0,
+        })) {
+        return false;
+    }
+    if (state->learn_nogoods) {
+        state->learning.frame_rows[0] = SIZE_MAX;
+    }
+    return true;
+}
+
+static void schedule_search_checkpoint(SolverState *state, uint64_t now)
+{
+    const uint64_t interval = state->checkpoint_interval_ns;
+    state->checkpoint_due_ns = now > UINT64_MAX - interval
+        ? UINT64_MAX
+        : now + interval;
+}
+
+/*
+ * Whether the next checkpoint is due. The clock is read once every
+ * SEARCH_BOUND_POLL_INTERVAL steps, like the deadline.
+ */
+static bool search_checkpoint_due(SolverState *state)
+{
+    if (state->checkpoint_path == NULL ||
+        --state->checkpoint_countdown != 0) {
+        return false;
+    }
+    state->checkpoint_countdown = SEARCH_BOUND_POLL_INTERVAL;
+    const uint64_t now = monotonic_now_ns();
+    if (now < state->checkpoint_due_ns) {
+        return false;
+    }
+    schedule_search_checkpoint(state, now);
+    return true;
+}
+
+/*
+ * Save the search at the top of a step, before the top frame takes its
+ * next value, which is where resume_search() continues it.
+ */
+static bool write_search_checkpoint(SolverState *state)
+{
+    const SearchCheckpoint checkpoint = {
+        .width = (uint32_t)state->region->width,
+        .height = (uint32_t)state->region->height,
+        .cell_count = state->cell_count,
+        .region_fingerprint = state->checkpoint_region_fingerprint,
+        .options_fingerprint = state->checkpoint_options_fingerprint,
+        .domains = state->domains,
+        .trail = state->trail,
+        .trail_count = state->trail_count,
+        .frames = state->stack.frames,
+        .frame_count = state->stack.count,
+        .dfs_node_count = state->dfs_node_count,
+        .random_state = state->random_state,
+        .value_order = (uint32_t)state->value_order,
+        .tie_break = (uint32_t)state->tie_break,
+        .restart_count = state->restart_count,
+        .restart_leaves_left = state->restart_leaves_left,
+        .probe_budget_ns = state->probe_budget_ns,
+        .probe_stopped = state->probe_stopped,
+        .arc_weights = state->weighted_degree ? state->arc_weights : NULL,
+        .weight_bump = state->weights.bump,
+        .weights_active = state->weights_active,
+        .has_best_leaf = state->has_best_leaf,
+        .best_snapshot = state->capture_unsat_snapshot
+            ? state->best_snapshot
+            : NULL,
+        .best_resolved_count = state->best_resolved_count,
+        .best_depth = state->best_depth,
+        .best_conflict_cell = state->best_conflict_cell,
+    };
+    return search_checkpoint_write(state->checkpoint_path, &checkpoint);
+}
+
+/* Take search steps from the frames on the stack until a result. */
+static WangSolveStatus run_search(SolverState *state)
+{
+    SearchStack *stack = &state->stack;
+    WangSolveStatus status = WANG_SOLVE_ERROR;
+
+    while (stack->count != 0) {
+        SearchFrame *frame = &stack->frames[stack->count - 1];
+        const ComponentStorage *components = &state->components;
+        if (frame->candidates == 0 && components->group_count != 0 &&
+            components->groups[components->group_count - 1].root_frame ==
+                stack->count - 1) {
+            /*
+             * A failed component refutes the decision that split it; the
+             * components solved before it cannot help, so skip their frames.
+             */
+            const ComponentGroup group =
+                components->groups[components->group_count - 1];
+            discard_component_group(state);
+            if (group.split_frame == SIZE_MAX) {
+                status = WANG_SOLVE_UNSAT;
+                break;
+            }
+            stack->count = group.split_frame + 1u;
+            rollback_to(state, group.split_mark);
+            if (state->collect_metrics) {
+                ++state->metrics.backtracks;
+            }
+            continue;
+        }
+        if (frame->candidates == 0 && state->learn_nogoods) {
+            bool refuted;
+            if (!backjump(state, &refuted)) {
+                break;
+            }
+            if (refuted) {
+                status = WANG_SOLVE_UNSAT;
+                break;
+            }
+            continue;
+        }
+        if (frame->candidates == 0) {
+            const size_t entry_mark = frame->entry_mark;
+            --stack->count;
+            if (stack->count == 0) {
+                status = WANG_SOLVE_UNSAT;
+                break;
+            }
+
+            rollback_to(state, entry_mark);
+            if (state->collect_metrics) {
+                ++state->metrics.backtracks;
+            }
+            continue;
+        }
+
+        if (search_bound_reached(state)) {
+            /* A bounded search leaves a checkpoint to resume from. */
+            status = state->checkpoint_path != NULL &&
+                    !write_search_checkpoint(state)
+                ? WANG_SOLVE_ERROR
+                : WANG_SOLVE_UNKNOWN;
+            break;
+        }
+        if (search_checkpoint_due(state) &&
+            !write_search_checkpoint(state)) {
+            break;
+        }
+
+        const uint32_t singleton = select_value(
+            state,
+            frame->cell_index,
+            frame->candidates
+        );
+        frame->candidates &= ~singleton;
+        if (state->learn_nogoods) {
+            bool refuted;
+            if (!refuted_by_nogood(
+                    state,
+                    stack->count - 1u,
+                    singleton,
+                    &refuted
+                )) {
+                break;
+            }
+            if (refuted) {
+                continue;
+            }
+        }
+
+        if (state->collect_metrics) {
+            ++state->metrics.decisions;
+        }
+
+        const size_t mark = state->trail_count;
+        begin_trail_interval(state);
+        if (!restrict_domain(
+                state,
+                frame->cell_index,
+                singleton,
+                state->cell_count + stack->count - 1u
+            )) {
+            rollback_to(state, mark);
+            break;
+        }
+
+        const size_t branch_depth = stack->count;
+        size_t conflict_cell = SIZE_MAX;
+        PropagateStatus propagated = propagate_from_cell(
+            state,
+            frame->cell_index,
+            &conflict_cell
+        );
+        if (propagated == PROPAGATE_OK && state->probe_singletons &&
+            branch_depth <= state->probe_depth) {
+            propagated = probe_singletons(
+                state,
+                state->cell_count + stack->count - 1u,
+                &conflict_cell
+            );
+        }
+
+        if (propagated == PROPAGATE_ERROR) {
+            rollback_to(state, mark);
+            break;
+        }
+
+        if (propagated == PROPAGATE_CONFLICT) {
+            if (state->weighted_degree) {
+                bump_conflict_weights(state, conflict_cell);
+            }
+            if (!record_failed_leaf(
+                    state,
+                    conflict_cell,
+                    branch_depth
+                )) {
+                rollback_to(state, mark);
+                break;
+            }
+            if (state->learn_nogoods &&
+                !record_leaf_conflict(state, conflict_cell)) {
+                rollback_to(state, mark);
+                break;
+            }
+        } else {
+            note_dfs_node(state, branch_depth);
+
+            if (state->resolved_count == state->active_count) {
+                state->best_depth = branch_depth;
+                status = WANG_SOLVE_SAT;
+                break;
+            }
+
+            if (state->decompose_each_decision &&
+                decision_may_split(state, mark) && !split_scope(
+                    state,
+                    stack->count - 1u,
+                    mark,
+                    stack->count
+                )) {
+                rollback_to(state, mark);
+                break;
+            }
+            size_t child_cell;
+            if (!build_mrv_index(state) ||
+                !select_branch_cell(state, stack->count, &child_cell)) {
+                rollback_to(state, mark);
+                break;
+            }
+            if (child_cell == SIZE_MAX && state->scope_cells != NULL) {
+                state->best_depth = branch_depth;
+                status = WANG_SOLVE_SAT;
+                break;
+            }
+            if (child_cell == SIZE_MAX ||
+                !search_stack_push(stack, (SearchFrame) {
+                    .cell_index = child_cell,
+                    .candidates = state->domains[child_cell],
+                    .entry_mark = mark,
+                })) {
+                rollback_to(state, mark);
+                break;
+            }
+            if (state->learn_nogoods) {
+                state->learning.frame_rows[stack->count - 1u] = SIZE_MAX;
+            }
+            note_search_stack_capacity(state, stack);
+            continue;
+        }
+
+        rollback_to(state, mark);
+        if (state->collect_metrics) {
+            ++state->metrics.backtracks;
+        }
+        if (state->restart_schedule != WANG_RESTART_NONE &&
+            --state->restart_leaves_left == 0 &&
+            !restart_search(state)) {
+            break;
+        }
+    }
+
+    return status;
+}
+
+static WangSolveStatus search(
+    SolverState *state,
+    SearchStackMode stack_mode
+)
+{
+    note_dfs_node(state, 0);
+
+    if (state->resolved_count == state->active_count) {
+        state->best_depth = 0;
+        return WANG_SOLVE_SAT;
+    }
+
+    SearchStack *stack = &state->stack;
+    if (!search_stack_init(stack, state->active_count, stack_mode)) {
+        return WANG_SOLVE_ERROR;
+    }
+    note_search_stack_capacity(state, stack);
+
+    if (state->decompose_root && !split_scope(state, SIZE_MAX, 0, 0)) {
+        return WANG_SOLVE_ERROR;
+    }
+    size_t root_cell;
+    if (!select_branch_cell(state, 0, &root_cell)) {
+        return WANG_SOLVE_ERROR;
+    }
+    if (root_cell == SIZE_MAX) {
+        if (state->scope_cells == NULL) {
+            return WANG_SOLVE_ERROR;
+        }
+        state->best_depth = 0;
+        return WANG_SOLVE_SAT;
+    }
+
+    if (!search_stack_push(stack, (SearchFrame) {
+            .cell_index = root_cell,
+            .candidates = state->domains[root_cell],
+            .entry_mark = 0,
+        })) {
+        return WANG_SOLVE_ERROR;
+    }
+    if (state->learn_nogoods) {
+        state->learning.frame_rows[0] = SIZE_MAX;
+    }
+    return run_search(state);
+}
+
+/*
+ * Whether checkpoint was written by this solve from the propagated root in
+ * state: same region and options, active cells open or resolved, inactive
+ * cells empty, frames on active cells, and a trail that unwinds the
+ * checkpoint's domains exactly to the root's.
+ */
+static bool search_checkpoint_matches(
+    const SolverState *state,
+    const SearchCheckpoint *checkpoint
+)
+{
+    if (checkpoint->cell_count != state->cell_count ||
+        checkpoint->width != (uint32_t)state->region->width ||
+        checkpoint->height != (uint32_t)state->region->height ||
+        checkpoint->region_fingerprint !=
+            state->checkpoint_region_fingerprint ||
+        checkpoint->options_fingerprint !=
+            state->checkpoint_options_fingerprint ||
+        checkpoint->value_order > WANG_VALUE_ORDER_LEAST_CONSTRAINING ||
+        checkpoint->tie_break > WANG_TIE_BREAK_RANDOM ||
+        (checkpoint->arc_weights != NULL) != state->weighted_degree ||
+        (checkpoint->best_snapshot != NULL) !=
+            (state->capture_unsat_snapshot && checkpoint->has_best_leaf)) {
+        return false;
+    }
+    for (size_t i = 0; i < checkpoint->cell_count; ++i) {
+        if (state->region->cells[i].active != (checkpoint->domains[i] != 0)) {
+            return false;
+        }
+    }
+    for (size_t i = 0; i < checkpoint->frame_count; ++i) {
+        if (!state->region->cells[checkpoint->frames[i].cell_index].active) {
+            return false;
+        }
+    }
+
+    uint32_t *unwound = malloc(
+        state->cell_count * sizeof(*unwound)
+    );
+    if (unwound == NULL) {
+        return false;
+    }
+    memcpy(
+        unwound,
+        checkpoint->domains,
+        state->cell_count * sizeof(*unwound)
+    );
+    for (size_t i = checkpoint->trail_count; i > 0; --i) {
+        const TrailEntry *entry = &checkpoint->trail[i - 1u];
+        unwound[entry->cell_index] = entry->old_domain;
+    }
+    const bool matches = memcmp(
+        unwound,
+        state->domains,
+        state->cell_count * sizeof(*unwound)
+    ) == 0;
+    free(unwound);
+    return matches;
+}
+
+/*
+ * Continue a search from a checkpoint instead of the root. state holds the
+ * propagated root, with learning and decomposition off; the checkpoint
+ * restores the domains, trail, and frames, and the state that steers the
+ * rest of the search, so the remaining steps are those the checkpointed
+ * search would have taken.
+ */
+static WangSolveStatus resume_search(
+    SolverState *state,
+    SearchStackMode stack_mode,
+    const SearchCheckpoint *checkpoint
+)
+{
+    SearchStack *stack = &state->stack;
+    if (!search_checkpoint_matches(state, checkpoint) ||
+        !ensure_trail_capacity(state, checkpoint->trail_count) ||
+        (checkpoint->best_snapshot != NULL &&
+         !ensure_best_snapshot(state)) ||
+        !search_stack_init(stack, state->active_count, stack_mode)) {
+        return WANG_SOLVE_ERROR;
+    }
+    for (size_t i = 0; i < checkpoint->frame_count; ++i) {
+        if (!search_stack_push(stack, checkpoint->frames[i])) {
+            return WANG_SOLVE_ERROR;
+        }
+    }
+    note_search_stack_capacity(state, stack);
+
+    const size_t domain_bytes = state->cell_count * sizeof(*state->domains);
+    memcpy(state->domains, checkpoint->domains, domain_bytes);
+    if (checkpoint->trail_count != 0) {
+        memcpy(
+            state->trail,
+            checkpoint->trail,
+            checkpoint->trail_count * sizeof(*state->trail)
+        );
+    }
+    state->trail_count = checkpoint->trail_count;
+    state->resolved_count = 0;
+    for (size_t i = 0; i < state->cell_count; ++i) {
+        if (domain_is_singleton(state->domains[i])) {
+            ++state->resolved_count;
+        }
+    }
+
+    state->dfs_node_count = checkpoint->dfs_node_count;
+    state->random_state = checkpoint->random_state;
+    state->value_order = (WangValueOrder)checkpoint->value_order;
+    state->tie_break = (WangTieBreak)checkpoint->tie_break;
+    state->restart_count = checkpoint->restart_count;
+    state->restart_leaves_left = checkpoint->restart_leaves_left;
+    state->probe_budget_ns = checkpoint->probe_budget_ns;
+    state->probe_stopped = checkpoint->probe_stopped;
+    if (checkpoint->arc_weights != NULL) {
+        memcpy(
+            state->arc_weights,
+            checkpoint->arc_weights,
+            2u * state->cell_count * sizeof(*state->arc_weights)
+        );
+    }
+    state->weights.bump = checkpoint->weight_bump;
+    state->weights_active = checkpoint->weights_active;
+
+    state->has_best_leaf = checkpoint->has_best_leaf;
+    state->best_resolved_count = checkpoint->best_resolved_count;
+    state->best_depth = checkpoint->best_depth;
+    state->best_conflict_cell = checkpoint->best_conflict_cell;
+    if (checkpoint->best_snapshot != NULL) {
+        memcpy(state->best_snapshot, checkpoint->best_snapshot, domain_bytes);
+    }
+    return run_search(state);
+}
+
+static bool frontier_bound_reached(void *context)
+{
+    return search_bound_reached(context);
+}
+
+/*
+ * Decide the propagated root by the frontier sweep instead of DFS. SAT
+ * narrows every active cell to its witness tile; UNSAT empties the first
+ * cell no profile could tile and records it as the only failed leaf. When
+ * the profiles outgrow their bound, *out_overflow is set, the domains are
+ * untouched, and the result is UNKNOWN.
+ */
+static WangSolveStatus frontier_search(
+    SolverState *state,
+    const FrontierSweep *sweep,
+    bool *out_overflow
+)
+{
+    *out_overflow = false;
+    TileId *tiles = malloc(
+        (state->cell_count == 0 ? 1u : state->cell_count) * sizeof(*tiles)
+    );
+    if (tiles == NULL) {
+        return WANG_SOLVE_ERROR;
+    }
+
+    FrontierCounters counters = {0};
+    size_t conflict_cell = SIZE_MAX;
+    const FrontierStatus frontier_status = frontier_solve(
+        state->region,
+        sweep,
+        state->domains,
+        frontier_bound_reached,
+        state,
+        tiles,
+        &conflict_cell,
+        &counters
+    );
+    if (state->collect_metrics) {
+        state->metrics.frontier_states += counters.states;
+        if (counters.peak_states > state->metrics.frontier_peak_states) {
+            state->metrics.frontier_peak_states = counters.peak_states;
+        }
+    }
+
+    WangSolveStatus status = WANG_SOLVE_ERROR;
+    switch (frontier_status) {
+    case FRONTIER_SAT:
+        status = WANG_SOLVE_SAT;
+        for (size_t i = 0; i < state->cell_count; ++i) {
+            if (state->region->cells[i].active &&
+                !restrict_domain(state, i, UINT32_C(1) << tiles[i], i)) {
+                status = WANG_SOLVE_ERROR;
+                break;
+            }
+        }
+        break;
+    case FRONTIER_UNSAT:
+        if (restrict_domain(state, conflict_cell, 0, conflict_cell) &&
+            record_failed_leaf(state, conflict_cell, 0)) {
+            status = WANG_SOLVE_UNSAT;
+        }
+        break;
+    case FRONTIER_OVERFLOW:
+        *out_overflow = true;
+        status = WANG_SOLVE_UNKNOWN;
+        break;
+    case FRONTIER_STOPPED:
+        status = WANG_SOLVE_UNKNOWN;
+        break;
+    case FRONTIER_ERROR:
+        break;
+    }
+    free(tiles);
+    return status;
+}
+
+static bool allocate_solver_arrays(SolverState *state)
+{
+    size_t queue_metric_bytes = 0;
+    size_t trail_metric_bytes = 0;
+    if ((state->collect_metrics && !checked_mul_size(
+            state->cell_count,
+            sizeof(*state->queue_pending_counts),
+            &queue_metric_bytes
+        )) ||
+        (state->collect_metrics && !checked_mul_size(
+            state->cell_count,
+            sizeof(*state->trail_cell_interval),
+            &trail_metric_bytes
+        ))) {
+        return false;
+    }
+
+    state->domains = reserve_cell_buffer(
+        state->domains,
+        &state->domain_capacity,
+        state->cell_count,
+        sizeof(*state->domains)
+    );
+    state->neighbor_mask = reserve_cell_buffer(
+        state->neighbor_mask,
+        &state->neighbor_capacity,
+        state->cell_count,
+        sizeof(*state->neighbor_mask)
+    );
+    if (state->domains == NULL || state->neighbor_mask == NULL) {
+        return false;
+    }
+    if (state->collect_metrics) {
+        state->queue_pending_counts = calloc(
+            state->cell_count,
+            sizeof(*state->queue_pending_counts)
+        );
+        state->trail_cell_interval = calloc(
+            state->cell_count,
+            sizeof(*state->trail_cell_interval)
+        );
+        if (state->queue_pending_counts == NULL ||
+            state->trail_cell_interval == NULL) {
+            return false;
+        }
+        state->trail_interval = 1;
+    }
+    return true;
+}
+
+static bool initialize_domains(
+    SolverState *state,
+    const uint32_t *initial_domains,
+    size_t *out_initial_conflict
+)
+{
+    *out_initial_conflict = SIZE_MAX;
+    static const int32_t dx[DIR_COUNT] = { 0, 1, 0, -1 };
+    static const int32_t dy[DIR_COUNT] = { -1, 0, 1, 0 };
+
+    for (int32_t y = 0; y < state->region->height; ++y) {
+        for (int32_t x = 0; x < state->region->width; ++x) {
+            const size_t index = region_index(state->region, x, y);
+            const RegionCell *cell = &state->region->cells[index];
+            state->neighbor_mask[index] = 0;
+
+            if (!cell->active) {
+                state->domains[index] = 0;
+                continue;
+            }
+
+            ++state->active_count;
+            uint32_t domain = initial_domains != NULL
+                ? initial_domains[index]
+                : WANG_DOMAIN_ALL;
+            if (state->collect_metrics && domain != WANG_DOMAIN_ALL) {
+                ++state->metrics.domain_reductions;
+            }
+
+            for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+                const RegionCell *neighbor = region_cell_const(
+                    state->region,
+                    x + dx[dir],
+                    y + dy[dir]
+                );
+
+                if (neighbor != NULL && neighbor->active) {
+                    state->neighbor_mask[index] |=
+                        (uint8_t)(UINT8_C(1) << dir);
+                    state->has_neighbor_arcs = true;
+                    continue;
+                }
+
+                const ColorId boundary = cell->boundary[dir];
+                if (boundary != COLOR_NONE) {
+                    const uint32_t restricted =
+                        domain & state->tables.edge_mask[dir][boundary];
+                    if (state->collect_metrics && restricted != domain) {
+                        ++state->metrics.domain_reductions;
+                    }
+                    domain = restricted;
+                }
+            }
+
+            /* An isolated cell cannot constrain any other choice. */
+            if (state->neighbor_mask[index] == 0 &&
+                !domain_is_singleton(domain) && domain != 0) {
+                domain &= UINT32_C(0) - domain;
+                if (state->collect_metrics) {
+                    ++state->metrics.domain_reductions;
+                }
+            }
+
+            state->domains[index] = domain;
+            if (domain_is_singleton(domain)) {
+                ++state->resolved_count;
+            } else if (domain == 0 && *out_initial_conflict == SIZE_MAX) {
+                *out_initial_conflict = index;
+            }
+        }
+    }
+
+    return true;
+}
+
+/*
+ * Redo a root that the warm start found contradictory, from the initialized
+ * domains, so that the conflict cell, the snapshot, and the counters are
+ * those of a cold solve: the warm queue may empty another cell first.
+ * initialized_metrics are the counters as initialize_domains() left them,
+ * and trail_capacity the capacity the solve started with; a trail the warm
+ * propagation grew shrinks back so that its growth is counted again.
+ */
+static PropagateStatus propagate_root_again_cold(
+    SolverState *state,
+    const uint32_t *initial_domains,
+    const WangSolverMetrics *initialized_metrics,
+    size_t trail_capacity,
+    bool bitslice,
+    size_t *out_conflict_cell
+)
+{
+    if (state->trail_capacity > trail_capacity) {
+        if (trail_capacity == 0) {
+            free(state->trail);
+            state->trail = NULL;
+        } else {
+            TrailEntry *shrunk = realloc(
+                state->trail,
+                trail_capacity * sizeof(*state->trail)
+            );
+            if (shrunk == NULL) {
+                return PROPAGATE_ERROR;
+            }
+            state->trail = shrunk;
+        }
+        state->trail_capacity = trail_capacity;
+    }
+    state->active_count = 0;
+    state->resolved_count = 0;
+    state->has_neighbor_arcs = false;
+    state->trail_count = 0;
+    size_t initial_conflict;
+    if (!initialize_domains(state, initial_domains, &initial_conflict)) {
+        return PROPAGATE_ERROR;
+    }
+    state->metrics = *initialized_metrics;
+    begin_trail_interval(state);
+    *out_conflict_cell = SIZE_MAX;
+    return bitslice
+        ? propagate_initial_bitsliced(state, out_conflict_cell)
+        : propagate_initial(state, out_conflict_cell);
+}
+
+static bool verify_sat_domains(const SolverState *state)
+{
+    size_t bytes;
+    if (!checked_mul_size(state->cell_count, sizeof(TileId), &bytes)) {
+        return false;
+    }
+
+    TileId *tiles = malloc(bytes);
+    if (tiles == NULL) {
+        return false;
+    }
+
+    bool complete = true;
+    for (size_t i = 0; i < state->cell_count; ++i) {
+        if (!state->region->cells[i].active) {
+            tiles[i] = TILE_NONE;
+        } else if (!domain_is_singleton(state->domains[i])) {
+            complete = false;
+            break;
+        } else {
+            tiles[i] = first_set_tile(state->domains[i]);
+        }
+    }
+
+    const bool valid = complete &&
+        wang_verify_tiling(state->region, tiles, state->cell_count) ==
+            WANG_VERIFY_VALID;
+    free(tiles);
+    return valid;
+}
+
+static bool solver_options_are_valid(const WangSolverOptions *options)
+{
+    if (options == NULL) {
+        return true;
+    }
+
+    const uint32_t known_flags =
+        WANG_SOLVE_COLLECT_METRICS |
+        WANG_SOLVE_TRACE_FAILED_LEAVES |
+        WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT |
+        WANG_SOLVE_DECOMPOSE_COMPONENTS |
+        WANG_SOLVE_DECOMPOSE_EACH_DECISION |
+        WANG_SOLVE_LEARN_NOGOODS |
+        WANG_SOLVE_BITSLICE_PROPAGATION |
+        WANG_SOLVE_FRONTIER_WHEN_NARROW |
+        WANG_SOLVE_PROBE_SINGLETONS |
+        WANG_SOLVE_WEIGHTED_DEGREE |
+        WANG_SOLVE_CHECKPOINT;
+    if ((options->flags & ~known_flags) != 0) {
+        return false;
+    }
+
+    if ((options->flags & WANG_SOLVE_TRACE_FAILED_LEAVES) != 0 &&
+        (options->failed_leaf_path == NULL ||
+         options->failed_leaf_path[0] == '\0' ||
+         options->failed_leaf_capacity == 0)) {
+        return false;
+    }
+
+    if ((unsigned)options->value_order >
+            WANG_VALUE_ORDER_LEAST_CONSTRAINING ||
+        (unsigned)options->tie_break > WANG_TIE_BREAK_RANDOM ||
+        (unsigned)options->restart_schedule > WANG_RESTART_GEOMETRIC ||
+        (options->restart_schedule == WANG_RESTART_NONE &&
+         options->restart_base != 0)) {
+        return false;
+    }
+    if ((options->flags & WANG_SOLVE_PROBE_SINGLETONS) == 0 &&
+        (options->probe_budget_ns != 0 || options->probe_depth != 0)) {
+        return false;
+    }
+    if ((options->flags & WANG_SOLVE_CHECKPOINT) != 0
+            ? options->checkpoint_path == NULL ||
+              options->checkpoint_path[0] == '\0'
+            : options->checkpoint_path != NULL ||
+              options->checkpoint_interval_ns != 0) {
+        return false;
+    }
+
+    return true;
+}
+
+static bool initial_domains_are_valid(
+    const Region *region,
+    const WangSolverOptions *options
+)
+{
+    if (options == NULL) {
+        return true;
+    }
+    if (options->initial_domains == NULL) {
+        return options->initial_domain_count == 0;
+    }
+    if (options->initial_domain_count != region->cell_count) {
+        return false;
+    }
+
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        const uint32_t mask = options->initial_domains[i];
+        if ((mask & ~WANG_DOMAIN_ALL) != 0 ||
+            (!region->cells[i].active && mask != 0)) {
+            return false;
+        }
+    }
+    return true;
+}
+
+static bool root_fixpoint_is_valid(
+    const Region *region,
+    const WangSolverOptions *options
+)
+{
+    if (options == NULL || options->root_fixpoint == NULL) {
+        return true;
+    }
+
+    const WangRootFixpoint *fixpoint = options->root_fixpoint;
+    if (fixpoint->contradiction
+            ? fixpoint->domains != NULL || fixpoint->domain_count != 0
+            : fixpoint->domains == NULL ||
+              fixpoint->domain_count != region->cell_count) {
+        return false;
+    }
+    return fixpoint->region_fingerprint == region_content_hash(region);
+}
+
+/*
+ * FNV-1a over the options that steer the search, so that only the options
+ * that wrote a checkpoint can resume it. Metrics, traces, bitslice
+ * propagation and the checkpoint options change no decision, and the
+ * bounds and probe budget may differ between runs. initial_domains and
+ * root_fixpoint are checked through the root domains instead.
+ */
+static uint64_t checkpoint_options_fingerprint(
+    const WangSolverOptions *options
+)
+{
+    const uint32_t neutral_flags =
+        WANG_SOLVE_COLLECT_METRICS |
+        WANG_SOLVE_TRACE_FAILED_LEAVES |
+        WANG_SOLVE_BITSLICE_PROPAGATION |
+        WANG_SOLVE_CHECKPOINT;
+    const uint64_t fields[] = {
+        options->flags & ~neutral_flags,
+        (uint64_t)options->value_order,
+        (uint64_t)options->tie_break,
+        options->seed,
+        (uint64_t)options->restart_schedule,
+        options->restart_base,
+        (uint64_t)options->probe_depth,
+    };
+    uint64_t hash = UINT64_C(14695981039346656037);
+    for (size_t i = 0; i < sizeof(fields) / sizeof(fields[0]); ++i) {
+        for (unsigned byte = 0; byte < 8; ++byte) {
+            hash ^= (fields[i] >> (8u * byte)) & UINT64_C(0xff);
+            hash *= UINT64_C(1099511628211);
+        }
+    }
+    return hash;
+}
+
+/* resume_search() from the checkpoint file at state->checkpoint_path. */
+static WangSolveStatus resume_checkpoint_file(
+    SolverState *state,
+    SearchStackMode stack_mode
+)
+{
+    SearchCheckpoint checkpoint;
+    if (!search_checkpoint_read(state->checkpoint_path, &checkpoint)) {
+        return WANG_SOLVE_ERROR;
+    }
+    const WangSolveStatus status =
+        resume_search(state, stack_mode, &checkpoint);
+    search_checkpoint_destroy(&checkpoint);
+    return status;
+}
+
+void wang_solve_result_destroy(WangSolveResult *result)
+{
+    if (result == NULL) {
+        return;
+    }
+
+    free(result->domains);
+    *result = (WangSolveResult){0};
+}
+
+/*
+ * Build the tileset tables once per workspace, validating them on first
+ * use.
+ */
+static bool workspace_prepare_tables(
+    SolverWorkspace *workspace,
+    bool use_bytewise_support
+)
+{
+    if (!workspace->tables_ready) {
+        build_solver_tables(&workspace->tables);
+        if (!solver_tables_are_valid(&workspace->tables)) {
+            return false;
+        }
+        workspace->tables_ready = true;
+    }
+    if (use_bytewise_support && workspace->byte_support == NULL) {
+        workspace->byte_support = malloc(sizeof(*workspace->byte_support));
+        if (workspace->byte_support == NULL) {
+            return false;
+        }
+        byte_support_tables_build(
+            (const ByteSupportCompat *)&workspace->tables.compat,
+            workspace->byte_support
+        );
+    }
+    return true;
+}
+
+static WangSolveStatus solve_wang_core(
+    SolverWorkspace *workspace,
+    const Region *region,
+    const WangSolverOptions *options,
+    const SolverSharedBounds *shared,
+    const SolverScope *scope,
+    WangSolveResult *out_result,
+    SolverMechanisms mechanisms
+)
+{
+    if (!solver_result_is_destroyed(out_result) ||
+        !solver_options_are_valid(options)) {
+        return WANG_SOLVE_ERROR;
+    }
+    const bool decompose_each_decision = options != NULL &&
+        (options->flags & WANG_SOLVE_DECOMPOSE_EACH_DECISION) != 0;
+    const bool decompose_root = decompose_each_decision ||
+        (options != NULL &&
+         (options->flags & WANG_SOLVE_DECOMPOSE_COMPONENTS) != 0);
+    if ((decompose_root || scope != NULL) &&
+        !mechanisms.allow_decomposition) {
+        return WANG_SOLVE_ERROR;
+    }
+    const bool learn_nogoods = options != NULL &&
+        (options->flags & WANG_SOLVE_LEARN_NOGOODS) != 0;
+    if (learn_nogoods && (!mechanisms.allow_learning ||
+                          decompose_root || scope != NULL)) {
+        return WANG_SOLVE_ERROR;
+    }
+    const bool restarts = options != NULL &&
+        options->restart_schedule != WANG_RESTART_NONE;
+    if (restarts && (!mechanisms.allow_restarts ||
+                     decompose_root || scope != NULL)) {
+        return WANG_SOLVE_ERROR;
+    }
+    const bool bitslice = options != NULL &&
+        (options->flags & WANG_SOLVE_BITSLICE_PROPAGATION) != 0;
+    if (bitslice && !mechanisms.allow_bitslice) {
+        return WANG_SOLVE_ERROR;
+    }
+    const bool frontier_when_narrow = options != NULL &&
+        (options->flags & WANG_SOLVE_FRONTIER_WHEN_NARROW) != 0;
+    if (frontier_when_narrow && !mechanisms.allow_frontier) {
+        return WANG_SOLVE_ERROR;
+    }
+    if (options != NULL &&
+        options->value_order == WANG_VALUE_ORDER_LEAST_CONSTRAINING &&
+        !mechanisms.allow_value_scoring) {
+        return WANG_SOLVE_ERROR;
+    }
+    const bool probe = options != NULL &&
+        (options->flags & WANG_SOLVE_PROBE_SINGLETONS) != 0;
+    if (probe && (!mechanisms.allow_probing ||
+                  (learn_nogoods && options->probe_depth != 0))) {
+        return WANG_SOLVE_ERROR;
+    }
+    const bool weighted_degree = options != NULL &&
+        (options->flags & WANG_SOLVE_WEIGHTED_DEGREE) != 0;
+    if (weighted_degree && !mechanisms.allow_weighted_degree) {
+        return WANG_SOLVE_ERROR;
+    }
+    const bool checkpoint = options != NULL &&
+        (options->flags & WANG_SOLVE_CHECKPOINT) != 0;
+    if ((checkpoint && (!mechanisms.allow_checkpoint || decompose_root ||
+                        learn_nogoods || scope != NULL || shared != NULL)) ||
+        (mechanisms.resume_checkpoint && !checkpoint)) {
+        return WANG_SOLVE_ERROR;
+    }
+
+    if (!region_validate(region)) {
+        return WANG_SOLVE_ERROR;
+    }
+    FrontierSweep sweep = {0};
+    bool use_frontier = false;
+    /* A checkpoint exists only once the sweep has handed over to DFS. */
+    if (scope == NULL && !mechanisms.resume_checkpoint &&
+        (mechanisms.force_frontier || frontier_when_narrow)) {
+        frontier_sweep_plan(region, &sweep);
+        use_frontier = sweep.width <= WANG_FRONTIER_MAX_WIDTH;
+        if (mechanisms.force_frontier && !use_frontier) {
+            return WANG_SOLVE_ERROR;
+        }
+    }
+    if (!initial_domains_are_valid(region, options) ||
+        !root_fixpoint_is_valid(region, options)) {
+        return WANG_SOLVE_ERROR;
+    }
+    const size_t cell_count = region->cell_count;
+    for (size_t i = 0; scope != NULL && i < scope->count; ++i) {
+        if (scope->cells[i] >= cell_count ||
+            !region->cells[scope->cells[i]].active) {
+            return WANG_SOLVE_ERROR;
+        }
+    }
+
+    SolverState state = {0};
+    state.writer.fd = -1;
+    state.region = region;
+    state.cell_count = cell_count;
+    state.collect_metrics = options != NULL &&
+        (options->flags & WANG_SOLVE_COLLECT_METRICS) != 0;
+    state.capture_unsat_snapshot = options != NULL &&
+        (options->flags & WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT) != 0;
+    state.record_trail = mechanisms.record_initial_trail;
+    state.deduplicate_queue = mechanisms.deduplicate_queue;
+    if (options != NULL) {
+        state.node_limit = options->node_limit;
+        state.deadline_ns = options->deadline_ns;
+        state.cancel_flag = options->cancel_flag;
+        state.value_order = options->value_order;
+        state.tie_break = options->tie_break;
+        state.random_state = seed_random_state(options->seed);
+        state.restart_schedule = options->restart_schedule;
+        state.restart_base = options->restart_base != 0
+            ? options->restart_base
+            : RESTART_DEFAULT_BASE;
+        state.restart_seed = options->seed;
+        state.restart_leaves_left = state.restart_base;
+        state.probe_depth = options->probe_depth;
+        state.probe_budget_ns = options->probe_budget_ns;
+    }
+    /* Scoped searches leave cells outside the scope to their caller. */
+    state.probe_singletons = probe && scope == NULL;
+    if (shared != NULL) {
+        state.stop_flag = shared->stop_flag;
+        state.shared_node_count = shared->node_count;
+    }
+    state.bound_poll_countdown = 1;
+    if (!workspace_prepare_tables(
+            workspace,
+            mechanisms.use_bytewise_support
+        )) {
+        return WANG_SOLVE_ERROR;
+    }
+    state.tables = workspace->tables;
+    solver_state_adopt(&state, workspace);
+    if (!mechanisms.use_bytewise_support) {
+        state.byte_support = NULL;
+    } else if (state.collect_metrics) {
+        state.metrics.support_table_bytes = sizeof(*state.byte_support);
+    }
+    note_retained_trail_capacity(&state);
+
+    if (!allocate_solver_arrays(&state)) {
+        solver_state_release(&state, workspace);
+        return WANG_SOLVE_ERROR;
+    }
+
+    const uint32_t *initial_domains =
+        options != NULL ? options->initial_domains : NULL;
+    size_t initial_conflict;
+    if (!initialize_domains(&state, initial_domains, &initial_conflict)) {
+        solver_state_release(&state, workspace);
+        return WANG_SOLVE_ERROR;
+    }
+    if (initial_conflict == SIZE_MAX &&
+        !allocate_queue_dedup_index(&state)) {
+        solver_state_release(&state, workspace);
+        return WANG_SOLVE_ERROR;
+    }
+    const WangRootFixpoint *root_fixpoint =
+        options != NULL ? options->root_fixpoint : NULL;
+    const bool warm_start = root_fixpoint != NULL &&
+        !root_fixpoint->contradiction;
+
+    const bool trace_requested = options != NULL &&
+        (options->flags & WANG_SOLVE_TRACE_FAILED_LEAVES) != 0;
+    if (trace_requested && !failed_leaf_writer_init(
+            &state.writer,
+            options->failed_leaf_path,
+            options->failed_leaf_capacity,
+            region,
+            cell_count)) {
+        solver_state_release(&state, workspace);
+        return WANG_SOLVE_ERROR;
+    }
+
+    WangSolveStatus status;
+    if (initial_conflict != SIZE_MAX) {
+        /* A search that was decided at the root left no checkpoint. */
+        if (mechanisms.resume_checkpoint ||
+            !record_failed_leaf(&state, initial_conflict, 0)) {
+            solver_state_release(&state, workspace);
+            return WANG_SOLVE_ERROR;
+        }
+        status = WANG_SOLVE_UNSAT;
+    } else {
+        size_t conflict_cell = SIZE_MAX;
+        const WangSolverMetrics initialized_metrics = state.metrics;
+        const size_t initial_trail_capacity = state.trail_capacity;
+        PropagateStatus initial_status = warm_start
+            ? propagate_from_root_fixpoint(
+                &state,
+                root_fixpoint->domains,
+                &conflict_cell
+            )
+            : bitslice
+            ? propagate_initial_bitsliced(&state, &conflict_cell)
+            : propagate_initial(&state, &conflict_cell);
+        if (warm_start && initial_status == PROPAGATE_CONFLICT &&
+            !mechanisms.keep_warm_root_conflict) {
+            initial_status = propagate_root_again_cold(
+                &state,
+                initial_domains,
+                &initialized_metrics,
+                initial_trail_capacity,
+                bitslice,
+                &conflict_cell
+            );
+        }
+
+        const PropagateStatus root_status =
+            initial_status == PROPAGATE_OK && state.probe_singletons
+            ? probe_singletons(&state, SIZE_MAX, &conflict_cell)
+            : initial_status;
+
+        if (root_status == PROPAGATE_ERROR) {
+            solver_state_release(&state, workspace);
+            return WANG_SOLVE_ERROR;
+        }
+        if (root_status == PROPAGATE_CONFLICT) {
+            if (mechanisms.resume_checkpoint ||
+                !record_failed_leaf(&state, conflict_cell, 0)) {
+                solver_state_release(&state, workspace);
+                return WANG_SOLVE_ERROR;
+            }
+            status = WANG_SOLVE_UNSAT;
+        } else {
+            bool frontier_overflow = false;
+            status = use_frontier
+                ? frontier_search(&state, &sweep, &frontier_overflow)
+                : WANG_SOLVE_UNKNOWN;
+            /* Profiles that outgrew their bound leave the root to DFS. */
+            const bool run_dfs = !use_frontier ||
+                (frontier_overflow && !mechanisms.force_frontier);
+            if (run_dfs) {
+                state.trail_count = 0;
+                state.trail_phase = TRAIL_PHASE_SEARCH;
+                state.record_trail = true;
+                state.use_mrv_index = mechanisms.use_mrv_index;
+                state.decompose_root = decompose_root;
+                state.decompose_each_decision = decompose_each_decision;
+                if (scope != NULL) {
+                    state.scope_cells = scope->cells;
+                    state.scope_count = scope->count;
+                }
+                state.learn_nogoods = learn_nogoods;
+                state.weighted_degree = weighted_degree;
+                if (checkpoint) {
+                    state.checkpoint_path = options->checkpoint_path;
+                    state.checkpoint_interval_ns =
+                        options->checkpoint_interval_ns;
+                    state.checkpoint_countdown = SEARCH_BOUND_POLL_INTERVAL;
+                    state.checkpoint_region_fingerprint =
+                        region_content_hash(region);
+                    state.checkpoint_options_fingerprint =
+                        checkpoint_options_fingerprint(options);
+                    schedule_search_checkpoint(&state, monotonic_now_ns());
+                }
+                status = (decompose_root &&
+                          !prepare_component_storage(&state)) ||
+                        (learn_nogoods &&
+                         !prepare_learning_storage(&state)) ||
+                        (weighted_degree && !prepare_weight_storage(&state))
+                    ? WANG_SOLVE_ERROR
+                    : mechanisms.resume_checkpoint
+                    ? resume_checkpoint_file(&state, mechanisms.stack_mode)
+                    : search(&state, mechanisms.stack_mode);
+            }
+            if (state.shared_node_count != NULL) {
+                (void)flush_shared_node_count(&state);
+            }
+        }
+    }
+
+    /* A scoped solve leaves other cells open; its caller verifies. */
+    if (status == WANG_SOLVE_SAT && scope == NULL &&
+        !verify_sat_domains(&state)) {
+        status = WANG_SOLVE_ERROR;
+    }
+    if (status == WANG_SOLVE_UNSAT && !state.has_best_leaf) {
+        status = WANG_SOLVE_ERROR;
+    }
+
+    if (status == WANG_SOLVE_SAT) {
+        if (!mechanisms.transfer_sat_domains) {
+            size_t snapshot_bytes;
+            if (!checked_mul_size(
+                    state.cell_count,
+                    sizeof(*state.domains),
+                    &snapshot_bytes
+                ) ||
+                !ensure_best_snapshot(&state)) {
+                solver_state_release(&state, workspace);
+                return WANG_SOLVE_ERROR;
+            }
+            memcpy(
+                state.best_snapshot,
+                state.domains,
+                snapshot_bytes
+            );
+            if (state.collect_metrics) {
+                state.metrics.sat_result_copy_bytes = snapshot_bytes;
+            }
+        }
+        state.best_resolved_count = state.resolved_count;
+        state.best_conflict_cell = SIZE_MAX;
+        state.has_best_leaf = true;
+    }
+
+    const size_t traced_leaf_count = state.writer.count;
+    const bool trace_truncated = state.writer.truncated;
+    if (!failed_leaf_writer_finish(&state.writer)) {
+        status = WANG_SOLVE_ERROR;
+    }
+
+    if (status == WANG_SOLVE_ERROR) {
+        solver_state_release(&state, workspace);
+        return WANG_SOLVE_ERROR;
+    }
+
+    const bool return_domains = status == WANG_SOLVE_SAT ||
+        (status == WANG_SOLVE_UNSAT && state.capture_unsat_snapshot);
+    const bool transfer_sat_domains = status == WANG_SOLVE_SAT &&
+        mechanisms.transfer_sat_domains;
+    WangSolveResult result = {
+        .domains = transfer_sat_domains
+            ? state.domains
+            : (return_domains ? state.best_snapshot : NULL),
+        .domain_count = return_domains ? state.cell_count : 0,
+        .conflict_cell = status == WANG_SOLVE_UNSAT
+            ? state.best_conflict_cell
+            : SIZE_MAX,
+        .resolved_count = state.best_resolved_count,
+        .decision_depth = state.best_depth,
+        .traced_leaf_count = traced_leaf_count,
+        .trace_truncated = trace_truncated,
+        .metrics = state.collect_metrics
+            ? state.metrics
+            : (WangSolverMetrics){0},
+    };
+
+    if (transfer_sat_domains) {
+        state.domains = NULL;
+    } else if (return_domains) {
+        state.best_snapshot = NULL;
+    }
+    solver_state_release(&state, workspace);
+    *out_result = result;
+    return status;
+}
+
+WangSolveStatus wang_solve_serial(
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolveResult *out_result
+)
+{
+    SolverWorkspace workspace = {0};
+    const WangSolveStatus status = solve_wang_core(
+        &workspace,
+        region,
+        options,
+        NULL,
+        NULL,
+        out_result,
+        REFERENCE_MECHANISMS
+    );
+    solver_workspace_clear(&workspace);
+    return status;
+}
+
+WangSolveStatus wang_solve_optimized(
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolveResult *out_result
+)
+{
+    SolverWorkspace workspace = {0};
+    const WangSolveStatus status = solve_wang_core(
+        &workspace,
+        region,
+        options,
+        NULL,
+        NULL,
+        out_result,
+        OPTIMIZED_MECHANISMS
+    );
+    solver_workspace_clear(&workspace);
+    return status;
+}
+
+WangSolveStatus wang_solve_resume(
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolveResult *out_result
+)
+{
+    SolverMechanisms mechanisms = OPTIMIZED_MECHANISMS;
+    mechanisms.resume_checkpoint = true;
+
+    SolverWorkspace workspace = {0};
+    const WangSolveStatus status = solve_wang_core(
+        &workspace,
+        region,
+        options,
+        NULL,
+        NULL,
+        out_result,
+        mechanisms
+    );
+    solver_workspace_clear(&workspace);
+    return status;
+}
+
+WangSolveStatus wang_solve_frontier(
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolveResult *out_result
+)
+{
+    SolverWorkspace workspace = {0};
+    const WangSolveStatus status = solve_wang_core(
+        &workspace,
+        region,
+        options,
+        NULL,
+        NULL,
+        out_result,
+        FRONTIER_MECHANISMS
+    );
+    solver_workspace_clear(&workspace);
+    return status;
+}
+
+/*
+ * Initialize region in workspace and propagate its root with the optimized
+ * mechanisms, honoring options->initial_domains and options->root_fixpoint.
+ * The state holds the domains until the caller releases it, which it must do
+ * whether or not this succeeds.
+ */
+static bool propagate_root(
+    SolverState *state,
+    SolverWorkspace *workspace,
+    const Region *region,
+    const WangSolverOptions *options,
+    bool *out_contradiction
+)
+{
+    state->writer.fd = -1;
+    state->region = region;
+    state->cell_count = region->cell_count;
+    state->deduplicate_queue = OPTIMIZED_MECHANISMS.deduplicate_queue;
+    const bool tables_ready = workspace_prepare_tables(workspace, true);
+    state->tables = workspace->tables;
+    solver_state_adopt(state, workspace);
+    if (!tables_ready) {
+        return false;
+    }
+
+    const uint32_t *initial_domains =
+        options != NULL ? options->initial_domains : NULL;
+    const WangRootFixpoint *root_fixpoint =
+        options != NULL ? options->root_fixpoint : NULL;
+    const bool bitslice = options != NULL &&
+        (options->flags & WANG_SOLVE_BITSLICE_PROPAGATION) != 0;
+    size_t conflict = SIZE_MAX;
+    if (!allocate_solver_arrays(state) ||
+        !initialize_domains(state, initial_domains, &conflict)) {
+        return false;
+    }
+    if (conflict == SIZE_MAX) {
+        if (!allocate_queue_dedup_index(state)) {
+            return false;
+        }
+        const PropagateStatus status =
+            root_fixpoint != NULL && !root_fixpoint->contradiction
+                ? propagate_from_root_fixpoint(
+                    state,
+                    root_fixpoint->domains,
+                    &conflict
+                )
+                : bitslice
+                ? propagate_initial_bitsliced(state, &conflict)
+                : propagate_initial(state, &conflict);
+        if (status == PROPAGATE_ERROR) {
+            return false;
+        }
+    }
+    *out_contradiction = conflict != SIZE_MAX;
+    return true;
+}
+
+bool wang_root_fixpoint_compute(
+    const Region *region,
+    WangRootFixpoint *out_fixpoint
+)
+{
+    if (out_fixpoint == NULL || out_fixpoint->domains != NULL ||
+        out_fixpoint->domain_count != 0 ||
+        out_fixpoint->region_fingerprint != 0 ||
+        out_fixpoint->contradiction ||
+        !region_validate(region)) {
+        return false;
+    }
+
+    SolverWorkspace workspace = {0};
+    SolverState state = {0};
+    bool contradiction = false;
+    const bool ok = propagate_root(
+        &state,
+        &workspace,
+        region,
+        NULL,
+        &contradiction
+    );
+
+    WangRootFixpoint fixpoint = {
+        .region_fingerprint = region_content_hash(region),
+        .contradiction = contradiction,
+    };
+    if (ok && !contradiction) {
+        fixpoint.domains = state.domains;
+        fixpoint.domain_count = state.cell_count;
+        state.domains = NULL;
+    }
+    solver_state_release(&state, &workspace);
+    solver_workspace_clear(&workspace);
+    if (!ok) {
+        return false;
+    }
+    *out_fixpoint = fixpoint;
+    return true;
+}
+
+void wang_root_fixpoint_destroy(WangRootFixpoint *fixpoint)
+{
+    if (fixpoint == NULL) {
+        return;
+    }
+
+    free(fixpoint->domains);
+    *fixpoint = (WangRootFixpoint){0};
+}
+
+static size_t count_mark(void *context)
+{
+    return ((SolverState *)context)->trail_count;
+}
+
+/* Pin one tile of cell and propagate, as one decision of the count. */
+static TilingPinStatus count_pin(void *context, size_t cell, uint32_t tile)
+{
+    SolverState *state = context;
+    ++state->dfs_node_count;
+    size_t conflict = SIZE_MAX;
+    const PropagateStatus status =
+        restrict_domain(state, cell, tile, state->cell_count)
+            ? propagate_from_cell(state, cell, &conflict)
+            : PROPAGATE_ERROR;
+    switch (status) {
+    case PROPAGATE_OK:
+        return TILING_PIN_OK;
+    case PROPAGATE_CONFLICT:
+        return TILING_PIN_CONFLICT;
+    case PROPAGATE_ERROR:
+        break;
+    }
+    return TILING_PIN_ERROR;
+}
+
+static void count_rollback(void *context, size_t mark)
+{
+    rollback_to(context, mark);
+}
+
+static size_t count_label(
+    void *context,
+    const size_t *cells,
+    size_t length,
+    size_t *out_cells,
+    size_t *out_starts
+)
+{
+    SolverState *state = context;
+    return label_components(
+        state->region,
+        state->domains,
+        cells,
+        length,
+        state->components.labels,
+        out_cells,
+        out_starts
+    );
+}
+
+static bool count_stop(void *context)
+{
+    return search_bound_reached(context);
+}
+
+/*
+ * initialize_domains() pins every isolated cell to its first tile, which
+ * keeps a witness but not a count. Give each its whole domain back: with
+ * no active neighbor, it constrains nothing else.
+ */
+static void restore_isolated_domains(
+    SolverState *state,
+    const uint32_t *initial_domains
 )
 {
-    if (options == NULL) {
-        return true;
-    }
-    if (options->initial_domains == NULL) {
-        return options->initial_domain_count == 0;
-    }
-    if (options->initial_domain_count != region->cell_count) {
-        return false;
-    }
-
-    for (size_t i = 0; i < region->cell_count; ++i) {
-        const uint32_t mask = options->initial_domains[i];
-        if ((mask & ~WANG_DOMAIN_ALL) != 0 ||
-            (!region->cells[i].active && mask != 0)) {
-            return false;
+    for (size_t i = 0; i < state->cell_count; ++i) {
+        const RegionCell *cell = &state->region->cells[i];
+        if (!cell->active || state->neighbor_mask[i] != 0) {
+            continue;
+        }
+        uint32_t domain = initial_domains != NULL
+            ? initial_domains[i]
+            : WANG_DOMAIN_ALL;
+        for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+            if (cell->boundary[dir] != COLOR_NONE) {
+                domain &= state->tables.edge_mask[dir][cell->boundary[dir]];
+            }
+        }
+        if (!domain_is_singleton(domain)) {
+            --state->resolved_count;
         }
+        state->domains[i] = domain;
     }
-    return true;
 }
 
-void wang_solve_result_destroy(WangSolveResult *result)
+static bool tiling_count_is_destroyed(const WangTilingCount *count)
 {
-    if (result == NULL) {
-        return;
-    }
-
-    free(result->domains);
-    *result = (WangSolveResult){0};
+    return count->limbs == NULL && count->limb_count == 0 &&
+        count->decisions == 0 && count->components == 0 &&
+        count->cache_hits == 0 && count->cache_entries == 0 &&
+        count->cache_bytes == 0 && count->cache_refused == 0;
 }
 
-static WangSolveStatus solve_wang_core(
+WangSolveStatus wang_count_tilings(
     const Region *region,
     const WangSolverOptions *options,
-    WangSolveResult *out_result,
-    SolverMechanisms mechanisms
+    size_t cache_limit_bytes,
+    WangTilingVisitor visit,
+    void *visit_context,
+    WangTilingCount *out_count
 )
 {
-    if (!result_is_destroyed(out_result) ||
-        !solver_options_are_valid(options)) {
-        return WANG_SOLVE_ERROR;
-    }
-
-    if (!region_validate(region)) {
+    if (out_count == NULL || !tiling_count_is_destroyed(out_count) ||
+        !region_validate(region) ||
+        !solver_options_are_valid(options) ||
+        (options != NULL &&
+         (options->flags & ~(uint32_t)WANG_SOLVE_BITSLICE_PROPAGATION) != 0) ||
+        !initial_domains_are_valid(region, options) ||
+        !root_fixpoint_is_valid(region, options)) {
         return WANG_SOLVE_ERROR;
     }
-    if (!initial_domains_are_valid(region, options)) {
-        return WANG_SOLVE_ERROR;
-    }
-    const size_t cell_count = region->cell_count;
 
+    SolverWorkspace workspace = {0};
     SolverState state = {0};
-    state.writer.fd = -1;
-    state.region = region;
-    state.cell_count = cell_count;
-    state.collect_metrics = options != NULL &&
-        (options->flags & WANG_SOLVE_COLLECT_METRICS) != 0;
-    state.capture_unsat_snapshot = options != NULL &&
-        (options->flags & WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT) != 0;
-    state.record_trail = mechanisms.record_initial_trail;
-    state.deduplicate_queue = mechanisms.deduplicate_queue;
-    build_solver_tables(&state.tables);
-    if (!solver_tables_are_valid(&state.tables)) {
-        return WANG_SOLVE_ERROR;
+    if (options != NULL) {
+        state.node_limit = options->node_limit;
+        state.deadline_ns = options->deadline_ns;
+        state.cancel_flag = options->cancel_flag;
     }
-    if (mechanisms.use_bytewise_support) {
-        state.byte_support = malloc(sizeof(*state.byte_support));
-        if (state.byte_support == NULL) {
-            solver_state_destroy(&state);
-            return WANG_SOLVE_ERROR;
-        }
-        byte_support_tables_build(
-            (const ByteSupportCompat *)&state.tables.compat,
-            state.byte_support
+    state.bound_poll_countdown = 1;
+    const TilingHooks hooks = {
+        .mark = count_mark,
+        .pin = count_pin,
+        .rollback = count_rollback,
+        .label = count_label,
+        .stop = count_stop,
+        .context = &state,
+    };
+    TilingCounter counter = {
+        .region = region,
+        .hooks = &hooks,
+        .use_cache = cache_limit_bytes != 0 && visit == NULL,
+        .cache = { .byte_limit = cache_limit_bytes },
+        .visit = visit,
+        .visit_context = visit_context,
+    };
+    BigCount total = {0};
+
+    bool contradiction = false;
+    bool ok = propagate_root(&state, &workspace, region, options,
+                             &contradiction);
+    if (ok && !contradiction) {
+        restore_isolated_domains(
+            &state,
+            options != NULL ? options->initial_domains : NULL
         );
-        if (state.collect_metrics) {
-            state.metrics.support_table_bytes = sizeof(*state.byte_support);
-        }
+        state.trail_count = 0;
+        state.trail_phase = TRAIL_PHASE_SEARCH;
+        state.record_trail = true;
+        counter.domains = state.domains;
+        ok = visit != NULL
+            ? tiling_enumerate(&counter)
+            : prepare_component_storage(&state) &&
+                tiling_count_region(&counter, &total);
+    }
+    if (ok && (visit != NULL || counter.stopped)) {
+        ok = big_count_set_u64(&total, counter.visited);
     }
 
-    if (!allocate_solver_arrays(&state)) {
-        solver_state_destroy(&state);
+    const WangTilingCount count = {
+        .decisions = state.dfs_node_count,
+        .components = counter.components,
+        .cache_hits = counter.cache_hits,
+        .cache_entries = counter.cache.entry_count,
+        .cache_bytes = counter.cache.bytes,
+        .cache_refused = counter.cache.refused,
+    };
+    const bool stopped = counter.stopped;
+    solver_state_release(&state, &workspace);
+    solver_workspace_clear(&workspace);
+    tiling_counter_destroy(&counter);
+    if (!ok) {
+        big_count_destroy(&total);
         return WANG_SOLVE_ERROR;
     }
 
-    size_t initial_conflict;
-    if (!initialize_domains(
-            &state,
-            options != NULL ? options->initial_domains : NULL,
-            &initial_conflict
-        )) {
-        solver_state_destroy(&state);
-        return WANG_SOLVE_ERROR;
+    *out_count = count;
+    if (total.count != 0) {
+        out_count->limbs = total.limbs;
+        out_count->limb_count = total.count;
+    } else {
+        big_count_destroy(&total);
     }
-    if (initial_conflict == SIZE_MAX &&
-        !allocate_queue_dedup_index(&state)) {
-        solver_state_destroy(&state);
-        return WANG_SOLVE_ERROR;
+    if (stopped) {
+        return WANG_SOLVE_UNKNOWN;
     }
+    return out_count->limb_count != 0 ? WANG_SOLVE_SAT : WANG_SOLVE_UNSAT;
+}
 
-    const bool trace_requested = options != NULL &&
-        (options->flags & WANG_SOLVE_TRACE_FAILED_LEAVES) != 0;
-    if (trace_requested && !failed_leaf_writer_init(
-            &state.writer,
-            options->failed_leaf_path,
-            options->failed_leaf_capacity,
-            region,
-            cell_count)) {
-        solver_state_destroy(&state);
-        return WANG_SOLVE_ERROR;
+void wang_tiling_count_destroy(WangTilingCount *count)
+{
+    if (count == NULL) {
+        return;
     }
 
-    WangSolveStatus status;
-    if (initial_conflict != SIZE_MAX) {
-        if (!record_failed_leaf(&state, initial_conflict, 0)) {
-            solver_state_destroy(&state);
-            return WANG_SOLVE_ERROR;
-        }
-        status = WANG_SOLVE_UNSAT;
-    } else {
-        size_t conflict_cell = SIZE_MAX;
-        const PropagateStatus initial_status = propagate_initial(
-            &state,
-            &conflict_cell
-        );
+    free(count->limbs);
+    *count = (WangTilingCount){0};
+}
 
-        if (initial_status == PROPAGATE_ERROR) {
-            solver_state_destroy(&state);
-            return WANG_SOLVE_ERROR;
-        }
-        if (initial_status == PROPAGATE_CONFLICT) {
-            if (!record_failed_leaf(&state, conflict_cell, 0)) {
-                solver_state_destroy(&state);
-                return WANG_SOLVE_ERROR;
-            }
-            status = WANG_SOLVE_UNSAT;
-        } else {
-            state.trail_count = 0;
-            state.trail_phase = TRAIL_PHASE_SEARCH;
-            state.record_trail = true;
-            status = search(&state, mechanisms.stack_mode);
-        }
-    }
+WangSolverContext *wang_solver_context_create(void)
+{
+    return calloc(1, sizeof(WangSolverContext));
+}
 
-    if (status == WANG_SOLVE_SAT && !verify_sat_domains(&state)) {
-        status = WANG_SOLVE_ERROR;
-    }
-    if (status == WANG_SOLVE_UNSAT && !state.has_best_leaf) {
-        status = WANG_SOLVE_ERROR;
+/*
+ * The unpinned root fixpoint of region from the context's root cache,
+ * propagated in the context's workspace and stored on a miss. NULL when
+ * propagation or allocation fails.
+ */
+static const WangRootFixpoint *cached_root_fixpoint(
+    WangSolverContext *context,
+    const Region *region
+)
+{
+    RootCache *cache = &context->root_cache;
+    const uint64_t hash = region_content_hash(region);
+    const WangRootFixpoint *cached = root_cache_lookup(cache, region, hash);
+    if (cached != NULL) {
+        return cached;
     }
 
-    if (status == WANG_SOLVE_SAT) {
-        if (!mechanisms.transfer_sat_domains) {
-            size_t snapshot_bytes;
-            if (!checked_mul_size(
-                    state.cell_count,
-                    sizeof(*state.domains),
-                    &snapshot_bytes
-                ) ||
-                !ensure_best_snapshot(&state)) {
-                solver_state_destroy(&state);
-                return WANG_SOLVE_ERROR;
-            }
+    SolverState state = {0};
+    bool contradiction = false;
+    bool ok = propagate_root(
+        &state,
+        &context->workspace,
+        region,
+        NULL,
+        &contradiction
+    );
+    WangRootFixpoint fixpoint = {
+        .region_fingerprint = hash,
+        .contradiction = contradiction,
+    };
+    if (ok && !contradiction) {
+        fixpoint.domains =
+            malloc(state.cell_count * sizeof(*fixpoint.domains));
+        ok = fixpoint.domains != NULL;
+        if (ok) {
             memcpy(
-                state.best_snapshot,
+                fixpoint.domains,
                 state.domains,
-                snapshot_bytes
+                state.cell_count * sizeof(*state.domains)
             );
-            if (state.collect_metrics) {
-                state.metrics.sat_result_copy_bytes = snapshot_bytes;
-            }
+            fixpoint.domain_count = state.cell_count;
         }
-        state.best_resolved_count = state.resolved_count;
-        state.best_conflict_cell = SIZE_MAX;
-        state.has_best_leaf = true;
     }
+    solver_state_release(&state, &context->workspace);
+    if (!ok) {
+        wang_root_fixpoint_destroy(&fixpoint);
+        return NULL;
+    }
+    return root_cache_store(cache, region, &fixpoint);
+}
 
-    const size_t traced_leaf_count = state.writer.count;
-    const bool trace_truncated = state.writer.truncated;
-    if (!failed_leaf_writer_finish(&state.writer)) {
-        status = WANG_SOLVE_ERROR;
+WangSolveStatus wang_solver_context_solve(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolverEngine engine,
+    WangSolveResult *out_result
+)
+{
+    /* A caller's own fixpoint, or input the core rejects, skips the cache. */
+    WangSolverOptions cached_options;
+    if (context != NULL && context->root_cache.enabled &&
+        (unsigned)engine <= WANG_SOLVER_FRONTIER &&
+        (options == NULL || options->root_fixpoint == NULL) &&
+        solver_result_is_destroyed(out_result) &&
+        solver_options_are_valid(options) && region_validate(region)) {
+        const WangRootFixpoint *fixpoint =
+            cached_root_fixpoint(context, region);
+        if (fixpoint == NULL) {
+            return WANG_SOLVE_ERROR;
+        }
+        cached_options = options != NULL ? *options : (WangSolverOptions){0};
+        cached_options.root_fixpoint = fixpoint;
+        options = &cached_options;
     }
+    return solver_context_solve_shared(
+        context,
+        region,
+        options,
+        engine,
+        NULL,
+        out_result
+    );
+}
 
-    if (status == WANG_SOLVE_ERROR) {
-        solver_state_destroy(&state);
+static WangSolveStatus solve_in_context(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolverEngine engine,
+    const SolverSharedBounds *shared,
+    bool keep_warm_root_conflict,
+    WangSolveResult *out_result
+)
+{
+    if (context == NULL) {
         return WANG_SOLVE_ERROR;
     }
-
-    const bool return_domains = status == WANG_SOLVE_SAT ||
-        state.capture_unsat_snapshot;
-    const bool transfer_sat_domains = status == WANG_SOLVE_SAT &&
-        mechanisms.transfer_sat_domains;
-    WangSolveResult result = {
-        .domains = transfer_sat_domains
-            ? state.domains
-            : (return_domains ? state.best_snapshot : NULL),
-        .domain_count = return_domains ? state.cell_count : 0,
-        .conflict_cell = status == WANG_SOLVE_SAT
-            ? SIZE_MAX
-            : state.best_conflict_cell,
-        .resolved_count = state.best_resolved_count,
-        .decision_depth = state.best_depth,
-        .traced_leaf_count = traced_leaf_count,
-        .trace_truncated = trace_truncated,
-        .metrics = state.collect_metrics
-            ? state.metrics
-            : (WangSolverMetrics){0},
-    };
-
-    if (transfer_sat_domains) {
-        state.domains = NULL;
-    } else if (return_domains) {
-        state.best_snapshot = NULL;
+    SolverMechanisms mechanisms;
+    switch (engine) {
+    case WANG_SOLVER_REFERENCE:
+        mechanisms = REFERENCE_MECHANISMS;
+        break;
+    case WANG_SOLVER_OPTIMIZED:
+        mechanisms = OPTIMIZED_MECHANISMS;
+        break;
+    case WANG_SOLVER_FRONTIER:
+        mechanisms = FRONTIER_MECHANISMS;
+        break;
+    default:
+        return WANG_SOLVE_ERROR;
     }
-    solver_state_destroy(&state);
-    *out_result = result;
-    return status;
+    mechanisms.keep_warm_root_conflict = keep_warm_root_conflict;
+    return solve_wang_core(
+        &context->workspace,
+        region,
+        options,
+        shared,
+        NULL,
+        out_result,
+        mechanisms
+    );
 }
 
-WangSolveStatus wang_solve_serial(
+WangSolveStatus solver_context_solve_shared(
+    WangSolverContext *context,
     const Region *region,
     const WangSolverOptions *options,
+    WangSolverEngine engine,
+    const SolverSharedBounds *shared,
     WangSolveResult *out_result
 )
 {
-    return solve_wang_core(
+    return solve_in_context(
+        context,
         region,
         options,
-        out_result,
-        (SolverMechanisms) {
-            .stack_mode = SEARCH_STACK_FIXED,
-            .record_initial_trail = true,
-            .transfer_sat_domains = false,
-            .use_bytewise_support = false,
-            .deduplicate_queue = false,
-        }
+        engine,
+        shared,
+        false,
+        out_result
     );
 }
 
-WangSolveStatus wang_solve_optimized(
+WangSolveStatus solver_context_solve_status(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolverEngine engine,
+    const SolverSharedBounds *shared,
+    WangSolveResult *out_result
+)
+{
+    return solve_in_context(
+        context,
+        region,
+        options,
+        engine,
+        shared,
+        true,
+        out_result
+    );
+}
+
+WangSolveStatus solver_context_solve_scoped(
+    WangSolverContext *context,
     const Region *region,
     const WangSolverOptions *options,
+    const SolverSharedBounds *shared,
+    const size_t *cells,
+    size_t cell_count,
     WangSolveResult *out_result
 )
 {
+    if (context == NULL || (cells == NULL && cell_count != 0)) {
+        return WANG_SOLVE_ERROR;
+    }
+    const SolverScope scope = {
+        .cells = cells,
+        .count = cell_count,
+    };
     return solve_wang_core(
+        &context->workspace,
         region,
         options,
+        shared,
+        &scope,
         out_result,
-        (SolverMechanisms) {
-            .stack_mode = SEARCH_STACK_DYNAMIC,
-            .record_initial_trail = false,
-            .transfer_sat_domains = true,
-            .use_bytewise_support = true,
-            .deduplicate_queue = WANG_OPTIMIZED_QUEUE_DEDUP != 0,
-        }
+        OPTIMIZED_MECHANISMS
+    );
+}
+
+size_t solver_label_components(
+    const Region *region,
+    const uint32_t *domains,
+    size_t *out_cells,
+    size_t *out_starts
+)
+{
+    const size_t count = region->cell_count == 0 ? 1 : region->cell_count;
+    size_t *labels = malloc(count * sizeof(*labels));
+    size_t component_count = SIZE_MAX;
+    if (labels != NULL) {
+        memset(labels, 0xff, count * sizeof(*labels));
+        component_count = label_components(
+            region,
+            domains,
+            NULL,
+            0,
+            labels,
+            out_cells,
+            out_starts
+        );
+    }
+    free(labels);
+    return component_count;
+}
+
+bool solver_context_propagate(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    uint32_t *out_domains,
+    bool *out_contradiction
+)
+{
+    if (context == NULL || out_domains == NULL ||
+        out_contradiction == NULL ||
+        !solver_options_are_valid(options) ||
+        !region_validate(region) ||
+        !initial_domains_are_valid(region, options) ||
+        !root_fixpoint_is_valid(region, options)) {
+        return false;
+    }
+
+    SolverState state = {0};
+    bool contradiction = false;
+    const bool ok = propagate_root(
+        &state,
+        &context->workspace,
+        region,
+        options,
+        &contradiction
     );
+    if (ok && !contradiction) {
+        memcpy(
+            out_domains,
+            state.domains,
+            state.cell_count * sizeof(*state.domains)
+        );
+    }
+    solver_state_release(&state, &context->workspace);
+    if (ok) {
+        *out_contradiction = contradiction;
+    }
+    return ok;
+}
+
+void wang_solver_context_reset(WangSolverContext *context)
+{
+    if (context == NULL) {
+        return;
+    }
+
+    SolverWorkspace *workspace = &context->workspace;
+    const SolverTables tables = workspace->tables;
+    const bool tables_ready = workspace->tables_ready;
+    ByteSupportTables *byte_support = workspace->byte_support;
+    workspace->byte_support = NULL;
+    solver_workspace_clear(workspace);
+    workspace->tables = tables;
+    workspace->tables_ready = tables_ready;
+    workspace->byte_support = byte_support;
+    root_cache_clear(&context->root_cache);
+}
+
+void wang_solver_context_destroy(WangSolverContext *context)
+{
+    if (context == NULL) {
+        return;
+    }
+    solver_workspace_clear(&context->workspace);
+    root_cache_destroy(&context->root_cache);
+    free(context);
+}
+
+bool wang_solver_context_enable_root_cache(
+    WangSolverContext *context,
+    size_t limit_bytes,
+    const char *directory
+)
+{
+    return context != NULL &&
+        root_cache_configure(&context->root_cache, limit_bytes, directory);
+}
+
+bool wang_solver_context_root_cache_stats(
+    const WangSolverContext *context,
+    WangRootCacheStats *out_stats
+)
+{
+    if (context == NULL || out_stats == NULL) {
+        return false;
+    }
+    *out_stats = context->root_cache.stats;
+    return true;
 }
@@ -0,0 +1,644 @@
+#include "tiling_count.h"
+
+#include "wang/verify.h"
+
+#include <stdlib.h>
+#include <string.h>
+
+#define COUNT_CACHE_INITIAL_SLOTS 64u
+
+static bool big_count_reserve(BigCount *value, size_t needed)
+{
+    if (needed <= value->capacity) {
+        return true;
+    }
+    size_t capacity = value->capacity == 0 ? 4u : value->capacity;
+    while (capacity < needed) {
+        if (capacity > SIZE_MAX / 2u) {
+            capacity = needed;
+            break;
+        }
+        capacity *= 2u;
+    }
+    if (capacity > SIZE_MAX / sizeof(*value->limbs)) {
+        return false;
+    }
+    uint32_t *limbs = realloc(value->limbs, capacity * sizeof(*limbs));
+    if (limbs == NULL) {
+        return false;
+    }
+    value->limbs = limbs;
+    value->capacity = capacity;
+    return true;
+}
+
+bool big_count_set_u64(BigCount *value, uint64_t small)
+{
+    if (!big_count_reserve(value, 2)) {
+        return false;
+    }
+    value->limbs[0] = (uint32_t)small;
+    value->limbs[1] = (uint32_t)(small >> 32);
+    value->count = small == 0 ? 0 : small >> 32 == 0 ? 1 : 2;
+    return true;
+}
+
+bool big_count_copy(BigCount *value, const uint32_t *limbs, size_t count)
+{
+    if (!big_count_reserve(value, count)) {
+        return false;
+    }
+    if (count != 0) {
+        memcpy(value->limbs, limbs, count * sizeof(*limbs));
+    }
+    value->count = count;
+    return true;
+}
+
+bool big_count_add(BigCount *sum, const BigCount *addend)
+{
+    const size_t longest =
+        sum->count > addend->count ? sum->count : addend->count;
+    if (longest == SIZE_MAX || !big_count_reserve(sum, longest + 1u)) {
+        return false;
+    }
+
+    uint64_t carry = 0;
+    for (size_t i = 0; i < longest; ++i) {
+        const uint64_t limb =
+            (i < sum->count ? sum->limbs[i] : 0u) + carry +
+            (i < addend->count ? addend->limbs[i] : 0u);
+        sum->limbs[i] = (uint32_t)limb;
+        carry = limb >> 32;
+    }
+    sum->count = longest;
+    if (carry != 0) {
+        sum->limbs[sum->count++] = (uint32_t)carry;
+    }
+    return true;
+}
+
+bool big_count_multiply(
+    BigCount *product,
+    const BigCount *factor,
+    BigCount *scratch
+)
+{
+    if (product->count == 0 || factor->count == 0) {
+        product->count = 0;
+        return true;
+    }
+    const size_t length = product->count + factor->count;
+    if (length < product->count || !big_count_reserve(scratch, length)) {
+        return false;
+    }
+
+    memset(scratch->limbs, 0, length * sizeof(*scratch->limbs));
+    for (size_t i = 0; i < product->count; ++i) {
+        uint64_t carry = 0;
+        for (size_t j = 0; j < factor->count; ++j) {
+            const uint64_t limb =
+                (uint64_t)product->limbs[i] * factor->limbs[j] +
+                scratch->limbs[i + j] + carry;
+            scratch->limbs[i + j] = (uint32_t)limb;
+            carry = limb >> 32;
+        }
+        scratch->limbs[i + factor->count] = (uint32_t)carry;
+    }
+    scratch->count = scratch->limbs[length - 1u] == 0 ? length - 1u : length;
+
+    const BigCount swap = *product;
+    *product = *scratch;
+    *scratch = swap;
+    return true;
+}
+
+void big_count_destroy(BigCount *value)
+{
+    free(value->limbs);
+    *value = (BigCount){0};
+}
+
+/* FNV-1a over the words' bytes, least significant first. */
+uint64_t count_cache_hash(const uint32_t *key, size_t length)
+{
+    uint64_t hash = UINT64_C(14695981039346656037);
+    for (size_t i = 0; i < length; ++i) {
+        for (unsigned byte = 0; byte < 4; ++byte) {
+            hash ^= (key[i] >> (8u * byte)) & UINT32_C(0xff);
+            hash *= UINT64_C(1099511628211);
+        }
+    }
+    return hash;
+}
+
+static bool slot_holds(
+    const CountCache *cache,
+    const CountCacheSlot *slot,
+    const uint32_t *key,
+    size_t length,
+    uint64_t hash
+)
+{
+    return slot->hash == hash && slot->key_length == length &&
+        memcmp(cache->keys + slot->key_offset, key,
+               length * sizeof(*key)) == 0;
+}
+
+bool count_cache_find(
+    const CountCache *cache,
+    const uint32_t *key,
+    size_t length,
+    uint64_t hash,
+    const uint32_t **out_limbs,
+    size_t *out_limb_count
+)
+{
+    if (cache->slot_count == 0) {
+        return false;
+    }
+    const size_t mask = cache->slot_count - 1u;
+    for (size_t index = (size_t)hash & mask;;
+         index = (index + 1u) & mask) {
+        const CountCacheSlot *slot = &cache->slots[index];
+        if (slot->key_length == 0) {
+            return false;
+        }
+        if (slot_holds(cache, slot, key, length, hash)) {
+            *out_limbs = cache->values + slot->value_offset;
+            *out_limb_count = slot->value_length;
+            return true;
+        }
+    }
+}
+
+/*
+ * Make room for needed elements in one of the cache's arrays, doubling
+ * within the byte limit. *out_fits is false when even needed would pass it.
+ */
+static bool cache_reserve(
+    CountCache *cache,
+    void **buffer,
+    size_t *capacity,
+    size_t needed,
+    size_t element_size,
+    bool *out_fits
+)
+{
+    *out_fits = true;
+    if (needed <= *capacity) {
+        return true;
+    }
+    const size_t room = (cache->byte_limit - cache->bytes) / element_size;
+    if (needed - *capacity > room) {
+        *out_fits = false;
+        return true;
+    }
+    size_t grown = *capacity == 0 ? 64u : *capacity;
+    while (grown < needed && grown <= SIZE_MAX / 2u) {
+        grown *= 2u;
+    }
+    if (grown < needed || grown - *capacity > room) {
+        grown = needed;
+    }
+
+    void *resized = realloc(*buffer, grown * element_size);
+    if (resized == NULL) {
+        return false;
+    }
+    cache->bytes += (grown - *capacity) * element_size;
+    *buffer = resized;
+    *capacity = grown;
+    return true;
+}
+
+/* Double the table, rehashing every entry; *out_fits as for reserving. */
+static bool cache_grow_slots(CountCache *cache, bool *out_fits)
+{
+    const size_t old_count = cache->slot_count;
+    const size_t slot_count =
+        old_count == 0 ? COUNT_CACHE_INITIAL_SLOTS : old_count * 2u;
+    const size_t room = cache->byte_limit - cache->bytes;
+    *out_fits = slot_count > old_count &&
+        slot_count - old_count <= room / sizeof(CountCacheSlot);
+    if (!*out_fits) {
+        return true;
+    }
+
+    CountCacheSlot *slots = calloc(slot_count, sizeof(*slots));
+    if (slots == NULL) {
+        return false;
+    }
+    const size_t mask = slot_count - 1u;
+    for (size_t i = 0; i < old_count; ++i) {
+        const CountCacheSlot *slot = &cache->slots[i];
+        if (slot->key_length == 0) {
+            continue;
+        }
+        size_t index = (size_t)slot->hash & mask;
+        while (slots[index].key_length != 0) {
+            index = (index + 1u) & mask;
+        }
+        slots[index] = *slot;
+    }
+    free(cache->slots);
+    cache->slots = slots;
+    cache->slot_count = slot_count;
+    cache->bytes += (slot_count - old_count) * sizeof(*slots);
+    return true;
+}
+
+bool count_cache_insert(
+    CountCache *cache,
+    const uint32_t *key,
+    size_t length,
+    uint64_t hash,
+    const BigCount *value
+)
+{
+    bool fits = true;
+    if (cache->entry_count >= cache->slot_count / 2u &&
+        !cache_grow_slots(cache, &fits)) {
+        return false;
+    }
+    void *keys = cache->keys;
+    if (fits && !cache_reserve(cache, &keys, &cache->key_capacity,
+                               cache->key_count + length,
+                               sizeof(*cache->keys), &fits)) {
+        return false;
+    }
+    cache->keys = keys;
+    void *values = cache->values;
+    if (fits && !cache_reserve(cache, &values, &cache->value_capacity,
+                               cache->value_count + value->count,
+                               sizeof(*cache->values), &fits)) {
+        return false;
+    }
+    cache->values = values;
+    if (!fits) {
+        ++cache->refused;
+        return true;
+    }
+
+    const size_t mask = cache->slot_count - 1u;
+    size_t index = (size_t)hash & mask;
+    while (cache->slots[index].key_length != 0) {
+        index = (index + 1u) & mask;
+    }
+    cache->slots[index] = (CountCacheSlot){
+        .hash = hash,
+        .key_offset = cache->key_count,
+        .key_length = length,
+        .value_offset = cache->value_count,
+        .value_length = value->count,
+    };
+    memcpy(cache->keys + cache->key_count, key, length * sizeof(*key));
+    cache->key_count += length;
+    if (value->count != 0) {
+        memcpy(cache->values + cache->value_count, value->limbs,
+               value->count * sizeof(*value->limbs));
+        cache->value_count += value->count;
+    }
+    ++cache->entry_count;
+    return true;
+}
+
+void count_cache_destroy(CountCache *cache)
+{
+    free(cache->slots);
+    free(cache->keys);
+    free(cache->values);
+    const size_t byte_limit = cache->byte_limit;
+    *cache = (CountCache){ .byte_limit = byte_limit };
+}
+
+static unsigned domain_size(uint32_t domain)
+{
+    unsigned count = 0;
+    while (domain != 0) {
+        domain &= domain - UINT32_C(1);
+        ++count;
+    }
+    return count;
+}
+
+static TileId first_set_tile(uint32_t domain)
+{
+    TileId tile = 0;
+    while ((domain & UINT32_C(1)) == 0) {
+        domain >>= 1;
+        ++tile;
+    }
+    return tile;
+}
+
+/* Make room for needed elements, doubling; false when allocation fails. */
+static bool counter_reserve(
+    void **buffer,
+    size_t *capacity,
+    size_t needed,
+    size_t element_size
+)
+{
+    if (*buffer != NULL && needed <= *capacity) {
+        return true;
+    }
+    size_t grown = *capacity == 0 ? 64u : *capacity;
+    while (grown < needed) {
+        if (grown > SIZE_MAX / 2u) {
+            grown = needed;
+            break;
+        }
+        grown *= 2u;
+    }
+    if (grown > SIZE_MAX / element_size) {
+        return false;
+    }
+    void *resized = realloc(*buffer, grown * element_size);
+    if (resized == NULL) {
+        return false;
+    }
+    *buffer = resized;
+    *capacity = grown;
+    return true;
+}
+
+/*
+ * Write the cache key of the component at offset: for each cell in order,
+ * its row and column offsets from the first cell, then its domain.
+ */
+static bool build_component_key(
+    TilingCounter *counter,
+    size_t offset,
+    size_t length
+)
+{
+    void *reserved = counter->key;
+    if (length > SIZE_MAX / 3u ||
+        !counter_reserve(&reserved, &counter->key_capacity, 3u * length,
+                         sizeof(*counter->key))) {
+        return false;
+    }
+    counter->key = reserved;
+
+    uint32_t *key = counter->key;
+    const size_t width = (size_t)counter->region->width;
+    const size_t *cells = counter->cells + offset;
+    const size_t first_x = cells[0] % width;
+    const size_t first_y = cells[0] / width;
+    for (size_t i = 0; i < length; ++i) {
+        key[3u * i] = (uint32_t)(cells[i] / width - first_y);
+        key[3u * i + 1u] = (uint32_t)(cells[i] % width - first_x);
+        key[3u * i + 2u] = counter->domains[cells[i]];
+    }
+    return true;
+}
+
+static bool count_component(
+    TilingCounter *counter,
+    size_t offset,
+    size_t length,
+    BigCount *out_count
+);
+
+/*
+ * Multiply into out_product the counts of the components that the open
+ * cells of the list at offset fall into, or those of the whole region when
+ * root is set.
+ */
+static bool count_components(
+    TilingCounter *counter,
+    bool root,
+    size_t offset,
+    size_t length,
+    BigCount *out_product
+)
+{
+    const size_t scope = root ? counter->region->cell_count : length;
+    if (scope == SIZE_MAX ||
+        counter->cell_top > SIZE_MAX - scope ||
+        counter->start_top > SIZE_MAX - scope - 1u) {
+        return false;
+    }
+    void *cells = counter->cells;
+    if (!counter_reserve(&cells, &counter->cell_capacity,
+                         counter->cell_top + scope,
+                         sizeof(*counter->cells))) {
+        return false;
+    }
+    counter->cells = cells;
+    void *starts = counter->starts;
+    if (!counter_reserve(&starts, &counter->start_capacity,
+                         counter->start_top + scope + 1u,
+                         sizeof(*counter->starts))) {
+        return false;
+    }
+    counter->starts = starts;
+
+    const size_t cell_base = counter->cell_top;
+    const size_t start_base = counter->start_top;
+    const size_t component_count = counter->hooks->label(
+        counter->hooks->context,
+        root ? NULL : counter->cells + offset,
+        length,
+        counter->cells + cell_base,
+        counter->starts + start_base
+    );
+    counter->cell_top += counter->starts[start_base + component_count];
+    counter->start_top += component_count + 1u;
+
+    bool ok = big_count_set_u64(out_product, 1);
+    BigCount factor = {0};
+    for (size_t c = 0; ok && c < component_count; ++c) {
+        const size_t begin = counter->starts[start_base + c];
+        const size_t end = counter->starts[start_base + c + 1u];
+        ok = count_component(counter, cell_base + begin, end - begin, &factor);
+        if (!ok || counter->stopped) {
+            break;
+        }
+        ok = big_count_multiply(out_product, &factor, &counter->scratch);
+        if (out_product->count == 0) {
+            break;
+        }
+    }
+    big_count_destroy(&factor);
+    counter->cell_top = cell_base;
+    counter->start_top = start_base;
+    return ok;
+}
+
+/*
+ * Count the tilings of the open component at offset, whose other neighbors
+ * are resolved or inactive. A bound sets counter->stopped and leaves
+ * out_count meaningless.
+ */
+static bool count_component(
+    TilingCounter *counter,
+    size_t offset,
+    size_t length,
+    BigCount *out_count
+)
+{
+    const TilingHooks *hooks = counter->hooks;
+    const uint32_t *domains = counter->domains;
+    ++counter->components;
+    if (length == 1) {
+        const size_t cell = counter->cells[offset];
+        return big_count_set_u64(out_count, domain_size(domains[cell]));
+    }
+
+    uint64_t hash = 0;
+    if (counter->use_cache) {
+        if (!build_component_key(counter, offset, length)) {
+            return false;
+        }
+        hash = count_cache_hash(counter->key, 3u * length);
+        const uint32_t *limbs = NULL;
+        size_t limb_count = 0;
+        if (count_cache_find(&counter->cache, counter->key, 3u * length,
+                             hash, &limbs, &limb_count)) {
+            ++counter->cache_hits;
+            return big_count_copy(out_count, limbs, limb_count);
+        }
+    }
+
+    size_t branch_cell = counter->cells[offset];
+    unsigned branch_size = domain_size(domains[branch_cell]);
+    for (size_t i = 1; i < length; ++i) {
+        const size_t cell = counter->cells[offset + i];
+        const unsigned size = domain_size(domains[cell]);
+        if (size < branch_size) {
+            branch_cell = cell;
+            branch_size = size;
+        }
+    }
+
+    bool ok = big_count_set_u64(out_count, 0);
+    BigCount product = {0};
+    const uint32_t domain = domains[branch_cell];
+    for (uint32_t rest = domain; ok && rest != 0; rest &= rest - 1u) {
+        if (hooks->stop(hooks->context)) {
+            counter->stopped = true;
+            break;
+        }
+        const size_t mark = hooks->mark(hooks->context);
+        const TilingPinStatus status = hooks->pin(
+            hooks->context,
+            branch_cell,
+            rest & (~rest + 1u)
+        );
+        if (status != TILING_PIN_OK) {
+            hooks->rollback(hooks->context, mark);
+            ok = status == TILING_PIN_CONFLICT;
+            continue;
+        }
+        ok = count_components(counter, false, offset, length, &product);
+        hooks->rollback(hooks->context, mark);
+        if (!ok || counter->stopped) {
+            break;
+        }
+        ok = big_count_add(out_count, &product);
+    }
+    big_count_destroy(&product);
+
+    /* Deeper components overwrote the key; the domains are back. */
+    if (ok && !counter->stopped && counter->use_cache) {
+        ok = build_component_key(counter, offset, length) &&
+            count_cache_insert(&counter->cache, counter->key, 3u * length,
+                               hash, out_count);
+    }
+    return ok;
+}
+
+bool tiling_count_region(TilingCounter *counter, BigCount *out_count)
+{
+    return count_components(counter, true, 0, 0, out_count);
+}
+
+/* Verify the resolved region and pass it to the visitor. */
+static bool visit_tiling(TilingCounter *counter)
+{
+    const Region *region = counter->region;
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        counter->tiles[i] = region->cells[i].active
+            ? first_set_tile(counter->domains[i])
+            : TILE_NONE;
+    }
+    if (wang_verify_tiling(region, counter->tiles, region->cell_count) !=
+        WANG_VERIFY_VALID) {
+        return false;
+    }
+    ++counter->visited;
+    if (!counter->visit(counter->visit_context, counter->tiles,
+                        region->cell_count)) {
+        counter->stopped = true;
+    }
+    return true;
+}
+
+static bool enumerate_tilings(TilingCounter *counter)
+{
+    const TilingHooks *hooks = counter->hooks;
+    const uint32_t *domains = counter->domains;
+    size_t branch_cell = SIZE_MAX;
+    unsigned branch_size = TILE_COUNT + 1u;
+    for (size_t i = 0; i < counter->region->cell_count; ++i) {
+        const unsigned size = domain_size(domains[i]);
+        if (size > 1u && size < branch_size) {
+            branch_cell = i;
+            branch_size = size;
+        }
+    }
+    if (branch_cell == SIZE_MAX) {
+        return visit_tiling(counter);
+    }
+
+    bool ok = true;
+    const uint32_t domain = domains[branch_cell];
+    for (uint32_t rest = domain; ok && rest != 0; rest &= rest - 1u) {
+        if (hooks->stop(hooks->context)) {
+            counter->stopped = true;
+            break;
+        }
+        const size_t mark = hooks->mark(hooks->context);
+        const TilingPinStatus status = hooks->pin(
+            hooks->context,
+            branch_cell,
+            rest & (~rest + 1u)
+        );
+        if (status != TILING_PIN_OK) {
+            hooks->rollback(hooks->context, mark);
+            ok = status == TILING_PIN_CONFLICT;
+            continue;
+        }
+        ok = enumerate_tilings(counter);
+        hooks->rollback(hooks->context, mark);
+        if (counter->stopped) {
+            break;
+        }
+    }
+    return ok;
+}
+
+bool tiling_enumerate(TilingCounter *counter)
+{
+    const size_t cell_count = counter->region->cell_count;
+    if (cell_count > SIZE_MAX / sizeof(*counter->tiles)) {
+        return false;
+    }
+    counter->tiles = malloc(cell_count == 0
+        ? 1u
+        : cell_count * sizeof(*counter->tiles));
+    return counter->tiles != NULL && enumerate_tilings(counter);
+}
+
+void tiling_counter_destroy(TilingCounter *counter)
+{
+    free(counter->cells);
+    free(counter->starts);
+    free(counter->key);
+    free(counter->tiles);
+    count_cache_destroy(&counter->cache);
+    big_count_destroy(&counter->scratch);
+    *counter = (TilingCounter){0};
+}
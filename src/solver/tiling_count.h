@@ -0,0 +1,182 @@
+#ifndef WANG_TILING_COUNT_H
+#define WANG_TILING_COUNT_H
+
+#include <stdbool.h>
+#include <stddef.h>
+#include <stdint.h>
+
+#include "wang/region.h"
+#include "wang/solver.h"
+#include "wang/tile.h"
+
+/*
+ * An exact unsigned counter of any size: count little-endian base 2^32
+ * limbs without leading zero limbs, so zero has none. Zero-initialize
+ * before use and release with big_count_destroy().
+ */
+typedef struct {
+    uint32_t *limbs;
+    size_t count;
+    size_t capacity;
+} BigCount;
+
+/* Each returns false only when allocation fails, leaving value unchanged. */
+bool big_count_set_u64(BigCount *value, uint64_t small);
+bool big_count_copy(BigCount *value, const uint32_t *limbs, size_t count);
+bool big_count_add(BigCount *sum, const BigCount *addend);
+
+/* product *= factor, using scratch as working storage. */
+bool big_count_multiply(
+    BigCount *product,
+    const BigCount *factor,
+    BigCount *scratch
+);
+
+void big_count_destroy(BigCount *value);
+
+/* A stored key: its hash and where its words and value limbs live. */
+typedef struct {
+    uint64_t hash;
+    size_t key_offset;
+    size_t key_length;
+    size_t value_offset;
+    size_t value_length;
+} CountCacheSlot;
+
+/*
+ * Counts keyed by arrays of 32-bit words, in an open-addressing table over
+ * two append-only arenas. Storage never grows past byte_limit: an insert
+ * that would is refused and leaves the cache as it was. Zero-initialize
+ * with a byte_limit, and release with count_cache_destroy().
+ */
+typedef struct {
+    CountCacheSlot *slots;
+    size_t slot_count;
+    size_t entry_count;
+    uint32_t *keys;
+    size_t key_count;
+    size_t key_capacity;
+    uint32_t *values;
+    size_t value_count;
+    size_t value_capacity;
+    size_t bytes;
+    size_t byte_limit;
+    uint64_t refused;
+} CountCache;
+
+uint64_t count_cache_hash(const uint32_t *key, size_t length);
+
+/*
+ * Point *out_limbs at the count stored under key; false when absent. The
+ * limbs stay valid until the next insert.
+ */
+bool count_cache_find(
+    const CountCache *cache,
+    const uint32_t *key,
+    size_t length,
+    uint64_t hash,
+    const uint32_t **out_limbs,
+    size_t *out_limb_count
+);
+
+/*
+ * Store value under key, which must be absent. Returns false only when
+ * allocation fails; a refused insert returns true and counts in refused.
+ */
+bool count_cache_insert(
+    CountCache *cache,
+    const uint32_t *key,
+    size_t length,
+    uint64_t hash,
+    const BigCount *value
+);
+
+void count_cache_destroy(CountCache *cache);
+
+typedef enum {
+    TILING_PIN_ERROR = -1,
+    TILING_PIN_CONFLICT = 0,
+    TILING_PIN_OK = 1
+} TilingPinStatus;
+
+/*
+ * The propagator a count drives, over the domains the counter reads. mark
+ * returns a point that rollback restores the domains to. pin restricts
+ * cell to the single-tile set tile and propagates, leaving the domains to
+ * rollback whatever it returns. label groups the open cells of cells
+ * (length entries), or of the whole region when cells is NULL, into
+ * components joined through open neighbors: each component's cells in
+ * ascending order to out_cells, components in order of their lowest cell,
+ * and each offset followed by the total to out_starts. It returns the
+ * component count. stop is polled before every pin.
+ */
+typedef struct {
+    size_t (*mark)(void *context);
+    TilingPinStatus (*pin)(void *context, size_t cell, uint32_t tile);
+    void (*rollback)(void *context, size_t mark);
+    size_t (*label)(
+        void *context,
+        const size_t *cells,
+        size_t length,
+        size_t *out_cells,
+        size_t *out_starts
+    );
+    bool (*stop)(void *context);
+    void *context;
+} TilingHooks;
+
+/*
+ * One count or enumeration over the live row-major domains of region. Set
+ * region, domains and hooks, then either visit and visit_context, or
+ * use_cache and the cache's byte_limit; zero the rest and release with
+ * tiling_counter_destroy(). Component cell lists form a stack in cells:
+ * each list counted is followed by the lists of the components its open
+ * cells fall into after a pin, with their offsets on the matching stack in
+ * starts. stopped is set when stop or the visitor ended the run.
+ */
+typedef struct {
+    const Region *region;
+    const uint32_t *domains;
+    const TilingHooks *hooks;
+    bool use_cache;
+    CountCache cache;
+    WangTilingVisitor visit;
+    void *visit_context;
+
+    size_t *cells;
+    size_t cell_top;
+    size_t cell_capacity;
+    size_t *starts;
+    size_t start_top;
+    size_t start_capacity;
+    uint32_t *key;
+    size_t key_capacity;
+    BigCount scratch;
+    TileId *tiles;
+
+    uint64_t components;
+    uint64_t cache_hits;
+    uint64_t visited;
+    bool stopped;
+} TilingCounter;
+
+/*
+ * Multiply into out_count the counts of the components the open cells of
+ * the region fall into. A component of one open cell counts its domain
+ * size. A larger one pins each tile of its smallest open cell in turn and
+ * sums the products over the components left open, through the cache when
+ * use_cache is set. Returns false only when allocation fails; when stopped
+ * is set, out_count is meaningless.
+ */
+bool tiling_count_region(TilingCounter *counter, BigCount *out_count);
+
+/*
+ * Verify every tiling below the domains and pass it to visit in search
+ * order, branching on the smallest open domain. Returns false when
+ * allocation fails or a resolved region does not verify.
+ */
+bool tiling_enumerate(TilingCounter *counter);
+
+void tiling_counter_destroy(TilingCounter *counter);
+
+#endif /* WANG_TILING_COUNT_H */
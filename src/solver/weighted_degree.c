@@ -0,0 +1,164 @@
+#include "weighted_degree.h"
+
+#include "wang/tile.h"
+
+#include <stdbool.h>
+
+/*
+ * Every bump grows the next one by 1 / WEIGHT_DECAY, so older conflicts
+ * weigh less. Weights are rescaled before they overflow.
+ */
+#define WEIGHT_DECAY 0.95
+#define WEIGHT_RESCALE_LIMIT 1e100
+
+static unsigned domain_size(uint32_t domain)
+{
+    unsigned count = 0;
+    while (domain != 0) {
+        domain &= domain - UINT32_C(1);
+        ++count;
+    }
+    return count;
+}
+
+static bool domain_is_singleton(uint32_t domain)
+{
+    return domain != 0 &&
+        (domain & (domain - UINT32_C(1))) == 0;
+}
+
+/* The weight of the arc from cell toward dir, stored once per arc. */
+static double *arc_weight(const ArcWeights *weights, size_t cell, Dir dir)
+{
+    switch (dir) {
+    case N:
+        return &weights->weights[2u * (cell - weights->width) + 1u];
+    case E:
+        return &weights->weights[2u * cell];
+    case S:
+        return &weights->weights[2u * cell + 1u];
+    case W:
+        return &weights->weights[2u * (cell - 1u)];
+    case DIR_COUNT:
+        break;
+    }
+    return NULL;
+}
+
+static size_t neighbor_cell(size_t width, size_t cell, Dir dir)
+{
+    switch (dir) {
+    case N:
+        return cell - width;
+    case E:
+        return cell + 1u;
+    case S:
+        return cell + width;
+    case W:
+        return cell - 1u;
+    case DIR_COUNT:
+        break;
+    }
+    return SIZE_MAX;
+}
+
+void arc_weights_reset(
+    ArcWeights *weights,
+    double *storage,
+    size_t width,
+    size_t cell_count
+)
+{
+    for (size_t i = 0; i < 2u * cell_count; ++i) {
+        storage[i] = 1.0;
+    }
+    *weights = (ArcWeights){
+        .weights = storage,
+        .width = width,
+        .cell_count = cell_count,
+        .bump = 1.0,
+    };
+}
+
+unsigned arc_weights_bump(ArcWeights *weights, size_t cell, uint8_t linked)
+{
+    unsigned bumped = 0;
+    for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+        if ((linked & (uint8_t)(UINT8_C(1) << dir)) != 0) {
+            *arc_weight(weights, cell, dir) += weights->bump;
+            ++bumped;
+        }
+    }
+
+    weights->bump /= WEIGHT_DECAY;
+    if (weights->bump > WEIGHT_RESCALE_LIMIT) {
+        for (size_t i = 0; i < 2u * weights->cell_count; ++i) {
+            weights->weights[i] /= WEIGHT_RESCALE_LIMIT;
+        }
+        weights->bump /= WEIGHT_RESCALE_LIMIT;
+    }
+    return bumped;
+}
+
+size_t weighted_degree_select(
+    const ArcWeights *weights,
+    const Region *region,
+    const uint32_t *domains,
+    const uint8_t *neighbor_mask,
+    const size_t *scope,
+    size_t scope_count,
+    WangTieBreak tie_break,
+    size_t (*draw)(void *draw_context, size_t bound),
+    void *draw_context,
+    uint64_t *cells_scanned
+)
+{
+    size_t selected = SIZE_MAX;
+    unsigned best_size = TILE_COUNT + 1u;
+    double best_degree = 0.0;
+    const bool reverse = tie_break == WANG_TIE_BREAK_LAST;
+    const bool random_tie = tie_break == WANG_TIE_BREAK_RANDOM;
+    size_t tied = 0;
+
+    for (size_t scanned = 0; scanned < scope_count; ++scanned) {
+        const size_t position = reverse
+            ? scope_count - 1u - scanned
+            : scanned;
+        const size_t i = scope != NULL ? scope[position] : position;
+        if (!region->cells[i].active) {
+            continue;
+        }
+        ++*cells_scanned;
+
+        const unsigned size = domain_size(domains[i]);
+        if (size < 2) {
+            continue;
+        }
+        double degree = 0.0;
+        const uint8_t linked = neighbor_mask[i];
+        for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+            if ((linked & (uint8_t)(UINT8_C(1) << dir)) != 0 &&
+                !domain_is_singleton(
+                    domains[neighbor_cell(weights->width, i, dir)]
+                )) {
+                degree += *arc_weight(weights, i, dir);
+            }
+        }
+
+        /* size / degree against best_size / best_degree, never dividing. */
+        const double ratio = (double)size * best_degree;
+        const double best_ratio = (double)best_size * degree;
+        if (selected == SIZE_MAX || ratio < best_ratio ||
+            (ratio == best_ratio && size < best_size)) {
+            selected = i;
+            best_size = size;
+            best_degree = degree;
+            tied = 1;
+        } else if (random_tie && ratio == best_ratio &&
+                   size == best_size && draw(draw_context, ++tied) == 0) {
+            selected = i;
+        }
+    }
+
+    return selected;
+}
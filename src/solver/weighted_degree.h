@@ -0,0 +1,65 @@
+#ifndef WANG_WEIGHTED_DEGREE_H
+#define WANG_WEIGHTED_DEGREE_H
+
+#include <stddef.h>
+#include <stdint.h>
+
+#include "wang/region.h"
+#include "wang/solver.h"
+
+/*
+ * Conflict weights for dom/wdeg selection, one per arc between adjacent
+ * cells of a row-major region width cells wide: weights[2 * i] is the arc
+ * from cell i to its east neighbor and weights[2 * i + 1] the arc to its
+ * south neighbor. bump is what the next conflict adds.
+ */
+typedef struct {
+    double *weights;
+    size_t width;
+    size_t cell_count;
+    double bump;
+} ArcWeights;
+
+/*
+ * Lay out weights over storage, which must hold 2 * cell_count doubles,
+ * and set every arc to 1, so the first weighted selection is dom/deg.
+ */
+void arc_weights_reset(
+    ArcWeights *weights,
+    double *storage,
+    size_t width,
+    size_t cell_count
+);
+
+/*
+ * Add the bump to the arcs from cell toward each direction set in linked,
+ * then age the bump so older conflicts weigh less. Returns the number of
+ * arcs bumped.
+ */
+unsigned arc_weights_bump(ArcWeights *weights, size_t cell, uint8_t linked);
+
+/*
+ * The open cell with the smallest domain size divided by its weighted
+ * degree, the summed weights of its arcs to other open cells, or SIZE_MAX
+ * when every cell is resolved. A cell whose neighbors are all resolved has
+ * no weighted degree and comes last. Equal ratios prefer the smaller
+ * domain, then tie_break; random ties call draw(draw_context, n), which
+ * must return a value below n, once per tied cell.
+ *
+ * The scan covers scope (scope_count cell indices), or every cell when
+ * scope is NULL, and adds the active cells it reads to *cells_scanned.
+ */
+size_t weighted_degree_select(
+    const ArcWeights *weights,
+    const Region *region,
+    const uint32_t *domains,
+    const uint8_t *neighbor_mask,
+    const size_t *scope,
+    size_t scope_count,
+    WangTieBreak tie_break,
+    size_t (*draw)(void *draw_context, size_t bound),
+    void *draw_context,
+    uint64_t *cells_scanned
+);
+
+#endif /* WANG_WEIGHTED_DEGREE_H */
@@ -0,0 +1,211 @@
+#include "../../src/solver/bitslice_propagation.h"
+
+#include "wang/solver.h"
+#include "wang/tile.h"
+
+#include <assert.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+
+enum {
+    TEST_WIDTH = 130,
+    TEST_HEIGHT = 3,
+    TEST_CELLS = TEST_WIDTH * TEST_HEIGHT
+};
+
+static void build_edge_mask(BitsliceEdgeMask edge_mask)
+{
+    for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+        for (ColorId color = 0; color < COLOR_COUNT; ++color) {
+            edge_mask[dir][color] = 0;
+        }
+        for (TileId tile = 0; tile < TILE_COUNT; ++tile) {
+            edge_mask[dir][TILESET[tile].edge[dir]] |= UINT32_C(1) << tile;
+        }
+    }
+}
+
+static uint32_t next_random(uint32_t *state)
+{
+    *state ^= *state << 13;
+    *state ^= *state >> 17;
+    *state ^= *state << 5;
+    return *state;
+}
+
+static uint64_t *allocate_storage(void)
+{
+    size_t words;
+    assert(bitslice_storage_words(TEST_WIDTH, TEST_HEIGHT, &words));
+    uint64_t *storage = malloc(words * sizeof(*storage));
+    assert(storage != NULL);
+    return storage;
+}
+
+static void unload(const BitslicePlanes *planes, uint32_t *domains)
+{
+    for (size_t word = 0; word < planes->plane_words; ++word) {
+        uint32_t cells[64];
+        const size_t count = bitslice_word_domains(planes, word, cells);
+        const size_t first = (word / planes->words_per_row) * TEST_WIDTH +
+            (word % planes->words_per_row) * 64u;
+        for (size_t bit = 0; bit < count; ++bit) {
+            domains[first + bit] = cells[bit];
+        }
+    }
+}
+
+/* Tiles of domain that some tile of neighbor_domain matches along dir. */
+static uint32_t supported(uint32_t domain, Dir dir, uint32_t neighbor_domain)
+{
+    uint32_t kept = 0;
+    for (TileId tile = 0; tile < TILE_COUNT; ++tile) {
+        if ((domain & (UINT32_C(1) << tile)) == 0) {
+            continue;
+        }
+        for (TileId other = 0; other < TILE_COUNT; ++other) {
+            if ((neighbor_domain & (UINT32_C(1) << other)) != 0 &&
+                wang_tiles_match(&TILESET[tile], dir, &TILESET[other])) {
+                kept |= UINT32_C(1) << tile;
+                break;
+            }
+        }
+    }
+    return kept;
+}
+
+static void test_unlinked_cells_round_trip(void)
+{
+    BitsliceEdgeMask edge_mask;
+    build_edge_mask(edge_mask);
+    uint64_t *storage = allocate_storage();
+    uint32_t domains[TEST_CELLS];
+    uint32_t loaded[TEST_CELLS];
+    uint8_t neighbor_mask[TEST_CELLS] = {0};
+    uint32_t random_state = UINT32_C(0x510e527f);
+    for (size_t i = 0; i < TEST_CELLS; ++i) {
+        domains[i] = next_random(&random_state) & WANG_DOMAIN_ALL;
+    }
+
+    BitslicePlanes planes;
+    bitslice_load(
+        &planes,
+        storage,
+        TEST_WIDTH,
+        TEST_HEIGHT,
+        domains,
+        neighbor_mask
+    );
+    assert(planes.words_per_row == 3);
+    uint64_t passes = 0;
+    uint64_t words = 0;
+    assert(bitslice_propagate(
+        &planes,
+        (const BitsliceEdgeMask *)&edge_mask,
+        &passes,
+        &words
+    ) == BITSLICE_FIXPOINT);
+    assert(words == 0);
+    unload(&planes, loaded);
+    for (size_t i = 0; i < TEST_CELLS; ++i) {
+        assert(loaded[i] == domains[i]);
+    }
+    for (size_t word = 0; word < planes.plane_words; ++word) {
+        assert(!bitslice_word_narrowed(&planes, word));
+    }
+    free(storage);
+}
+
+/*
+ * One linked pair per direction, placed across a word boundary for east and
+ * west, reaches the pair's arc-consistent domains or reports the wipeout.
+ */
+static void test_linked_pairs_match_tile_rules(void)
+{
+    BitsliceEdgeMask edge_mask;
+    build_edge_mask(edge_mask);
+    uint64_t *storage = allocate_storage();
+    uint32_t random_state = UINT32_C(0x9b05688c);
+    size_t fixpoints = 0;
+    size_t wipeouts = 0;
+
+    for (size_t sample = 0; sample < 400; ++sample) {
+        const Dir dir = (Dir)(sample % DIR_COUNT);
+        const size_t first = dir == E ? 63u
+            : dir == W ? 64u
+            : dir == N ? TEST_WIDTH + 5u
+            : 5u;
+        const size_t second = dir == E ? 64u
+            : dir == W ? 63u
+            : dir == N ? 5u
+            : TEST_WIDTH + 5u;
+        uint32_t domains[TEST_CELLS] = {0};
+        uint8_t neighbor_mask[TEST_CELLS] = {0};
+        domains[first] = next_random(&random_state) &
+            next_random(&random_state) & WANG_DOMAIN_ALL;
+        domains[second] = next_random(&random_state) &
+            next_random(&random_state) & WANG_DOMAIN_ALL;
+        if (domains[first] == 0 || domains[second] == 0) {
+            continue;
+        }
+        neighbor_mask[first] = (uint8_t)(UINT8_C(1) << dir);
+        neighbor_mask[second] = (uint8_t)(UINT8_C(1) << opposite(dir));
+
+        uint32_t expected_first = domains[first];
+        uint32_t expected_second = domains[second];
+        for (;;) {
+            const uint32_t next_first =
+                supported(expected_first, dir, expected_second);
+            const uint32_t next_second =
+                supported(expected_second, opposite(dir), next_first);
+            if (next_first == expected_first &&
+                next_second == expected_second) {
+                break;
+            }
+            expected_first = next_first;
+            expected_second = next_second;
+        }
+
+        BitslicePlanes planes;
+        bitslice_load(
+            &planes,
+            storage,
+            TEST_WIDTH,
+            TEST_HEIGHT,
+            domains,
+            neighbor_mask
+        );
+        uint64_t passes = 0;
+        uint64_t words = 0;
+        const BitsliceStatus status = bitslice_propagate(
+            &planes,
+            (const BitsliceEdgeMask *)&edge_mask,
+            &passes,
+            &words
+        );
+        assert(passes > 0 && words > 0);
+        if (expected_first == 0 || expected_second == 0) {
+            assert(status == BITSLICE_WIPEOUT);
+            ++wipeouts;
+            continue;
+        }
+        assert(status == BITSLICE_FIXPOINT);
+        uint32_t result[TEST_CELLS];
+        unload(&planes, result);
+        assert(result[first] == expected_first);
+        assert(result[second] == expected_second);
+        ++fixpoints;
+    }
+
+    assert(fixpoints > 0 && wipeouts > 0);
+    free(storage);
+}
+
+int main(void)
+{
+    test_unlinked_cells_round_trip();
+    test_linked_pairs_match_tile_rules();
+    puts("test_bitslice_propagation: OK");
+    return 0;
+}
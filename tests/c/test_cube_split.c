@@ -0,0 +1,284 @@
+#include "wang/solver.h"
+
+#include "wang/tile.h"
+
+#include <assert.h>
+#include <stdbool.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <string.h>
+
+static uint32_t next_random(uint32_t *state)
+{
+    *state ^= *state << 13;
+    *state ^= *state >> 17;
+    *state ^= *state << 5;
+    return *state;
+}
+
+/*
+ * A region with about one cell in inactive_one_in left out, and about one
+ * active cell in narrow_one_in narrowed to a random triple.
+ */
+static void build_narrowed_case(
+    Region *region,
+    uint32_t *domains,
+    int32_t side,
+    uint32_t inactive_one_in,
+    uint32_t narrow_one_in,
+    uint32_t *random_state
+)
+{
+    assert(region_init(region, side, side));
+    for (int32_t y = 0; y < side; ++y) {
+        for (int32_t x = 0; x < side; ++x) {
+            const bool active =
+                next_random(random_state) % inactive_one_in != 0;
+            assert(region_set_active(region, x, y, active));
+        }
+    }
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        domains[i] = region->cells[i].active ? WANG_DOMAIN_ALL : 0;
+        if (domains[i] != 0 &&
+            next_random(random_state) % narrow_one_in == 0) {
+            domains[i] = 0;
+            for (size_t pick = 0; pick < 3; ++pick) {
+                domains[i] |= UINT32_C(1) <<
+                    (next_random(random_state) % TILE_COUNT);
+            }
+        }
+    }
+}
+
+static const uint32_t *cube_at(const WangCubeSet *cubes, size_t index)
+{
+    return cubes->domains + index * cubes->domain_count;
+}
+
+/* Solve region within one cube's domains through context. */
+static WangSolveStatus solve_cube(
+    WangSolverContext *context,
+    const Region *region,
+    const uint32_t *cube,
+    WangSolveResult *out_result
+)
+{
+    const WangSolverOptions options = {
+        .initial_domains = cube,
+        .initial_domain_count = region->cell_count,
+    };
+    return wang_solver_context_solve(
+        context,
+        region,
+        &options,
+        WANG_SOLVER_OPTIMIZED,
+        out_result
+    );
+}
+
+/*
+ * Cubes must be disjoint sub-boxes of the initial domains, zero on inactive
+ * cells. Some cube is SAT exactly when the region is, and the reference
+ * witness lies in exactly one cube.
+ */
+static void test_cubes_partition_random_regions(void)
+{
+    static const size_t targets[] = { 1, 2, 7, 32 };
+    size_t sat_count = 0;
+    size_t unsat_count = 0;
+    size_t refuted = 0;
+    uint32_t random_state = UINT32_C(0x2545f491);
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+
+    for (size_t sample = 0; sample < 120; ++sample) {
+        Region region = {0};
+        uint32_t domains[64];
+        build_narrowed_case(&region, domains, 8, 12u, 10u, &random_state);
+        const WangSolverOptions options = {
+            .initial_domains = domains,
+            .initial_domain_count = region.cell_count,
+        };
+        WangSolveResult reference = {0};
+        const WangSolveStatus expected =
+            wang_solve_serial(&region, &options, &reference);
+        assert(expected == WANG_SOLVE_SAT || expected == WANG_SOLVE_UNSAT);
+        sat_count += expected == WANG_SOLVE_SAT;
+        unsat_count += expected == WANG_SOLVE_UNSAT;
+
+        const size_t target = targets[sample % 4];
+        WangCubeSet cubes = {0};
+        const WangSolveStatus split = wang_solver_context_split_cubes(
+            context,
+            &region,
+            &options,
+            target,
+            &cubes
+        );
+        assert(cubes.lookahead_propagations > 0);
+        refuted += cubes.refuted_count;
+        if (split == WANG_SOLVE_UNSAT) {
+            assert(expected == WANG_SOLVE_UNSAT);
+            assert(cubes.domains == NULL && cubes.cube_count == 0);
+            wang_cube_set_destroy(&cubes);
+            wang_solve_result_destroy(&reference);
+            region_destroy(&region);
+            continue;
+        }
+        assert(split == WANG_SOLVE_UNKNOWN);
+        assert(cubes.cube_count > 0);
+        assert(cubes.domain_count == region.cell_count);
+        assert(cubes.cube_count <= target + TILE_COUNT - 2u);
+
+        bool any_sat = false;
+        size_t holders = 0;
+        for (size_t c = 0; c < cubes.cube_count; ++c) {
+            const uint32_t *cube = cube_at(&cubes, c);
+            bool holds_witness = expected == WANG_SOLVE_SAT;
+            for (size_t i = 0; i < region.cell_count; ++i) {
+                assert((cube[i] & ~domains[i]) == 0);
+                assert(region.cells[i].active == (cube[i] != 0));
+                if (holds_witness && region.cells[i].active &&
+                    (cube[i] & reference.domains[i]) == 0) {
+                    holds_witness = false;
+                }
+            }
+            holders += holds_witness;
+            for (size_t other = 0; other < c; ++other) {
+                const uint32_t *prior = cube_at(&cubes, other);
+                bool disjoint = false;
+                for (size_t i = 0; i < region.cell_count && !disjoint; ++i) {
+                    disjoint = region.cells[i].active &&
+                        (cube[i] & prior[i]) == 0;
+                }
+                assert(disjoint);
+            }
+
+            WangSolveResult result = {0};
+            const WangSolveStatus status =
+                solve_cube(context, &region, cube, &result);
+            assert(status == WANG_SOLVE_SAT || status == WANG_SOLVE_UNSAT);
+            any_sat = any_sat || status == WANG_SOLVE_SAT;
+            wang_solve_result_destroy(&result);
+        }
+        assert(any_sat == (expected == WANG_SOLVE_SAT));
+        assert(holders == (expected == WANG_SOLVE_SAT ? 1u : 0u));
+
+        wang_cube_set_destroy(&cubes);
+        assert(cubes.domains == NULL && cubes.cube_count == 0);
+        wang_solve_result_destroy(&reference);
+        region_destroy(&region);
+    }
+
+    assert(sat_count > 0 && unsat_count > 0 && refuted > 0);
+    wang_solver_context_destroy(context);
+}
+
+/* One cube is the propagated root; a large target resolves every cell. */
+static void test_targets_bound_the_split(void)
+{
+    Region region = {0};
+    assert(region_init(&region, 2, 1));
+    assert(region_set_active(&region, 0, 0, true));
+    assert(region_set_active(&region, 1, 0, true));
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+
+    WangRootFixpoint root = {0};
+    assert(wang_root_fixpoint_compute(&region, &root));
+    WangCubeSet single = {0};
+    assert(wang_solver_context_split_cubes(
+        context, &region, NULL, 1, &single) == WANG_SOLVE_UNKNOWN);
+    assert(single.cube_count == 1 && single.refuted_count == 0);
+    assert(single.lookahead_propagations == 1);
+    assert(memcmp(single.domains, root.domains,
+                  region.cell_count * sizeof(*root.domains)) == 0);
+
+    WangCubeSet bounded = {0};
+    assert(wang_solver_context_split_cubes(
+        context, &region, NULL, 5, &bounded) == WANG_SOLVE_UNKNOWN);
+    assert(bounded.cube_count >= 5);
+    assert(bounded.cube_count <= 5 + TILE_COUNT - 2u);
+
+    WangCubeSet resolved = {0};
+    assert(wang_solver_context_split_cubes(
+        context, &region, NULL, SIZE_MAX, &resolved) == WANG_SOLVE_UNKNOWN);
+    assert(resolved.cube_count > bounded.cube_count);
+    for (size_t c = 0; c < resolved.cube_count; ++c) {
+        const uint32_t *cube = cube_at(&resolved, c);
+        for (size_t i = 0; i < region.cell_count; ++i) {
+            assert(cube[i] != 0 && (cube[i] & (cube[i] - 1u)) == 0);
+        }
+        WangSolveResult result = {0};
+        assert(solve_cube(context, &region, cube, &result) ==
+               WANG_SOLVE_SAT);
+        assert(memcmp(result.domains, cube,
+                      region.cell_count * sizeof(*cube)) == 0);
+        wang_solve_result_destroy(&result);
+    }
+
+    wang_cube_set_destroy(&single);
+    wang_cube_set_destroy(&bounded);
+    wang_cube_set_destroy(&resolved);
+    wang_root_fixpoint_destroy(&root);
+    wang_solver_context_destroy(context);
+    region_destroy(&region);
+}
+
+static void test_root_conflict_and_invalid_inputs(void)
+{
+    Region region = {0};
+    assert(region_init(&region, 2, 1));
+    assert(region_set_active(&region, 0, 0, true));
+    assert(region_set_active(&region, 1, 0, true));
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+
+    const uint32_t empty[2] = { WANG_DOMAIN_ALL, 0 };
+    const WangSolverOptions contradiction = {
+        .initial_domains = empty,
+        .initial_domain_count = 2,
+    };
+    WangCubeSet cubes = {0};
+    assert(wang_solver_context_split_cubes(
+        context, &region, &contradiction, 4, &cubes) == WANG_SOLVE_UNSAT);
+    assert(cubes.domains == NULL && cubes.cube_count == 0);
+    assert(cubes.domain_count == 0 && cubes.refuted_count == 0);
+    wang_cube_set_destroy(&cubes);
+
+    const uint32_t invalid[2] = { WANG_DOMAIN_ALL, UINT32_C(1) << 31 };
+    const WangSolverOptions out_of_range = {
+        .initial_domains = invalid,
+        .initial_domain_count = 2,
+    };
+    assert(wang_solver_context_split_cubes(
+        context, &region, &out_of_range, 4, &cubes) == WANG_SOLVE_ERROR);
+    assert(wang_solver_context_split_cubes(
+        NULL, &region, NULL, 4, &cubes) == WANG_SOLVE_ERROR);
+    assert(wang_solver_context_split_cubes(
+        context, NULL, NULL, 4, &cubes) == WANG_SOLVE_ERROR);
+    assert(wang_solver_context_split_cubes(
+        context, &region, NULL, 0, &cubes) == WANG_SOLVE_ERROR);
+    assert(wang_solver_context_split_cubes(
+        context, &region, NULL, 4, NULL) == WANG_SOLVE_ERROR);
+    assert(cubes.domains == NULL && cubes.cube_count == 0);
+
+    assert(wang_solver_context_split_cubes(
+        context, &region, NULL, 4, &cubes) == WANG_SOLVE_UNKNOWN);
+    assert(wang_solver_context_split_cubes(
+        context, &region, NULL, 4, &cubes) == WANG_SOLVE_ERROR);
+    wang_cube_set_destroy(&cubes);
+    wang_cube_set_destroy(NULL);
+
+    wang_solver_context_destroy(context);
+    region_destroy(&region);
+}
+
+int main(void)
+{
+    test_cubes_partition_random_regions();
+    test_targets_bound_the_split();
+    test_root_conflict_and_invalid_inputs();
+    puts("test_cube_split: OK");
+    return 0;
+}
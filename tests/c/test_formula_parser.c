@@ -6,17 +6,34 @@
 
 static void assert_destroyed(const Cm13Formula *formula);
 
+/* Parse from a stream and from memory; both paths must agree exactly. */
 static Cm13ParseStatus parse_text(const char *text, Cm13Formula *formula,
                                   Cm13ParseLocation *location)
 {
     FILE *input = tmpfile();
     Cm13ParseStatus status;
+    Cm13Formula buffered = {0};
+    Cm13ParseLocation buffered_location = { 77, 77 };
 
     assert(input != NULL);
     assert(fwrite(text, 1, strlen(text), input) == strlen(text));
     rewind(input);
     status = cm13_formula_parse(input, formula, location);
     assert(fclose(input) == 0);
+
+    assert(cm13_formula_parse_buffer(text, strlen(text), &buffered,
+                                     &buffered_location) == status);
+    assert(buffered.variable_count == formula->variable_count);
+    assert(buffered.clause_count == formula->clause_count);
+    for (size_t clause = 0; clause < buffered.clause_count; clause++) {
+        assert(memcmp(&buffered.clauses[clause], &formula->clauses[clause],
+                      sizeof(buffered.clauses[clause])) == 0);
+    }
+    if (location != NULL) {
+        assert(buffered_location.line == location->line);
+        assert(buffered_location.column == location->column);
+    }
+    cm13_formula_destroy(&buffered);
     return status;
 }
 
@@ -162,6 +179,75 @@ static void test_domain_errors_and_arguments(void)
     }
 }
 
+static void test_parse_buffer_bounds_and_arguments(void)
+{
+    static const char text[] = "p cm13 1 1\n1 1 1 0\nGARBAGE";
+    const size_t valid_length = strlen("p cm13 1 1\n1 1 1 0\n");
+    Cm13Formula formula = {0};
+    Cm13Formula occupied = { .variable_count = 1, .clauses = (Cm13Clause *)(void *)text,
+                             .clause_count = 1 };
+    Cm13ParseLocation location = { 5, 6 };
+
+    assert(cm13_formula_parse_buffer(text, valid_length, &formula, &location) ==
+           CM13_PARSE_OK);
+    assert(formula.variable_count == 1 && formula.clause_count == 1);
+    cm13_formula_destroy(&formula);
+
+    assert(cm13_formula_parse_buffer(text, sizeof(text) - 1, &formula, &location) ==
+           CM13_PARSE_SYNTAX_ERROR);
+    assert_destroyed(&formula);
+    assert(location.line == 3 && location.column == 1);
+
+    assert(cm13_formula_parse_buffer("p cm13 1 1\n1 1\0 1 0", 18, &formula, NULL) ==
+           CM13_PARSE_SYNTAX_ERROR);
+    assert_destroyed(&formula);
+
+    location = (Cm13ParseLocation){ 5, 6 };
+    assert(cm13_formula_parse_buffer(NULL, 0, &formula, &location) ==
+           CM13_PARSE_INVALID_ARGUMENT);
+    assert(location.line == 0 && location.column == 0);
+    assert(cm13_formula_parse_buffer(text, valid_length, NULL, NULL) ==
+           CM13_PARSE_INVALID_ARGUMENT);
+    assert(cm13_formula_parse_buffer(text, valid_length, &occupied, NULL) ==
+           CM13_PARSE_INVALID_ARGUMENT);
+    assert(occupied.clauses == (Cm13Clause *)(void *)text);
+}
+
+static void test_from_packed(void)
+{
+    static const uint32_t indices[] = { 0, 0, 2, 1, 1, 2, 0, 1, 2 };
+    static const uint32_t unbalanced[] = { 0, 0, 0, 1, 1, 2, 0, 1, 2 };
+    static const uint32_t outside[] = { 0, 0, 3, 1, 1, 2, 0, 1, 2 };
+    Cm13Formula formula = {0};
+    Cm13Formula parsed = {0};
+    Cm13Formula occupied = { .variable_count = 1, .clauses = (Cm13Clause *)(void *)indices,
+                             .clause_count = 1 };
+
+    assert(cm13_formula_from_packed(3, indices, 9, &formula) == CM13_PARSE_OK);
+    assert(parse_text("p cm13 3 3\n1 1 3 0\n2 2 3 0\n1 2 3 0\n", &parsed, NULL) ==
+           CM13_PARSE_OK);
+    assert(formula.variable_count == 3 && formula.clause_count == 3);
+    assert(memcmp(formula.clauses, parsed.clauses,
+                  3 * sizeof(*formula.clauses)) == 0);
+    cm13_formula_destroy(&parsed);
+    cm13_formula_destroy(&formula);
+
+    assert(cm13_formula_from_packed(3, unbalanced, 9, &formula) == CM13_PARSE_DOMAIN_ERROR);
+    assert_destroyed(&formula);
+    assert(cm13_formula_from_packed(3, outside, 9, &formula) == CM13_PARSE_DOMAIN_ERROR);
+    assert_destroyed(&formula);
+    assert(cm13_formula_from_packed(3, indices, 8, &formula) == CM13_PARSE_DOMAIN_ERROR);
+    assert(cm13_formula_from_packed(2, indices, 9, &formula) == CM13_PARSE_DOMAIN_ERROR);
+    assert(cm13_formula_from_packed(0, indices, 0, &formula) == CM13_PARSE_DOMAIN_ERROR);
+    assert_destroyed(&formula);
+
+    assert(cm13_formula_from_packed(3, NULL, 9, &formula) == CM13_PARSE_INVALID_ARGUMENT);
+    assert(cm13_formula_from_packed(3, indices, 9, NULL) == CM13_PARSE_INVALID_ARGUMENT);
+    assert(cm13_formula_from_packed(3, indices, 9, &occupied) ==
+           CM13_PARSE_INVALID_ARGUMENT);
+    assert(occupied.clauses == (Cm13Clause *)(void *)indices);
+}
+
 static void write_path_text(const char *path, const char *text)
 {
     FILE *output = fopen(path, "wb");
@@ -237,6 +323,8 @@ int main(void)
     test_syntax_errors();
     test_exact_error_locations();
     test_domain_errors_and_arguments();
+    test_parse_buffer_bounds_and_arguments();
+    test_from_packed();
     test_load_path();
     return 0;
 }
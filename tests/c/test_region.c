@@ -281,12 +281,48 @@ static void test_deterministic_api_stress(void)
     }
 }
 
+/* Equal content hashes equally; each part of the content changes it. */
+static void test_content_hash(void)
+{
+    Region first = {0};
+    Region second = {0};
+    assert(region_init(&first, 3, 2));
+    assert(region_init(&second, 3, 2));
+    assert(region_content_hash(&first) == region_content_hash(&second));
+
+    assert(region_set_active(&first, 1, 1, true));
+    const uint64_t inactive = region_content_hash(&second);
+    assert(region_content_hash(&first) != inactive);
+    assert(region_set_active(&second, 1, 1, true));
+    assert(region_content_hash(&first) == region_content_hash(&second));
+
+    assert(region_set_boundary(&first, 1, 1, N, COLOR_V));
+    assert(region_content_hash(&first) != region_content_hash(&second));
+    assert(region_set_boundary(&second, 1, 1, N, COLOR_V));
+    assert(region_content_hash(&first) == region_content_hash(&second));
+    assert(region_set_boundary(&second, 1, 1, N, COLOR_B));
+    assert(region_content_hash(&first) != region_content_hash(&second));
+
+    /* The same empty cells in another shape hash differently. */
+    Region wide = {0};
+    Region tall = {0};
+    assert(region_init(&wide, 6, 1));
+    assert(region_init(&tall, 1, 6));
+    assert(region_content_hash(&wide) != region_content_hash(&tall));
+
+    region_destroy(&tall);
+    region_destroy(&wide);
+    region_destroy(&second);
+    region_destroy(&first);
+}
+
 int main(void)
 {
     test_lifetime_and_initial_state();
     test_coordinate_api_exhaustively();
     test_region_validation();
     test_deterministic_api_stress();
+    test_content_hash();
 
     puts("test_region: OK");
     return 0;
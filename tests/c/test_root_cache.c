@@ -0,0 +1,479 @@
+#define _POSIX_C_SOURCE 200809L
+
+#include "wang/solver.h"
+
+#include "wang/tile.h"
+
+#include <assert.h>
+#include <inttypes.h>
+#include <stdbool.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+
+static const WangSolverEngine ENGINES[] = {
+    WANG_SOLVER_REFERENCE,
+    WANG_SOLVER_OPTIMIZED,
+    WANG_SOLVER_FRONTIER,
+};
+
+static uint32_t random_state = UINT32_C(0x2545f491);
+
+static uint32_t next_random(void)
+{
+    random_state ^= random_state << 13;
+    random_state ^= random_state >> 17;
+    random_state ^= random_state << 5;
+    return random_state;
+}
+
+static void activate_all(Region *region)
+{
+    for (int32_t y = 0; y < region->height; ++y) {
+        for (int32_t x = 0; x < region->width; ++x) {
+            assert(region_set_active(region, x, y, true));
+        }
+    }
+}
+
+/*
+ * A random region of at most 6x6 cells, mostly active, with a few random
+ * boundary colors: some are SAT, some UNSAT at the root or in the search.
+ */
+static void random_region(Region *region)
+{
+    const int32_t width = 1 + (int32_t)(next_random() % 6u);
+    const int32_t height = 1 + (int32_t)(next_random() % 6u);
+    assert(region_init(region, width, height));
+    for (int32_t y = 0; y < height; ++y) {
+        for (int32_t x = 0; x < width; ++x) {
+            if (next_random() % 8u != 0) {
+                assert(region_set_active(region, x, y, true));
+            }
+        }
+    }
+    for (int32_t y = 0; y < height; ++y) {
+        for (int32_t x = 0; x < width; ++x) {
+            for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+                if (next_random() % 6u == 0) {
+                    (void)region_set_boundary(
+                        region,
+                        x,
+                        y,
+                        dir,
+                        (ColorId)(next_random() % COLOR_COUNT)
+                    );
+                }
+            }
+        }
+    }
+}
+
+static WangRootCacheStats cache_stats(const WangSolverContext *context)
+{
+    WangRootCacheStats stats;
+    assert(wang_solver_context_root_cache_stats(context, &stats));
+    return stats;
+}
+
+/* A context solve through the cache returns what a cold one-shot does. */
+static void assert_cached_matches_cold(
+    WangSolverContext *context,
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolverEngine engine
+)
+{
+    WangSolveResult expected = {0};
+    WangSolveResult actual = {0};
+    const WangSolveStatus status = engine == WANG_SOLVER_FRONTIER
+        ? wang_solve_frontier(region, options, &expected)
+        : engine == WANG_SOLVER_OPTIMIZED
+        ? wang_solve_optimized(region, options, &expected)
+        : wang_solve_serial(region, options, &expected);
+    assert(status == WANG_SOLVE_SAT || status == WANG_SOLVE_UNSAT);
+    assert(wang_solver_context_solve(
+        context,
+        region,
+        options,
+        engine,
+        &actual
+    ) == status);
+
+    assert(actual.domain_count == expected.domain_count);
+    assert(actual.metrics.dfs_nodes == expected.metrics.dfs_nodes);
+    assert(actual.metrics.failed_leaves == expected.metrics.failed_leaves);
+    assert(expected.domain_count == 0 || memcmp(
+        actual.domains,
+        expected.domains,
+        expected.domain_count * sizeof(*expected.domains)
+    ) == 0);
+    assert(actual.conflict_cell == expected.conflict_cell);
+    assert(actual.resolved_count == expected.resolved_count);
+    assert(actual.decision_depth == expected.decision_depth);
+
+    wang_solve_result_destroy(&actual);
+    wang_solve_result_destroy(&expected);
+}
+
+/* Every other solve of a region hits; results never change. */
+static void test_random_regions_match_cold_solves(void)
+{
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+    assert(wang_solver_context_enable_root_cache(context, 1u << 20, NULL));
+
+    const WangSolverOptions configurations[] = {
+        { .flags = WANG_SOLVE_COLLECT_METRICS },
+        {
+            .flags = WANG_SOLVE_COLLECT_METRICS |
+                WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT,
+        },
+    };
+    uint64_t solves = 0;
+    for (unsigned i = 0; i < 64u; ++i) {
+        Region region = {0};
+        random_region(&region);
+        uint32_t *initial = calloc(region.cell_count, sizeof(*initial));
+        assert(initial != NULL);
+        for (size_t cell = 0; cell < region.cell_count; ++cell) {
+            if (region.cells[cell].active) {
+                initial[cell] = next_random() % 4u != 0
+                    ? WANG_DOMAIN_ALL
+                    : next_random() & WANG_DOMAIN_ALL;
+            }
+        }
+
+        for (size_t c = 0;
+             c < sizeof(configurations) / sizeof(*configurations);
+             ++c) {
+            WangSolverOptions options = configurations[c];
+            for (size_t e = 0; e < sizeof(ENGINES) / sizeof(*ENGINES); ++e) {
+                options.initial_domains = NULL;
+                options.initial_domain_count = 0;
+                assert_cached_matches_cold(
+                    context,
+                    &region,
+                    &options,
+                    ENGINES[e]
+                );
+                /* The fixpoint stays unpinned under initial domains. */
+                options.initial_domains = initial;
+                options.initial_domain_count = region.cell_count;
+                assert_cached_matches_cold(
+                    context,
+                    &region,
+                    &options,
+                    ENGINES[e]
+                );
+                solves += 2u;
+            }
+        }
+        free(initial);
+        region_destroy(&region);
+    }
+
+    /* Random regions repeat rarely, so each misses once. */
+    const WangRootCacheStats stats = cache_stats(context);
+    assert(stats.misses <= 64u);
+    assert(stats.hits + stats.misses == solves);
+    assert(stats.entry_count == stats.misses);
+    assert(stats.evictions == 0);
+    assert(stats.disk_hits == 0 && stats.disk_writes == 0);
+    wang_solver_context_destroy(context);
+}
+
+static void solve_in_context(WangSolverContext *context, const Region *region)
+{
+    WangSolveResult result = {0};
+    const WangSolveStatus status = wang_solver_context_solve(
+        context,
+        region,
+        NULL,
+        WANG_SOLVER_OPTIMIZED,
+        &result
+    );
+    assert(status == WANG_SOLVE_SAT || status == WANG_SOLVE_UNSAT);
+    wang_solve_result_destroy(&result);
+}
+
+/* Four open 5x5 regions that differ in one inactive cell. */
+static void build_open_regions(Region regions[4])
+{
+    for (int32_t i = 0; i < 4; ++i) {
+        assert(region_init(&regions[i], 5, 5));
+        activate_all(&regions[i]);
+        assert(region_set_active(&regions[i], i, 2, false));
+    }
+}
+
+static void test_least_recently_used_eviction(void)
+{
+    Region regions[4];
+    build_open_regions(regions);
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+
+    /* Measure one entry, then leave room for two and a half. */
+    assert(wang_solver_context_enable_root_cache(context, SIZE_MAX, NULL));
+    solve_in_context(context, &regions[0]);
+    const size_t entry_bytes = cache_stats(context).bytes;
+    assert(entry_bytes > 25u * sizeof(uint32_t));
+    const size_t limit = 2u * entry_bytes + entry_bytes / 2u;
+    assert(wang_solver_context_enable_root_cache(context, limit, NULL));
+    WangRootCacheStats stats = cache_stats(context);
+    assert(stats.misses == 0 && stats.entry_count == 0 && stats.bytes == 0);
+
+    /* A, B, A, C evicts B; A hits again; B misses and evicts C. */
+    const size_t order[] = { 0, 1, 0, 2, 0, 1 };
+    for (size_t i = 0; i < sizeof(order) / sizeof(*order); ++i) {
+        solve_in_context(context, &regions[order[i]]);
+    }
+    stats = cache_stats(context);
+    assert(stats.hits == 2);
+    assert(stats.misses == 4);
+    assert(stats.evictions == 2);
+    assert(stats.entry_count == 2);
+    assert(stats.bytes == 2u * entry_bytes);
+    solve_in_context(context, &regions[0]);
+    solve_in_context(context, &regions[1]);
+    assert(cache_stats(context).hits == 4);
+
+    /* Reset drops the entries and keeps the counters. */
+    wang_solver_context_reset(context);
+    stats = cache_stats(context);
+    assert(stats.entry_count == 0 && stats.bytes == 0);
+    assert(stats.hits == 4 && stats.misses == 4 && stats.evictions == 2);
+    solve_in_context(context, &regions[0]);
+    assert(cache_stats(context).misses == 5);
+
+    /* An entry larger than the limit is used once and never kept. */
+    assert(wang_solver_context_enable_root_cache(context, 1, NULL));
+    solve_in_context(context, &regions[0]);
+    solve_in_context(context, &regions[0]);
+    stats = cache_stats(context);
+    assert(stats.misses == 2 && stats.hits == 0);
+    assert(stats.entry_count == 0 && stats.evictions == 0);
+
+    wang_solver_context_destroy(context);
+    for (size_t i = 0; i < 4; ++i) {
+        region_destroy(&regions[i]);
+    }
+}
+
+static char *cache_file_path(const char *directory, const Region *region)
+{
+    char *path = malloc(strlen(directory) + 32u);
+    assert(path != NULL);
+    (void)sprintf(
+        path,
+        "%s/%016" PRIx64 ".root",
+        directory,
+        region_content_hash(region)
+    );
+    return path;
+}
+
+/* Overwrite the byte at offset with its complement. */
+static void flip_byte(const char *path, long offset)
+{
+    FILE *file = fopen(path, "r+b");
+    assert(file != NULL);
+    assert(fseek(file, offset, SEEK_SET) == 0);
+    const int byte = fgetc(file);
+    assert(byte != EOF);
+    assert(fseek(file, offset, SEEK_SET) == 0);
+    assert(fputc(~byte & 0xff, file) != EOF);
+    assert(fclose(file) == 0);
+}
+
+static void test_disk_tier(void)
+{
+    char directory[] = "/tmp/wang-root-cache-XXXXXX";
+    assert(mkdtemp(directory) != NULL);
+    Region regions[4];
+    build_open_regions(regions);
+    Region impossible = {0};
+    assert(region_init(&impossible, 2, 1));
+    activate_all(&impossible);
+    assert(region_set_boundary(&impossible, 0, 0, N, COLOR_V));
+    assert(region_set_boundary(&impossible, 0, 0, S, COLOR_V));
+
+    /* A disk-only cache writes every fixpoint it computes. */
+    WangSolverContext *writer = wang_solver_context_create();
+    assert(writer != NULL);
+    assert(wang_solver_context_enable_root_cache(writer, 0, directory));
+    const WangSolverOptions options = {
+        .flags = WANG_SOLVE_COLLECT_METRICS |
+            WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT,
+    };
+    assert_cached_matches_cold(
+        writer,
+        &regions[0],
+        &options,
+        WANG_SOLVER_OPTIMIZED
+    );
+    assert_cached_matches_cold(
+        writer,
+        &impossible,
+        &options,
+        WANG_SOLVER_REFERENCE
+    );
+    WangRootCacheStats stats = cache_stats(writer);
+    assert(stats.misses == 2 && stats.disk_writes == 2);
+    assert(stats.disk_hits == 0 && stats.entry_count == 0);
+    char *path = cache_file_path(directory, &regions[0]);
+    char *impossible_path = cache_file_path(directory, &impossible);
+    assert(access(path, F_OK) == 0);
+    assert(access(impossible_path, F_OK) == 0);
+
+    /* Another context maps the files, then keeps them in memory. */
+    WangSolverContext *reader = wang_solver_context_create();
+    assert(reader != NULL);
+    assert(wang_solver_context_enable_root_cache(
+        reader,
+        1u << 20,
+        directory
+    ));
+    for (unsigned round = 0; round < 2; ++round) {
+        assert_cached_matches_cold(
+            reader,
+            &regions[0],
+            &options,
+            WANG_SOLVER_FRONTIER
+        );
+        assert_cached_matches_cold(
+            reader,
+            &impossible,
+            &options,
+            WANG_SOLVER_OPTIMIZED
+        );
+    }
+    stats = cache_stats(reader);
+    assert(stats.disk_hits == 2 && stats.hits == 2 && stats.misses == 0);
+    assert(stats.disk_writes == 0 && stats.entry_count == 2);
+
+    /* A damaged magic, checksum, cell, or domain misses and rewrites. */
+    const long offsets[] = { 0, 40, 48 + 25 * 5 + 4 * 7, 48 + 5 * 12 + 1 };
+    for (size_t i = 0; i < sizeof(offsets) / sizeof(*offsets); ++i) {
+        flip_byte(path, offsets[i]);
+        wang_solver_context_reset(reader);
+        assert_cached_matches_cold(
+            reader,
+            &regions[0],
+            &options,
+            WANG_SOLVER_OPTIMIZED
+        );
+        stats = cache_stats(reader);
+        assert(stats.misses == i + 1u && stats.disk_writes == i + 1u);
+    }
+    wang_solver_context_reset(reader);
+    solve_in_context(reader, &regions[0]);
+    assert(cache_stats(reader).disk_hits == 3);
+
+    /* Removing the directory only fails the writes. */
+    assert(remove(path) == 0);
+    assert(remove(impossible_path) == 0);
+    assert(rmdir(directory) == 0);
+    solve_in_context(writer, &regions[1]);
+    stats = cache_stats(writer);
+    assert(stats.misses == 3 && stats.disk_failures == 1);
+
+    free(impossible_path);
+    free(path);
+    wang_solver_context_destroy(reader);
+    wang_solver_context_destroy(writer);
+    region_destroy(&impossible);
+    for (size_t i = 0; i < 4; ++i) {
+        region_destroy(&regions[i]);
+    }
+}
+
+/* A caller's fixpoint, a disabled cache, and bad input bypass the cache. */
+static void test_bypasses_and_invalid_arguments(void)
+{
+    Region region = {0};
+    assert(region_init(&region, 4, 3));
+    activate_all(&region);
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+
+    WangRootCacheStats stats;
+    assert(!wang_solver_context_root_cache_stats(NULL, &stats));
+    assert(!wang_solver_context_root_cache_stats(context, NULL));
+    assert(!wang_solver_context_enable_root_cache(NULL, 1024, NULL));
+    assert(!wang_solver_context_enable_root_cache(
+        context,
+        1024,
+        "/nonexistent/wang-root-cache"
+    ));
+    assert(!wang_solver_context_enable_root_cache(context, 1024, ""));
+    assert(!wang_solver_context_enable_root_cache(
+        context,
+        1024,
+        "/dev/null"
+    ));
+
+    /* Disabled by default and by zero limits. */
+    solve_in_context(context, &region);
+    assert(wang_solver_context_enable_root_cache(context, 0, NULL));
+    solve_in_context(context, &region);
+    stats = cache_stats(context);
+    assert(stats.misses == 0 && stats.hits == 0);
+
+    assert(wang_solver_context_enable_root_cache(context, 1u << 16, NULL));
+    WangRootFixpoint fixpoint = {0};
+    assert(wang_root_fixpoint_compute(&region, &fixpoint));
+    const WangSolverOptions own = { .root_fixpoint = &fixpoint };
+    WangSolveResult result = {0};
+    assert(wang_solver_context_solve(
+        context,
+        &region,
+        &own,
+        WANG_SOLVER_OPTIMIZED,
+        &result
+    ) == WANG_SOLVE_SAT);
+    wang_solve_result_destroy(&result);
+
+    const WangSolverOptions invalid = { .restart_base = 2 };
+    assert(wang_solver_context_solve(
+        context,
+        &region,
+        &invalid,
+        WANG_SOLVER_OPTIMIZED,
+        &result
+    ) == WANG_SOLVE_ERROR);
+    assert(wang_solver_context_solve(
+        context,
+        &region,
+        NULL,
+        (WangSolverEngine)3,
+        &result
+    ) == WANG_SOLVE_ERROR);
+    result.domain_count = 1;
+    assert(wang_solver_context_solve(
+        context,
+        &region,
+        NULL,
+        WANG_SOLVER_OPTIMIZED,
+        &result
+    ) == WANG_SOLVE_ERROR);
+    stats = cache_stats(context);
+    assert(stats.misses == 0 && stats.hits == 0 && stats.entry_count == 0);
+
+    wang_root_fixpoint_destroy(&fixpoint);
+    wang_solver_context_destroy(context);
+    region_destroy(&region);
+}
+
+int main(void)
+{
+    test_random_regions_match_cold_solves();
+    test_least_recently_used_eviction();
+    test_disk_tier();
+    test_bypasses_and_invalid_arguments();
+    puts("test_root_cache: OK");
+    return 0;
+}
@@ -0,0 +1,451 @@
+#define _POSIX_C_SOURCE 200809L
+
+#include "wang/solver.h"
+
+#include "wang/tile.h"
+
+#include <assert.h>
+#include <stdbool.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <unistd.h>
+
+static void make_checkpoint_path(char *path)
+{
+    const int fd = mkstemp(path);
+    assert(fd >= 0);
+    assert(close(fd) == 0);
+    assert(unlink(path) == 0);
+}
+
+static WangSolverOptions with_checkpoint(
+    WangSolverOptions options,
+    const char *path
+)
+{
+    options.flags |= WANG_SOLVE_CHECKPOINT | WANG_SOLVE_COLLECT_METRICS;
+    options.checkpoint_path = path;
+    return options;
+}
+
+/* The status, witness, and best leaf of two solves agree. */
+static void assert_same_outcome(
+    WangSolveStatus status,
+    const WangSolveResult *result,
+    WangSolveStatus expected_status,
+    const WangSolveResult *expected
+)
+{
+    assert(status == expected_status);
+    assert(result->domain_count == expected->domain_count);
+    assert(result->domain_count == 0 || memcmp(
+        result->domains,
+        expected->domains,
+        result->domain_count * sizeof(*result->domains)
+    ) == 0);
+    assert(result->conflict_cell == expected->conflict_cell);
+    assert(result->resolved_count == expected->resolved_count);
+    assert(result->decision_depth == expected->decision_depth);
+}
+
+/*
+ * Stop a checkpointed solve after stop_nodes DFS nodes, resume it once to
+ * twice that many, then resume it to the end: every piece continues where
+ * the last stopped, so the pieces add up to the uninterrupted solve.
+ */
+static void assert_resume_replays(
+    const Region *region,
+    const WangSolverOptions *options,
+    WangSolveStatus expected_status,
+    const WangSolveResult *expected,
+    uint64_t stop_nodes
+)
+{
+    char path[] = "/tmp/wang-checkpoint-XXXXXX";
+    make_checkpoint_path(path);
+
+    WangSolverOptions bounded = with_checkpoint(*options, path);
+    bounded.node_limit = stop_nodes;
+    WangSolveResult first = {0};
+    assert(wang_solve_optimized(region, &bounded, &first) ==
+           WANG_SOLVE_UNKNOWN);
+    assert(first.metrics.dfs_nodes == stop_nodes);
+
+    bounded.node_limit = 2u * stop_nodes;
+    WangSolveResult second = {0};
+    const WangSolveStatus second_status =
+        wang_solve_resume(region, &bounded, &second);
+    assert(second_status == WANG_SOLVE_UNKNOWN ||
+           second_status == expected_status);
+
+    const WangSolverOptions unbounded = with_checkpoint(*options, path);
+    WangSolveResult last = {0};
+    const WangSolveStatus status = second_status == WANG_SOLVE_UNKNOWN
+        ? wang_solve_resume(region, &unbounded, &last)
+        : second_status;
+    const WangSolveResult *final = second_status == WANG_SOLVE_UNKNOWN
+        ? &last
+        : &second;
+    assert_same_outcome(status, final, expected_status, expected);
+    assert(first.metrics.dfs_nodes + second.metrics.dfs_nodes +
+           last.metrics.dfs_nodes == expected->metrics.dfs_nodes);
+    assert(first.metrics.failed_leaves + second.metrics.failed_leaves +
+           last.metrics.failed_leaves == expected->metrics.failed_leaves);
+
+    wang_solve_result_destroy(&last);
+    wang_solve_result_destroy(&second);
+    wang_solve_result_destroy(&first);
+    assert(remove(path) == 0);
+}
+
+/* Returns the DFS nodes of the uninterrupted solve. */
+static uint64_t assert_resume_matches(
+    const Region *region,
+    const WangSolverOptions *options
+)
+{
+    WangSolverOptions measured = *options;
+    measured.flags |= WANG_SOLVE_COLLECT_METRICS;
+    WangSolveResult expected = {0};
+    const WangSolveStatus expected_status =
+        wang_solve_optimized(region, &measured, &expected);
+    assert(expected_status == WANG_SOLVE_SAT ||
+           expected_status == WANG_SOLVE_UNSAT);
+
+    /* A solve decided within three nodes has no stop to interrupt. */
+    const uint64_t nodes = expected.metrics.dfs_nodes;
+    const uint64_t stops[] = { 1, 2, nodes / 3u, nodes - 1u };
+    for (size_t i = 0;
+         nodes > 3 && i < sizeof(stops) / sizeof(*stops);
+         ++i) {
+        assert_resume_replays(
+            region,
+            options,
+            expected_status,
+            &expected,
+            stops[i]
+        );
+    }
+    wang_solve_result_destroy(&expected);
+    return nodes;
+}
+
+static uint32_t next_random(uint32_t *state)
+{
+    *state ^= *state << 13;
+    *state ^= *state >> 17;
+    *state ^= *state << 5;
+    return *state;
+}
+
+/*
+ * A fully active 10x10 region whose cells are narrowed, one in twenty, to
+ * a random triple of tiles. Propagation refutes a wrong early choice only
+ * deep in the search, so some samples take hundreds of DFS nodes.
+ */
+#define SEARCH_CASE_SIDE 10
+#define SEARCH_CASE_CELLS (SEARCH_CASE_SIDE * SEARCH_CASE_SIDE)
+
+typedef struct {
+    Region region;
+    uint32_t domains[SEARCH_CASE_CELLS];
+} SearchCase;
+
+static void build_search_case(SearchCase *search_case, uint32_t sample)
+{
+    Region *region = &search_case->region;
+    assert(region_init(region, SEARCH_CASE_SIDE, SEARCH_CASE_SIDE));
+    for (int32_t y = 0; y < SEARCH_CASE_SIDE; ++y) {
+        for (int32_t x = 0; x < SEARCH_CASE_SIDE; ++x) {
+            assert(region_set_active(region, x, y, true));
+        }
+    }
+    uint32_t state = sample * UINT32_C(2654435761) | 1u;
+    for (size_t i = 0; i < SEARCH_CASE_CELLS; ++i) {
+        search_case->domains[i] = WANG_DOMAIN_ALL;
+        if (next_random(&state) % 20u == 0) {
+            search_case->domains[i] = 0;
+            for (unsigned pick = 0; pick < 3; ++pick) {
+                search_case->domains[i] |=
+                    UINT32_C(1) << (next_random(&state) % TILE_COUNT);
+            }
+        }
+    }
+}
+
+/* An UNSAT and a SAT sample that search 239 and 216 DFS nodes. */
+static const uint32_t SEARCH_SAMPLES[] = { 408, 923 };
+
+static WangSolverOptions search_case_options(
+    const SearchCase *search_case,
+    WangSolverOptions options
+)
+{
+    options.initial_domains = search_case->domains;
+    options.initial_domain_count = SEARCH_CASE_CELLS;
+    return options;
+}
+
+/* Every mechanism whose state a checkpoint carries, one at a time. */
+static void test_resume_replays_search(void)
+{
+    const WangSolverOptions configurations[] = {
+        {0},
+        { .flags = WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT },
+        {
+            .value_order = WANG_VALUE_ORDER_RANDOM,
+            .tie_break = WANG_TIE_BREAK_RANDOM,
+            .seed = 7,
+        },
+        { .value_order = WANG_VALUE_ORDER_LEAST_CONSTRAINING },
+        {
+            .restart_schedule = WANG_RESTART_LUBY,
+            .restart_base = 2,
+            .seed = 3,
+        },
+        { .flags = WANG_SOLVE_WEIGHTED_DEGREE },
+        { .flags = WANG_SOLVE_PROBE_SINGLETONS, .probe_depth = 2 },
+    };
+    enum {
+        CONFIGURATION_COUNT =
+            sizeof(configurations) / sizeof(*configurations)
+    };
+    uint64_t longest[CONFIGURATION_COUNT] = {0};
+    for (size_t sample = 0;
+         sample < sizeof(SEARCH_SAMPLES) / sizeof(*SEARCH_SAMPLES);
+         ++sample) {
+        SearchCase search_case;
+        build_search_case(&search_case, SEARCH_SAMPLES[sample]);
+        for (size_t i = 0; i < CONFIGURATION_COUNT; ++i) {
+            const WangSolverOptions options =
+                search_case_options(&search_case, configurations[i]);
+            const uint64_t nodes =
+                assert_resume_matches(&search_case.region, &options);
+            if (nodes > longest[i]) {
+                longest[i] = nodes;
+            }
+        }
+        region_destroy(&search_case.region);
+    }
+    /* Each configuration searched deep enough to stop mid-tree. */
+    for (size_t i = 0; i < CONFIGURATION_COUNT; ++i) {
+        assert(longest[i] > 8);
+    }
+}
+
+/*
+ * Checkpoints at every poll leave the last one, which resumes too, and
+ * leave the temporary file of another writer alone.
+ */
+static void test_periodic_checkpoints(void)
+{
+    char path[] = "/tmp/wang-checkpoint-XXXXXX";
+    make_checkpoint_path(path);
+    char other[sizeof(path) + 4u];
+    (void)snprintf(other, sizeof(other), "%s.tmp", path);
+    FILE *other_file = fopen(other, "wb");
+    assert(other_file != NULL);
+    assert(fputs("other writer", other_file) != EOF);
+    assert(fclose(other_file) == 0);
+
+    SearchCase search_case;
+    build_search_case(&search_case, SEARCH_SAMPLES[0]);
+    const Region *region = &search_case.region;
+    const WangSolverOptions options = with_checkpoint(
+        search_case_options(
+            &search_case,
+            (WangSolverOptions){ .flags = WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT }
+        ),
+        path
+    );
+    WangSolveResult expected = {0};
+    const WangSolveStatus expected_status =
+        wang_solve_optimized(region, &options, &expected);
+    assert(expected.metrics.dfs_nodes > 64);
+    assert(access(path, F_OK) == 0);
+
+    WangSolveResult resumed = {0};
+    const WangSolveStatus status =
+        wang_solve_resume(region, &options, &resumed);
+    assert_same_outcome(status, &resumed, expected_status, &expected);
+    assert(resumed.metrics.dfs_nodes < expected.metrics.dfs_nodes);
+
+    char contents[16] = {0};
+    other_file = fopen(other, "rb");
+    assert(other_file != NULL);
+    assert(fread(contents, 1, sizeof(contents) - 1u, other_file) == 12u);
+    assert(fclose(other_file) == 0);
+    assert(strcmp(contents, "other writer") == 0);
+
+    wang_solve_result_destroy(&resumed);
+    wang_solve_result_destroy(&expected);
+    assert(remove(other) == 0);
+    assert(remove(path) == 0);
+    region_destroy(&search_case.region);
+}
+
+/* Overwrite the byte at offset with its complement. */
+static void flip_byte(const char *path, long offset)
+{
+    FILE *file = fopen(path, "r+b");
+    assert(file != NULL);
+    assert(fseek(file, offset, SEEK_SET) == 0);
+    const int byte = fgetc(file);
+    assert(byte != EOF);
+    assert(fseek(file, offset, SEEK_SET) == 0);
+    assert(fputc(~byte & 0xff, file) != EOF);
+    assert(fclose(file) == 0);
+}
+
+static void truncate_by_one(const char *path)
+{
+    FILE *file = fopen(path, "rb");
+    assert(file != NULL);
+    assert(fseek(file, 0, SEEK_END) == 0);
+    const long size = ftell(file);
+    assert(size > 0);
+    assert(fclose(file) == 0);
+    assert(truncate(path, size - 1) == 0);
+}
+
+static void test_rejects_mismatched_checkpoints(void)
+{
+    char path[] = "/tmp/wang-checkpoint-XXXXXX";
+    make_checkpoint_path(path);
+    SearchCase search_case;
+    build_search_case(&search_case, SEARCH_SAMPLES[0]);
+    const Region *region = &search_case.region;
+    const WangSolverOptions options = with_checkpoint(
+        search_case_options(&search_case, (WangSolverOptions){0}),
+        path
+    );
+
+    WangSolveResult result = {0};
+    assert(wang_solve_resume(region, &options, &result) == WANG_SOLVE_ERROR);
+
+    WangSolverOptions bounded = options;
+    bounded.node_limit = 10;
+    assert(wang_solve_optimized(region, &bounded, &result) ==
+           WANG_SOLVE_UNKNOWN);
+    wang_solve_result_destroy(&result);
+
+    /* Other steering options, or none, cannot resume it. */
+    WangSolverOptions reseeded = options;
+    reseeded.value_order = WANG_VALUE_ORDER_DESCENDING;
+    assert(wang_solve_resume(region, &reseeded, &result) ==
+           WANG_SOLVE_ERROR);
+    const WangSolverOptions unflagged =
+        search_case_options(&search_case, (WangSolverOptions){0});
+    assert(wang_solve_resume(region, &unflagged, &result) ==
+           WANG_SOLVE_ERROR);
+    assert(wang_solve_resume(region, NULL, &result) == WANG_SOLVE_ERROR);
+
+    /* Neither can narrower initial domains, whose root differs. */
+    uint32_t narrowed[SEARCH_CASE_CELLS];
+    memcpy(narrowed, search_case.domains, sizeof(narrowed));
+    narrowed[0] = UINT32_C(1) << (TILE_COUNT - 1u);
+    WangSolverOptions restricted = options;
+    restricted.initial_domains = narrowed;
+    assert(wang_solve_resume(region, &restricted, &result) ==
+           WANG_SOLVE_ERROR);
+
+    /* Metrics and bounds may change between runs. */
+    WangSolverOptions unmeasured = options;
+    unmeasured.flags &= ~(uint32_t)WANG_SOLVE_COLLECT_METRICS;
+    unmeasured.deadline_ns = UINT64_MAX;
+    const WangSolveStatus status =
+        wang_solve_resume(region, &unmeasured, &result);
+    assert(status == WANG_SOLVE_SAT || status == WANG_SOLVE_UNSAT);
+    wang_solve_result_destroy(&result);
+
+    /* The solve checkpointed again while it ran; damage that one. */
+    bounded.node_limit = 20;
+    assert(wang_solve_optimized(region, &bounded, &result) ==
+           WANG_SOLVE_UNKNOWN);
+    flip_byte(path, 200);
+    assert(wang_solve_resume(region, &options, &result) == WANG_SOLVE_ERROR);
+    flip_byte(path, 200);
+    truncate_by_one(path);
+    assert(wang_solve_resume(region, &options, &result) == WANG_SOLVE_ERROR);
+    flip_byte(path, 200);
+
+    /* A checkpoint of one region does not resume another. */
+    Region other = {0};
+    assert(region_init(&other, 3, 3));
+    for (int32_t y = 0; y < 3; ++y) {
+        for (int32_t x = 0; x < 3; ++x) {
+            assert(region_set_active(&other, x, y, true));
+        }
+    }
+    const WangSolverOptions other_options =
+        with_checkpoint((WangSolverOptions){0}, path);
+    assert(wang_solve_resume(&other, &other_options, &result) ==
+           WANG_SOLVE_ERROR);
+    region_destroy(&other);
+    assert(remove(path) == 0);
+    region_destroy(&search_case.region);
+}
+
+static void test_rejects_invalid_options(void)
+{
+    Region region = {0};
+    assert(region_init(&region, 2, 2));
+    for (int32_t y = 0; y < 2; ++y) {
+        for (int32_t x = 0; x < 2; ++x) {
+            assert(region_set_active(&region, x, y, true));
+        }
+    }
+
+    const char *path = "/tmp/wang-checkpoint-unused";
+    const WangSolverOptions invalid[] = {
+        { .flags = WANG_SOLVE_CHECKPOINT },
+        { .flags = WANG_SOLVE_CHECKPOINT, .checkpoint_path = "" },
+        { .checkpoint_path = path },
+        { .checkpoint_interval_ns = 1 },
+        {
+            .flags = WANG_SOLVE_CHECKPOINT |
+                WANG_SOLVE_DECOMPOSE_COMPONENTS,
+            .checkpoint_path = path,
+        },
+        {
+            .flags = WANG_SOLVE_CHECKPOINT | WANG_SOLVE_LEARN_NOGOODS,
+            .checkpoint_path = path,
+        },
+    };
+    for (size_t i = 0; i < sizeof(invalid) / sizeof(*invalid); ++i) {
+        WangSolveResult result = {0};
+        assert(wang_solve_optimized(&region, &invalid[i], &result) ==
+               WANG_SOLVE_ERROR);
+        assert(wang_solve_resume(&region, &invalid[i], &result) ==
+               WANG_SOLVE_ERROR);
+    }
+
+    const WangSolverOptions options = {
+        .flags = WANG_SOLVE_CHECKPOINT,
+        .checkpoint_path = path,
+    };
+    WangSolveResult result = {0};
+    assert(wang_solve_serial(&region, &options, &result) == WANG_SOLVE_ERROR);
+    assert(wang_solve_frontier(&region, &options, &result) ==
+           WANG_SOLVE_ERROR);
+
+    /* A search shorter than one poll interval writes no checkpoint. */
+    assert(wang_solve_optimized(&region, &options, &result) ==
+           WANG_SOLVE_SAT);
+    wang_solve_result_destroy(&result);
+    assert(access(path, F_OK) != 0);
+    assert(wang_solve_resume(&region, &options, &result) == WANG_SOLVE_ERROR);
+    region_destroy(&region);
+}
+
+int main(void)
+{
+    test_resume_replays_search();
+    test_periodic_checkpoints();
+    test_rejects_mismatched_checkpoints();
+    test_rejects_invalid_options();
+    puts("test_search_checkpoint: OK");
+    return 0;
+}
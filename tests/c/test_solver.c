@@ -32,6 +32,25 @@ static bool metrics_are_zero(const WangSolverMetrics *metrics)
         metrics->support_byte_lookups == 0 &&
         metrics->support_table_bytes == 0 &&
         metrics->mrv_cells_scanned == 0 &&
+        metrics->mrv_index_updates == 0 &&
+        metrics->mrv_index_bytes == 0 &&
+        metrics->component_splits == 0 &&
+        metrics->components == 0 &&
+        metrics->nogoods_learned == 0 &&
+        metrics->nogoods_evicted == 0 &&
+        metrics->nogood_hits == 0 &&
+        metrics->backjumps == 0 &&
+        metrics->backjump_levels == 0 &&
+        metrics->restarts == 0 &&
+        metrics->bitslice_passes == 0 &&
+        metrics->bitslice_words == 0 &&
+        metrics->frontier_states == 0 &&
+        metrics->frontier_peak_states == 0 &&
+        metrics->value_scorings == 0 &&
+        metrics->value_score_lookups == 0 &&
+        metrics->probes == 0 &&
+        metrics->probe_prunes == 0 &&
+        metrics->weight_bumps == 0 &&
         metrics->initial_trail_writes == 0 &&
         metrics->search_trail_writes == 0 &&
         metrics->enqueue_attempts == 0 &&
@@ -503,6 +522,332 @@ static void build_backtracking_fixture(Region *region)
     assert(region_set_boundary(region, 3, 3, E, COLOR_0));
 }
 
+static void test_branching_orders_preserve_status(void)
+{
+    Region backtracking = {0};
+    Region unsat = {0};
+    build_backtracking_fixture(&backtracking);
+    assert(region_init(&unsat, 3, 1));
+    activate_all(&unsat);
+    assert(region_set_boundary(&unsat, 0, 0, W, COLOR_1));
+    assert(region_set_boundary(&unsat, 2, 0, E, COLOR_0));
+    assert(region_set_boundary(&unsat, 1, 0, N, COLOR_B));
+    assert(region_set_boundary(&unsat, 1, 0, S, COLOR_B));
+    const Region *regions[] = { &backtracking, &unsat };
+
+    for (size_t r = 0; r < sizeof(regions) / sizeof(*regions); ++r) {
+        WangSolveResult canonical = {0};
+        const WangSolveStatus expected = wang_solve_optimized(
+            regions[r],
+            NULL,
+            &canonical
+        );
+        assert(expected == WANG_SOLVE_SAT || expected == WANG_SOLVE_UNSAT);
+
+        for (int order = WANG_VALUE_ORDER_ASCENDING;
+             order <= WANG_VALUE_ORDER_RANDOM;
+             ++order) {
+            for (int tie = WANG_TIE_BREAK_FIRST;
+                 tie <= WANG_TIE_BREAK_RANDOM;
+                 ++tie) {
+                for (uint64_t seed = 0; seed < 3; ++seed) {
+                    const WangSolverOptions options = {
+                        .flags = WANG_SOLVE_COLLECT_METRICS,
+                        .value_order = (WangValueOrder)order,
+                        .tie_break = (WangTieBreak)tie,
+                        .seed = seed,
+                    };
+                    WangSolveResult first = {0};
+                    WangSolveResult replay = {0};
+                    assert(wang_solve_serial(regions[r], &options, &first) ==
+                           expected);
+                    assert(wang_solve_serial(regions[r], &options, &replay) ==
+                           expected);
+                    if (expected == WANG_SOLVE_SAT) {
+                        assert_sat_snapshot(regions[r], &first);
+                        assert(memcmp(
+                            first.domains,
+                            replay.domains,
+                            first.domain_count * sizeof(*first.domains)
+                        ) == 0);
+                    }
+                    assert(first.metrics.dfs_nodes ==
+                           replay.metrics.dfs_nodes);
+                    assert(first.metrics.mrv_cells_scanned ==
+                           replay.metrics.mrv_cells_scanned);
+                    assert(first.conflict_cell == replay.conflict_cell);
+                    wang_solve_result_destroy(&replay);
+                    wang_solve_result_destroy(&first);
+                }
+            }
+        }
+        wang_solve_result_destroy(&canonical);
+    }
+
+    /* The zero-valued orders are the canonical search. */
+    const WangSolverOptions metrics_only = {
+        .flags = WANG_SOLVE_COLLECT_METRICS,
+    };
+    const WangSolverOptions explicit_canonical = {
+        .flags = WANG_SOLVE_COLLECT_METRICS,
+        .value_order = WANG_VALUE_ORDER_ASCENDING,
+        .tie_break = WANG_TIE_BREAK_FIRST,
+        .seed = 42,
+    };
+    WangSolveResult implicit_result = {0};
+    WangSolveResult explicit_result = {0};
+    assert(wang_solve_optimized(
+        &backtracking,
+        &metrics_only,
+        &implicit_result
+    ) == WANG_SOLVE_SAT);
+    assert(wang_solve_optimized(
+        &backtracking,
+        &explicit_canonical,
+        &explicit_result
+    ) == WANG_SOLVE_SAT);
+    assert(memcmp(
+        implicit_result.domains,
+        explicit_result.domains,
+        implicit_result.domain_count * sizeof(*implicit_result.domains)
+    ) == 0);
+    assert(implicit_result.metrics.dfs_nodes ==
+           explicit_result.metrics.dfs_nodes);
+    assert(implicit_result.metrics.mrv_cells_scanned ==
+           explicit_result.metrics.mrv_cells_scanned);
+
+    wang_solve_result_destroy(&explicit_result);
+    wang_solve_result_destroy(&implicit_result);
+    region_destroy(&unsat);
+    region_destroy(&backtracking);
+}
+
+static unsigned east_support_count(TileId tile)
+{
+    unsigned count = 0;
+    for (TileId other = 0; other < TILE_COUNT; ++other) {
+        count += wang_tiles_match(&TILESET[tile], E, &TILESET[other]);
+    }
+    return count;
+}
+
+static void test_least_constraining_value_order(void)
+{
+    /* Two tiles whose lower ID leaves its east neighbor fewer tiles. */
+    TileId narrow = TILE_NONE;
+    TileId wide = TILE_NONE;
+    for (TileId a = 0; a < TILE_COUNT && wide == TILE_NONE; ++a) {
+        for (TileId b = (TileId)(a + 1); b < TILE_COUNT; ++b) {
+            const unsigned a_count = east_support_count(a);
+            if (a_count > 0 && a_count + 1 < east_support_count(b)) {
+                narrow = a;
+                wide = b;
+                break;
+            }
+        }
+    }
+    assert(wide != TILE_NONE);
+
+    Region region = {0};
+    assert(region_init(&region, 2, 1));
+    activate_all(&region);
+    const uint32_t domains[] = {
+        (UINT32_C(1) << narrow) | (UINT32_C(1) << wide),
+        WANG_DOMAIN_ALL,
+    };
+    WangSolverOptions options = {
+        .flags = WANG_SOLVE_COLLECT_METRICS,
+        .initial_domains = domains,
+        .initial_domain_count = 2,
+    };
+
+    WangSolveResult ascending = {0};
+    assert(wang_solve_optimized(&region, &options, &ascending) ==
+           WANG_SOLVE_SAT);
+    assert(ascending.domains[0] == (UINT32_C(1) << narrow));
+    assert(ascending.metrics.value_scorings == 0);
+    assert(ascending.metrics.value_score_lookups == 0);
+
+    options.value_order = WANG_VALUE_ORDER_LEAST_CONSTRAINING;
+    WangSolveResult scored = {0};
+    assert(wang_solve_optimized(&region, &options, &scored) ==
+           WANG_SOLVE_SAT);
+    assert_sat_snapshot(&region, &scored);
+    assert(scored.domains[0] == (UINT32_C(1) << wide));
+    assert(scored.metrics.value_scorings > 0);
+    assert(scored.metrics.value_score_lookups >=
+           scored.metrics.value_scorings * 2);
+
+    WangSolveResult rejected = {0};
+    assert(wang_solve_serial(&region, &options, &rejected) ==
+           WANG_SOLVE_ERROR);
+    assert_destroyed_result(&rejected);
+
+    wang_solve_result_destroy(&scored);
+    wang_solve_result_destroy(&ascending);
+    region_destroy(&region);
+}
+
+/*
+ * Every failed leaf weights the arcs around its conflict cell, the search
+ * replays under every tie rule, and only the optimized search accepts it.
+ */
+static void test_weighted_degree_selection(void)
+{
+    Region region = {0};
+    build_backtracking_fixture(&region);
+
+    WangSolveResult plain = {0};
+    const WangSolverOptions metrics_only = {
+        .flags = WANG_SOLVE_COLLECT_METRICS,
+    };
+    assert(wang_solve_optimized(&region, &metrics_only, &plain) ==
+           WANG_SOLVE_SAT);
+    assert(plain.metrics.weight_bumps == 0);
+
+    for (int tie = WANG_TIE_BREAK_FIRST; tie <= WANG_TIE_BREAK_RANDOM; ++tie) {
+        for (uint64_t seed = 0; seed < 3; ++seed) {
+            const WangSolverOptions options = {
+                .flags = WANG_SOLVE_COLLECT_METRICS |
+                    WANG_SOLVE_WEIGHTED_DEGREE,
+                .tie_break = (WangTieBreak)tie,
+                .seed = seed,
+            };
+            WangSolveResult first = {0};
+            WangSolveResult replay = {0};
+            assert(wang_solve_optimized(&region, &options, &first) ==
+                   WANG_SOLVE_SAT);
+            assert(wang_solve_optimized(&region, &options, &replay) ==
+                   WANG_SOLVE_SAT);
+            assert_sat_snapshot(&region, &first);
+            assert(memcmp(
+                first.domains,
+                replay.domains,
+                first.domain_count * sizeof(*first.domains)
+            ) == 0);
+            assert(first.metrics.dfs_nodes == replay.metrics.dfs_nodes);
+            assert(first.metrics.mrv_cells_scanned ==
+                   replay.metrics.mrv_cells_scanned);
+            assert(first.metrics.weight_bumps == replay.metrics.weight_bumps);
+            assert(first.metrics.weight_bumps <=
+                   4u * first.metrics.failed_leaves);
+            assert(first.metrics.failed_leaves == 0 ||
+                   first.metrics.weight_bumps > 0);
+            wang_solve_result_destroy(&replay);
+            wang_solve_result_destroy(&first);
+        }
+    }
+
+    const WangSolverOptions weighted = {
+        .flags = WANG_SOLVE_WEIGHTED_DEGREE,
+    };
+    WangSolveResult rejected = {0};
+    assert(wang_solve_serial(&region, &weighted, &rejected) ==
+           WANG_SOLVE_ERROR);
+    assert_destroyed_result(&rejected);
+    assert(wang_solve_frontier(&region, &weighted, &rejected) ==
+           WANG_SOLVE_ERROR);
+    assert_destroyed_result(&rejected);
+
+    wang_solve_result_destroy(&plain);
+    region_destroy(&region);
+}
+
+static void test_singleton_probing_decides_root(void)
+{
+    /*
+     * A 2x2 square with two- or three-tile domains that root propagation
+     * leaves open but that has no tiling: a cycle arc consistency misses.
+     */
+    Region region = {0};
+    assert(region_init(&region, 2, 2));
+    activate_all(&region);
+    uint32_t domains[4];
+    WangSolverOptions options = {
+        .flags = WANG_SOLVE_COLLECT_METRICS,
+        .initial_domains = domains,
+        .initial_domain_count = 4,
+    };
+    WangSolveResult plain = {0};
+    uint32_t random = 12345;
+    bool found = false;
+    for (unsigned attempt = 0; attempt < 1000000 && !found; ++attempt) {
+        for (size_t i = 0; i < 4; ++i) {
+            domains[i] = 0;
+            random ^= random << 13;
+            random ^= random >> 17;
+            random ^= random << 5;
+            for (uint32_t tiles = 2 + random % 2; tiles != 0; --tiles) {
+                random ^= random << 13;
+                random ^= random >> 17;
+                random ^= random << 5;
+                domains[i] |= UINT32_C(1) << (random % TILE_COUNT);
+            }
+        }
+        const WangSolveStatus status =
+            wang_solve_optimized(&region, &options, &plain);
+        found = status == WANG_SOLVE_UNSAT && plain.metrics.dfs_nodes > 0;
+        if (!found) {
+            wang_solve_result_destroy(&plain);
+        }
+    }
+    assert(found);
+    assert(plain.metrics.probes == 0);
+    assert(plain.metrics.probe_prunes == 0);
+
+    options.flags |= WANG_SOLVE_PROBE_SINGLETONS;
+    WangSolveResult probed = {0};
+    assert(wang_solve_optimized(&region, &options, &probed) ==
+           WANG_SOLVE_UNSAT);
+    assert(probed.metrics.dfs_nodes == 0);
+    assert(probed.metrics.decisions == 0);
+    assert(probed.metrics.failed_leaves == 1);
+    assert(probed.metrics.probes > 0);
+    assert(probed.metrics.probe_prunes > 0);
+    assert(probed.conflict_cell < 4);
+    assert(probed.decision_depth == 0);
+
+    /* A budget that is never reached changes nothing. */
+    options.probe_budget_ns = UINT64_C(60000000000);
+    WangSolveResult budgeted = {0};
+    assert(wang_solve_optimized(&region, &options, &budgeted) ==
+           WANG_SOLVE_UNSAT);
+    assert(budgeted.metrics.probes == probed.metrics.probes);
+    assert(budgeted.metrics.probe_prunes == probed.metrics.probe_prunes);
+    assert(budgeted.conflict_cell == probed.conflict_cell);
+
+    WangSolveResult rejected = {0};
+    assert(wang_solve_serial(&region, &options, &rejected) ==
+           WANG_SOLVE_ERROR);
+    options.flags |= WANG_SOLVE_LEARN_NOGOODS;
+    options.probe_depth = 1;
+    assert(wang_solve_optimized(&region, &options, &rejected) ==
+           WANG_SOLVE_ERROR);
+    options.flags &= ~(uint32_t)WANG_SOLVE_PROBE_SINGLETONS;
+    assert(wang_solve_optimized(&region, &options, &rejected) ==
+           WANG_SOLVE_ERROR);
+    options.probe_depth = 0;
+    assert(wang_solve_optimized(&region, &options, &rejected) ==
+           WANG_SOLVE_ERROR);
+    assert_destroyed_result(&rejected);
+
+    /* Probing below decisions keeps an open region SAT. */
+    const WangSolverOptions deep = {
+        .flags = WANG_SOLVE_COLLECT_METRICS | WANG_SOLVE_PROBE_SINGLETONS,
+        .probe_depth = 2,
+    };
+    WangSolveResult sat = {0};
+    assert(wang_solve_optimized(&region, &deep, &sat) == WANG_SOLVE_SAT);
+    assert_sat_snapshot(&region, &sat);
+    assert(sat.metrics.probes > 0);
+
+    wang_solve_result_destroy(&sat);
+    wang_solve_result_destroy(&budgeted);
+    wang_solve_result_destroy(&probed);
+    wang_solve_result_destroy(&plain);
+    region_destroy(&region);
+}
+
 static void test_backtracking_and_trace_truncation(void)
 {
     char path[] = "/tmp/wang-leaf-cap-XXXXXX";
@@ -564,6 +909,86 @@ static void test_backtracking_and_trace_truncation(void)
     region_destroy(&region);
 }
 
+static void assert_search_bounds(SolveFunction solve)
+{
+    Region region = {0};
+    build_backtracking_fixture(&region);
+
+    WangSolveResult full = {0};
+    const WangSolverOptions metrics_only = {
+        .flags = WANG_SOLVE_COLLECT_METRICS,
+    };
+    assert(solve(&region, &metrics_only, &full) == WANG_SOLVE_SAT);
+    const uint64_t full_nodes = full.metrics.dfs_nodes;
+    assert(full_nodes > 3);
+
+    WangSolveResult result = {0};
+    WangSolverOptions options = {
+        .flags = WANG_SOLVE_COLLECT_METRICS |
+            WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT,
+        .node_limit = 3,
+    };
+    assert(solve(&region, &options, &result) == WANG_SOLVE_UNKNOWN);
+    assert(result.domains == NULL);
+    assert(result.domain_count == 0);
+    assert(result.conflict_cell == SIZE_MAX);
+    assert(result.metrics.dfs_nodes == 3);
+    assert(result.metrics.decisions >= 2);
+    assert(result.metrics.decisions < full.metrics.decisions);
+    wang_solve_result_destroy(&result);
+
+    options.node_limit = full_nodes;
+    assert(solve(&region, &options, &result) == WANG_SOLVE_SAT);
+    assert_sat_snapshot(&region, &result);
+    wang_solve_result_destroy(&result);
+
+    atomic_int cancel = 1;
+    options = (WangSolverOptions){
+        .flags = WANG_SOLVE_COLLECT_METRICS,
+        .cancel_flag = &cancel,
+    };
+    assert(solve(&region, &options, &result) == WANG_SOLVE_UNKNOWN);
+    assert(result.metrics.dfs_nodes == 1);
+    assert(result.metrics.decisions == 0);
+    wang_solve_result_destroy(&result);
+
+    atomic_store(&cancel, 0);
+    assert(solve(&region, &options, &result) == WANG_SOLVE_SAT);
+    wang_solve_result_destroy(&result);
+
+    options = (WangSolverOptions){ .deadline_ns = 1 };
+    assert(solve(&region, &options, &result) == WANG_SOLVE_UNKNOWN);
+    assert(metrics_are_zero(&result.metrics));
+    wang_solve_result_destroy(&result);
+
+    options.deadline_ns = UINT64_MAX;
+    assert(solve(&region, &options, &result) == WANG_SOLVE_SAT);
+    wang_solve_result_destroy(&result);
+
+    /* Bounds never override a root that propagation already decides. */
+    Region forced = {0};
+    assert(region_init(&forced, 1, 1));
+    activate_all(&forced);
+    assert(region_set_boundary(&forced, 0, 0, N, COLOR_B));
+    assert(region_set_boundary(&forced, 0, 0, E, COLOR_0));
+    assert(region_set_boundary(&forced, 0, 0, S, COLOR_B));
+    assert(region_set_boundary(&forced, 0, 0, W, COLOR_0));
+    options = (WangSolverOptions){ .node_limit = 1, .cancel_flag = &cancel };
+    atomic_store(&cancel, 1);
+    assert(solve(&forced, &options, &result) == WANG_SOLVE_SAT);
+    wang_solve_result_destroy(&result);
+    region_destroy(&forced);
+
+    wang_solve_result_destroy(&full);
+    region_destroy(&region);
+}
+
+static void test_search_bounds_return_unknown(void)
+{
+    assert_search_bounds(wang_solve_serial);
+    assert_search_bounds(wang_solve_optimized);
+}
+
 static void test_mmap_trace_for_root_conflict(void)
 {
     char path[] = "/tmp/wang-leaf-trace-XXXXXX";
@@ -662,6 +1087,332 @@ static void test_trace_cleanup_after_ftruncate_error(void)
     assert(trace_was_removed);
 }
 
+static void assert_search_metrics_equal(
+    const WangSolverMetrics *actual,
+    const WangSolverMetrics *expected
+)
+{
+    /* Capacity and byte peaks legitimately reflect retained storage. */
+    assert(actual->dfs_nodes == expected->dfs_nodes);
+    assert(actual->decisions == expected->decisions);
+    assert(actual->backtracks == expected->backtracks);
+    assert(actual->failed_leaves == expected->failed_leaves);
+    assert(actual->domain_reductions == expected->domain_reductions);
+    assert(actual->propagated_arcs == expected->propagated_arcs);
+    assert(actual->support_tile_visits == expected->support_tile_visits);
+    assert(actual->support_byte_lookups == expected->support_byte_lookups);
+    assert(actual->support_table_bytes == expected->support_table_bytes);
+    assert(actual->mrv_cells_scanned == expected->mrv_cells_scanned);
+    assert(actual->mrv_index_updates == expected->mrv_index_updates);
+    assert(actual->mrv_index_bytes == expected->mrv_index_bytes);
+    assert(actual->component_splits == expected->component_splits);
+    assert(actual->components == expected->components);
+    assert(actual->nogoods_learned == expected->nogoods_learned);
+    assert(actual->nogoods_evicted == expected->nogoods_evicted);
+    assert(actual->nogood_hits == expected->nogood_hits);
+    assert(actual->backjumps == expected->backjumps);
+    assert(actual->backjump_levels == expected->backjump_levels);
+    assert(actual->restarts == expected->restarts);
+    assert(actual->bitslice_passes == expected->bitslice_passes);
+    assert(actual->bitslice_words == expected->bitslice_words);
+    assert(actual->frontier_states == expected->frontier_states);
+    assert(actual->frontier_peak_states == expected->frontier_peak_states);
+    assert(actual->value_scorings == expected->value_scorings);
+    assert(actual->value_score_lookups == expected->value_score_lookups);
+    assert(actual->probes == expected->probes);
+    assert(actual->probe_prunes == expected->probe_prunes);
+    assert(actual->weight_bumps == expected->weight_bumps);
+    assert(actual->initial_trail_writes == expected->initial_trail_writes);
+    assert(actual->search_trail_writes == expected->search_trail_writes);
+    assert(actual->initial_trail_rewrites ==
+           expected->initial_trail_rewrites);
+    assert(actual->search_trail_rewrites == expected->search_trail_rewrites);
+    assert(actual->trail_peak == expected->trail_peak);
+    assert(actual->enqueue_attempts == expected->enqueue_attempts);
+    assert(actual->duplicate_enqueue_attempts ==
+           expected->duplicate_enqueue_attempts);
+    assert(actual->queue_dedup_index_bytes ==
+           expected->queue_dedup_index_bytes);
+    assert(actual->queue_peak == expected->queue_peak);
+    assert(actual->queue_unique_peak == expected->queue_unique_peak);
+    assert(actual->max_depth == expected->max_depth);
+    assert(actual->sat_result_copy_bytes == expected->sat_result_copy_bytes);
+    assert(actual->trail_capacity_peak >= expected->trail_capacity_peak);
+    assert(actual->dfs_stack_capacity_peak >=
+           expected->dfs_stack_capacity_peak);
+}
+
+static void assert_context_matches_one_shot(
+    WangSolverContext *context,
+    const Region *region,
+    WangSolverEngine engine
+)
+{
+    const WangSolverOptions options = {
+        .flags = WANG_SOLVE_COLLECT_METRICS |
+            WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT,
+    };
+    WangSolveResult expected = {0};
+    WangSolveResult actual = {0};
+    const WangSolveStatus status = engine == WANG_SOLVER_FRONTIER
+        ? wang_solve_frontier(region, &options, &expected)
+        : engine == WANG_SOLVER_OPTIMIZED
+        ? wang_solve_optimized(region, &options, &expected)
+        : wang_solve_serial(region, &options, &expected);
+    assert(status == WANG_SOLVE_SAT || status == WANG_SOLVE_UNSAT);
+    assert(wang_solver_context_solve(
+        context,
+        region,
+        &options,
+        engine,
+        &actual
+    ) == status);
+
+    assert(actual.domain_count == expected.domain_count);
+    assert(memcmp(
+        actual.domains,
+        expected.domains,
+        expected.domain_count * sizeof(*expected.domains)
+    ) == 0);
+    assert(actual.conflict_cell == expected.conflict_cell);
+    assert(actual.resolved_count == expected.resolved_count);
+    assert(actual.decision_depth == expected.decision_depth);
+    assert_search_metrics_equal(&actual.metrics, &expected.metrics);
+
+    wang_solve_result_destroy(&actual);
+    wang_solve_result_destroy(&expected);
+}
+
+static void test_solver_context_reuses_storage_across_regions(void)
+{
+    Region backtracking = {0};
+    Region open = {0};
+    Region impossible = {0};
+    build_backtracking_fixture(&backtracking);
+    assert(region_init(&open, 9, 7));
+    activate_all(&open);
+    assert(region_init(&impossible, 1, 1));
+    activate_all(&impossible);
+    assert(region_set_boundary(&impossible, 0, 0, N, COLOR_V));
+    assert(region_set_boundary(&impossible, 0, 0, S, COLOR_V));
+
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+    const Region *regions[] = { &open, &backtracking, &impossible, &open };
+    for (unsigned round = 0; round < 2; ++round) {
+        for (size_t index = 0; index < 4; ++index) {
+            assert_context_matches_one_shot(
+                context,
+                regions[index],
+                WANG_SOLVER_REFERENCE
+            );
+            assert_context_matches_one_shot(
+                context,
+                regions[index],
+                WANG_SOLVER_OPTIMIZED
+            );
+            assert_context_matches_one_shot(
+                context,
+                regions[index],
+                WANG_SOLVER_FRONTIER
+            );
+        }
+        wang_solver_context_reset(context);
+    }
+
+    /* An interrupted search leaves nothing behind for the next solve. */
+    WangSolveResult result = {0};
+    const WangSolverOptions bounded = { .node_limit = 2 };
+    assert(wang_solver_context_solve(
+        context,
+        &backtracking,
+        &bounded,
+        WANG_SOLVER_OPTIMIZED,
+        &result
+    ) == WANG_SOLVE_UNKNOWN);
+    wang_solve_result_destroy(&result);
+    assert_context_matches_one_shot(
+        context,
+        &backtracking,
+        WANG_SOLVER_OPTIMIZED
+    );
+
+    assert(wang_solver_context_solve(
+        NULL,
+        &open,
+        NULL,
+        WANG_SOLVER_REFERENCE,
+        &result
+    ) == WANG_SOLVE_ERROR);
+    assert(wang_solver_context_solve(
+        context,
+        &open,
+        NULL,
+        (WangSolverEngine)3,
+        &result
+    ) == WANG_SOLVE_ERROR);
+    result.domain_count = 1;
+    assert(wang_solver_context_solve(
+        context,
+        &open,
+        NULL,
+        WANG_SOLVER_REFERENCE,
+        &result
+    ) == WANG_SOLVE_ERROR);
+    assert(result.domain_count == 1);
+    result.domain_count = 0;
+    assert_context_matches_one_shot(context, &open, WANG_SOLVER_REFERENCE);
+
+    wang_solver_context_reset(NULL);
+    wang_solver_context_destroy(NULL);
+    wang_solver_context_destroy(context);
+    region_destroy(&impossible);
+    region_destroy(&open);
+    region_destroy(&backtracking);
+}
+
+static void assert_warm_solve_matches_cold(
+    const Region *region,
+    const WangRootFixpoint *fixpoint,
+    const uint32_t *initial_domains,
+    SolveFunction solve
+)
+{
+    WangSolverOptions options = {
+        .flags = WANG_SOLVE_COLLECT_METRICS |
+            WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT,
+        .initial_domains = initial_domains,
+        .initial_domain_count = region->cell_count,
+    };
+    WangSolveResult cold = {0};
+    WangSolveResult warm = {0};
+    const WangSolveStatus status = solve(region, &options, &cold);
+    options.root_fixpoint = fixpoint;
+    assert(solve(region, &options, &warm) == status);
+
+    assert(warm.domain_count == cold.domain_count);
+    assert(warm.metrics.dfs_nodes == cold.metrics.dfs_nodes);
+    if (status == WANG_SOLVE_UNSAT && cold.metrics.dfs_nodes == 0) {
+        /* A root conflict is redone cold: the whole result matches. */
+        assert(warm.conflict_cell == cold.conflict_cell);
+        assert(warm.resolved_count == cold.resolved_count);
+        assert(warm.decision_depth == cold.decision_depth);
+        assert(warm.traced_leaf_count == cold.traced_leaf_count);
+        assert(warm.trace_truncated == cold.trace_truncated);
+        assert(memcmp(
+            warm.domains,
+            cold.domains,
+            cold.domain_count * sizeof(*cold.domains)
+        ) == 0);
+        assert(memcmp(
+            &warm.metrics,
+            &cold.metrics,
+            sizeof(warm.metrics)
+        ) == 0);
+        wang_solve_result_destroy(&warm);
+        wang_solve_result_destroy(&cold);
+        return;
+    }
+
+    assert(cold.domain_count == 0 || memcmp(
+        warm.domains,
+        cold.domains,
+        cold.domain_count * sizeof(*cold.domains)
+    ) == 0);
+    assert(warm.conflict_cell == cold.conflict_cell);
+    assert(warm.resolved_count == cold.resolved_count);
+    assert(warm.decision_depth == cold.decision_depth);
+    assert(warm.metrics.decisions == cold.metrics.decisions);
+    assert(warm.metrics.backtracks == cold.metrics.backtracks);
+    assert(warm.metrics.failed_leaves == cold.metrics.failed_leaves);
+    assert(warm.metrics.max_depth == cold.metrics.max_depth);
+
+    wang_solve_result_destroy(&warm);
+    wang_solve_result_destroy(&cold);
+}
+
+static void test_root_fixpoint_warm_start(void)
+{
+    Region region = {0};
+    build_backtracking_fixture(&region);
+
+    WangRootFixpoint fixpoint = {0};
+    assert(wang_root_fixpoint_compute(&region, &fixpoint));
+    assert(!fixpoint.contradiction);
+    assert(fixpoint.domain_count == region.cell_count);
+
+    uint32_t *domains = malloc(region.cell_count * sizeof(*domains));
+    assert(domains != NULL);
+    for (size_t cell = 0; cell < region.cell_count; ++cell) {
+        for (TileId tile = 0; tile < TILE_COUNT; ++tile) {
+            for (size_t i = 0; i < region.cell_count; ++i) {
+                domains[i] = WANG_DOMAIN_ALL;
+            }
+            domains[cell] = UINT32_C(1) << tile;
+            assert_warm_solve_matches_cold(
+                &region,
+                &fixpoint,
+                domains,
+                wang_solve_serial
+            );
+            assert_warm_solve_matches_cold(
+                &region,
+                &fixpoint,
+                domains,
+                wang_solve_optimized
+            );
+        }
+    }
+    assert_warm_solve_matches_cold(
+        &region,
+        &fixpoint,
+        NULL,
+        wang_solve_optimized
+    );
+
+    /* A fixpoint of any other region is rejected. */
+    Region other = {0};
+    build_backtracking_fixture(&other);
+    assert(region_set_boundary(&other, 0, 0, N, COLOR_B));
+    WangSolveResult result = {0};
+    const WangSolverOptions mismatched = { .root_fixpoint = &fixpoint };
+    assert(wang_solve_optimized(&other, &mismatched, &result) ==
+           WANG_SOLVE_ERROR);
+    assert(result.domains == NULL);
+    /* An owned output is never overwritten. */
+    assert(!wang_root_fixpoint_compute(&other, &fixpoint));
+    WangRootFixpoint empty = {0};
+    assert(!wang_root_fixpoint_compute(NULL, &empty));
+    assert(!wang_root_fixpoint_compute(&other, NULL));
+
+    /* A contradictory unpinned root carries no domains and solves cold. */
+    Region impossible = {0};
+    assert(region_init(&impossible, 2, 1));
+    activate_all(&impossible);
+    assert(region_set_boundary(&impossible, 0, 0, N, COLOR_V));
+    assert(region_set_boundary(&impossible, 0, 0, S, COLOR_V));
+    WangRootFixpoint contradiction = {0};
+    assert(wang_root_fixpoint_compute(&impossible, &contradiction));
+    assert(contradiction.contradiction);
+    assert(contradiction.domains == NULL);
+    assert(contradiction.domain_count == 0);
+    assert_warm_solve_matches_cold(
+        &impossible,
+        &contradiction,
+        NULL,
+        wang_solve_serial
+    );
+
+    wang_root_fixpoint_destroy(&contradiction);
+    wang_root_fixpoint_destroy(&fixpoint);
+    wang_root_fixpoint_destroy(NULL);
+    assert(fixpoint.domains == NULL && fixpoint.region_fingerprint == 0);
+    free(domains);
+    region_destroy(&impossible);
+    region_destroy(&other);
+    region_destroy(&region);
+}
+
 static void test_rejects_invalid_api_inputs(void)
 {
     Region region = {0};
@@ -680,6 +1431,27 @@ static void test_rejects_invalid_api_inputs(void)
     assert(wang_solve_serial(&region, &missing_trace, &result) ==
            WANG_SOLVE_ERROR);
 
+    WangSolverOptions unknown_order = {
+        .value_order =
+            (WangValueOrder)(WANG_VALUE_ORDER_LEAST_CONSTRAINING + 1),
+    };
+    assert(wang_solve_serial(&region, &unknown_order, &result) ==
+           WANG_SOLVE_ERROR);
+    WangSolverOptions unknown_tie = {
+        .tie_break = (WangTieBreak)(WANG_TIE_BREAK_RANDOM + 1),
+    };
+    assert(wang_solve_serial(&region, &unknown_tie, &result) ==
+           WANG_SOLVE_ERROR);
+    WangSolverOptions unknown_restart = {
+        .restart_schedule =
+            (WangRestartSchedule)(WANG_RESTART_GEOMETRIC + 1),
+    };
+    assert(wang_solve_optimized(&region, &unknown_restart, &result) ==
+           WANG_SOLVE_ERROR);
+    WangSolverOptions base_without_schedule = { .restart_base = 8 };
+    assert(wang_solve_optimized(&region, &base_without_schedule, &result) ==
+           WANG_SOLVE_ERROR);
+
     result.domain_count = 1;
     assert(wang_solve_serial(&region, NULL, &result) == WANG_SOLVE_ERROR);
     result.domain_count = 0;
@@ -701,7 +1473,14 @@ int main(void)
     test_small_regions_against_brute_force();
     test_mmap_trace_for_root_conflict();
     test_backtracking_and_trace_truncation();
+    test_branching_orders_preserve_status();
+    test_least_constraining_value_order();
+    test_singleton_probing_decides_root();
+    test_weighted_degree_selection();
     test_trace_cleanup_after_ftruncate_error();
+    test_search_bounds_return_unknown();
+    test_solver_context_reuses_storage_across_regions();
+    test_root_fixpoint_warm_start();
     test_rejects_invalid_api_inputs();
 
     puts("test_solver: OK");
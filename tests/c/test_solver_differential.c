@@ -445,6 +445,14 @@ static void test_generic_backtracking_case(void)
     assert(reference_metrics.sat_result_copy_bytes ==
            region.cell_count * sizeof(uint32_t));
     assert(optimized_metrics.sat_result_copy_bytes == 0);
+    assert(reference_metrics.mrv_index_updates == 0);
+    assert(reference_metrics.mrv_index_bytes == 0);
+    assert(optimized_metrics.mrv_index_updates > 0);
+    assert(optimized_metrics.mrv_index_bytes ==
+           (TILE_COUNT - 1u) * 2u * sizeof(uint64_t));
+    assert(optimized_metrics.mrv_cells_scanned == 31);
+    assert(optimized_metrics.mrv_cells_scanned <
+           reference_metrics.mrv_cells_scanned);
 
     char reference_path[] = "/tmp/wang-reference-sat-ownership-XXXXXX";
     char optimized_path[] = "/tmp/wang-optimized-sat-ownership-XXXXXX";
@@ -722,6 +730,82 @@ static void assert_invalid_contract(SolveFunction solve)
     assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
     result.metrics.queue_dedup_index_bytes = 0;
 
+    result.metrics.mrv_index_updates = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.mrv_index_updates = 0;
+
+    result.metrics.mrv_index_bytes = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.mrv_index_bytes = 0;
+
+    result.metrics.component_splits = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.component_splits = 0;
+
+    result.metrics.components = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.components = 0;
+
+    result.metrics.nogoods_learned = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.nogoods_learned = 0;
+
+    result.metrics.nogoods_evicted = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.nogoods_evicted = 0;
+
+    result.metrics.nogood_hits = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.nogood_hits = 0;
+
+    result.metrics.backjumps = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.backjumps = 0;
+
+    result.metrics.backjump_levels = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.backjump_levels = 0;
+
+    result.metrics.restarts = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.restarts = 0;
+
+    result.metrics.bitslice_passes = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.bitslice_passes = 0;
+
+    result.metrics.bitslice_words = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.bitslice_words = 0;
+
+    result.metrics.frontier_states = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.frontier_states = 0;
+
+    result.metrics.frontier_peak_states = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.frontier_peak_states = 0;
+
+    result.metrics.value_scorings = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.value_scorings = 0;
+
+    result.metrics.value_score_lookups = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.value_score_lookups = 0;
+
+    result.metrics.probes = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.probes = 0;
+
+    result.metrics.probe_prunes = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.probe_prunes = 0;
+
+    result.metrics.weight_bumps = 1;
+    assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
+    result.metrics.weight_bumps = 0;
+
     result.metrics.initial_trail_rewrites = 1;
     assert(solve(&region, NULL, &result) == WANG_SOLVE_ERROR);
     result.metrics.initial_trail_rewrites = 0;
@@ -739,6 +823,7 @@ static void test_matching_invalid_input_contract(void)
 {
     assert_invalid_contract(wang_solve_serial);
     assert_invalid_contract(wang_solve_optimized);
+    assert_invalid_contract(wang_solve_frontier);
 }
 
 static void test_optimized_uses_bytewise_support_lookup(void)
@@ -793,6 +878,1054 @@ static void test_optimized_uses_bytewise_support_lookup(void)
     region_destroy(&region);
 }
 
+static void assert_mrv_index_matches_scan_order(const Region *region)
+{
+    static const WangTieBreak tie_breaks[] = {
+        WANG_TIE_BREAK_FIRST,
+        WANG_TIE_BREAK_LAST,
+        WANG_TIE_BREAK_RANDOM,
+    };
+
+    for (size_t i = 0; i < sizeof(tie_breaks) / sizeof(tie_breaks[0]); ++i) {
+        const WangSolverOptions options = {
+            .flags = WANG_SOLVE_COLLECT_METRICS,
+            .tie_break = tie_breaks[i],
+            .seed = 5,
+        };
+        WangSolveResult reference = {0};
+        WangSolveResult optimized = {0};
+        assert(wang_solve_serial(region, &options, &reference) ==
+               WANG_SOLVE_SAT);
+        assert(wang_solve_optimized(region, &options, &optimized) ==
+               WANG_SOLVE_SAT);
+
+        /* The index picks exactly the cells the scan would pick. */
+        assert(reference.metrics.decisions > 1);
+        assert(optimized.metrics.decisions == reference.metrics.decisions);
+        assert(optimized.metrics.backtracks == reference.metrics.backtracks);
+        assert(optimized.metrics.domain_reductions ==
+               reference.metrics.domain_reductions);
+        assert(memcmp(
+            optimized.domains,
+            reference.domains,
+            region->cell_count * sizeof(*reference.domains)
+        ) == 0);
+        assert(reference.metrics.mrv_index_updates == 0);
+        if (tie_breaks[i] == WANG_TIE_BREAK_RANDOM) {
+            assert(optimized.metrics.mrv_index_updates == 0);
+            assert(optimized.metrics.mrv_index_bytes == 0);
+            assert(optimized.metrics.mrv_cells_scanned ==
+                   reference.metrics.mrv_cells_scanned);
+        } else {
+            assert(optimized.metrics.mrv_index_updates > 0);
+            assert(optimized.metrics.mrv_index_bytes > 0);
+            assert(optimized.metrics.mrv_cells_scanned <
+                   reference.metrics.mrv_cells_scanned);
+        }
+
+        wang_solve_result_destroy(&reference);
+        wang_solve_result_destroy(&optimized);
+    }
+}
+
+static void test_mrv_index_matches_scan_order(void)
+{
+    Region region = {0};
+    assert(region_init(&region, 4, 4));
+    activate_all(&region);
+    assert(region_set_boundary(&region, 1, 0, N, COLOR_R));
+    assert(region_set_boundary(&region, 2, 3, S, COLOR_B));
+    assert(region_set_boundary(&region, 0, 3, W, COLOR_1));
+    assert(region_set_boundary(&region, 3, 1, E, COLOR_1));
+    assert(region_set_boundary(&region, 3, 3, E, COLOR_0));
+    assert_mrv_index_matches_scan_order(&region);
+    region_destroy(&region);
+
+    assert(region_init(&region, 70, 3));
+    activate_all(&region);
+    assert_mrv_index_matches_scan_order(&region);
+    region_destroy(&region);
+}
+
+/*
+ * Regions split by an inactive column and random holes, with a few cells
+ * narrowed to random pairs, so the root often leaves several components.
+ */
+static void build_component_case(
+    Region *region,
+    uint32_t *domains,
+    uint32_t *random_state
+)
+{
+    assert(region_init(region, 9, 4));
+    for (int32_t y = 0; y < region->height; ++y) {
+        for (int32_t x = 0; x < region->width; ++x) {
+            if (x != 4 && next_random(random_state) % 7u != 0) {
+                assert(region_set_active(region, x, y, true));
+            }
+        }
+    }
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        domains[i] = region->cells[i].active ? WANG_DOMAIN_ALL : 0;
+        if (domains[i] != 0 && next_random(random_state) % 6u == 0) {
+            const uint32_t first = next_random(random_state) % TILE_COUNT;
+            const uint32_t second = next_random(random_state) % TILE_COUNT;
+            domains[i] = (UINT32_C(1) << first) | (UINT32_C(1) << second);
+        }
+    }
+}
+
+static void test_component_decomposition_matches_reference(void)
+{
+    static const uint32_t decompose_flags[] = {
+        WANG_SOLVE_DECOMPOSE_COMPONENTS,
+        WANG_SOLVE_DECOMPOSE_EACH_DECISION,
+    };
+    uint64_t splits[2] = { 0, 0 };
+    uint64_t indexed[2] = { 0, 0 };
+    size_t sat_count = 0;
+    size_t unsat_count = 0;
+    uint32_t random_state = UINT32_C(0x2545f491);
+
+    for (size_t sample = 0; sample < 200; ++sample) {
+        Region region = {0};
+        uint32_t domains[36];
+        build_component_case(&region, domains, &random_state);
+        const WangSolverOptions options = {
+            .flags = WANG_SOLVE_COLLECT_METRICS,
+            .initial_domains = domains,
+            .initial_domain_count = region.cell_count,
+        };
+
+        WangSolveResult reference = {0};
+        const WangSolveStatus expected =
+            wang_solve_serial(&region, &options, &reference);
+        assert(expected == WANG_SOLVE_SAT || expected == WANG_SOLVE_UNSAT);
+        sat_count += expected == WANG_SOLVE_SAT;
+        unsat_count += expected == WANG_SOLVE_UNSAT;
+
+        for (size_t mode = 0; mode < 2; ++mode) {
+            WangSolverOptions decomposed = options;
+            decomposed.flags |= decompose_flags[mode];
+
+            WangSolveResult rejected = {0};
+            assert(wang_solve_serial(&region, &decomposed, &rejected) ==
+                   WANG_SOLVE_ERROR);
+
+            WangSolveResult result = {0};
+            assert(wang_solve_optimized(&region, &decomposed, &result) ==
+                   expected);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+            } else {
+                assert_unsat_result(&region, &decomposed, &result);
+            }
+            assert(result.metrics.components >=
+                   2u * result.metrics.component_splits);
+            splits[mode] += result.metrics.component_splits;
+            /* Split searches keep the MRV index instead of scanning. */
+            indexed[mode] += result.metrics.component_splits != 0 &&
+                result.metrics.mrv_index_updates != 0;
+            wang_solve_result_destroy(&result);
+        }
+
+        wang_solve_result_destroy(&reference);
+        region_destroy(&region);
+    }
+
+    assert(sat_count > 0 && unsat_count > 0);
+    assert(splits[0] > 0);
+    assert(splits[1] >= splits[0]);
+    assert(indexed[0] > 0 && indexed[1] > 0);
+}
+
+/*
+ * A fully active region with about one cell in narrow_one_in narrowed to a
+ * random triple; larger regions leave propagation enough slack to need real
+ * backtracking.
+ */
+static void build_narrowed_case(
+    Region *region,
+    uint32_t *domains,
+    int32_t width,
+    int32_t height,
+    uint32_t narrow_one_in,
+    uint32_t *random_state
+)
+{
+    assert(region_init(region, width, height));
+    activate_all(region);
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        domains[i] = WANG_DOMAIN_ALL;
+        if (next_random(random_state) % narrow_one_in == 0) {
+            domains[i] = 0;
+            for (size_t pick = 0; pick < 3; ++pick) {
+                domains[i] |= UINT32_C(1) <<
+                    (next_random(random_state) % TILE_COUNT);
+            }
+        }
+    }
+}
+
+/*
+ * Two halves of a wide region, split by an inactive column. Plain MRV
+ * interleaves their decisions, so a refutation deep in one half retries the
+ * other half's decisions and can thrash past the node limit. Decomposition
+ * solves each half to completion once, so it decides every sample.
+ */
+static void test_component_decomposition_solves_halves_once(void)
+{
+    size_t thrashed = 0;
+    uint32_t random_state = UINT32_C(0x5be0cd19);
+
+    for (size_t sample = 0; sample < 20; ++sample) {
+        Region region = {0};
+        uint32_t domains[250];
+        build_narrowed_case(&region, domains, 25, 10, 80u, &random_state);
+        for (int32_t y = 0; y < region.height; ++y) {
+            assert(region_set_active(&region, 12, y, false));
+            domains[region_index(&region, 12, y)] = 0;
+        }
+        const WangSolverOptions options = {
+            .flags = WANG_SOLVE_COLLECT_METRICS,
+            .initial_domains = domains,
+            .initial_domain_count = region.cell_count,
+            .node_limit = 100000,
+        };
+        WangSolverOptions decomposed = options;
+        decomposed.flags |= WANG_SOLVE_DECOMPOSE_COMPONENTS;
+
+        WangSolveResult plain = {0};
+        WangSolveResult result = {0};
+        const WangSolveStatus plain_status =
+            wang_solve_optimized(&region, &options, &plain);
+        const WangSolveStatus status =
+            wang_solve_optimized(&region, &decomposed, &result);
+        assert(status == WANG_SOLVE_SAT || status == WANG_SOLVE_UNSAT);
+        if (plain_status == WANG_SOLVE_UNKNOWN) {
+            ++thrashed;
+        } else {
+            assert(plain_status == status);
+        }
+        if (status == WANG_SOLVE_SAT) {
+            assert_sat_witness(&region, &result);
+        }
+
+        wang_solve_result_destroy(&plain);
+        wang_solve_result_destroy(&result);
+        region_destroy(&region);
+    }
+
+    assert(thrashed > 0);
+}
+
+static void test_nogood_learning_matches_reference(void)
+{
+    static const struct {
+        int32_t width;
+        int32_t height;
+        uint32_t narrow_one_in;
+    } shapes[] = {
+        { 6, 6, 20u },
+        { 12, 12, 100u },
+    };
+    uint64_t learned = 0;
+    uint64_t backjumps = 0;
+    uint64_t reference_backtracks = 0;
+    uint64_t learning_backtracks = 0;
+    size_t sat_count = 0;
+    size_t unsat_count = 0;
+    uint32_t random_state = UINT32_C(0x6a09e667);
+
+    for (size_t shape = 0; shape < 2; ++shape) {
+        for (size_t sample = 0; sample < 300; ++sample) {
+            Region region = {0};
+            uint32_t domains[144];
+            build_narrowed_case(
+                &region,
+                domains,
+                shapes[shape].width,
+                shapes[shape].height,
+                shapes[shape].narrow_one_in,
+                &random_state
+            );
+            const WangSolverOptions options = {
+                .flags = WANG_SOLVE_COLLECT_METRICS,
+                .initial_domains = domains,
+                .initial_domain_count = region.cell_count,
+            };
+            WangSolverOptions learning = options;
+            learning.flags |= WANG_SOLVE_LEARN_NOGOODS;
+
+            WangSolveResult reference = {0};
+            const WangSolveStatus expected =
+                wang_solve_serial(&region, &options, &reference);
+            assert(expected == WANG_SOLVE_SAT ||
+                   expected == WANG_SOLVE_UNSAT);
+            sat_count += expected == WANG_SOLVE_SAT;
+            unsat_count += expected == WANG_SOLVE_UNSAT;
+
+            WangSolveResult rejected = {0};
+            assert(wang_solve_serial(&region, &learning, &rejected) ==
+                   WANG_SOLVE_ERROR);
+
+            WangSolveResult result = {0};
+            assert(wang_solve_optimized(&region, &learning, &result) ==
+                   expected);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+            } else {
+                assert_unsat_result(&region, &learning, &result);
+            }
+            /* Skipped frames and refuted values are never searched. */
+            assert(result.metrics.backtracks <=
+                   reference.metrics.backtracks);
+            assert(result.metrics.backjumps <= result.metrics.backtracks);
+            assert(result.metrics.backjump_levels >=
+                   result.metrics.backjumps);
+            assert(result.metrics.nogoods_evicted <=
+                   result.metrics.nogoods_learned);
+            learned += result.metrics.nogoods_learned;
+            backjumps += result.metrics.backjumps;
+            reference_backtracks += reference.metrics.backtracks;
+            learning_backtracks += result.metrics.backtracks;
+            wang_solve_result_destroy(&result);
+            wang_solve_result_destroy(&reference);
+            region_destroy(&region);
+        }
+    }
+
+    assert(sat_count > 0 && unsat_count > 0);
+    assert(learned > 0 && backjumps > 0);
+    assert(learning_backtracks < reference_backtracks);
+
+    Region region = {0};
+    assert(region_init(&region, 4, 4));
+    activate_all(&region);
+    const WangSolverOptions combined = {
+        .flags = WANG_SOLVE_LEARN_NOGOODS | WANG_SOLVE_DECOMPOSE_COMPONENTS,
+    };
+    WangSolveResult result = {0};
+    assert(wang_solve_optimized(&region, &combined, &result) ==
+           WANG_SOLVE_ERROR);
+    region_destroy(&region);
+}
+
+/*
+ * Restarted searches keep the reference status under both schedules, replay
+ * exactly from equal seeds, and trace the failed leaves of every run.
+ */
+static void test_restarts_match_reference(void)
+{
+    static const WangRestartSchedule schedules[] = {
+        WANG_RESTART_LUBY,
+        WANG_RESTART_GEOMETRIC,
+    };
+    uint64_t restarts[2] = { 0, 0 };
+    bool traced = false;
+    uint32_t random_state = UINT32_C(0xbb67ae85);
+
+    for (size_t sample = 0; sample < 300; ++sample) {
+        Region region = {0};
+        uint32_t domains[144];
+        build_narrowed_case(&region, domains, 12, 12, 100u, &random_state);
+        const WangSolverOptions options = {
+            .flags = WANG_SOLVE_COLLECT_METRICS,
+            .initial_domains = domains,
+            .initial_domain_count = region.cell_count,
+        };
+        WangSolveResult reference = {0};
+        const WangSolveStatus expected =
+            wang_solve_serial(&region, &options, &reference);
+        assert(expected == WANG_SOLVE_SAT || expected == WANG_SOLVE_UNSAT);
+
+        for (size_t mode = 0; mode < 2; ++mode) {
+            WangSolverOptions restarting = options;
+            restarting.restart_schedule = schedules[mode];
+            restarting.restart_base = 4;
+            restarting.seed = sample;
+
+            WangSolveResult rejected = {0};
+            assert(wang_solve_serial(&region, &restarting, &rejected) ==
+                   WANG_SOLVE_ERROR);
+
+            WangSolveResult result = {0};
+            WangSolveResult replay = {0};
+            assert(wang_solve_optimized(&region, &restarting, &result) ==
+                   expected);
+            assert(wang_solve_optimized(&region, &restarting, &replay) ==
+                   expected);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+                assert(memcmp(
+                    result.domains,
+                    replay.domains,
+                    region.cell_count * sizeof(*result.domains)
+                ) == 0);
+            } else {
+                assert_unsat_result(&region, &restarting, &result);
+            }
+            assert(result.metrics.restarts == replay.metrics.restarts);
+            assert(result.metrics.decisions == replay.metrics.decisions);
+            restarts[mode] += result.metrics.restarts;
+
+            if (!traced && result.metrics.restarts != 0) {
+                char path[] = "/tmp/wang-restart-trace-XXXXXX";
+                const int fd = mkstemp(path);
+                assert(fd >= 0);
+                assert(close(fd) == 0);
+                assert(unlink(path) == 0);
+                WangSolverOptions tracing = restarting;
+                tracing.flags |= WANG_SOLVE_TRACE_FAILED_LEAVES;
+                tracing.failed_leaf_path = path;
+                tracing.failed_leaf_capacity = result.metrics.failed_leaves;
+                WangSolveResult traced_result = {0};
+                assert(wang_solve_optimized(
+                    &region,
+                    &tracing,
+                    &traced_result
+                ) == expected);
+                assert(traced_result.traced_leaf_count ==
+                       result.metrics.failed_leaves);
+                assert(!traced_result.trace_truncated);
+                assert(traced_result.metrics.restarts ==
+                       result.metrics.restarts);
+                assert(unlink(path) == 0);
+                wang_solve_result_destroy(&traced_result);
+                traced = true;
+            }
+            wang_solve_result_destroy(&replay);
+            wang_solve_result_destroy(&result);
+        }
+
+        wang_solve_result_destroy(&reference);
+        region_destroy(&region);
+    }
+
+    assert(restarts[0] > 0 && restarts[1] > 0);
+    assert(traced);
+}
+
+/*
+ * A width x height region with random holes, boundary colors on some sides
+ * that face no active neighbor, and cells narrowed to random tile triples.
+ */
+static void build_holed_case(
+    Region *region,
+    uint32_t *domains,
+    int32_t width,
+    int32_t height,
+    uint32_t *random_state
+)
+{
+    static const int32_t dx[DIR_COUNT] = { 0, 1, 0, -1 };
+    static const int32_t dy[DIR_COUNT] = { -1, 0, 1, 0 };
+
+    assert(region_init(region, width, height));
+    for (int32_t y = 0; y < height; ++y) {
+        for (int32_t x = 0; x < width; ++x) {
+            assert(region_set_active(
+                region,
+                x,
+                y,
+                next_random(random_state) % 16u != 0
+            ));
+        }
+    }
+    for (int32_t y = 0; y < height; ++y) {
+        for (int32_t x = 0; x < width; ++x) {
+            const size_t index = (size_t)y * (size_t)width + (size_t)x;
+            domains[index] = 0;
+            if (!region->cells[index].active) {
+                continue;
+            }
+            domains[index] = WANG_DOMAIN_ALL;
+            if (next_random(random_state) % 40u == 0) {
+                domains[index] = 0;
+                for (size_t pick = 0; pick < 3; ++pick) {
+                    domains[index] |= UINT32_C(1) <<
+                        (next_random(random_state) % TILE_COUNT);
+                }
+            }
+            for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+                const RegionCell *neighbor = region_cell_const(
+                    region,
+                    x + dx[dir],
+                    y + dy[dir]
+                );
+                if ((neighbor == NULL || !neighbor->active) &&
+                    next_random(random_state) % 40u == 0) {
+                    assert(region_set_boundary(
+                        region,
+                        x,
+                        y,
+                        dir,
+                        (ColorId)(next_random(random_state) % COLOR_COUNT)
+                    ));
+                }
+            }
+        }
+    }
+    assert(region_validate(region));
+}
+
+/*
+ * Bit-sliced root propagation reaches the queue's fixpoint exactly, so the
+ * whole search, its witness or diagnostic, and its counters are unchanged.
+ * Rows of 70 and 130 cells span several words.
+ */
+static void test_bitslice_propagation_matches_queue(void)
+{
+    static const struct {
+        int32_t width;
+        int32_t height;
+    } shapes[] = {
+        { 6, 6 },
+        { 12, 12 },
+        { 64, 3 },
+        { 70, 3 },
+        { 130, 2 },
+    };
+    size_t sat_count = 0;
+    size_t unsat_count = 0;
+    uint64_t passes = 0;
+    uint32_t random_state = UINT32_C(0x3c6ef372);
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+
+    for (size_t shape = 0; shape < 5; ++shape) {
+        for (size_t sample = 0; sample < 120; ++sample) {
+            Region region = {0};
+            uint32_t domains[260];
+            build_holed_case(
+                &region,
+                domains,
+                shapes[shape].width,
+                shapes[shape].height,
+                &random_state
+            );
+            const WangSolverOptions options = {
+                .flags = WANG_SOLVE_COLLECT_METRICS |
+                    WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT,
+                .initial_domains = domains,
+                .initial_domain_count = region.cell_count,
+                .node_limit = 100000,
+            };
+            WangSolverOptions bitsliced = options;
+            bitsliced.flags |= WANG_SOLVE_BITSLICE_PROPAGATION;
+
+            WangSolveResult rejected = {0};
+            assert(wang_solve_serial(&region, &bitsliced, &rejected) ==
+                   WANG_SOLVE_ERROR);
+
+            WangSolveResult queued = {0};
+            WangSolveResult result = {0};
+            const WangSolveStatus expected =
+                wang_solve_optimized(&region, &options, &queued);
+            assert(wang_solver_context_solve(
+                context,
+                &region,
+                &bitsliced,
+                WANG_SOLVER_OPTIMIZED,
+                &result
+            ) == expected);
+            sat_count += expected == WANG_SOLVE_SAT;
+            unsat_count += expected == WANG_SOLVE_UNSAT;
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+            }
+            assert((result.domains == NULL) == (queued.domains == NULL));
+            assert(result.domains == NULL || memcmp(
+                result.domains,
+                queued.domains,
+                region.cell_count * sizeof(*result.domains)
+            ) == 0);
+            assert(result.metrics.dfs_nodes == queued.metrics.dfs_nodes);
+            assert(result.metrics.decisions == queued.metrics.decisions);
+            assert(result.metrics.backtracks == queued.metrics.backtracks);
+            assert(result.conflict_cell == queued.conflict_cell);
+            assert(result.resolved_count == queued.resolved_count);
+            assert(result.decision_depth == queued.decision_depth);
+            assert(result.metrics.failed_leaves ==
+                   queued.metrics.failed_leaves);
+            assert(result.metrics.max_depth == queued.metrics.max_depth);
+            assert(queued.metrics.bitslice_passes == 0);
+            passes += result.metrics.bitslice_passes;
+            wang_solve_result_destroy(&result);
+            wang_solve_result_destroy(&queued);
+            region_destroy(&region);
+        }
+    }
+
+    assert(sat_count > 0 && unsat_count > 0);
+    assert(passes > 0);
+    wang_solver_context_destroy(context);
+}
+
+/*
+ * Least-constraining values change which witness the search finds and how
+ * many branches it takes, but never the decision. Each witness stays within
+ * the initial domains, and only the scored order spends lookups.
+ */
+static void test_least_constraining_values_match_reference(void)
+{
+    size_t sat_count = 0;
+    size_t unsat_count = 0;
+    uint64_t scorings = 0;
+    uint32_t random_state = UINT32_C(0x510e527f);
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+
+    for (size_t sample = 0; sample < 300; ++sample) {
+        Region region = {0};
+        uint32_t domains[144];
+        build_narrowed_case(&region, domains, 12, 12, 100u, &random_state);
+        const WangSolverOptions options = {
+            .flags = WANG_SOLVE_COLLECT_METRICS,
+            .initial_domains = domains,
+            .initial_domain_count = region.cell_count,
+        };
+        WangSolverOptions scored = options;
+        scored.value_order = WANG_VALUE_ORDER_LEAST_CONSTRAINING;
+
+        WangSolveResult reference = {0};
+        const WangSolveStatus expected =
+            wang_solve_serial(&region, &options, &reference);
+        assert(expected == WANG_SOLVE_SAT || expected == WANG_SOLVE_UNSAT);
+
+        WangSolveResult rejected = {0};
+        assert(wang_solve_serial(&region, &scored, &rejected) ==
+               WANG_SOLVE_ERROR);
+
+        WangSolveResult result = {0};
+        WangSolveResult replay = {0};
+        assert(wang_solve_optimized(&region, &scored, &result) == expected);
+        assert(wang_solver_context_solve(
+            context,
+            &region,
+            &scored,
+            WANG_SOLVER_OPTIMIZED,
+            &replay
+        ) == expected);
+        if (expected == WANG_SOLVE_SAT) {
+            ++sat_count;
+            assert_sat_witness(&region, &result);
+            for (size_t i = 0; i < region.cell_count; ++i) {
+                assert((result.domains[i] & ~domains[i]) == 0);
+            }
+            assert(memcmp(
+                result.domains,
+                replay.domains,
+                region.cell_count * sizeof(*result.domains)
+            ) == 0);
+        } else {
+            ++unsat_count;
+        }
+        assert(result.metrics.backtracks == replay.metrics.backtracks);
+        assert(result.metrics.value_scorings ==
+               replay.metrics.value_scorings);
+        assert(reference.metrics.value_scorings == 0);
+        assert(reference.metrics.value_score_lookups == 0);
+        assert(result.metrics.value_score_lookups >=
+               result.metrics.value_scorings);
+        scorings += result.metrics.value_scorings;
+
+        wang_solve_result_destroy(&replay);
+        wang_solve_result_destroy(&result);
+        wang_solve_result_destroy(&reference);
+        region_destroy(&region);
+    }
+
+    assert(sat_count > 0 && unsat_count > 0);
+    assert(scorings > 0);
+    wang_solver_context_destroy(context);
+}
+
+/*
+ * Weighted-degree selection only reorders the search, alone and with every
+ * mechanism it combines with, and equal seeds replay it through a context.
+ */
+static void test_weighted_degree_matches_reference(void)
+{
+    size_t sat_count = 0;
+    size_t unsat_count = 0;
+    uint64_t bumps = 0;
+    uint32_t random_state = UINT32_C(0x1f83d9ab);
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+
+    for (size_t sample = 0; sample < 300; ++sample) {
+        Region region = {0};
+        uint32_t domains[144];
+        build_narrowed_case(&region, domains, 12, 12, 100u, &random_state);
+        const WangSolverOptions options = {
+            .flags = WANG_SOLVE_COLLECT_METRICS,
+            .initial_domains = domains,
+            .initial_domain_count = region.cell_count,
+        };
+        WangSolverOptions weighted = options;
+        weighted.flags |= WANG_SOLVE_WEIGHTED_DEGREE;
+        WangSolverOptions random_ties = weighted;
+        random_ties.tie_break = WANG_TIE_BREAK_RANDOM;
+        random_ties.seed = sample;
+        WangSolverOptions learning = weighted;
+        learning.flags |= WANG_SOLVE_LEARN_NOGOODS;
+        WangSolverOptions components = weighted;
+        components.flags |= WANG_SOLVE_DECOMPOSE_EACH_DECISION;
+        WangSolverOptions restarts = random_ties;
+        restarts.restart_schedule = WANG_RESTART_LUBY;
+        restarts.restart_base = 4;
+
+        WangSolveResult reference = {0};
+        const WangSolveStatus expected =
+            wang_solve_serial(&region, &options, &reference);
+        assert(expected == WANG_SOLVE_SAT || expected == WANG_SOLVE_UNSAT);
+        assert(reference.metrics.weight_bumps == 0);
+
+        WangSolveResult rejected = {0};
+        assert(wang_solve_serial(&region, &weighted, &rejected) ==
+               WANG_SOLVE_ERROR);
+
+        const WangSolverOptions *const modes[] = {
+            &weighted,
+            &random_ties,
+            &learning,
+            &components,
+            &restarts,
+        };
+        for (size_t mode = 0; mode < sizeof(modes) / sizeof(*modes); ++mode) {
+            WangSolveResult result = {0};
+            WangSolveResult replay = {0};
+            assert(wang_solve_optimized(&region, modes[mode], &result) ==
+                   expected);
+            assert(wang_solver_context_solve(
+                context,
+                &region,
+                modes[mode],
+                WANG_SOLVER_OPTIMIZED,
+                &replay
+            ) == expected);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+                for (size_t i = 0; i < region.cell_count; ++i) {
+                    assert((result.domains[i] & ~domains[i]) == 0);
+                }
+                assert(memcmp(
+                    result.domains,
+                    replay.domains,
+                    region.cell_count * sizeof(*result.domains)
+                ) == 0);
+            }
+            assert(result.metrics.dfs_nodes == replay.metrics.dfs_nodes);
+            assert(result.metrics.weight_bumps ==
+                   replay.metrics.weight_bumps);
+            assert(result.metrics.weight_bumps <=
+                   4u * result.metrics.failed_leaves);
+            bumps += result.metrics.weight_bumps;
+            wang_solve_result_destroy(&replay);
+            wang_solve_result_destroy(&result);
+        }
+        if (expected == WANG_SOLVE_SAT) {
+            ++sat_count;
+        } else {
+            ++unsat_count;
+        }
+
+        wang_solve_result_destroy(&reference);
+        region_destroy(&region);
+    }
+
+    assert(sat_count > 0 && unsat_count > 0);
+    assert(bumps > 0);
+    wang_solver_context_destroy(context);
+}
+
+/*
+ * Probing removes only tiles that cannot be part of a tiling, so statuses
+ * match the reference at the root and below decisions, and an UNSAT
+ * conflict cell is one that probing or propagation emptied.
+ */
+static void test_singleton_probing_matches_reference(void)
+{
+    size_t sat_count = 0;
+    size_t unsat_count = 0;
+    uint64_t prunes = 0;
+    uint32_t random_state = UINT32_C(0x9b05688c);
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+
+    for (size_t sample = 0; sample < 400; ++sample) {
+        Region region = {0};
+        uint32_t domains[36];
+        build_narrowed_case(&region, domains, 6, 6, 12u, &random_state);
+        const WangSolverOptions options = {
+            .flags = WANG_SOLVE_COLLECT_METRICS |
+                WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT,
+            .initial_domains = domains,
+            .initial_domain_count = region.cell_count,
+        };
+        WangSolverOptions root = options;
+        root.flags |= WANG_SOLVE_PROBE_SINGLETONS;
+        WangSolverOptions deep = root;
+        deep.probe_depth = 2;
+
+        WangSolveResult reference = {0};
+        WangSolveResult plain = {0};
+        const WangSolveStatus expected =
+            wang_solve_serial(&region, &options, &reference);
+        assert(expected == WANG_SOLVE_SAT || expected == WANG_SOLVE_UNSAT);
+        assert(wang_solve_optimized(&region, &options, &plain) == expected);
+        assert(plain.metrics.probes == 0);
+        assert(plain.metrics.probe_prunes == 0);
+
+        WangSolveResult rejected = {0};
+        assert(wang_solve_serial(&region, &root, &rejected) ==
+               WANG_SOLVE_ERROR);
+
+        const WangSolverOptions *const modes[] = { &root, &deep };
+        for (size_t mode = 0; mode < 2; ++mode) {
+            WangSolveResult result = {0};
+            WangSolveResult replay = {0};
+            assert(wang_solve_optimized(&region, modes[mode], &result) ==
+                   expected);
+            assert(wang_solver_context_solve(
+                context,
+                &region,
+                modes[mode],
+                WANG_SOLVER_OPTIMIZED,
+                &replay
+            ) == expected);
+            assert(memcmp(
+                result.domains,
+                replay.domains,
+                region.cell_count * sizeof(*result.domains)
+            ) == 0);
+            assert(result.metrics.probes == replay.metrics.probes);
+            assert(result.metrics.probe_prunes ==
+                   replay.metrics.probe_prunes);
+            assert(result.metrics.probe_prunes <= result.metrics.probes);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+                for (size_t i = 0; i < region.cell_count; ++i) {
+                    assert((result.domains[i] & ~domains[i]) == 0);
+                }
+            } else {
+                assert(result.domains[result.conflict_cell] == 0);
+            }
+            prunes += result.metrics.probe_prunes;
+            wang_solve_result_destroy(&replay);
+            wang_solve_result_destroy(&result);
+        }
+        if (expected == WANG_SOLVE_SAT) {
+            ++sat_count;
+        } else {
+            ++unsat_count;
+        }
+
+        wang_solve_result_destroy(&plain);
+        wang_solve_result_destroy(&reference);
+        region_destroy(&region);
+    }
+
+    assert(sat_count > 0 && unsat_count > 0);
+    assert(prunes > 0);
+    wang_solver_context_destroy(context);
+}
+
+/*
+ * The frontier sweep decides every narrow region the way DFS does, with a
+ * verified witness inside the initial domains, or with the first cell it
+ * could not tile as its only failed leaf. Strips run both ways, so the
+ * sweep is transposed for half of them.
+ */
+static void test_frontier_engine_matches_search(void)
+{
+    static const struct {
+        int32_t width;
+        int32_t height;
+    } shapes[] = {
+        { 1, 90 },
+        { 90, 1 },
+        { 3, 40 },
+        { 40, 3 },
+        { 5, 5 },
+        { 6, 14 },
+    };
+    size_t sat_count = 0;
+    size_t unsat_count = 0;
+    size_t swept_unsat_count = 0;
+    uint32_t random_state = UINT32_C(0xa54ff53a);
+    WangSolverContext *context = wang_solver_context_create();
+    assert(context != NULL);
+
+    for (size_t shape = 0; shape < sizeof(shapes) / sizeof(shapes[0]);
+         ++shape) {
+        for (size_t sample = 0; sample < 120; ++sample) {
+            Region region = {0};
+            uint32_t domains[120];
+            build_holed_case(
+                &region,
+                domains,
+                shapes[shape].width,
+                shapes[shape].height,
+                &random_state
+            );
+            const WangSolverOptions options = {
+                .flags = WANG_SOLVE_COLLECT_METRICS |
+                    WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT,
+                .initial_domains = domains,
+                .initial_domain_count = region.cell_count,
+                .node_limit = 100000,
+            };
+            WangSolverOptions narrow = options;
+            narrow.flags |= WANG_SOLVE_FRONTIER_WHEN_NARROW;
+
+            WangSolveResult rejected = {0};
+            assert(wang_solve_serial(&region, &narrow, &rejected) ==
+                   WANG_SOLVE_ERROR);
+
+            WangSolveResult searched = {0};
+            WangSolveResult swept = {0};
+            WangSolveResult selected = {0};
+            const WangSolveStatus expected =
+                wang_solve_optimized(&region, &options, &searched);
+            const WangSolveStatus status =
+                wang_solve_frontier(&region, &options, &swept);
+            assert(wang_solver_context_solve(
+                context,
+                &region,
+                &narrow,
+                WANG_SOLVER_OPTIMIZED,
+                &selected
+            ) == status);
+            assert(status == WANG_SOLVE_SAT || status == WANG_SOLVE_UNSAT);
+            assert(expected == WANG_SOLVE_UNKNOWN || expected == status);
+            assert(swept.metrics.dfs_nodes == 0);
+            assert(selected.metrics.dfs_nodes == 0);
+            assert(swept.metrics.frontier_states ==
+                   selected.metrics.frontier_states);
+            assert(searched.metrics.frontier_states == 0);
+
+            if (status == WANG_SOLVE_SAT) {
+                ++sat_count;
+                assert_sat_witness(&region, &swept);
+                for (size_t i = 0; i < region.cell_count; ++i) {
+                    assert((swept.domains[i] & ~domains[i]) == 0);
+                }
+                assert(memcmp(
+                    swept.domains,
+                    selected.domains,
+                    region.cell_count * sizeof(*swept.domains)
+                ) == 0);
+                assert(swept.metrics.frontier_peak_states > 0);
+            } else {
+                ++unsat_count;
+                assert_unsat_result(&region, &options, &swept);
+                assert(swept.conflict_cell == selected.conflict_cell);
+                assert(swept.decision_depth == 0);
+                assert(swept.metrics.failed_leaves == 1);
+                swept_unsat_count += swept.metrics.frontier_states > 0;
+            }
+            wang_solve_result_destroy(&selected);
+            wang_solve_result_destroy(&swept);
+            wang_solve_result_destroy(&searched);
+            region_destroy(&region);
+        }
+    }
+    assert(sat_count > 0 && unsat_count > 0);
+
+    /*
+     * Propagation refutes nearly every UNSAT region at the root. A 2x2
+     * square whose cells each keep about six tiles occasionally leaves the
+     * refutation to the sweep.
+     */
+    for (size_t sample = 0; sample < 5000; ++sample) {
+        Region region = {0};
+        uint32_t domains[4] = {0};
+        assert(region_init(&region, 2, 2));
+        activate_all(&region);
+        for (size_t i = 0; i < 4; ++i) {
+            for (size_t pick = 0; pick < 6; ++pick) {
+                domains[i] |= UINT32_C(1) <<
+                    (next_random(&random_state) % TILE_COUNT);
+            }
+        }
+        const WangSolverOptions options = {
+            .flags = WANG_SOLVE_COLLECT_METRICS |
+                WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT,
+            .initial_domains = domains,
+            .initial_domain_count = region.cell_count,
+        };
+        WangSolveResult searched = {0};
+        WangSolveResult swept = {0};
+        const WangSolveStatus status =
+            wang_solve_frontier(&region, &options, &swept);
+        assert(wang_solve_optimized(&region, &options, &searched) == status);
+        if (status == WANG_SOLVE_SAT) {
+            assert_sat_witness(&region, &swept);
+        } else {
+            assert(status == WANG_SOLVE_UNSAT);
+            assert_unsat_result(&region, &options, &swept);
+            swept_unsat_count += swept.metrics.frontier_states > 0;
+        }
+        wang_solve_result_destroy(&swept);
+        wang_solve_result_destroy(&searched);
+        region_destroy(&region);
+    }
+    assert(swept_unsat_count > 0);
+
+    /* Wider regions and search mechanisms belong to DFS alone. */
+    Region wide = {0};
+    assert(region_init(&wide, 17, 17));
+    activate_all(&wide);
+    WangSolveResult result = {0};
+    assert(wang_solve_frontier(&wide, NULL, &result) == WANG_SOLVE_ERROR);
+    const WangSolverOptions narrow = {
+        .flags = WANG_SOLVE_FRONTIER_WHEN_NARROW |
+            WANG_SOLVE_COLLECT_METRICS,
+    };
+    assert(wang_solver_context_solve(
+        context,
+        &wide,
+        &narrow,
+        WANG_SOLVER_OPTIMIZED,
+        &result
+    ) == WANG_SOLVE_SAT);
+    assert(result.metrics.frontier_states == 0);
+    assert(result.metrics.dfs_nodes > 0);
+    wang_solve_result_destroy(&result);
+    region_destroy(&wide);
+
+    Region strip = {0};
+    assert(region_init(&strip, 4, 2));
+    activate_all(&strip);
+    const WangSolverOptions learn = {
+        .flags = WANG_SOLVE_LEARN_NOGOODS,
+    };
+    const WangSolverOptions restarts = {
+        .restart_schedule = WANG_RESTART_LUBY,
+    };
+    const WangSolverOptions decompose = {
+        .flags = WANG_SOLVE_DECOMPOSE_COMPONENTS,
+    };
+    assert(wang_solve_frontier(&strip, &learn, &result) == WANG_SOLVE_ERROR);
+    assert(wang_solve_frontier(&strip, &restarts, &result) ==
+           WANG_SOLVE_ERROR);
+    assert(wang_solve_frontier(&strip, &decompose, &result) ==
+           WANG_SOLVE_ERROR);
+    assert(wang_solver_context_solve(
+        context,
+        &strip,
+        NULL,
+        WANG_SOLVER_FRONTIER,
+        &result
+    ) == WANG_SOLVE_SAT);
+    assert_sat_witness(&strip, &result);
+    wang_solve_result_destroy(&result);
+    region_destroy(&strip);
+    wang_solver_context_destroy(context);
+}
+
 static void test_optimized_stack_is_small_for_shallow_search(void)
 {
     Cm13Clause clauses[6];
@@ -890,6 +2023,16 @@ int main(void)
     test_queue_dedup_index_skips_no_arc_case();
     test_matching_invalid_input_contract();
     test_optimized_uses_bytewise_support_lookup();
+    test_mrv_index_matches_scan_order();
+    test_component_decomposition_matches_reference();
+    test_component_decomposition_solves_halves_once();
+    test_nogood_learning_matches_reference();
+    test_restarts_match_reference();
+    test_bitslice_propagation_matches_queue();
+    test_least_constraining_values_match_reference();
+    test_singleton_probing_matches_reference();
+    test_weighted_degree_matches_reference();
+    test_frontier_engine_matches_search();
     test_optimized_stack_is_small_for_shallow_search();
     test_optimized_stack_grows_for_deep_search();
 
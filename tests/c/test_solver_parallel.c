@@ -0,0 +1,998 @@
+#include "wang/solver_parallel.h"
+
+#include "wang/formula_parser.h"
+#include "wang/solver.h"
+#include "wang/tile.h"
+#include "wang/verify.h"
+#include "wang/yang_zhang.h"
+
+#include <assert.h>
+#include <stdatomic.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <stdlib.h>
+
+static const size_t THREAD_COUNTS[] = { 1, 2, 3, 4 };
+
+static uint32_t random_state = UINT32_C(0x5bd1e995);
+
+static uint32_t next_random(void)
+{
+    uint32_t value = random_state;
+    value ^= value << 13;
+    value ^= value >> 17;
+    value ^= value << 5;
+    random_state = value;
+    return value;
+}
+
+static void assert_sat_witness(
+    const Region *region,
+    const WangSolveResult *result
+)
+{
+    TileId *tiles = malloc(
+        (region->cell_count == 0 ? 1 : region->cell_count) * sizeof(*tiles)
+    );
+    assert(tiles != NULL);
+    assert(result->domain_count == region->cell_count);
+    assert(result->conflict_cell == SIZE_MAX);
+
+    for (size_t cell = 0; cell < region->cell_count; ++cell) {
+        uint32_t domain = result->domains[cell];
+        if (!region->cells[cell].active) {
+            assert(domain == 0);
+            tiles[cell] = TILE_NONE;
+            continue;
+        }
+        assert(domain != 0 && (domain & (domain - 1u)) == 0);
+        TileId tile = 0;
+        while ((domain & UINT32_C(1)) == 0) {
+            domain >>= 1;
+            ++tile;
+        }
+        tiles[cell] = tile;
+    }
+
+    assert(wang_verify_tiling(region, tiles, region->cell_count) ==
+           WANG_VERIFY_VALID);
+    free(tiles);
+}
+
+static void assert_unsat_leaf(
+    const Region *region,
+    const WangSolveResult *result,
+    bool captured
+)
+{
+    assert(result->conflict_cell < region->cell_count);
+    assert(region->cells[result->conflict_cell].active);
+    if (captured) {
+        assert(result->domain_count == region->cell_count);
+        assert(result->domains[result->conflict_cell] == 0);
+    } else {
+        assert(result->domains == NULL && result->domain_count == 0);
+    }
+}
+
+/* Every thread count and engine agrees with the serial status. */
+static void assert_parallel_matches_serial(const Region *region)
+{
+    WangSolveResult serial = {0};
+    const WangSolveStatus expected = wang_solve_optimized(
+        region,
+        NULL,
+        &serial
+    );
+    assert(expected == WANG_SOLVE_SAT || expected == WANG_SOLVE_UNSAT);
+    wang_solve_result_destroy(&serial);
+
+    const WangSolverOptions options = {
+        .flags = WANG_SOLVE_COLLECT_METRICS |
+            WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT,
+    };
+    for (size_t i = 0; i < sizeof(THREAD_COUNTS) / sizeof(*THREAD_COUNTS);
+         ++i) {
+        for (int engine = WANG_SOLVER_REFERENCE;
+             engine <= WANG_SOLVER_OPTIMIZED;
+             ++engine) {
+            WangSolveResult result = {0};
+            const WangSolveStatus status = wang_solve_parallel(
+                region,
+                &options,
+                (WangSolverEngine)engine,
+                THREAD_COUNTS[i],
+                &result
+            );
+            assert(status == expected);
+            if (status == WANG_SOLVE_SAT) {
+                assert_sat_witness(region, &result);
+            } else {
+                assert_unsat_leaf(region, &result, true);
+            }
+            assert(result.traced_leaf_count == 0);
+            wang_solve_result_destroy(&result);
+        }
+    }
+}
+
+/* A single winner whose metrics are the returned ones. */
+static void assert_portfolio_reports(
+    const WangPortfolioReport *reports,
+    size_t member_count,
+    WangSolveStatus status,
+    const WangSolveResult *result
+)
+{
+    size_t winners = 0;
+    for (size_t i = 0; i < member_count; ++i) {
+        if (!reports[i].winner) {
+            assert(reports[i].status == status ||
+                   reports[i].status == WANG_SOLVE_UNKNOWN);
+            continue;
+        }
+        ++winners;
+        assert(reports[i].status == status);
+        assert(reports[i].metrics.dfs_nodes == result->metrics.dfs_nodes);
+        assert(reports[i].metrics.decisions == result->metrics.decisions);
+    }
+    assert(winners == 1);
+}
+
+/* Default and explicit portfolios agree with the serial status. */
+static void assert_portfolio_matches_serial(const Region *region)
+{
+    WangSolveResult serial = {0};
+    const WangSolveStatus expected = wang_solve_optimized(
+        region,
+        NULL,
+        &serial
+    );
+    wang_solve_result_destroy(&serial);
+
+    const WangPortfolioMember explicit_members[] = {
+        { .engine = WANG_SOLVER_REFERENCE },
+        {
+            .engine = WANG_SOLVER_OPTIMIZED,
+            .value_order = WANG_VALUE_ORDER_RANDOM,
+            .tie_break = WANG_TIE_BREAK_LAST,
+            .seed = 7,
+        },
+        {
+            .engine = WANG_SOLVER_REFERENCE,
+            .value_order = WANG_VALUE_ORDER_DESCENDING,
+            .tie_break = WANG_TIE_BREAK_RANDOM,
+            .seed = 11,
+        },
+    };
+    const WangSolverOptions options = {
+        .flags = WANG_SOLVE_COLLECT_METRICS |
+            WANG_SOLVE_CAPTURE_UNSAT_SNAPSHOT,
+    };
+    for (size_t member_count = 1; member_count <= 4; ++member_count) {
+        for (int use_defaults = 0; use_defaults <= 1; ++use_defaults) {
+            if (!use_defaults && member_count > 3) {
+                continue;
+            }
+            WangPortfolioReport reports[4];
+            WangSolveResult result = {0};
+            const WangSolveStatus status = wang_solve_portfolio(
+                region,
+                &options,
+                use_defaults ? NULL : explicit_members,
+                member_count,
+                reports,
+                &result
+            );
+            assert(status == expected);
+            if (status == WANG_SOLVE_SAT) {
+                assert_sat_witness(region, &result);
+            } else {
+                assert_unsat_leaf(region, &result, true);
+            }
+            assert_portfolio_reports(reports, member_count, status, &result);
+            wang_solve_result_destroy(&result);
+        }
+    }
+}
+
+static void with_pipeline_region(
+    const char *path,
+    void (*check)(const Region *region)
+)
+{
+    Cm13Formula formula = {0};
+    YangZhangReduction reduction = {0};
+    assert(cm13_formula_load_path(path, &formula, NULL) == CM13_PARSE_OK);
+    assert(yang_zhang_build(&formula, &reduction));
+    check(&reduction.region);
+    yang_zhang_reduction_destroy(&reduction);
+    cm13_formula_destroy(&formula);
+}
+
+static void assert_unsat_is_deterministic(const Region *region)
+{
+    const WangSolverOptions options = {
+        .flags = WANG_SOLVE_COLLECT_METRICS,
+    };
+    WangSolveResult first = {0};
+    WangSolveResult second = {0};
+    assert(wang_solve_parallel(
+        region,
+        &options,
+        WANG_SOLVER_OPTIMIZED,
+        4,
+        &first
+    ) == WANG_SOLVE_UNSAT);
+    assert(wang_solve_parallel(
+        region,
+        &options,
+        WANG_SOLVER_OPTIMIZED,
+        4,
+        &second
+    ) == WANG_SOLVE_UNSAT);
+
+    assert_unsat_leaf(region, &first, false);
+    assert(first.conflict_cell == second.conflict_cell);
+    assert(first.resolved_count == second.resolved_count);
+    assert(first.decision_depth == second.decision_depth);
+    assert(first.metrics.dfs_nodes == second.metrics.dfs_nodes);
+    assert(first.metrics.failed_leaves == second.metrics.failed_leaves);
+    assert(first.metrics.dfs_nodes > 0);
+
+    wang_solve_result_destroy(&second);
+    wang_solve_result_destroy(&first);
+}
+
+static void assert_bounds_stop_every_thread(const Region *region)
+{
+    atomic_int cancel = 1;
+    const WangSolverOptions bounded[] = {
+        { .node_limit = 1 },
+        { .cancel_flag = &cancel },
+        { .deadline_ns = 1 },
+    };
+    for (size_t i = 0; i < sizeof(bounded) / sizeof(*bounded); ++i) {
+        WangSolveResult result = {0};
+        assert(wang_solve_parallel(
+            region,
+            &bounded[i],
+            WANG_SOLVER_OPTIMIZED,
+            4,
+            &result
+        ) == WANG_SOLVE_UNKNOWN);
+        assert(result.domains == NULL && result.domain_count == 0);
+        assert(result.conflict_cell == SIZE_MAX);
+        wang_solve_result_destroy(&result);
+    }
+}
+
+static void assert_portfolio_bounds_have_no_winner(const Region *region)
+{
+    const WangSolverOptions bounded = {
+        .flags = WANG_SOLVE_COLLECT_METRICS,
+        .node_limit = 1,
+    };
+    WangPortfolioReport reports[3];
+    WangSolveResult result = {0};
+    assert(wang_solve_portfolio(
+        region,
+        &bounded,
+        NULL,
+        3,
+        reports,
+        &result
+    ) == WANG_SOLVE_UNKNOWN);
+    assert(result.domains == NULL && result.conflict_cell == SIZE_MAX);
+    for (size_t i = 0; i < 3; ++i) {
+        assert(reports[i].status == WANG_SOLVE_UNKNOWN);
+        assert(!reports[i].winner);
+        assert(reports[i].metrics.dfs_nodes == 1);
+    }
+    wang_solve_result_destroy(&result);
+}
+
+static void test_pipeline_instances(void)
+{
+    with_pipeline_region(
+        "tests/instances/pipeline_sat.cm13",
+        assert_parallel_matches_serial
+    );
+    with_pipeline_region(
+        "tests/instances/pipeline_unsat.cm13",
+        assert_parallel_matches_serial
+    );
+    with_pipeline_region(
+        "tests/instances/pipeline_unsat.cm13",
+        assert_unsat_is_deterministic
+    );
+    with_pipeline_region(
+        "tests/instances/pipeline_unsat.cm13",
+        assert_bounds_stop_every_thread
+    );
+    with_pipeline_region(
+        "tests/instances/pipeline_sat.cm13",
+        assert_portfolio_matches_serial
+    );
+    with_pipeline_region(
+        "tests/instances/pipeline_unsat.cm13",
+        assert_portfolio_matches_serial
+    );
+    with_pipeline_region(
+        "tests/instances/pipeline_unsat.cm13",
+        assert_portfolio_bounds_have_no_winner
+    );
+}
+
+static void random_small_region(Region *region)
+{
+    const int32_t width = 1 + (int32_t)(next_random() % 4u);
+    const int32_t height = 1 + (int32_t)(next_random() % 3u);
+    assert(region_init(region, width, height));
+    for (int32_t y = 0; y < height; ++y) {
+        for (int32_t x = 0; x < width; ++x) {
+            if ((next_random() & 3u) != 0) {
+                assert(region_set_active(region, x, y, true));
+            }
+        }
+    }
+    for (int32_t y = 0; y < height; ++y) {
+        for (int32_t x = 0; x < width; ++x) {
+            for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+                if (region_cell_const(region, x, y)->active &&
+                    next_random() % 4u == 0) {
+                    const ColorId color =
+                        (ColorId)(next_random() % COLOR_COUNT);
+                    (void)region_set_boundary(region, x, y, dir, color);
+                }
+            }
+        }
+    }
+}
+
+static void test_random_regions_match_serial_status(void)
+{
+    for (unsigned i = 0; i < 96u; ++i) {
+        Region region = {0};
+        random_small_region(&region);
+        assert_parallel_matches_serial(&region);
+        assert_portfolio_matches_serial(&region);
+        region_destroy(&region);
+    }
+}
+
+/* Tasks pin cells of the caller's initial domains, not of a full root. */
+static void test_initial_domains_match_serial(void)
+{
+    for (unsigned i = 0; i < 48u; ++i) {
+        Region region = {0};
+        random_small_region(&region);
+        uint32_t *initial = calloc(region.cell_count, sizeof(*initial));
+        assert(initial != NULL);
+        for (size_t cell = 0; cell < region.cell_count; ++cell) {
+            if (region.cells[cell].active) {
+                initial[cell] = (next_random() & 1u) != 0
+                    ? WANG_DOMAIN_ALL
+                    : next_random() & WANG_DOMAIN_ALL;
+            }
+        }
+
+        const WangSolverOptions options = {
+            .initial_domains = initial,
+            .initial_domain_count = region.cell_count,
+        };
+        WangSolveResult serial = {0};
+        const WangSolveStatus expected = wang_solve_optimized(
+            &region,
+            &options,
+            &serial
+        );
+        for (size_t t = 0; t < sizeof(THREAD_COUNTS) / sizeof(*THREAD_COUNTS);
+             ++t) {
+            WangSolveResult result = {0};
+            assert(wang_solve_parallel(
+                &region,
+                &options,
+                WANG_SOLVER_OPTIMIZED,
+                THREAD_COUNTS[t],
+                &result
+            ) == expected);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+                for (size_t cell = 0; cell < region.cell_count; ++cell) {
+                    assert((result.domains[cell] & ~initial[cell]) == 0);
+                }
+            }
+            wang_solve_result_destroy(&result);
+        }
+
+        wang_solve_result_destroy(&serial);
+        free(initial);
+        region_destroy(&region);
+    }
+}
+
+/* Every subtree task backjumps and learns on its own. */
+static void test_learning_matches_serial(void)
+{
+    for (unsigned i = 0; i < 48u; ++i) {
+        Region region = {0};
+        random_small_region(&region);
+        const WangSolverOptions options = {
+            .flags = WANG_SOLVE_LEARN_NOGOODS,
+        };
+        WangSolveResult serial = {0};
+        const WangSolveStatus expected = wang_solve_optimized(
+            &region,
+            NULL,
+            &serial
+        );
+        for (size_t t = 0; t < sizeof(THREAD_COUNTS) / sizeof(*THREAD_COUNTS);
+             ++t) {
+            WangSolveResult result = {0};
+            assert(wang_solve_parallel(
+                &region,
+                &options,
+                WANG_SOLVER_OPTIMIZED,
+                THREAD_COUNTS[t],
+                &result
+            ) == expected);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+            }
+            wang_solve_result_destroy(&result);
+        }
+        WangSolveResult rejected = {0};
+        assert(wang_solve_parallel(
+            &region,
+            &options,
+            WANG_SOLVER_REFERENCE,
+            2,
+            &rejected
+        ) == WANG_SOLVE_ERROR);
+
+        wang_solve_result_destroy(&serial);
+        region_destroy(&region);
+    }
+}
+
+/* Bit-sliced root propagation keeps every status; the reference rejects it. */
+static void test_bitslice_matches_serial(void)
+{
+    for (unsigned i = 0; i < 48u; ++i) {
+        Region region = {0};
+        random_small_region(&region);
+        const WangSolverOptions options = {
+            .flags = WANG_SOLVE_BITSLICE_PROPAGATION,
+        };
+        WangSolveResult serial = {0};
+        const WangSolveStatus expected = wang_solve_optimized(
+            &region,
+            NULL,
+            &serial
+        );
+        for (size_t t = 0; t < sizeof(THREAD_COUNTS) / sizeof(*THREAD_COUNTS);
+             ++t) {
+            WangSolveResult result = {0};
+            assert(wang_solve_parallel(
+                &region,
+                &options,
+                WANG_SOLVER_OPTIMIZED,
+                THREAD_COUNTS[t],
+                &result
+            ) == expected);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+            }
+            wang_solve_result_destroy(&result);
+        }
+        WangSolveResult rejected = {0};
+        assert(wang_solve_parallel(
+            &region,
+            &options,
+            WANG_SOLVER_REFERENCE,
+            2,
+            &rejected
+        ) == WANG_SOLVE_ERROR);
+
+        wang_solve_result_destroy(&serial);
+        region_destroy(&region);
+    }
+}
+
+/*
+ * Least-constraining values keep every status, in tasks and in portfolio
+ * members; the reference engine rejects them in both drivers.
+ */
+static void test_least_constraining_matches_serial(void)
+{
+    const WangPortfolioMember members[] = {
+        {
+            .engine = WANG_SOLVER_OPTIMIZED,
+            .value_order = WANG_VALUE_ORDER_LEAST_CONSTRAINING,
+        },
+        {
+            .engine = WANG_SOLVER_REFERENCE,
+            .value_order = WANG_VALUE_ORDER_LEAST_CONSTRAINING,
+        },
+    };
+    for (unsigned i = 0; i < 48u; ++i) {
+        Region region = {0};
+        random_small_region(&region);
+        const WangSolverOptions options = {
+            .value_order = WANG_VALUE_ORDER_LEAST_CONSTRAINING,
+        };
+        WangSolveResult serial = {0};
+        const WangSolveStatus expected = wang_solve_optimized(
+            &region,
+            NULL,
+            &serial
+        );
+        for (size_t t = 0; t < sizeof(THREAD_COUNTS) / sizeof(*THREAD_COUNTS);
+             ++t) {
+            WangSolveResult result = {0};
+            assert(wang_solve_parallel(
+                &region,
+                &options,
+                WANG_SOLVER_OPTIMIZED,
+                THREAD_COUNTS[t],
+                &result
+            ) == expected);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+            }
+            wang_solve_result_destroy(&result);
+        }
+        WangSolveResult result = {0};
+        assert(wang_solve_portfolio(
+            &region,
+            NULL,
+            members,
+            1,
+            NULL,
+            &result
+        ) == expected);
+        wang_solve_result_destroy(&result);
+
+        WangSolveResult rejected = {0};
+        assert(wang_solve_parallel(
+            &region,
+            &options,
+            WANG_SOLVER_REFERENCE,
+            2,
+            &rejected
+        ) == WANG_SOLVE_ERROR);
+        assert(wang_solve_portfolio(
+            &region,
+            NULL,
+            members,
+            2,
+            NULL,
+            &rejected
+        ) == WANG_SOLVE_ERROR);
+
+        wang_solve_result_destroy(&serial);
+        region_destroy(&region);
+    }
+}
+
+/*
+ * Subtree tasks probe their own roots and below their decisions; component
+ * tasks are scoped and never probe. Neither changes the status.
+ */
+static void test_probing_matches_serial(void)
+{
+    uint64_t probes = 0;
+    for (unsigned i = 0; i < 48u; ++i) {
+        Region region = {0};
+        random_small_region(&region);
+        WangSolverOptions options = {
+            .flags = WANG_SOLVE_COLLECT_METRICS |
+                WANG_SOLVE_PROBE_SINGLETONS,
+            .probe_depth = 1,
+        };
+        WangSolveResult serial = {0};
+        const WangSolveStatus expected = wang_solve_optimized(
+            &region,
+            NULL,
+            &serial
+        );
+        for (size_t t = 0; t < sizeof(THREAD_COUNTS) / sizeof(*THREAD_COUNTS);
+             ++t) {
+            WangSolveResult result = {0};
+            assert(wang_solve_parallel(
+                &region,
+                &options,
+                WANG_SOLVER_OPTIMIZED,
+                THREAD_COUNTS[t],
+                &result
+            ) == expected);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+            }
+            probes += result.metrics.probes;
+            wang_solve_result_destroy(&result);
+        }
+
+        WangSolveResult result = {0};
+        options.flags |= WANG_SOLVE_DECOMPOSE_COMPONENTS;
+        assert(wang_solve_parallel(
+            &region,
+            &options,
+            WANG_SOLVER_OPTIMIZED,
+            2,
+            &result
+        ) == expected);
+        wang_solve_result_destroy(&result);
+
+        WangSolveResult rejected = {0};
+        assert(wang_solve_parallel(
+            &region,
+            &options,
+            WANG_SOLVER_REFERENCE,
+            2,
+            &rejected
+        ) == WANG_SOLVE_ERROR);
+
+        wang_solve_result_destroy(&serial);
+        region_destroy(&region);
+    }
+    assert(probes > 0);
+}
+
+/*
+ * Every subtree task and component task keeps its own arc weights, so the
+ * status matches the serial search at every thread count.
+ */
+static void test_weighted_degree_matches_serial(void)
+{
+    for (unsigned i = 0; i < 48u; ++i) {
+        Region region = {0};
+        random_small_region(&region);
+        WangSolverOptions options = {
+            .flags = WANG_SOLVE_COLLECT_METRICS | WANG_SOLVE_WEIGHTED_DEGREE,
+        };
+        WangSolveResult serial = {0};
+        const WangSolveStatus expected = wang_solve_optimized(
+            &region,
+            &options,
+            &serial
+        );
+        assert(expected == WANG_SOLVE_SAT || expected == WANG_SOLVE_UNSAT);
+        for (size_t t = 0; t < sizeof(THREAD_COUNTS) / sizeof(*THREAD_COUNTS);
+             ++t) {
+            WangSolveResult result = {0};
+            assert(wang_solve_parallel(
+                &region,
+                &options,
+                WANG_SOLVER_OPTIMIZED,
+                THREAD_COUNTS[t],
+                &result
+            ) == expected);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+            }
+            wang_solve_result_destroy(&result);
+        }
+
+        WangSolveResult result = {0};
+        options.flags |= WANG_SOLVE_DECOMPOSE_COMPONENTS;
+        assert(wang_solve_parallel(
+            &region,
+            &options,
+            WANG_SOLVER_OPTIMIZED,
+            2,
+            &result
+        ) == expected);
+        wang_solve_result_destroy(&result);
+
+        WangSolveResult rejected = {0};
+        assert(wang_solve_parallel(
+            &region,
+            &options,
+            WANG_SOLVER_REFERENCE,
+            2,
+            &rejected
+        ) == WANG_SOLVE_ERROR);
+
+        wang_solve_result_destroy(&serial);
+        region_destroy(&region);
+    }
+}
+
+/*
+ * A narrow region is swept once on the calling thread, so every thread
+ * count returns the frontier engine's own result; the reference rejects
+ * the flag and the driver rejects the frontier engine.
+ */
+static void test_frontier_sweeps_once(void)
+{
+    for (unsigned i = 0; i < 48u; ++i) {
+        Region region = {0};
+        random_small_region(&region);
+        const WangSolverOptions options = {
+            .flags = WANG_SOLVE_COLLECT_METRICS |
+                WANG_SOLVE_FRONTIER_WHEN_NARROW,
+        };
+        WangSolveResult swept = {0};
+        const WangSolveStatus expected = wang_solve_frontier(
+            &region,
+            &options,
+            &swept
+        );
+        for (size_t t = 0; t < sizeof(THREAD_COUNTS) / sizeof(*THREAD_COUNTS);
+             ++t) {
+            WangSolveResult result = {0};
+            assert(wang_solve_parallel(
+                &region,
+                &options,
+                WANG_SOLVER_OPTIMIZED,
+                THREAD_COUNTS[t],
+                &result
+            ) == expected);
+            assert(result.metrics.frontier_states ==
+                   swept.metrics.frontier_states);
+            assert(result.metrics.dfs_nodes == 0);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &result);
+            }
+            wang_solve_result_destroy(&result);
+        }
+        WangSolveResult rejected = {0};
+        assert(wang_solve_parallel(
+            &region,
+            &options,
+            WANG_SOLVER_REFERENCE,
+            2,
+            &rejected
+        ) == WANG_SOLVE_ERROR);
+        assert(wang_solve_parallel(
+            &region,
+            NULL,
+            WANG_SOLVER_FRONTIER,
+            2,
+            &rejected
+        ) == WANG_SOLVE_ERROR);
+
+        wang_solve_result_destroy(&swept);
+        region_destroy(&region);
+    }
+}
+
+/* Root components solve as separate tasks and merge into one witness. */
+static void test_components_match_serial(void)
+{
+    Region split = {0};
+    assert(region_init(&split, 5, 2));
+    for (int32_t y = 0; y < 2; ++y) {
+        for (int32_t x = 0; x < 5; ++x) {
+            assert(region_set_active(&split, x, y, x != 2));
+        }
+    }
+    const WangSolverOptions decompose = {
+        .flags = WANG_SOLVE_COLLECT_METRICS |
+            WANG_SOLVE_DECOMPOSE_COMPONENTS,
+    };
+    WangSolveResult result = {0};
+    assert(wang_solve_parallel(&split, &decompose, WANG_SOLVER_OPTIMIZED, 2,
+                               &result) == WANG_SOLVE_SAT);
+    assert_sat_witness(&split, &result);
+    assert(result.resolved_count == 8);
+    assert(result.metrics.component_splits >= 1);
+    assert(result.metrics.components >= 2);
+    wang_solve_result_destroy(&result);
+    assert(wang_solve_parallel(&split, &decompose, WANG_SOLVER_REFERENCE, 2,
+                               &result) == WANG_SOLVE_ERROR);
+    region_destroy(&split);
+
+    static const uint32_t flags[] = {
+        WANG_SOLVE_DECOMPOSE_COMPONENTS,
+        WANG_SOLVE_DECOMPOSE_EACH_DECISION,
+    };
+    for (unsigned i = 0; i < 48u; ++i) {
+        Region region = {0};
+        assert(region_init(&region, 7, 3));
+        for (int32_t y = 0; y < 3; ++y) {
+            for (int32_t x = 0; x < 7; ++x) {
+                if (x != 3 && next_random() % 6u != 0) {
+                    assert(region_set_active(&region, x, y, true));
+                }
+            }
+        }
+        uint32_t *initial = calloc(region.cell_count, sizeof(*initial));
+        assert(initial != NULL);
+        for (size_t cell = 0; cell < region.cell_count; ++cell) {
+            if (region.cells[cell].active) {
+                initial[cell] = next_random() % 5u != 0
+                    ? WANG_DOMAIN_ALL
+                    : next_random() & WANG_DOMAIN_ALL;
+            }
+        }
+
+        WangSolverOptions options = {
+            .initial_domains = initial,
+            .initial_domain_count = region.cell_count,
+        };
+        WangSolveResult serial = {0};
+        const WangSolveStatus expected = wang_solve_optimized(
+            &region,
+            &options,
+            &serial
+        );
+        options.flags = flags[i % 2u];
+        for (size_t t = 0; t < sizeof(THREAD_COUNTS) / sizeof(*THREAD_COUNTS);
+             ++t) {
+            WangSolveResult parallel = {0};
+            assert(wang_solve_parallel(
+                &region,
+                &options,
+                WANG_SOLVER_OPTIMIZED,
+                THREAD_COUNTS[t],
+                &parallel
+            ) == expected);
+            if (expected == WANG_SOLVE_SAT) {
+                assert_sat_witness(&region, &parallel);
+                for (size_t cell = 0; cell < region.cell_count; ++cell) {
+                    assert((parallel.domains[cell] & ~initial[cell]) == 0);
+                }
+            } else {
+                assert_unsat_leaf(&region, &parallel, false);
+            }
+            wang_solve_result_destroy(&parallel);
+        }
+
+        wang_solve_result_destroy(&serial);
+        free(initial);
+        region_destroy(&region);
+    }
+}
+
+static void test_trace_runs_serially(void)
+{
+    Region region = {0};
+    assert(region_init(&region, 2, 1));
+    assert(region_set_active(&region, 0, 0, true));
+    assert(region_set_active(&region, 1, 0, true));
+    assert(region_set_boundary(&region, 0, 0, N, COLOR_V));
+    assert(region_set_boundary(&region, 0, 0, S, COLOR_V));
+
+    const WangSolverOptions options = {
+        .flags = WANG_SOLVE_TRACE_FAILED_LEAVES,
+        .failed_leaf_path = "build/tests/c/test_solver_parallel.trace",
+        .failed_leaf_capacity = 4,
+    };
+    WangSolveResult serial = {0};
+    WangSolveResult parallel = {0};
+    assert(wang_solve_optimized(&region, &options, &serial) ==
+           WANG_SOLVE_UNSAT);
+    assert(wang_solve_parallel(
+        &region,
+        &options,
+        WANG_SOLVER_OPTIMIZED,
+        4,
+        &parallel
+    ) == WANG_SOLVE_UNSAT);
+    assert(parallel.traced_leaf_count == serial.traced_leaf_count);
+    assert(parallel.conflict_cell == serial.conflict_cell);
+    assert(remove(options.failed_leaf_path) == 0);
+
+    wang_solve_result_destroy(&parallel);
+    wang_solve_result_destroy(&serial);
+    region_destroy(&region);
+}
+
+/* A checkpointed solve runs as one search, which a resume continues. */
+static void test_checkpoint_runs_serially(void)
+{
+    Region region = {0};
+    assert(region_init(&region, 6, 6));
+    for (int32_t y = 0; y < 6; ++y) {
+        for (int32_t x = 0; x < 6; ++x) {
+            assert(region_set_active(&region, x, y, true));
+        }
+    }
+
+    WangSolverOptions options = {
+        .flags = WANG_SOLVE_CHECKPOINT,
+        .checkpoint_path = "build/tests/c/test_solver_parallel.checkpoint",
+        .node_limit = 1,
+    };
+    WangSolveResult result = {0};
+    assert(wang_solve_parallel(
+        &region,
+        &options,
+        WANG_SOLVER_REFERENCE,
+        4,
+        &result
+    ) == WANG_SOLVE_ERROR);
+    assert(wang_solve_portfolio(&region, &options, NULL, 2, NULL, &result) ==
+           WANG_SOLVE_ERROR);
+    assert(wang_solve_parallel(
+        &region,
+        &options,
+        WANG_SOLVER_OPTIMIZED,
+        4,
+        &result
+    ) == WANG_SOLVE_UNKNOWN);
+    wang_solve_result_destroy(&result);
+
+    options.node_limit = 0;
+    assert(wang_solve_resume(&region, &options, &result) == WANG_SOLVE_SAT);
+    assert_sat_witness(&region, &result);
+    assert(remove(options.checkpoint_path) == 0);
+
+    wang_solve_result_destroy(&result);
+    region_destroy(&region);
+}
+
+static void test_rejects_invalid_inputs(void)
+{
+    Region region = {0};
+    assert(region_init(&region, 1, 1));
+    assert(region_set_active(&region, 0, 0, true));
+
+    WangSolveResult result = {0};
+    assert(wang_solve_parallel(NULL, NULL, WANG_SOLVER_OPTIMIZED, 2,
+                               &result) == WANG_SOLVE_ERROR);
+    assert(wang_solve_parallel(&region, NULL, (WangSolverEngine)7, 2,
+                               &result) == WANG_SOLVE_ERROR);
+    assert(wang_solve_parallel(&region, NULL, WANG_SOLVER_OPTIMIZED, 2,
+                               NULL) == WANG_SOLVE_ERROR);
+
+    assert(wang_solve_parallel(&region, NULL, WANG_SOLVER_OPTIMIZED, 0,
+                               &result) == WANG_SOLVE_SAT);
+    uint32_t *owned = result.domains;
+    assert(wang_solve_parallel(&region, NULL, WANG_SOLVER_OPTIMIZED, 2,
+                               &result) == WANG_SOLVE_ERROR);
+    assert(result.domains == owned);
+    assert(wang_solve_portfolio(&region, NULL, NULL, 2, NULL, &result) ==
+           WANG_SOLVE_ERROR);
+    assert(result.domains == owned);
+    wang_solve_result_destroy(&result);
+
+    WangPortfolioReport reports[2];
+    const WangPortfolioMember invalid[] = {
+        { .engine = WANG_SOLVER_OPTIMIZED },
+        { .engine = (WangSolverEngine)7 },
+    };
+    const WangSolverOptions traced = {
+        .flags = WANG_SOLVE_TRACE_FAILED_LEAVES,
+        .failed_leaf_path = "build/tests/c/test_solver_parallel.trace",
+        .failed_leaf_capacity = 4,
+    };
+    assert(wang_solve_portfolio(&region, NULL, NULL, 0, NULL, &result) ==
+           WANG_SOLVE_ERROR);
+    assert(wang_solve_portfolio(&region, NULL, invalid, 2, reports,
+                                &result) == WANG_SOLVE_ERROR);
+    assert(reports[0].status == WANG_SOLVE_ERROR && !reports[0].winner);
+    assert(wang_solve_portfolio(&region, &traced, NULL, 2, NULL, &result) ==
+           WANG_SOLVE_ERROR);
+    assert(wang_solve_portfolio(NULL, NULL, NULL, 2, NULL, &result) ==
+           WANG_SOLVE_ERROR);
+    assert(wang_solve_portfolio(&region, NULL, NULL, 2, reports, &result) ==
+           WANG_SOLVE_SAT);
+    assert(reports[0].winner != reports[1].winner);
+
+    wang_solve_result_destroy(&result);
+    region_destroy(&region);
+}
+
+int main(void)
+{
+    test_pipeline_instances();
+    test_random_regions_match_serial_status();
+    test_initial_domains_match_serial();
+    test_learning_matches_serial();
+    test_bitslice_matches_serial();
+    test_least_constraining_matches_serial();
+    test_probing_matches_serial();
+    test_weighted_degree_matches_serial();
+    test_frontier_sweeps_once();
+    test_components_match_serial();
+    test_trace_runs_serially();
+    test_checkpoint_runs_serially();
+    test_rejects_invalid_inputs();
+
+    puts("test_solver_parallel: OK");
+    return 0;
+}
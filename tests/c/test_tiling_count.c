@@ -0,0 +1,405 @@
+#include "wang/solver.h"
+
+#include "wang/tile.h"
+#include "wang/verify.h"
+
+#include <assert.h>
+#include <stdbool.h>
+#include <stdint.h>
+#include <stdio.h>
+#include <string.h>
+
+#define COUNT_CACHE_BYTES ((size_t)1 << 20)
+
+static uint32_t next_random(uint32_t *state)
+{
+    *state ^= *state << 13;
+    *state ^= *state >> 17;
+    *state ^= *state << 5;
+    return *state;
+}
+
+/*
+ * A width by height region with about one cell in inactive_one_in left out,
+ * one exposed side in four given the matching color of a random tile, and
+ * one active cell in narrow_one_in narrowed to a random set of six tiles.
+ */
+static void build_random_case(
+    Region *region,
+    uint32_t *domains,
+    int32_t width,
+    int32_t height,
+    uint32_t inactive_one_in,
+    uint32_t narrow_one_in,
+    uint32_t *random_state
+)
+{
+    assert(region_init(region, width, height));
+    for (int32_t y = 0; y < height; ++y) {
+        for (int32_t x = 0; x < width; ++x) {
+            const bool active =
+                next_random(random_state) % inactive_one_in != 0;
+            assert(region_set_active(region, x, y, active));
+        }
+    }
+    static const int32_t dx[DIR_COUNT] = { 0, 1, 0, -1 };
+    static const int32_t dy[DIR_COUNT] = { -1, 0, 1, 0 };
+    for (int32_t y = 0; y < height; ++y) {
+        for (int32_t x = 0; x < width; ++x) {
+            if (!region_cell_const(region, x, y)->active) {
+                continue;
+            }
+            for (Dir dir = N; dir < DIR_COUNT; ++dir) {
+                const RegionCell *neighbor =
+                    region_cell_const(region, x + dx[dir], y + dy[dir]);
+                if ((neighbor == NULL || !neighbor->active) &&
+                    next_random(random_state) % 4u == 0) {
+                    const TileId tile =
+                        (TileId)(next_random(random_state) % TILE_COUNT);
+                    assert(region_set_boundary(
+                        region, x, y, dir, TILESET[tile].edge[dir]));
+                }
+            }
+        }
+    }
+    for (size_t i = 0; i < region->cell_count; ++i) {
+        domains[i] = region->cells[i].active ? WANG_DOMAIN_ALL : 0;
+        if (domains[i] != 0 &&
+            next_random(random_state) % narrow_one_in == 0) {
+            domains[i] = 0;
+            for (size_t pick = 0; pick < 6; ++pick) {
+                domains[i] |= UINT32_C(1) <<
+                    (next_random(random_state) % TILE_COUNT);
+            }
+        }
+    }
+}
+
+/* Count by trying every tile of every cell in row-major order. */
+static uint64_t brute_force_count(
+    const Region *region,
+    const uint32_t *domains,
+    TileId *tiles,
+    size_t index
+)
+{
+    if (index == region->cell_count) {
+        return 1;
+    }
+    const RegionCell *cell = &region->cells[index];
+    if (!cell->active) {
+        tiles[index] = TILE_NONE;
+        return brute_force_count(region, domains, tiles, index + 1);
+    }
+
+    const size_t width = (size_t)region->width;
+    const bool has_west = index % width != 0 &&
+        region->cells[index - 1].active;
+    const bool has_north = index >= width &&
+        region->cells[index - width].active;
+    uint64_t total = 0;
+    for (TileId tile = 0; tile < TILE_COUNT; ++tile) {
+        const WangTile *candidate = &TILESET[tile];
+        bool fits = (domains[index] >> tile & 1u) != 0;
+        for (Dir dir = N; fits && dir < DIR_COUNT; ++dir) {
+            fits = cell->boundary[dir] == COLOR_NONE ||
+                cell->boundary[dir] == candidate->edge[dir];
+        }
+        fits = fits &&
+            (!has_west ||
+             wang_tiles_match(&TILESET[tiles[index - 1]], E, candidate)) &&
+            (!has_north ||
+             wang_tiles_match(&TILESET[tiles[index - width]], S, candidate));
+        if (fits) {
+            tiles[index] = tile;
+            total += brute_force_count(region, domains, tiles, index + 1);
+        }
+    }
+    return total;
+}
+
+static uint64_t count_value(const WangTilingCount *count)
+{
+    assert(count->limb_count <= 2);
+    uint64_t value = 0;
+    for (size_t i = count->limb_count; i > 0; --i) {
+        value = value << 32 | count->limbs[i - 1];
+    }
+    return value;
+}
+
+typedef struct {
+    const Region *region;
+    const uint32_t *domains;
+    uint64_t visits;
+    uint64_t stop_after;
+} VisitLog;
+
+/* Check each visited tiling and stop once stop_after have arrived. */
+static bool log_tiling(void *context, const TileId *tiles, size_t tile_count)
+{
+    VisitLog *log = context;
+    assert(tile_count == log->region->cell_count);
+    assert(wang_verify_tiling(log->region, tiles, tile_count) ==
+           WANG_VERIFY_VALID);
+    for (size_t i = 0; i < tile_count; ++i) {
+        assert(tiles[i] == TILE_NONE ||
+               (log->domains[i] >> tiles[i] & 1u) != 0);
+    }
+    ++log->visits;
+    return log->visits != log->stop_after;
+}
+
+/*
+ * Counts with and without the cache, and the enumerated tilings, must all
+ * match brute force on small regions with holes, boundaries and narrowed
+ * domains.
+ */
+static void test_counts_match_brute_force(void)
+{
+    size_t sat_count = 0;
+    size_t unsat_count = 0;
+    uint64_t cache_hits = 0;
+    uint32_t random_state = UINT32_C(0x6b43a9b5);
+
+    for (size_t sample = 0; sample < 200; ++sample) {
+        const int32_t width = 2 + (int32_t)(sample % 3);
+        const int32_t height = 2 + (int32_t)(sample / 3 % 2);
+        Region region = {0};
+        uint32_t domains[12];
+        build_random_case(&region, domains, width, height, 6u, 3u,
+                          &random_state);
+        TileId tiles[12];
+        const uint64_t expected =
+            brute_force_count(&region, domains, tiles, 0);
+        const WangSolverOptions options = {
+            .initial_domains = domains,
+            .initial_domain_count = region.cell_count,
+        };
+
+        WangTilingCount cached = {0};
+        const WangSolveStatus status = wang_count_tilings(
+            &region, &options, COUNT_CACHE_BYTES, NULL, NULL, &cached);
+        assert(status == (expected != 0 ? WANG_SOLVE_SAT : WANG_SOLVE_UNSAT));
+        assert(count_value(&cached) == expected);
+        assert(cached.cache_bytes <= COUNT_CACHE_BYTES);
+        cache_hits += cached.cache_hits;
+
+        WangTilingCount uncached = {0};
+        assert(wang_count_tilings(&region, &options, 0, NULL, NULL,
+                                  &uncached) == status);
+        assert(count_value(&uncached) == expected);
+        assert(uncached.cache_hits == 0 && uncached.cache_entries == 0);
+        assert(uncached.cache_bytes == 0);
+
+        VisitLog log = {
+            .region = &region,
+            .domains = domains,
+            .stop_after = UINT64_MAX,
+        };
+        WangTilingCount visited = {0};
+        assert(wang_count_tilings(&region, &options, COUNT_CACHE_BYTES,
+                                  log_tiling, &log, &visited) == status);
+        assert(log.visits == expected && count_value(&visited) == expected);
+        assert(visited.components == 0 && visited.cache_entries == 0);
+
+        sat_count += expected != 0;
+        unsat_count += expected == 0;
+        wang_tiling_count_destroy(&cached);
+        wang_tiling_count_destroy(&uncached);
+        wang_tiling_count_destroy(&visited);
+        assert(cached.limbs == NULL && cached.limb_count == 0);
+        region_destroy(&region);
+    }
+    assert(sat_count > 0 && unsat_count > 0 && cache_hits > 0);
+}
+
+/*
+ * A row of identical blocks: translated copies hit the cache, and the
+ * count, the block count to the power of the blocks, needs several limbs.
+ */
+static void test_repeated_blocks_share_cache_entries(void)
+{
+    enum { BLOCKS = 12, BLOCK_WIDTH = 2 };
+    Region block = {0};
+    assert(region_init(&block, BLOCK_WIDTH, 2));
+    for (int32_t y = 0; y < 2; ++y) {
+        for (int32_t x = 0; x < BLOCK_WIDTH; ++x) {
+            assert(region_set_active(&block, x, y, true));
+        }
+    }
+    uint32_t block_domains[4];
+    for (size_t i = 0; i < 4; ++i) {
+        block_domains[i] = WANG_DOMAIN_ALL;
+    }
+    TileId block_tiles[4];
+    const uint64_t per_block =
+        brute_force_count(&block, block_domains, block_tiles, 0);
+    assert(per_block > 1 && per_block < UINT32_MAX);
+
+    Region region = {0};
+    const int32_t width = BLOCKS * (BLOCK_WIDTH + 1) - 1;
+    assert(region_init(&region, width, 2));
+    for (int32_t y = 0; y < 2; ++y) {
+        for (int32_t x = 0; x < width; ++x) {
+            assert(region_set_active(
+                &region, x, y, x % (BLOCK_WIDTH + 1) != BLOCK_WIDTH));
+        }
+    }
+
+    /* per_block to the power BLOCKS, in base 2^32 limbs. */
+    uint32_t expected[BLOCKS + 1] = { 1 };
+    size_t expected_count = 1;
+    for (size_t b = 0; b < BLOCKS; ++b) {
+        uint64_t carry = 0;
+        for (size_t i = 0; i < expected_count; ++i) {
+            const uint64_t limb = expected[i] * per_block + carry;
+            expected[i] = (uint32_t)limb;
+            carry = limb >> 32;
+        }
+        if (carry != 0) {
+            expected[expected_count++] = (uint32_t)carry;
+        }
+    }
+    assert(expected_count > 2);
+
+    WangTilingCount count = {0};
+    assert(wang_count_tilings(&region, NULL, COUNT_CACHE_BYTES, NULL, NULL,
+                              &count) == WANG_SOLVE_SAT);
+    assert(count.limb_count == expected_count);
+    assert(memcmp(count.limbs, expected,
+                  expected_count * sizeof(*expected)) == 0);
+    assert(count.cache_hits >= BLOCKS - 1u);
+    assert(count.cache_entries > 0 && count.cache_refused == 0);
+
+    WangTilingCount uncached = {0};
+    assert(wang_count_tilings(&region, NULL, 0, NULL, NULL,
+                              &uncached) == WANG_SOLVE_SAT);
+    assert(uncached.limb_count == expected_count);
+    assert(memcmp(uncached.limbs, expected,
+                  expected_count * sizeof(*expected)) == 0);
+    assert(uncached.decisions > count.decisions);
+
+    /* A cache too small for any entry refuses them and still counts. */
+    WangTilingCount tiny = {0};
+    assert(wang_count_tilings(&region, NULL, 1, NULL, NULL,
+                              &tiny) == WANG_SOLVE_SAT);
+    assert(tiny.limb_count == expected_count);
+    assert(tiny.cache_hits == 0 && tiny.cache_entries == 0);
+    assert(tiny.cache_bytes == 0 && tiny.cache_refused > 0);
+
+    wang_tiling_count_destroy(&count);
+    wang_tiling_count_destroy(&uncached);
+    wang_tiling_count_destroy(&tiny);
+    region_destroy(&region);
+    region_destroy(&block);
+}
+
+/* Isolated cells count every tile their boundary allows. */
+static void test_isolated_cells_count_their_domains(void)
+{
+    Region region = {0};
+    assert(region_init(&region, 3, 1));
+    assert(region_set_active(&region, 0, 0, true));
+    assert(region_set_active(&region, 2, 0, true));
+    assert(region_set_boundary(&region, 2, 0, N, COLOR_B));
+    uint32_t domains[3] = { WANG_DOMAIN_ALL, 0, WANG_DOMAIN_ALL };
+    TileId tiles[3];
+    const uint64_t expected = brute_force_count(&region, domains, tiles, 0);
+    assert(expected > TILE_COUNT);
+
+    WangTilingCount count = {0};
+    assert(wang_count_tilings(&region, NULL, COUNT_CACHE_BYTES, NULL, NULL,
+                              &count) == WANG_SOLVE_SAT);
+    assert(count_value(&count) == expected);
+    wang_tiling_count_destroy(&count);
+
+    WangRootFixpoint root = {0};
+    assert(wang_root_fixpoint_compute(&region, &root));
+    const WangSolverOptions options = {
+        .initial_domains = domains,
+        .initial_domain_count = 3,
+        .root_fixpoint = &root,
+    };
+    assert(wang_count_tilings(&region, &options, 0, NULL, NULL,
+                              &count) == WANG_SOLVE_SAT);
+    assert(count_value(&count) == expected);
+    wang_tiling_count_destroy(&count);
+    wang_root_fixpoint_destroy(&root);
+    region_destroy(&region);
+}
+
+static void test_bounds_visitor_stop_and_invalid_inputs(void)
+{
+    Region region = {0};
+    assert(region_init(&region, 3, 2));
+    for (int32_t y = 0; y < 2; ++y) {
+        for (int32_t x = 0; x < 3; ++x) {
+            assert(region_set_active(&region, x, y, true));
+        }
+    }
+
+    uint32_t domains[6];
+    for (size_t i = 0; i < 6; ++i) {
+        domains[i] = WANG_DOMAIN_ALL;
+    }
+    VisitLog log = {
+        .region = &region,
+        .domains = domains,
+        .stop_after = 3,
+    };
+    WangTilingCount count = {0};
+    assert(wang_count_tilings(&region, NULL, 0, log_tiling, &log,
+                              &count) == WANG_SOLVE_UNKNOWN);
+    assert(log.visits == 3 && count_value(&count) == 3);
+    wang_tiling_count_destroy(&count);
+
+    const WangSolverOptions limited = { .node_limit = 1 };
+    assert(wang_count_tilings(&region, &limited, COUNT_CACHE_BYTES, NULL,
+                              NULL, &count) == WANG_SOLVE_UNKNOWN);
+    assert(count.limbs == NULL && count.limb_count == 0);
+    assert(count.decisions == 1);
+    wang_tiling_count_destroy(&count);
+
+    domains[4] = 0;
+    const WangSolverOptions contradiction = {
+        .initial_domains = domains,
+        .initial_domain_count = 6,
+    };
+    assert(wang_count_tilings(&region, &contradiction, COUNT_CACHE_BYTES,
+                              NULL, NULL, &count) == WANG_SOLVE_UNSAT);
+    assert(count.limbs == NULL && count.limb_count == 0);
+    assert(count.decisions == 0);
+    wang_tiling_count_destroy(&count);
+
+    const WangSolverOptions metrics = {
+        .flags = WANG_SOLVE_COLLECT_METRICS,
+    };
+    assert(wang_count_tilings(&region, &metrics, 0, NULL, NULL,
+                              &count) == WANG_SOLVE_ERROR);
+    const WangSolverOptions bitslice = {
+        .flags = WANG_SOLVE_BITSLICE_PROPAGATION,
+    };
+    assert(wang_count_tilings(&region, &bitslice, 0, NULL, NULL,
+                              &count) == WANG_SOLVE_SAT);
+    assert(wang_count_tilings(&region, NULL, 0, NULL, NULL,
+                              &count) == WANG_SOLVE_ERROR);
+    wang_tiling_count_destroy(&count);
+    assert(wang_count_tilings(NULL, NULL, 0, NULL, NULL,
+                              &count) == WANG_SOLVE_ERROR);
+    assert(wang_count_tilings(&region, NULL, 0, NULL, NULL,
+                              NULL) == WANG_SOLVE_ERROR);
+    assert(count.limbs == NULL && count.decisions == 0);
+    wang_tiling_count_destroy(NULL);
+    region_destroy(&region);
+}
+
+int main(void)
+{
+    test_counts_match_brute_force();
+    test_repeated_blocks_share_cache_entries();
+    test_isolated_cells_count_their_domains();
+    test_bounds_visitor_stop_and_invalid_inputs();
+    puts("test_tiling_count: OK");
+    return 0;
+}
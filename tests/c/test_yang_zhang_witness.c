@@ -478,6 +478,80 @@ static void test_extraction_is_transactional_and_correspondence_is_tri_state(voi
     yang_zhang_reduction_destroy(&reduction);
 }
 
+static void test_invalid_batch_arguments(void)
+{
+    Cm13Clause clauses[] = {
+        { .variable_index = { 0, 0, 1 } },
+        { .variable_index = { 0, 1, 1 } },
+    };
+    Cm13Formula formula = {
+        .variable_count = 2,
+        .clauses = clauses,
+        .clause_count = 2,
+    };
+    const bool assignments[] = { true, false, false, true };
+    YangZhangReduction reduction = {0};
+    YangZhangReduction destroyed = {0};
+    int8_t statuses[2] = { 7, 7 };
+
+    assert(yang_zhang_build(&formula, &reduction));
+    const size_t cell_count = reduction.region.cell_count;
+    TileId *tilings = malloc(2 * cell_count * sizeof(*tilings));
+    assert(tilings != NULL);
+
+    assert(!yang_zhang_solve_assignment_batch(
+        &formula, &reduction, assignments, 2, 1,
+        YANG_ZHANG_EXTENSION_REFERENCE, statuses, NULL, 0
+    ));
+    assert(!yang_zhang_solve_assignment_batch(
+        &formula, &reduction, NULL, 2, 2,
+        YANG_ZHANG_EXTENSION_REFERENCE, statuses, NULL, 0
+    ));
+    assert(!yang_zhang_solve_assignment_batch(
+        &formula, &reduction, assignments, 2, 2,
+        YANG_ZHANG_EXTENSION_REFERENCE, NULL, NULL, 0
+    ));
+    assert(!yang_zhang_solve_assignment_batch(
+        &formula, &destroyed, assignments, 2, 2,
+        YANG_ZHANG_EXTENSION_REFERENCE, statuses, NULL, 0
+    ));
+    assert(!yang_zhang_solve_assignment_batch(
+        &formula, &reduction, assignments, 2, 2,
+        (YangZhangExtensionSolver)2, statuses, NULL, 0
+    ));
+    assert(!yang_zhang_solve_assignment_batch(
+        &formula, &reduction, assignments, 2, 2,
+        YANG_ZHANG_EXTENSION_REFERENCE, statuses, NULL, cell_count
+    ));
+    assert(!yang_zhang_solve_assignment_batch(
+        &formula, &reduction, assignments, 2, 2,
+        YANG_ZHANG_EXTENSION_REFERENCE, statuses, tilings, cell_count
+    ));
+    assert(!yang_zhang_solve_assignment_batch(
+        &formula, &reduction, assignments, SIZE_MAX, 2,
+        YANG_ZHANG_EXTENSION_REFERENCE, statuses, NULL, 0
+    ));
+    assert(statuses[0] == 7 && statuses[1] == 7);
+
+    assert(yang_zhang_solve_assignment_batch(
+        &formula, &reduction, NULL, 0, 2,
+        YANG_ZHANG_EXTENSION_OPTIMIZED, NULL, NULL, 0
+    ));
+    assert(yang_zhang_solve_assignment_batch(
+        &formula, &reduction, assignments, 2, 2,
+        YANG_ZHANG_EXTENSION_OPTIMIZED, statuses, NULL, 0
+    ));
+    assert(statuses[0] == (assignment_is_valid(&formula, UINT32_C(1))
+        ? WANG_SOLVE_SAT
+        : WANG_SOLVE_UNSAT));
+    assert(statuses[1] == (assignment_is_valid(&formula, UINT32_C(2))
+        ? WANG_SOLVE_SAT
+        : WANG_SOLVE_UNSAT));
+
+    free(tilings);
+    yang_zhang_reduction_destroy(&reduction);
+}
+
 static void report_exhaustive_failure(
     const Cm13Formula *formula,
     uint32_t assignment_bits,
@@ -604,6 +678,83 @@ static void assert_assignment_equivalence(
     wang_solve_result_destroy(&result);
 }
 
+/* One batched call per formula must reproduce every single-call result. */
+static void assert_batch_matches_single_calls(
+    const Cm13Formula *formula,
+    YangZhangReduction *reduction,
+    YangZhangExtensionSolver solver
+)
+{
+    const size_t variable_count = formula->variable_count;
+    const size_t row_count = (size_t)1 << variable_count;
+    const size_t cell_count = reduction->region.cell_count;
+    bool *assignments = malloc(
+        row_count * variable_count * sizeof(*assignments)
+    );
+    int8_t *statuses = malloc(row_count * sizeof(*statuses));
+    TileId *tilings = malloc(row_count * cell_count * sizeof(*tilings));
+    assert(assignments != NULL && statuses != NULL && tilings != NULL);
+
+    for (size_t row = 0; row < row_count; ++row) {
+        for (size_t variable = 0; variable < variable_count; ++variable) {
+            assignments[row * variable_count + variable] =
+                ((row >> variable) & 1u) != 0;
+        }
+    }
+    assert(yang_zhang_solve_assignment_batch(
+        formula,
+        reduction,
+        assignments,
+        row_count,
+        variable_count,
+        solver,
+        statuses,
+        tilings,
+        row_count * cell_count
+    ));
+
+    for (size_t row = 0; row < row_count; ++row) {
+        WangSolveResult result = {0};
+        const WangSolveStatus status = yang_zhang_solve_assignment_extension(
+            formula,
+            reduction,
+            assignments + row * variable_count,
+            variable_count,
+            solver,
+            &result
+        );
+        const TileId *batch_tiling = tilings + row * cell_count;
+        if (statuses[row] != (int8_t)status) {
+            report_exhaustive_failure(
+                formula,
+                (uint32_t)row,
+                solver,
+                (WangSolveStatus)statuses[row],
+                &result
+            );
+            abort();
+        }
+        if (status == WANG_SOLVE_SAT) {
+            TileId *tiling = tiling_from_result(&reduction->region, &result);
+            assert(memcmp(
+                tiling,
+                batch_tiling,
+                cell_count * sizeof(*tiling)
+            ) == 0);
+            free(tiling);
+        } else {
+            for (size_t index = 0; index < cell_count; ++index) {
+                assert(batch_tiling[index] == TILE_NONE);
+            }
+        }
+        wang_solve_result_destroy(&result);
+    }
+
+    free(tilings);
+    free(statuses);
+    free(assignments);
+}
+
 static void enumerate_canonical_formulas(
     Cm13Formula *formula,
     uint8_t remaining[3],
@@ -632,6 +783,16 @@ static void enumerate_canonical_formulas(
                 YANG_ZHANG_EXTENSION_OPTIMIZED
             );
         }
+        assert_batch_matches_single_calls(
+            formula,
+            &reduction,
+            YANG_ZHANG_EXTENSION_REFERENCE
+        );
+        assert_batch_matches_single_calls(
+            formula,
+            &reduction,
+            YANG_ZHANG_EXTENSION_OPTIMIZED
+        );
 
         yang_zhang_reduction_destroy(&reduction);
         ++*case_count;
@@ -694,6 +855,7 @@ int main(void)
     test_extension_extracts_the_requested_assignment();
     test_bridge_ignores_swap_trace();
     test_invalid_bridge_arguments();
+    test_invalid_batch_arguments();
     test_extraction_is_transactional_and_correspondence_is_tri_state();
     test_all_assignments_for_canonical_formulas();
 
@@ -6,10 +6,14 @@ from tempfile import TemporaryDirectory
 import unittest
 from unittest.mock import patch
 
+from model.formula import Formula
 from native.formula_adapter import (
     FormulaLoadError,
     FormulaParseStatus,
+    _copy_formula,
+    _marshalled_formula,
     load_formula,
+    parse_formula,
 )
 
 
@@ -79,6 +83,35 @@ class NativeFormulaTests(unittest.TestCase):
         self.assertEqual(raised.exception.status, FormulaParseStatus.IO_ERROR)
         self.assertEqual((raised.exception.line, raised.exception.column), (0, 0))
 
+    def test_parses_in_memory_text_with_file_diagnostics(self) -> None:
+        for text in (VALID_FORMULA, VALID_FORMULA.encode("ascii")):
+            with self.subTest(kind=type(text).__name__):
+                formula = parse_formula(text)
+                self.assertEqual(
+                    formula.clauses,
+                    ((0, 0, 2), (1, 1, 2), (0, 1, 2)),
+                )
+
+        with self.assertRaises(FormulaLoadError) as raised:
+            parse_formula("p cm13 1 1\n2 1 1 0\n")
+
+        self.assertEqual(raised.exception.status, FormulaParseStatus.DOMAIN_ERROR)
+        self.assertEqual((raised.exception.line, raised.exception.column), (2, 1))
+        self.assertEqual(raised.exception.path, "<memory>")
+
+    def test_marshals_python_formula_through_packed_indices(self) -> None:
+        formula = Formula(
+            variable_count=3,
+            clauses=((0, 0, 2), (1, 1, 2), (0, 1, 2)),
+        )
+
+        with _marshalled_formula(formula) as native_formula:
+            self.assertEqual(_copy_formula(native_formula), formula)
+
+        with self.assertRaises(TypeError):
+            with _marshalled_formula(VALID_FORMULA):  # type: ignore[arg-type]
+                pass
+
     def test_releases_native_formula_when_python_copy_fails(self) -> None:
         class RecordingLibrary:
             destroyed = False
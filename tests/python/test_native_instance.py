@@ -0,0 +1,674 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+import io
+from itertools import product
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from model.formula import Formula
+from model.tileset import TILESET
+from native.instance_adapter import (
+    NativeInstance,
+    cached_instance,
+    clear_instance_cache,
+    solve_cubes,
+    solve_many,
+)
+from native.formula_adapter import load_formula
+from native.reduction_adapter import load_formula_and_region
+from native.witness_adapter import (
+    CancelFlag,
+    RootCacheStats,
+    SolverContext,
+    _SolveOptions,
+    _WangSolverMetrics,
+    _solve_native,
+)
+from oracles.tiling_check import is_valid_tiling
+from oracles.tiling_solver import TilingSolveStatus
+from oracles.witness_check import is_valid_assignment
+from crosscheck.witness_pipeline import solve_native_and_extract
+
+
+INSTANCE_DIRECTORY = Path(__file__).resolve().parents[1] / "instances"
+SAT_PATH = INSTANCE_DIRECTORY / "pipeline_sat.cm13"
+UNSAT_PATH = INSTANCE_DIRECTORY / "pipeline_unsat.cm13"
+# Three satisfying assignments; propagation leaves the reduction open.
+THREE_SOLUTIONS_CM13 = (
+    "p cm13 6 6\n"
+    "1 2 3 0\n"
+    "4 5 6 0\n"
+    "1 4 5 0\n"
+    "2 5 6 0\n"
+    "3 4 6 0\n"
+    "1 2 3 0\n"
+)
+# Three variable pairs that share no clause; the root splits into components.
+INDEPENDENT_PAIRS = Formula(
+    6,
+    ((0, 0, 1), (0, 1, 1), (2, 2, 3), (2, 3, 3), (4, 4, 5), (4, 5, 5)),
+)
+# UNSAT only after search; its failed leaves explain a nogood.
+SEARCHED_UNSAT = Formula(
+    5,
+    ((1, 2, 3), (2, 3, 4), (0, 3, 4), (0, 1, 2), (0, 1, 4)),
+)
+# Optimized-only solve options, each with an instance on which it changes
+# the search and the native counter that shows it did. No instance here
+# fails the 100 leaves that precede the first restart.
+OPTIMIZED_OPTIONS: tuple[
+    tuple[dict[str, object], Formula | Path, str | None],
+    ...,
+] = (
+    ({"decompose": True}, INDEPENDENT_PAIRS, "components"),
+    ({"learn": True}, SEARCHED_UNSAT, "nogoods_learned"),
+    ({"restarts": "luby", "seed": 7}, SEARCHED_UNSAT, None),
+    ({"restarts": "geometric", "seed": 7}, SEARCHED_UNSAT, None),
+    ({"bitslice": True}, SAT_PATH, "bitslice_passes"),
+    ({"frontier": True}, SAT_PATH, "frontier_states"),
+    ({"least_constraining": True}, SEARCHED_UNSAT, "value_scorings"),
+    ({"probe": True}, SEARCHED_UNSAT, "probe_prunes"),
+    ({"probe": True, "probe_budget": 0.05}, SAT_PATH, "probe_prunes"),
+    ({"weighted_degree": True}, SEARCHED_UNSAT, "weight_bumps"),
+)
+# Optimized-only options whose serial solve keeps the default witness.
+WITNESS_PRESERVING_OPTIONS: tuple[dict[str, object], ...] = (
+    {"bitslice": True},
+)
+# Invalid optimized solve options, with the rejection.
+CONFLICTING_OPTIONS: tuple[tuple[dict[str, object], str], ...] = (
+    ({"learn": True, "decompose": True}, "decompose"),
+    ({"restarts": "never"}, "luby"),
+    ({"restarts": "luby", "seed": -1}, "seed"),
+    ({"restarts": "luby", "decompose": True}, "decompose"),
+    ({"probe_budget": 0.05}, "requires probe"),
+    *(
+        ({"probe": True, "probe_budget": budget}, "positive")
+        for budget in (0, float("inf"), float("nan"))
+    ),
+)
+
+
+@contextmanager
+def three_solution_path() -> Iterator[Path]:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "three_solutions.cm13"
+        path.write_text(THREE_SOLUTIONS_CM13, encoding="ascii")
+        yield path
+
+
+def solve_metrics(
+    instance: NativeInstance,
+    **options: object,
+) -> _WangSolverMetrics:
+    """Solve ``instance`` on the optimized engine and return its counters."""
+    metrics = _WangSolverMetrics()
+    _solve_native(
+        instance._native_reduction,
+        instance.region,
+        _SolveOptions(optimized=True, **options),
+        metrics=metrics,
+    )
+    return metrics
+
+
+class NativeInstanceTests(unittest.TestCase):
+    def test_reuses_one_parse_for_every_native_operation(self) -> None:
+        formula, region = load_formula_and_region(SAT_PATH)
+
+        with NativeInstance(SAT_PATH) as instance:
+            self.assertEqual(instance.formula, formula)
+            self.assertEqual(instance.region, region)
+
+            solved = instance.solve(optimized=True)
+            self.assertEqual(solved.status, TilingSolveStatus.SAT)
+            self.assertTrue(is_valid_tiling(region, TILESET, solved.tiling))
+            assignment = instance.extract(solved.tiling)
+            self.assertIsNotNone(assignment)
+            self.assertTrue(is_valid_assignment(formula, assignment))
+            self.assertTrue(instance.correspond(assignment, solved.tiling))
+
+            extended = instance.extend(assignment)
+            self.assertEqual(extended.status, TilingSolveStatus.SAT)
+            self.assertEqual(instance.extract(extended.tiling), assignment)
+
+            _, _, piped, extracted = solve_native_and_extract(instance)
+            self.assertEqual(piped.status, TilingSolveStatus.SAT)
+            self.assertIsNotNone(extracted)
+            self.assertFalse(instance.closed)
+
+        self.assertTrue(instance.closed)
+
+    def test_search_bounds_return_unknown_without_a_tiling(self) -> None:
+        cancel = CancelFlag()
+        cancel.set()
+        with NativeInstance(SAT_PATH) as instance:
+            for optimized in (False, True):
+                with self.subTest(optimized=optimized):
+                    for bounds in (
+                        {"node_limit": 1},
+                        {"cancel": cancel},
+                        {"timeout": 1e-9},
+                    ):
+                        result = instance.solve(optimized=optimized, **bounds)
+                        self.assertEqual(
+                            result.status,
+                            TilingSolveStatus.UNKNOWN,
+                        )
+                        self.assertIsNone(result.tiling)
+
+            cancel.clear()
+            result = instance.solve(
+                optimized=True,
+                timeout=60.0,
+                node_limit=10**9,
+                cancel=cancel,
+            )
+            self.assertEqual(result.status, TilingSolveStatus.SAT)
+
+            for bounds in (
+                {"node_limit": 0},
+                {"node_limit": True},
+                {"timeout": 0},
+                {"timeout": float("inf")},
+                {"timeout": float("nan")},
+            ):
+                with self.subTest(bounds=bounds):
+                    with self.assertRaises(ValueError):
+                        instance.solve(**bounds)
+
+    def test_accepts_an_in_memory_formula_without_a_file(self) -> None:
+        formula = load_formula(SAT_PATH)
+        _, expected_region = load_formula_and_region(SAT_PATH)
+
+        self.assertEqual(load_formula_and_region(formula), (formula, expected_region))
+        with NativeInstance(formula) as instance:
+            self.assertIsNone(instance.path)
+            self.assertIs(instance.formula, formula)
+            self.assertEqual(instance.region, expected_region)
+            self.assertEqual(instance.solve().status, TilingSolveStatus.SAT)
+
+        _, _, result, extracted = solve_native_and_extract(formula, optimized=True)
+        self.assertEqual(result.status, TilingSolveStatus.SAT)
+        self.assertTrue(is_valid_assignment(formula, extracted))
+
+    def test_batched_extensions_match_single_extensions(self) -> None:
+        for path in (SAT_PATH, UNSAT_PATH):
+            with NativeInstance(path) as instance:
+                assignments = list(
+                    product(
+                        (False, True),
+                        repeat=instance.formula.variable_count,
+                    )
+                )
+                for optimized in (False, True):
+                    with self.subTest(path=path.name, optimized=optimized):
+                        expected = tuple(
+                            instance.extend(assignment, optimized=optimized)
+                            for assignment in assignments
+                        )
+                        self.assertEqual(
+                            instance.extend_many(
+                                iter(assignments),
+                                optimized=optimized,
+                            ),
+                            expected,
+                        )
+                        self.assertEqual(
+                            instance.extension_statuses(
+                                assignments,
+                                optimized=optimized,
+                            ),
+                            tuple(result.status for result in expected),
+                        )
+
+                self.assertEqual(instance.extend_many([]), ())
+                with self.assertRaisesRegex(ValueError, "assignment length"):
+                    instance.extend_many(
+                        [assignments[0], assignments[0] + (True,)]
+                    )
+                with self.assertRaisesRegex(ValueError, "only booleans"):
+                    instance.extension_statuses(
+                        [(1,) * instance.formula.variable_count]
+                    )
+
+    def test_solver_context_reuse_matches_fresh_solves(self) -> None:
+        with NativeInstance(SAT_PATH) as sat, NativeInstance(
+            UNSAT_PATH
+        ) as unsat, SolverContext() as context:
+            for _ in range(2):
+                for instance in (sat, unsat, sat):
+                    for optimized in (False, True):
+                        with self.subTest(
+                            path=instance.path,
+                            optimized=optimized,
+                        ):
+                            self.assertEqual(
+                                instance.solve(
+                                    optimized=optimized,
+                                    context=context,
+                                ),
+                                instance.solve(optimized=optimized),
+                            )
+                context.reset()
+
+            self.assertEqual(
+                sat.solve(node_limit=1, context=context).status,
+                TilingSolveStatus.UNKNOWN,
+            )
+            self.assertEqual(
+                sat.solve(context=context).status,
+                TilingSolveStatus.SAT,
+            )
+
+        self.assertTrue(context.closed)
+        context.close()
+        with self.assertRaisesRegex(ValueError, "closed SolverContext"):
+            context.reset()
+        with NativeInstance(SAT_PATH) as instance:
+            with self.assertRaisesRegex(ValueError, "closed SolverContext"):
+                instance.solve(context=context)
+
+    def test_solver_context_root_cache(self) -> None:
+        with NativeInstance(SAT_PATH) as sat, NativeInstance(
+            UNSAT_PATH
+        ) as unsat, tempfile.TemporaryDirectory() as directory:
+            with SolverContext() as writer:
+                self.assertEqual(
+                    writer.root_cache_stats(),
+                    RootCacheStats(0, 0, 0, 0, 0, 0, 0, 0),
+                )
+                writer.enable_root_cache(1 << 20, directory)
+                for _ in range(2):
+                    for instance in (sat, unsat):
+                        for optimized in (False, True):
+                            self.assertEqual(
+                                instance.solve(
+                                    optimized=optimized,
+                                    context=writer,
+                                ),
+                                instance.solve(optimized=optimized),
+                            )
+                stats = writer.root_cache_stats()
+                self.assertEqual((stats.misses, stats.hits), (2, 6))
+                self.assertEqual(stats.disk_writes, 2)
+                self.assertEqual(stats.entry_count, 2)
+                self.assertEqual(len(os.listdir(directory)), 2)
+
+                writer.reset()
+                self.assertEqual(writer.root_cache_stats().entry_count, 0)
+                self.assertEqual(writer.root_cache_stats().hits, 6)
+
+            with SolverContext() as reader:
+                reader.enable_root_cache(0, Path(directory))
+                self.assertEqual(
+                    sat.solve(context=reader),
+                    sat.solve(),
+                )
+                self.assertEqual(reader.root_cache_stats().disk_hits, 1)
+
+                with self.assertRaisesRegex(ValueError, "limit_bytes"):
+                    reader.enable_root_cache(-1)
+                with self.assertRaisesRegex(ValueError, "existing directory"):
+                    reader.enable_root_cache(0, Path(directory) / "missing")
+
+        with self.assertRaisesRegex(ValueError, "closed SolverContext"):
+            reader.root_cache_stats()
+
+    def test_parallel_solve_matches_serial_status(self) -> None:
+        with NativeInstance(SAT_PATH) as sat, NativeInstance(
+            UNSAT_PATH
+        ) as unsat:
+            for instance in (sat, unsat):
+                for optimized in (False, True):
+                    expected = instance.solve(optimized=optimized)
+                    for threads in (1, 2, 4):
+                        with self.subTest(
+                            path=instance.path,
+                            optimized=optimized,
+                            threads=threads,
+                        ):
+                            result = instance.solve(
+                                optimized=optimized,
+                                threads=threads,
+                            )
+                            self.assertEqual(result.status, expected.status)
+                            if result.status is TilingSolveStatus.SAT:
+                                self.assertTrue(
+                                    is_valid_tiling(
+                                        instance.region,
+                                        TILESET,
+                                        result.tiling,
+                                    )
+                                )
+
+            self.assertEqual(
+                unsat.solve(threads=2, node_limit=1).status,
+                TilingSolveStatus.UNKNOWN,
+            )
+            with self.assertRaisesRegex(ValueError, "positive integer"):
+                sat.solve(threads=0)
+            with SolverContext() as context:
+                with self.assertRaisesRegex(ValueError, "context"):
+                    sat.solve(threads=2, context=context)
+
+    def test_optimized_options_preserve_status_and_need_optimized(
+        self,
+    ) -> None:
+        with NativeInstance(SAT_PATH) as sat, NativeInstance(
+            UNSAT_PATH
+        ) as unsat:
+            for options, source, counter in OPTIMIZED_OPTIONS:
+                for instance in (sat, unsat):
+                    expected = instance.solve(optimized=True)
+                    for threads in (None, 2):
+                        with self.subTest(
+                            options=options,
+                            path=instance.path,
+                            threads=threads,
+                        ):
+                            result = instance.solve(
+                                optimized=True,
+                                threads=threads,
+                                **options,
+                            )
+                            self.assertEqual(result.status, expected.status)
+                            if result.status is TilingSolveStatus.SAT:
+                                self.assertTrue(
+                                    is_valid_tiling(
+                                        instance.region,
+                                        TILESET,
+                                        result.tiling,
+                                    )
+                                )
+                            if (
+                                threads is None
+                                and options in WITNESS_PRESERVING_OPTIONS
+                            ):
+                                self.assertEqual(
+                                    result.tiling,
+                                    expected.tiling,
+                                )
+
+                with self.subTest(options=options, counter=counter):
+                    with self.assertRaisesRegex(ValueError, "optimized"):
+                        sat.solve(**options)
+                    if counter is not None:
+                        with NativeInstance(source) as instance:
+                            default = solve_metrics(instance)
+                            metrics = solve_metrics(instance, **options)
+                        self.assertEqual(getattr(default, counter), 0)
+                        self.assertGreater(getattr(metrics, counter), 0)
+
+    def test_rejects_conflicting_optimized_options(self) -> None:
+        with NativeInstance(SAT_PATH) as sat:
+            for options, message in CONFLICTING_OPTIONS:
+                with self.subTest(options=options):
+                    with self.assertRaisesRegex(ValueError, message):
+                        sat.solve(optimized=True, **options)
+
+    def test_checkpointed_solve_resumes_to_the_same_result(self) -> None:
+        with tempfile.TemporaryDirectory() as directory, NativeInstance(
+            SAT_PATH
+        ) as sat:
+            path = Path(directory) / "search.checkpoint"
+            expected = sat.solve(optimized=True)
+            stopped = sat.solve(optimized=True, checkpoint=path, node_limit=1)
+            self.assertIs(stopped.status, TilingSolveStatus.UNKNOWN)
+            self.assertTrue(path.exists())
+            resumed = sat.solve(optimized=True, checkpoint=path, resume=True)
+            self.assertIs(resumed.status, expected.status)
+            self.assertEqual(resumed.tiling, expected.tiling)
+
+            with self.assertRaisesRegex(ValueError, "optimized"):
+                sat.solve(checkpoint=path)
+            with self.assertRaisesRegex(ValueError, "requires checkpoint"):
+                sat.solve(optimized=True, resume=True)
+            for interval in (0, float("inf"), float("nan")):
+                with self.assertRaisesRegex(ValueError, "positive"):
+                    sat.solve(
+                        optimized=True,
+                        checkpoint=path,
+                        checkpoint_interval=interval,
+                    )
+            with self.assertRaisesRegex(ValueError, "threads"):
+                sat.solve(
+                    optimized=True,
+                    checkpoint=path,
+                    resume=True,
+                    threads=2,
+                )
+            with self.assertRaisesRegex(ValueError, "learn"):
+                sat.solve(optimized=True, checkpoint=path, learn=True)
+
+    def test_split_cubes_partition_the_solve(self) -> None:
+        with three_solution_path() as path, NativeInstance(path) as instance:
+            region = instance.region
+            single = instance.split(1)
+            self.assertEqual(len(single), 1)
+            cubes = instance.split(2)
+            self.assertGreaterEqual(len(cubes), 2)
+            for cube in cubes:
+                self.assertEqual(len(cube), len(region.active))
+                for mask, active, root in zip(cube, region.active, single[0]):
+                    self.assertEqual(mask != 0, bool(active))
+                    self.assertEqual(mask & ~root, 0)
+                result = instance.solve(optimized=True, initial_domains=cube)
+                self.assertIs(result.status, TilingSolveStatus.SAT)
+                self.assertTrue(
+                    is_valid_tiling(region, TILESET, result.tiling)
+                )
+                self.assertTrue(
+                    all(
+                        mask >> tile & 1
+                        for mask, tile in zip(cube, result.tiling)
+                        if tile is not None
+                    )
+                )
+
+            with self.assertRaisesRegex(ValueError, "cube_count"):
+                instance.split(0)
+            with self.assertRaisesRegex(ValueError, "length"):
+                instance.solve(initial_domains=cubes[0][1:])
+            with self.assertRaisesRegex(ValueError, "bitmasks"):
+                instance.solve(initial_domains=(1 << 23,) * len(cubes[0]))
+            inactive = region.active.index(0)
+            with self.assertRaisesRegex(ValueError, "inactive"):
+                instance.solve(
+                    initial_domains=cubes[0][:inactive]
+                    + (1,)
+                    + cubes[0][inactive + 1 :]
+                )
+
+        with NativeInstance(UNSAT_PATH) as unsat:
+            self.assertEqual(unsat.split(4), ())
+
+    def test_counts_and_enumerates_every_tiling(self) -> None:
+        with three_solution_path() as path, NativeInstance(path) as instance:
+            region = instance.region
+            self.assertEqual(instance.count_tilings(), 3)
+            self.assertEqual(instance.count_tilings(cache_bytes=0), 3)
+
+            tilings = []
+            stream = io.BytesIO()
+            self.assertEqual(
+                instance.count_tilings(visit=tilings.append, stream=stream),
+                3,
+            )
+            self.assertEqual(
+                stream.getvalue(),
+                b"".join(tiling.data for tiling in tilings),
+            )
+            self.assertEqual(len({tiling.data for tiling in tilings}), 3)
+            assignments = set()
+            for tiling in tilings:
+                self.assertTrue(is_valid_tiling(region, TILESET, tiling))
+                assignment = instance.extract(tiling)
+                self.assertTrue(
+                    is_valid_assignment(instance.formula, assignment)
+                )
+                assignments.add(assignment)
+            self.assertEqual(len(assignments), 3)
+
+            self.assertIsNone(instance.count_tilings(visit=lambda _: False))
+            self.assertIsNone(instance.count_tilings(node_limit=1))
+
+            def fail(_: object) -> None:
+                raise LookupError("visit failed")
+
+            with self.assertRaisesRegex(LookupError, "visit failed"):
+                instance.count_tilings(visit=fail)
+            with self.assertRaisesRegex(ValueError, "cache_bytes"):
+                instance.count_tilings(cache_bytes=-1)
+
+        with NativeInstance(SAT_PATH) as sat, NativeInstance(UNSAT_PATH) as unsat:
+            self.assertEqual(sat.count_tilings(), 1)
+            self.assertEqual(unsat.count_tilings(), 0)
+
+    def test_close_is_idempotent_and_blocks_later_operations(self) -> None:
+        instance = NativeInstance(UNSAT_PATH)
+        self.assertEqual(instance.solve().status, TilingSolveStatus.UNSAT)
+
+        instance.close()
+        instance.close()
+
+        with self.assertRaisesRegex(ValueError, "closed NativeInstance"):
+            instance.solve()
+        with self.assertRaisesRegex(ValueError, "closed NativeInstance"):
+            with instance:
+                pass
+
+    def test_releases_formula_when_reduction_build_fails(self) -> None:
+        events: list[str] = []
+
+        @contextmanager
+        def built_reduction(native_formula):
+            try:
+                raise RuntimeError("build failed")
+                yield
+            finally:
+                events.append("reduction")
+
+        with patch(
+            "native.instance_adapter._built_reduction",
+            built_reduction,
+        ), patch(
+            "native.formula_adapter._formula_library",
+        ) as formula_library:
+            formula_library.return_value.cm13_formula_load_path.return_value = 0
+            with self.assertRaisesRegex(RuntimeError, "build failed"):
+                NativeInstance(SAT_PATH)
+
+        self.assertEqual(events, ["reduction"])
+        formula_library.return_value.cm13_formula_destroy.assert_called_once()
+
+
+class SolveManyTests(unittest.TestCase):
+    def test_yields_every_instance_with_its_own_result(self) -> None:
+        with NativeInstance(SAT_PATH) as sat, NativeInstance(UNSAT_PATH) as unsat:
+            instances = [sat, unsat, sat, unsat, sat]
+            results = list(solve_many(instances, optimized=True, workers=3))
+
+        self.assertEqual(len(results), len(instances))
+        self.assertEqual(
+            sorted(
+                (instance is sat, result.status.value)
+                for instance, result in results
+            ),
+            [(False, "unsat")] * 2 + [(True, "sat")] * 3,
+        )
+        for instance, result in results:
+            if result.status is TilingSolveStatus.SAT:
+                self.assertTrue(
+                    is_valid_tiling(instance.region, TILESET, result.tiling)
+                )
+
+    def test_rejects_invalid_worker_counts_and_propagates_failures(self) -> None:
+        with self.assertRaisesRegex(ValueError, "workers"):
+            list(solve_many([], workers=0))
+
+        instance = NativeInstance(SAT_PATH)
+        instance.close()
+        with self.assertRaisesRegex(ValueError, "closed NativeInstance"):
+            list(solve_many([instance], workers=1))
+
+
+class SolveCubesTests(unittest.TestCase):
+    def test_first_sat_cube_wins_and_unsat_needs_every_cube(self) -> None:
+        with three_solution_path() as path:
+            for optimized in (True, False):
+                with self.subTest(optimized=optimized):
+                    result = solve_cubes(
+                        path,
+                        cube_count=3,
+                        workers=2,
+                        optimized=optimized,
+                    )
+                    self.assertIs(result.status, TilingSolveStatus.SAT)
+                    with NativeInstance(path) as instance:
+                        self.assertTrue(
+                            is_valid_tiling(
+                                instance.region,
+                                TILESET,
+                                result.tiling,
+                            )
+                        )
+
+        self.assertIs(
+            solve_cubes(UNSAT_PATH, workers=2).status,
+            TilingSolveStatus.UNSAT,
+        )
+
+    def test_rejects_invalid_bounds(self) -> None:
+        with self.assertRaisesRegex(ValueError, "workers"):
+            solve_cubes(SAT_PATH, workers=0)
+        with self.assertRaisesRegex(ValueError, "cube_count"):
+            solve_cubes(SAT_PATH, cube_count=0, workers=1)
+        for timeout in (0, float("inf"), float("nan")):
+            with self.assertRaisesRegex(ValueError, "timeout"):
+                solve_cubes(SAT_PATH, workers=1, timeout=timeout)
+        with self.assertRaisesRegex(ValueError, "node_limit"):
+            solve_cubes(SAT_PATH, workers=1, node_limit=0)
+
+
+class NativeInstanceCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        clear_instance_cache()
+        self.addCleanup(clear_instance_cache)
+
+    def test_returns_the_same_open_instance_for_an_unchanged_file(self) -> None:
+        first = cached_instance(SAT_PATH)
+        second = cached_instance(str(SAT_PATH))
+
+        self.assertIs(first, second)
+        self.assertFalse(first.closed)
+
+        clear_instance_cache()
+        self.assertTrue(first.closed)
+
+    def test_reparses_and_closes_a_stale_entry_after_the_file_changes(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "formula.cm13"
+            shutil.copyfile(SAT_PATH, path)
+            first = cached_instance(path)
+
+            shutil.copyfile(UNSAT_PATH, path)
+            status = os.stat(path)
+            os.utime(
+                path,
+                ns=(status.st_atime_ns, status.st_mtime_ns + 1_000_000_000),
+            )
+            second = cached_instance(path)
+
+            self.assertIsNot(first, second)
+            self.assertTrue(first.closed)
+            self.assertEqual(second.solve().status, TilingSolveStatus.UNSAT)
+            clear_instance_cache()
+
+
+if __name__ == "__main__":
+    unittest.main()
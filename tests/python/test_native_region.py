@@ -1,3 +1,4 @@
+from ctypes import sizeof
 from pathlib import Path
 import unittest
 from unittest.mock import patch
@@ -6,13 +7,19 @@ from model.formula import Formula
 from model.region import COLOR_NONE
 from native.formula_adapter import FormulaParseStatus, _Cm13Formula
 from native.region_adapter import (
+    NativeRegion,
     RegionBuildError,
     _Region,
     _RegionCell,
     _build_region,
     _copy_region,
+    _native_cells,
+    _packed_region,
+)
+from native.reduction_adapter import (
+    load_formula_and_native_region,
+    load_formula_and_region,
 )
-from native.reduction_adapter import load_formula_and_region
 
 
 INSTANCE_DIRECTORY = Path(__file__).resolve().parents[1] / "instances"
@@ -64,6 +71,71 @@ class NativeRegionCopyTests(unittest.TestCase):
             112,
         )
 
+    def test_packed_region_splits_cells_into_python_owned_planes(self) -> None:
+        cells = (_RegionCell * 2)()
+        cells[0].active = True
+        cells[0].boundary[:] = (0, 1, 2, 3)
+        cells[1].boundary[:] = (255, 255, 255, 255)
+        native_region = _Region(width=1, height=2, cell_count=2, cells=cells)
+
+        packed = _packed_region(native_region)
+        cells[0].boundary[0] = 15
+
+        self.assertIsInstance(packed, NativeRegion)
+        self.assertEqual(
+            (packed.width, packed.height, packed.cell_count),
+            (1, 2, 2),
+        )
+        self.assertEqual(packed.active.tolist(), [True, False])
+        self.assertEqual(
+            packed.boundary.tolist(),
+            [[0, 1, 2, 3], [255, 255, 255, 255]],
+        )
+        self.assertEqual(packed.cells.tolist()[0], [1, 0, 1, 2, 3])
+        self.assertTrue(packed.boundary.readonly)
+        self.assertEqual(
+            packed.to_region().boundary,
+            ((0, 1, 2, 3), (255, 255, 255, 255)),
+        )
+
+    def test_native_cells_borrow_native_memory_without_copying(self) -> None:
+        cells = (_RegionCell * 2)()
+        cells[1].boundary[:] = (4, 5, 6, 7)
+        native_region = _Region(width=2, height=1, cell_count=2, cells=cells)
+
+        width, height, borrowed = _native_cells(native_region)
+        cells[0].active = True
+        cells[1].boundary[2] = 9
+
+        self.assertEqual((width, height), (2, 1))
+        self.assertEqual(borrowed.nbytes, 2 * sizeof(_RegionCell))
+        self.assertEqual(borrowed[_RegionCell.active.offset], 1)
+        self.assertEqual(
+            borrowed[sizeof(_RegionCell) + _RegionCell.boundary.offset + 2],
+            9,
+        )
+
+    def test_packed_region_matches_copy_for_built_instance(self) -> None:
+        formula, packed = load_formula_and_native_region(
+            INSTANCE_DIRECTORY / "pipeline_sat.cm13"
+        )
+        expected_formula, expected_region = load_formula_and_region(
+            INSTANCE_DIRECTORY / "pipeline_sat.cm13"
+        )
+
+        self.assertEqual(formula, expected_formula)
+        self.assertEqual(packed.to_region(), expected_region)
+
+    def test_packed_region_rejects_mismatched_cell_bytes(self) -> None:
+        for width, height, cells in (
+            (0, 1, b""),
+            (1, 1, bytes(4)),
+            (1, 1, bytearray(5)),
+        ):
+            with self.subTest(width=width, height=height, cells=cells):
+                with self.assertRaisesRegex(ValueError, "region extent"):
+                    NativeRegion(width, height, cells)
+
     def test_rejects_invalid_native_extent_before_copying(self) -> None:
         cells = (_RegionCell * 1)()
         invalid_regions = (
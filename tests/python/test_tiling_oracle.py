@@ -13,6 +13,7 @@ from model.tileset import (
     TILE_F1,
     TILE_L0,
 )
+from model.tiling import TILE_NONE, TilingBuffer
 from oracles.tiling_check import is_valid_tiling
 from oracles.tiling_solver import (
     TilingSolveResult,
@@ -45,6 +46,33 @@ class TilingSolveResultTests(unittest.TestCase):
             TilingSolveResult(TilingSolveStatus.UNSAT, tiling)
 
 
+class TilingBufferTests(unittest.TestCase):
+    def test_reads_as_the_equivalent_dense_tuple(self) -> None:
+        buffer = TilingBuffer(bytes((TILE_F0, TILE_NONE, TILE_L0)))
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer[1], None)
+        self.assertEqual(buffer[-1], TILE_L0)
+        self.assertEqual(tuple(buffer), (TILE_F0, None, TILE_L0))
+        self.assertEqual(buffer, (TILE_F0, None, TILE_L0))
+        self.assertEqual(hash(buffer), hash((TILE_F0, None, TILE_L0)))
+        self.assertEqual(buffer.occupancy(), bytes((1, 0, 1)))
+        self.assertEqual(
+            TilingBuffer.from_tiling((TILE_F0, None, TILE_L0)),
+            buffer,
+        )
+
+    def test_rejects_bytes_and_tiles_outside_the_tileset(self) -> None:
+        with self.assertRaises(TypeError):
+            TilingBuffer(bytearray(1))  # type: ignore[arg-type]
+        with self.assertRaises(ValueError):
+            TilingBuffer(bytes((len(TILESET),)))
+        for tiling in ((True,), (len(TILESET),), (-1,), ("0",)):
+            with self.subTest(tiling=tiling):
+                with self.assertRaises(ValueError):
+                    TilingBuffer.from_tiling(tiling)  # type: ignore[arg-type]
+
+
 class TilingCheckerTests(unittest.TestCase):
     def test_accepts_a_valid_boundary_constrained_tiling(self) -> None:
         region = Region(
@@ -72,6 +100,13 @@ class TilingCheckerTests(unittest.TestCase):
         self.assertFalse(is_valid_tiling(region, TILESET, (len(TILESET), None)))
         self.assertFalse(is_valid_tiling(region, TILESET, (TILE_F0, TILE_F0)))
 
+        encoded = TilingBuffer(bytes((TILE_F0, TILE_NONE)))
+        self.assertTrue(is_valid_tiling(region, TILESET, encoded))
+        self.assertFalse(is_valid_tiling(region, TILESET, encoded[:1]))
+        self.assertFalse(
+            is_valid_tiling(region, TILESET, TilingBuffer(bytes((TILE_F0,) * 2)))
+        )
+
     def test_checks_horizontal_and_vertical_adjacency(self) -> None:
         horizontal = Region(
             width=2,
@@ -1,6 +1,9 @@
 from contextlib import contextmanager
 from ctypes import POINTER, c_uint32, cast
+import os
 from pathlib import Path
+import subprocess
+import sys
 import unittest
 from unittest.mock import patch
 
@@ -8,8 +11,11 @@ from model.region import Region
 from model.tileset import COLOR_NONE, TILESET
 from native.formula_adapter import _Cm13Formula
 from native.region_adapter import _YangZhangReduction
+from model.tiling import TilingBuffer
 from native.witness_adapter import (
     NativeWitnessError,
+    _WangSolveResult,
+    _copy_sat_tiling,
     _solve_assignment_extension,
 )
 from oracles.boolean_solver import (
@@ -31,6 +37,7 @@ from native.reduction_adapter import load_formula_and_region
 INSTANCE_DIRECTORY = Path(__file__).resolve().parents[1] / "instances"
 SAT_PATH = INSTANCE_DIRECTORY / "pipeline_sat.cm13"
 UNSAT_PATH = INSTANCE_DIRECTORY / "pipeline_unsat.cm13"
+NO_BOUNDARY = (COLOR_NONE, COLOR_NONE, COLOR_NONE, COLOR_NONE)
 
 
 class WitnessPipelineIntegrationTests(unittest.TestCase):
@@ -82,6 +89,31 @@ class WitnessPipelineIntegrationTests(unittest.TestCase):
                 self.assertIsNone(wang_result.tiling)
                 self.assertIsNone(assignment)
 
+    def test_native_only_pipeline_never_imports_z3(self) -> None:
+        repository = Path(__file__).resolve().parents[2]
+        environment = dict(os.environ)
+        environment["PYTHONPATH"] = str(repository / "python")
+        program = (
+            "import sys\n"
+            "from crosscheck.witness_pipeline import solve_native_and_extract\n"
+            "assert 'z3' not in sys.modules, 'z3 imported'\n"
+            "assert 'concurrent.futures' not in sys.modules, 'futures imported'\n"
+            f"result = solve_native_and_extract({str(SAT_PATH)!r})[2]\n"
+            "assert result.status.value == 'sat', result\n"
+            "assert 'z3' not in sys.modules, 'z3 imported by a native solve'\n"
+        )
+
+        completed = subprocess.run(
+            [sys.executable, "-c", program],
+            cwd=repository,
+            env=environment,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+
     def test_wang_z3_tiling_extracts_a_valid_assignment(self) -> None:
         formula, region = load_formula_and_region(SAT_PATH)
         wang_result = solve_tiling(region, TILESET)
@@ -105,7 +137,7 @@ class WitnessPipelineIntegrationTests(unittest.TestCase):
 
     def test_boolean_unsat_does_not_produce_or_request_a_wang_witness(self) -> None:
         with patch(
-            "crosscheck.witness_pipeline._solve_assignment_extension",
+            "native.instance_adapter._solve_assignment_extension",
             side_effect=AssertionError("extension must not be called"),
         ):
             _, _, boolean_result, wang_result = solve_boolean_native_extension(
@@ -121,7 +153,7 @@ class WitnessPipelineIntegrationTests(unittest.TestCase):
             "crosscheck.witness_pipeline.solve_boolean",
             return_value=unknown,
         ), patch(
-            "crosscheck.witness_pipeline._solve_assignment_extension",
+            "native.instance_adapter._solve_assignment_extension",
             side_effect=AssertionError("extension must not be called"),
         ):
             _, _, boolean_result, wang_result = solve_boolean_native_extension(
@@ -137,6 +169,18 @@ class WitnessPipelineIntegrationTests(unittest.TestCase):
 
         self.assertIsNone(extract_wang_assignment(SAT_PATH, invalid))
 
+    def test_native_tilings_are_compact_buffers(self) -> None:
+        _, region, wang_result, extracted = solve_native_and_extract(
+            SAT_PATH,
+            optimized=True,
+        )
+
+        self.assertIsInstance(wang_result.tiling, TilingBuffer)
+        self.assertEqual(
+            extract_wang_assignment(SAT_PATH, wang_result.tiling.to_tuple()),
+            extracted,
+        )
+
     def test_malformed_python_tilings_are_rejected_before_native_call(self) -> None:
         _, region = load_formula_and_region(SAT_PATH)
         valid_shape = [0 if active else None for active in region.active]
@@ -166,7 +210,7 @@ class WitnessAdapterFailureTests(unittest.TestCase):
             width=1,
             height=1,
             active=(True,),
-            boundary=((COLOR_NONE, COLOR_NONE, COLOR_NONE, COLOR_NONE),),
+            boundary=(NO_BOUNDARY,),
         )
         self.formula = _Cm13Formula(
             variable_count=1,
@@ -203,6 +247,38 @@ class WitnessAdapterFailureTests(unittest.TestCase):
 
             self.assertEqual(events, ["result"])
 
+    def test_bulk_domain_decoding_matches_the_cell_rules(self) -> None:
+        region = Region(
+            width=3,
+            height=1,
+            active=(True, False, True),
+            boundary=(NO_BOUNDARY,) * 3,
+        )
+        cases = (
+            ((1 << 0, 0, 1 << 22), TilingBuffer(bytes((0, 255, 22)))),
+            ((1 << 9, 1 << 3, 1 << 17), "inactive cell"),
+            ((1 << 9, 0, 0), "non-singleton"),
+            ((1 << 9, 0, (1 << 3) | (1 << 12)), "non-singleton"),
+            ((1 << 9, 0, 3), "non-singleton"),
+            ((1 << 9, 0, 1 << 23), "outside the canonical tileset"),
+            ((1 << 9, 0, 1 << 31), "outside the canonical tileset"),
+        )
+        for domains, expected in cases:
+            native_domains = (c_uint32 * 3)(*domains)
+            result = _WangSolveResult(
+                domains=cast(native_domains, POINTER(c_uint32)),
+                domain_count=3,
+            )
+            with self.subTest(domains=domains):
+                if isinstance(expected, TilingBuffer):
+                    self.assertEqual(
+                        _copy_sat_tiling(region, result, "decode"),
+                        expected,
+                    )
+                    continue
+                with self.assertRaisesRegex(NativeWitnessError, expected):
+                    _copy_sat_tiling(region, result, "decode")
+
     def test_malformed_sat_copy_out_still_destroys_result(self) -> None:
         events: list[str] = []
 
@@ -282,16 +358,16 @@ class WitnessCoordinatorFailureTests(unittest.TestCase):
                 events.append("result")
 
         with patch(
-            "crosscheck.witness_pipeline._loaded_formula",
+            "native.instance_adapter._loaded_formula",
             loaded_formula,
         ), patch(
-            "crosscheck.witness_pipeline._built_reduction",
+            "native.instance_adapter._built_reduction",
             built_reduction,
         ), patch(
-            "crosscheck.witness_pipeline._copy_formula",
+            "native.instance_adapter._copy_formula",
             return_value=python_formula,
         ), patch(
-            "crosscheck.witness_pipeline._copy_region",
+            "native.instance_adapter._copy_region",
             return_value=python_region,
         ), patch(
             "crosscheck.witness_pipeline.solve_boolean",
@@ -334,25 +410,25 @@ class WitnessCoordinatorFailureTests(unittest.TestCase):
                 events.append("reduction")
 
         with patch(
-            "crosscheck.witness_pipeline._loaded_formula",
+            "native.instance_adapter._loaded_formula",
             loaded_formula,
         ), patch(
-            "crosscheck.witness_pipeline._built_reduction",
+            "native.instance_adapter._built_reduction",
             built_reduction,
         ), patch(
-            "crosscheck.witness_pipeline._copy_formula",
+            "native.instance_adapter._copy_formula",
             return_value=python_formula,
         ), patch(
-            "crosscheck.witness_pipeline._copy_region",
+            "native.instance_adapter._copy_region",
             return_value=python_region,
         ), patch(
             "crosscheck.witness_pipeline.solve_boolean",
             return_value=boolean_result,
         ), patch(
-            "crosscheck.witness_pipeline._solve_assignment_extension",
+            "native.instance_adapter._solve_assignment_extension",
             return_value=wang_result,
         ), patch(
-            "crosscheck.witness_pipeline._extract_assignment",
+            "native.instance_adapter._extract_assignment",
             side_effect=RuntimeError("copy failed"),
         ):
             with self.assertRaisesRegex(RuntimeError, "copy failed"):
@@ -368,7 +444,7 @@ class WitnessCoordinatorFailureTests(unittest.TestCase):
         different = tuple(not value for value in boolean_result.assignment)
 
         with patch(
-            "crosscheck.witness_pipeline._extract_assignment",
+            "native.instance_adapter._extract_assignment",
             return_value=different,
         ):
             with self.assertRaises(WitnessCrosscheckError) as raised: